@@ -0,0 +1,98 @@
+"""
+Benchmark per-turn ADK session overhead on a long-running session.
+
+Fills a session with N events, then measures what one broadcast turn costs
+the session service: the runner's get_session plus appending the user
+message and the model's streamed reply. Compares ADK's
+InMemorySessionService (keeps and copies every event) with saint_graph's
+BoundedSessionService, in memory and backed by SQLite in WAL mode.
+
+Usage:
+    python -m benchmarks.bench_session_store [--events 1000 5000] [--turns 100]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from google.adk.events.event import Event  # noqa: E402
+from google.adk.sessions import InMemorySessionService  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from saint_graph.session_store import BoundedSessionService, SqliteSessionStore  # noqa: E402
+
+APP, USER, SESSION = "InMemoryRunner", "yt_user", "yt_session"
+# 1 ターンあたりのモデル側のイベント数（ツール呼び出し・応答・本文）
+MODEL_EVENTS_PER_TURN = 3
+REPLY = "[emotion: joyful] 本日のニュースをお伝えします。" * 8
+
+
+def make_event(author: str, text: str) -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(author=author, content=types.Content(role=role, parts=[types.Part(text=text)]))
+
+
+async def append_turn(service, session, turn: int) -> None:
+    await service.append_event(session, make_event("user", f"[News Reading: {turn}]\n原稿 {turn}"))
+    for _ in range(MODEL_EVENTS_PER_TURN):
+        await service.append_event(session, make_event("SaintGraph", REPLY))
+
+
+async def run_turn(service, turn: int) -> None:
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+    await append_turn(service, session, turn)
+
+
+async def measure(service, events: int, turns: int) -> dict:
+    await service.create_session(app_name=APP, user_id=USER, session_id=SESSION)
+    fill_turns = events // (MODEL_EVENTS_PER_TURN + 1)
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+    for i in range(fill_turns):
+        await append_turn(service, session, i)
+
+    samples = []
+    for i in range(turns):
+        start = time.perf_counter()
+        await run_turn(service, fill_turns + i)
+        samples.append(time.perf_counter() - start)
+
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+    return {
+        "p50": statistics.median(samples) * 1000,
+        "p95": sorted(samples)[int(len(samples) * 0.95) - 1] * 1000,
+        "resident": len(session.events),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ADK session service per-turn overhead benchmark")
+    parser.add_argument("--events", type=int, nargs="+", default=[1000, 5000], help="Events in the session before measuring")
+    parser.add_argument("--turns", type=int, default=100, help="Measured turns")
+    parser.add_argument("--max-events", type=int, default=200, help="SESSION_MAX_EVENTS for BoundedSessionService")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "adk in-memory": lambda n: InMemorySessionService(),
+            "bounded memory": lambda n: BoundedSessionService(max_events=args.max_events),
+            "bounded sqlite (WAL)": lambda n: BoundedSessionService(
+                SqliteSessionStore(os.path.join(tmp, f"sessions_{n}.sqlite3")), max_events=args.max_events),
+        }
+        for events in args.events:
+            print(f"Session with {events} events, {args.turns} turns x {MODEL_EVENTS_PER_TURN + 1} appends")
+            print(f"  {'backend':<22} {'p50 ms':>8} {'p95 ms':>8} {'resident':>9}")
+            for label, factory in backends.items():
+                service = factory(events)
+                result = asyncio.run(measure(service, events, args.turns))
+                if hasattr(service, "close"):
+                    asyncio.run(service.close())
+                print(f"  {label:<22} {result['p50']:8.2f} {result['p95']:8.2f} {result['resident']:9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark serial vs. concurrent storage access against a local fake GCS.
+
+Models saint_graph startup (several small prompt/config reads) and an asset
+sync (many file downloads) with a fixed per-request latency, then compares
+the blocking client calls issued one by one with the async facade.
+
+Usage:
+    python -m benchmarks.bench_storage_async [--latency 0.05] [--files 24]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from benchmarks.fake_gcs import FakeGcsServer  # noqa: E402
+
+BUCKET = "bench-bucket"
+STARTUP_KEYS = [
+    "mind/ren/system_prompt.md",
+    "mind/ren/persona.md",
+    "mind/ren/mind.json",
+    "mind/ren/templates/intro.md",
+    "mind/ren/templates/news_reading.md",
+    "mind/ren/templates/news_finished.md",
+    "mind/ren/templates/closing.md",
+    "news/news_script.md",
+]
+
+
+def build_objects(files: int) -> dict:
+    objects = {key: f"content of {key}\n".encode() * 64 for key in STARTUP_KEYS}
+    for i in range(files):
+        objects[f"assets/file_{i:03d}.png"] = os.urandom(64 * 1024)
+    return objects
+
+
+def make_client(endpoint: str):
+    # google-cloud-storage talks to the emulator with anonymous credentials
+    os.environ["STORAGE_EMULATOR_HOST"] = endpoint
+    from infra.storage_client import GcsStorageClient
+
+    return GcsStorageClient(project_id="bench", default_bucket=BUCKET)
+
+
+async def read_all(client, keys):
+    return await asyncio.gather(*(client.aread_text(k) for k in keys))
+
+
+def timed(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Storage async facade benchmark")
+    parser.add_argument("--latency", type=float, default=0.05, help="Per-request latency in seconds")
+    parser.add_argument("--files", type=int, default=24, help="Number of asset files to download")
+    parser.add_argument("--concurrency", type=int, default=8, help="max_concurrency for adownload_many")
+    args = parser.parse_args()
+
+    asset_keys = [f"assets/file_{i:03d}.png" for i in range(args.files)]
+
+    with FakeGcsServer(build_objects(args.files), latency=args.latency) as server:
+        client = make_client(server.endpoint)
+        with tempfile.TemporaryDirectory() as tmp:
+            print(f"Startup reads ({len(STARTUP_KEYS)} objects, latency={args.latency * 1000:.0f} ms)")
+            serial_startup = timed("serial read_text", lambda: [client.read_text(k) for k in STARTUP_KEYS])
+            async_startup = timed("gather(aread_text)", lambda: asyncio.run(read_all(client, STARTUP_KEYS)))
+
+            print(f"Asset downloads ({args.files} files x 64 KiB)")
+            serial_assets = timed("serial download_file", lambda: [
+                client.download_file(k, os.path.join(tmp, "serial", k)) for k in asset_keys])
+            results = []
+            async_assets = timed(f"adownload_many (max={args.concurrency})", lambda: results.extend(asyncio.run(
+                client.adownload_many([(k, os.path.join(tmp, "async", k)) for k in asset_keys],
+                                      max_concurrency=args.concurrency))))
+            failures = [r for r in results if r is not None]
+            if failures:
+                print(f"  {len(failures)} downloads failed: {failures[0]}")
+
+        print(f"Speed-up: startup x{serial_startup / async_startup:.1f}, assets x{serial_assets / async_assets:.1f}")
+        print(f"Requests served: {server.requests}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the weather tool caches against a local Open-Meteo stand-in.
+
+Replays a weather segment in which the LLM asks about a handful of cities
+repeatedly, partly in parallel. The uncached run drops the caches and the
+shared client before every call, which matches the previous behaviour of
+one fresh client and two upstream requests per call.
+
+Usage:
+    python -m benchmarks.bench_weather_cache [--latency 0.08] [--calls 40]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from benchmarks.fake_open_meteo import FakeOpenMeteoServer  # noqa: E402
+
+CITIES = ["東京", "大阪", "札幌", "福岡", "那覇", "仙台"]
+DATES = [None, "tomorrow"]
+
+
+def build_workload(calls: int, batch: int) -> list[list[tuple[str, str]]]:
+    """LLM が1ターンで並列に呼ぶツール呼び出しをバッチ単位で並べる"""
+    requests = [(CITIES[i % len(CITIES)], DATES[(i // len(CITIES)) % len(DATES)]) for i in range(calls)]
+    return [requests[i:i + batch] for i in range(0, len(requests), batch)]
+
+
+async def replay(tools, workload, cached: bool, cache_dir: str) -> float:
+    start = time.perf_counter()
+    for batch in workload:
+        if not cached:
+            tools.reset_caches()
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        await asyncio.gather(*(tools.get_weather(city, date) for city, date in batch))
+    await tools.close_client()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Weather tool cache benchmark")
+    parser.add_argument("--latency", type=float, default=0.08, help="Upstream latency per request (seconds)")
+    parser.add_argument("--calls", type=int, default=40, help="Number of get_weather calls")
+    parser.add_argument("--batch", type=int, default=4, help="Parallel tool calls per LLM turn")
+    args = parser.parse_args()
+
+    with FakeOpenMeteoServer(latency=args.latency) as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ["OPEN_METEO_GEOCODING_URL"] = f"{server.base_url}/v1/search"
+        os.environ["OPEN_METEO_FORECAST_URL"] = f"{server.base_url}/v1/forecast"
+        os.environ["WEATHER_CACHE_DIR"] = tmp
+        from tools.weather import tools
+
+        workload = build_workload(args.calls, args.batch)
+        print(f"{args.calls} calls over {len(CITIES)} cities, batch={args.batch}, latency={args.latency * 1000:.0f} ms")
+
+        for label, cached in (("uncached", False), ("cached", True)):
+            tools.reset_caches()
+            shutil.rmtree(tmp, ignore_errors=True)
+            before = dict(server.requests)
+            elapsed = asyncio.run(replay(tools, workload, cached, tmp))
+            upstream = {k: server.requests[k] - before[k] for k in before}
+            print(f"  {label:<9} {elapsed * 1000:8.1f} ms  "
+                  f"geocode={upstream['search']:3d} forecast={upstream['forecast']:3d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Local stand-in for the GCS JSON API used by the storage benchmarks.
+
+Implements just enough of the API for GcsStorageClient: object listing,
+media download (with ifGenerationNotMatch revalidation) and object metadata.
+Every request sleeps for `latency` seconds to model a network round-trip.
+"""
+import json
+import threading
+import time
+import zlib
+import base64
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+
+class FakeGcsServer:
+    """In-memory GCS server running on a background thread."""
+
+    def __init__(self, objects: Optional[Dict[str, bytes]] = None, latency: float = 0.05):
+        self.objects: Dict[str, bytes] = dict(objects or {})
+        self.generations: Dict[str, int] = {name: 1 for name in self.objects}
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def put(self, name: str, data: bytes) -> None:
+        with self._lock:
+            self.objects[name] = data
+            self.generations[name] = self.generations.get(name, 0) + 1
+
+    def __enter__(self) -> "FakeGcsServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _metadata(self, bucket: str, name: str) -> dict:
+        data = self.objects[name]
+        crc = base64.b64encode(zlib.crc32(data).to_bytes(4, "big")).decode()
+        return {
+            "kind": "storage#object",
+            "bucket": bucket,
+            "name": name,
+            "size": str(len(data)),
+            "generation": str(self.generations[name]),
+            "metageneration": "1",
+            "contentType": "application/octet-stream",
+            # Not a real CRC32C; only used as an opaque change token by the fakes
+            "crc32c": crc,
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.latency)
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                parts = url.path.strip("/").split("/")
+
+                # /download/storage/v1/b/{bucket}/o/{name}?alt=media
+                if parts[:4] == ["download", "storage", "v1", "b"] and len(parts) >= 7:
+                    self._download(parts[4], unquote("/".join(parts[6:])), query)
+                # /storage/v1/b/{bucket}/o?prefix=...
+                elif parts[:3] == ["storage", "v1", "b"] and len(parts) == 5 and parts[4] == "o":
+                    prefix = query.get("prefix", [""])[0]
+                    items = [server._metadata(parts[3], name)
+                             for name in sorted(server.objects) if name.startswith(prefix)]
+                    self._send_json(200, {"kind": "storage#objects", "items": items})
+                # /storage/v1/b/{bucket}/o/{name}
+                elif parts[:3] == ["storage", "v1", "b"] and len(parts) >= 6:
+                    name = unquote("/".join(parts[5:]))
+                    if name not in server.objects:
+                        self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+                    elif query.get("alt") == ["media"]:
+                        self._download(parts[3], name, query)
+                    else:
+                        self._send_json(200, server._metadata(parts[3], name))
+                else:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+
+            def _download(self, bucket: str, name: str, query: dict) -> None:
+                if name not in server.objects:
+                    self._send_json(404, {"error": {"code": 404, "message": "Not Found"}})
+                    return
+                generation = server.generations[name]
+                not_match = query.get("ifGenerationNotMatch")
+                if not_match and int(not_match[0]) == generation:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                data = server.objects[name]
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-Goog-Generation", str(generation))
+                self.send_header("X-Goog-Metageneration", "1")
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
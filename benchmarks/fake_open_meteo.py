@@ -0,0 +1,102 @@
+"""Local stand-in for the Open-Meteo geocoding and forecast APIs.
+
+Serves /v1/search and /v1/forecast with deterministic data. The forecast
+endpoint accepts comma-separated latitude/longitude lists like the real API
+and then returns a JSON list with one entry per location. Every request
+sleeps for `latency` seconds to model a network round-trip.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _coordinates(name: str) -> tuple[float, float]:
+    digest = hashlib.sha256(name.encode("utf-8")).digest()
+    return 24.0 + digest[0] / 255 * 21.0, 123.0 + digest[1] / 255 * 23.0
+
+
+def _forecast(lat: float, lon: float) -> dict:
+    seed = int(abs(lat * 1000 + lon * 1000)) % 10
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current_weather": {"temperature": 10.0 + seed, "weathercode": [0, 1, 2, 3, 61][seed % 5]},
+        "daily": {
+            "time": ["2026-01-10", "2026-01-11", "2026-01-12"],
+            "weathercode": [0, 3, 61],
+            "temperature_2m_max": [15.0 + seed, 14.0 + seed, 13.0 + seed],
+            "temperature_2m_min": [5.0 + seed, 4.0 + seed, 3.0 + seed],
+        },
+    }
+
+
+class FakeOpenMeteoServer:
+    """Open-Meteo stand-in running on a background thread."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.requests = {"search": 0, "forecast": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FakeOpenMeteoServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, status: int, payload) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                endpoint = url.path.rstrip("/").rsplit("/", 1)[-1]
+                with server._lock:
+                    if endpoint in server.requests:
+                        server.requests[endpoint] += 1
+                time.sleep(server.latency)
+
+                if endpoint == "search":
+                    name = query.get("name", [""])[0]
+                    if not name or name.startswith("unknown"):
+                        self._send_json(200, {"generationtime_ms": 0.1})
+                        return
+                    lat, lon = _coordinates(name)
+                    self._send_json(200, {"results": [{"name": name, "latitude": lat, "longitude": lon}]})
+                elif endpoint == "forecast":
+                    lats = [float(v) for v in query["latitude"][0].split(",")]
+                    lons = [float(v) for v in query["longitude"][0].split(",")]
+                    if len(lats) != len(lons):
+                        self._send_json(400, {"error": True, "reason": "latitude/longitude length mismatch"})
+                        return
+                    results = [_forecast(lat, lon) for lat, lon in zip(lats, lons)]
+                    self._send_json(200, results if len(results) > 1 else results[0])
+                else:
+                    self._send_json(404, {"error": True, "reason": "Not Found"})
+
+        return Handler
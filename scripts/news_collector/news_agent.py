@@ -5,6 +5,8 @@ import datetime
 import logging
 import asyncio
 import re
+import time
+from typing import Awaitable, Callable, Optional
 
 # プロジェクトルートとsrcをsys.pathに追加
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -27,6 +29,8 @@ from google.adk.tools.google_search_tool import GoogleSearchTool
 # インフラ（StorageClient）のインポート
 from infra.storage_client import create_storage_client
 
+from scripts.news_collector.news_cache import CACHE_KEY, DEFAULT_RECURRING_THEMES, CollectionStats, NewsCache
+
 # 設定
 MODEL_NAME = "gemini-3.1-pro-preview"
 
@@ -36,34 +40,76 @@ logging.basicConfig(
 )
 logger = logging.getLogger("news_agent")
 
-async def run_agent(themes: list[str], target_date: str):
-    logger.info(f"エージェントを初期化中: 日付={target_date}")
+# 並列収集モード（テーマごとにエージェントを同時実行）の既定値
+DEFAULT_CONCURRENCY = int(os.getenv("NEWS_CONCURRENCY", "3"))
+DEFAULT_THEME_TIMEOUT = float(os.getenv("NEWS_THEME_TIMEOUT", "300"))
 
-    # ツール定義
-    tools = [GoogleSearchTool(bypass_multi_tools_limit=True)]
+# 差分収集モードの既定値（テーマの鮮度・項目フィンガープリントの保持期間）
+DEFAULT_THEME_TTL_HOURS = float(os.getenv("NEWS_THEME_TTL_HOURS", "6"))
+DEFAULT_CACHE_RETENTION_DAYS = float(os.getenv("NEWS_CACHE_RETENTION_DAYS", "3"))
+# 日をまたいだ重複除外をしない定例テーマ（テーマ名に含まれる語をパイプ区切りで指定）
+RECURRING_THEMES = os.getenv("NEWS_RECURRING_THEMES", "|".join(DEFAULT_RECURRING_THEMES)).split("|")
 
-    # システム指示をファイルから読み込む
+NEWS_SCRIPT_HEADER = "# News Script"
+
+
+def load_system_instruction() -> str:
+    """システム指示をファイルから読み込みます。"""
     prompt_path = os.path.join(current_dir, "system_prompt.md")
     try:
         with open(prompt_path, "r", encoding="utf-8") as f:
-            system_instruction = f.read()
+            return f.read()
     except Exception as e:
         logger.error(f"システムプロンプトの読み込みに失敗しました: {e}")
         # フォールバック（最低限の指示）
-        system_instruction = "あなたはプロのニュース編集者です。Markdown形式でニュース原稿を作成してください。"
+        return "あなたはプロのニュース編集者です。Markdown形式でニュース原稿を作成してください。"
+
+
+def build_user_prompt(target_date: str, themes: list[str], covered_items: Optional[list[str]] = None) -> str:
+    """
+    ユーザープロンプトをファイルから読み込んでフォーマットします。
+    covered_items が与えられた場合は、既に取り上げた話題を再要約しないよう指示を追記します。
+    """
+    user_prompt_path = os.path.join(current_dir, "user_prompt.md")
+    try:
+        with open(user_prompt_path, "r", encoding="utf-8") as f:
+            prompt_template = f.read()
+        prompt_text = prompt_template.format(target_date=target_date, themes=', '.join(themes))
+    except Exception as e:
+        logger.error(f"ユーザープロンプトの読み込みまたはフォーマットに失敗しました: {e}")
+        prompt_text = f"対象日: {target_date}, テーマ: {', '.join(themes)} に関するニュースをレポートしてください。"
+
+    if covered_items:
+        covered = "\n".join(f"- {item.lstrip('*-・ ')}" for item in covered_items)
+        prompt_text += f"\n\n以下の話題は既に取り上げ済みです。これらは含めず、新しい話題のみを報告してください:\n{covered}\n"
+    return prompt_text
+
+
+def create_runner() -> InMemoryRunner:
+    """ニュース編集エージェントと Runner を生成します。"""
+    # ツール定義
+    tools = [GoogleSearchTool(bypass_multi_tools_limit=True)]
 
-    # エージェント初期化
     agent = Agent(
         name="NewsEditor",
         model=Gemini(model=MODEL_NAME),
-        instruction=system_instruction,
+        instruction=load_system_instruction(),
         tools=tools
     )
+    return InMemoryRunner(agent=agent)
 
-    runner = InMemoryRunner(agent=agent)
 
-    # セッション確保
-    session_id = "news_session"
+async def run_prompt(
+    runner: InMemoryRunner,
+    prompt_text: str,
+    session_id: str = "news_session",
+    stats: Optional[CollectionStats] = None,
+) -> str:
+    """
+    1 セッションでプロンプトを送信し、応答テキストを連結して返します。
+    セッションIDを分ければ、同じ Runner 上で複数の呼び出しを同時に実行できます。
+    stats が与えられた場合は LLM 呼び出し回数と検索クエリ数を加算します。
+    """
     user_id = "cli_user"
 
     # InMemoryRunnerのapp_nameと一致させる
@@ -75,33 +121,28 @@ async def run_agent(themes: list[str], target_date: str):
         session_id=session_id
     )
     if not session:
-        logger.info("Creating new session...")
+        logger.info(f"Creating new session: {session_id}")
         await runner.session_service.create_session(
             app_name=app_name,
             user_id=user_id,
             session_id=session_id
         )
     else:
-        logger.info("Using existing session.")
-
-    # ユーザープロンプトをファイルから読み込んでフォーマット
-    user_prompt_path = os.path.join(current_dir, "user_prompt.md")
-    try:
-        with open(user_prompt_path, "r", encoding="utf-8") as f:
-            prompt_template = f.read()
-        prompt_text = prompt_template.format(target_date=target_date, themes=', '.join(themes))
-    except Exception as e:
-        logger.error(f"ユーザープロンプトの読み込みまたはフォーマットに失敗しました: {e}")
-        prompt_text = f"対象日: {target_date}, テーマ: {', '.join(themes)} に関するニュースをレポートしてください。"
+        logger.info(f"Using existing session: {session_id}")
 
-    logger.info("エージェントにプロンプトを送信中...")
     full_response = ""
-
+    if stats:
+        stats.llm_calls += 1
     async for event in runner.run_async(
         new_message=types.Content(role="user", parts=[types.Part(text=prompt_text)]),
         user_id=user_id,
         session_id=session_id
     ):
+        # Google Search のグラウンディングで実行された検索クエリを数える
+        grounding = getattr(event, 'grounding_metadata', None)
+        if stats and grounding and grounding.web_search_queries:
+            stats.search_queries += len(grounding.web_search_queries)
+
         # イベントからテキストを抽出
         if hasattr(event, 'content') and event.content:
             parts = getattr(event.content, 'parts', [])
@@ -109,37 +150,237 @@ async def run_agent(themes: list[str], target_date: str):
                 if hasattr(p, 'text') and p.text:
                     full_response += p.text
 
-    cleaned_response = clean_news_script(full_response)
-    
-    # ストレージクライアントの初期化
-    storage = create_storage_client()
-    
+    return full_response
+
+
+async def collect_themes_concurrently(
+    themes: list[str],
+    target_date: str,
+    prompt_runner: Callable[[str, str], Awaitable[str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    theme_timeout: float = DEFAULT_THEME_TIMEOUT,
+    covered_items: Optional[dict[str, list[str]]] = None,
+) -> list[tuple[str, Optional[str]]]:
+    """
+    テーマごとに 1 回ずつエージェントを呼び出し、同時実行数を制限しながら並列収集します。
+
+    Args:
+        themes: テーマのリスト
+        target_date: 対象日
+        prompt_runner: (prompt_text, session_id) を受け取り応答テキストを返す非同期関数
+        concurrency: 同時に実行するテーマ数の上限
+        theme_timeout: テーマ 1 件あたりのタイムアウト秒数
+        covered_items: テーマごとの取り上げ済み項目（プロンプトで除外を指示する）
+
+    Returns:
+        (テーマ, 応答テキスト) のリスト（入力と同じ順序）。失敗したテーマの応答は None。
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    covered_items = covered_items or {}
+
+    async def _collect(index: int, theme: str) -> tuple[str, Optional[str]]:
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                text = await asyncio.wait_for(
+                    prompt_runner(
+                        build_user_prompt(target_date, [theme], covered_items.get(theme)),
+                        f"news_session_{index}",
+                    ),
+                    timeout=theme_timeout,
+                )
+                logger.info(f"テーマ収集完了: {theme} ({time.monotonic() - started:.1f}s)")
+                return theme, text
+            except asyncio.TimeoutError:
+                logger.error(f"テーマ収集がタイムアウトしました: {theme} ({theme_timeout}s)")
+            except Exception as e:
+                logger.error(f"テーマ収集に失敗しました: {theme}: {e}")
+            return theme, None
+
+    return await asyncio.gather(*(_collect(i, theme) for i, theme in enumerate(themes)))
+
+
+def to_theme_section(theme: str, text: Optional[str]) -> str:
+    """
+    テーマ 1 件分の応答を clean_news_script で整形し、'## テーマ' セクションにして返します。
+    応答が空の場合は空文字を返します。
+    """
+    if not text:
+        return ""
+    body = clean_news_script(text)
+    if body.startswith(NEWS_SCRIPT_HEADER):
+        body = body[len(NEWS_SCRIPT_HEADER):].strip()
+    if not body:
+        return ""
+    # テーマ見出しが欠けている場合は補う
+    if not re.match(r"^##[ \t]", body):
+        body = f"## {theme}\n{body}"
+    return body
+
+
+def join_sections(sections: list[str]) -> str:
+    """セクションを '# News Script' 形式の原稿に結合します。空のセクションは除外します。"""
+    sections = [section for section in sections if section]
+    if not sections:
+        return ""
+    return NEWS_SCRIPT_HEADER + "\n" + "\n".join(sections)
+
+
+def merge_news_scripts(results: list[tuple[str, Optional[str]]]) -> str:
+    """
+    テーマごとの応答を 1 つの '# News Script' 形式の原稿にまとめます。
+    各応答には clean_news_script を適用し、失敗（None / 空）のテーマは除外します。
+    """
+    return join_sections([to_theme_section(theme, text) for theme, text in results])
+
+
+async def collect_incrementally(
+    themes: list[str],
+    target_date: str,
+    prompt_runner: Callable[[str, str], Awaitable[str]],
+    cache: NewsCache,
+    stats: CollectionStats,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    theme_timeout: float = DEFAULT_THEME_TIMEOUT,
+) -> str:
+    """
+    キャッシュを使って差分のみを収集し、原稿を組み立てます。
+
+    - 同じ対象日で鮮度の残っているテーマは LLM を呼ばずに再利用します。
+    - それ以外のテーマは、取り上げ済みの項目を除外するよう指示して収集し、
+      以前の対象日で既に取り上げた項目は出力からも取り除きます（定例テーマを除く）。
+    - 新しい項目が無かったテーマは、同じ対象日に生成済みのセクションがあればそれを使います。
+    """
+    sections: dict[str, str] = {}
+    stale = []
+    for theme in themes:
+        cached = cache.get_fresh_section(theme, target_date)
+        if cached:
+            logger.info(f"キャッシュを再利用します: {theme}")
+            sections[theme] = cached
+            stats.themes_reused += 1
+        else:
+            stale.append(theme)
+
+    if stale:
+        results = await collect_themes_concurrently(
+            stale,
+            target_date,
+            prompt_runner,
+            concurrency=concurrency,
+            theme_timeout=theme_timeout,
+            covered_items={theme: cache.covered_items(theme, target_date) for theme in stale},
+        )
+        for theme, text in results:
+            section = to_theme_section(theme, text)
+            skipped = 0
+            if section:
+                section, skipped = cache.filter_new_items(section, target_date, theme)
+            stats.items_skipped += skipped
+            if not section:
+                # 当日分を取り上げ済みのテーマを原稿から落とさない
+                previous = cache.same_day_section(theme, target_date)
+                if previous:
+                    logger.info(f"新しい項目が無いため当日のセクションを再利用します: {theme}")
+                    sections[theme] = previous
+                    stats.themes_reused += 1
+                continue
+            stats.themes_collected += 1
+            cache.record_section(theme, target_date, section)
+            sections[theme] = section
+
+    return join_sections([sections.get(theme, "") for theme in themes])
+
+
+def save_news_script(text: str):
+    """ニュース原稿を StorageClient 経由で直接保存します（ローカルへの一時書き出しは行いません）。"""
     # 論理パスの決定 (data/ 配下を StorageClient が管理)
     logical_key = "news/news_script.md"
     
-    # ローカルおよびリモートに保存
     try:
-        # ローカル側の出力をトリガーにするのではなく、StorageClient 経由で保存を抽象化
-        # まずは一時的に書き出したファイルをアップロード（将来的に write_text も追加可能）
-        local_output_path = os.path.join(project_root, "data", logical_key)
-        os.makedirs(os.path.dirname(local_output_path), exist_ok=True)
-        
-        with open(local_output_path, "w", encoding="utf-8") as f:
-            f.write(cleaned_response)
-        
-        logger.info(f"ニュース原稿を保存しました: {local_output_path}")
-
-        # GCS (または設定されたストレージ) にアップロード
-        # STORAGE_TYPE=gcs の場合のみアップロードを実行
-        if os.getenv("STORAGE_TYPE") == "gcs":
-            storage.upload_file(key=logical_key, src=local_output_path)
-            logger.info(f"ストレージにアップロードしました: {logical_key}")
-            print(f"アップロード完了: {logical_key}")
+        # filesystem ではアトミックな rename、GCS では直接アップロードで書き込まれる
+        storage = create_storage_client()
+        storage.write_text(key=logical_key, text=text, content_type="text/markdown; charset=utf-8")
+        logger.info(f"ニュース原稿を保存しました: {logical_key} ({storage.__class__.__name__})")
+        print(f"保存完了: {logical_key}")
         
     except Exception as e:
         logger.error(f"保存/アップロードエラー: {e}")
         print(f"警告: 保存に失敗しました: {e}")
 
+
+async def run_agent(
+    themes: list[str],
+    target_date: str,
+    parallel: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    theme_timeout: float = DEFAULT_THEME_TIMEOUT,
+    incremental: bool = False,
+    theme_ttl_hours: float = DEFAULT_THEME_TTL_HOURS,
+    cache_retention_days: float = DEFAULT_CACHE_RETENTION_DAYS,
+):
+    logger.info(f"エージェントを初期化中: 日付={target_date}")
+
+    runner = create_runner()
+    stats = CollectionStats()
+    started = time.monotonic()
+
+    def prompt_runner(prompt_text: str, session_id: str) -> Awaitable[str]:
+        return run_prompt(runner, prompt_text, session_id, stats=stats)
+
+    if incremental:
+        # 差分モード: 鮮度の切れたテーマのみ LLM で収集する
+        cache = NewsCache.load(
+            create_storage_client(),
+            theme_ttl=theme_ttl_hours * 3600,
+            retention=cache_retention_days * 86400,
+            recurring_themes=RECURRING_THEMES,
+        )
+        cache.prune()
+        cleaned_response = await collect_incrementally(
+            themes,
+            target_date,
+            prompt_runner,
+            cache,
+            stats,
+            concurrency=concurrency if parallel else 1,
+            theme_timeout=theme_timeout,
+        )
+        logger.info(f"収集統計: {stats.summary()}")
+        if not cleaned_response:
+            logger.error("原稿を組み立てられませんでした。原稿は保存しません。")
+            return
+        try:
+            create_storage_client().write_text(key=CACHE_KEY, text=cache.to_json(), content_type="application/json")
+        except Exception as e:
+            logger.warning(f"ニュースキャッシュの保存に失敗しました: {e}")
+    elif parallel:
+        # テーマごとにエージェントを並列実行（全体の所要時間は最も遅いテーマに近づく）
+        logger.info(f"並列モードで {len(themes)} テーマを収集します (同時実行数={concurrency}, タイムアウト={theme_timeout}s)")
+        results = await collect_themes_concurrently(
+            themes,
+            target_date,
+            prompt_runner,
+            concurrency=concurrency,
+            theme_timeout=theme_timeout,
+        )
+        failed = [theme for theme, text in results if not text]
+        if failed:
+            logger.warning(f"収集に失敗したテーマ: {', '.join(failed)}")
+
+        cleaned_response = merge_news_scripts(results)
+        if not cleaned_response:
+            # 既存の原稿を空で上書きしないよう保存しない
+            logger.error("すべてのテーマの収集に失敗しました。原稿は保存しません。")
+            return
+    else:
+        logger.info("エージェントにプロンプトを送信中...")
+        full_response = await run_prompt(runner, build_user_prompt(target_date, themes), stats=stats)
+        cleaned_response = clean_news_script(full_response)
+
+    logger.info(f"ニュース収集完了: {time.monotonic() - started:.1f}s ({stats.summary()})")
+    save_news_script(cleaned_response)
+
 def remove_apologetic_phrases(text: str) -> str:
     """
     「見つかりませんでした」系の言い訳フレーズを削除する。
@@ -213,6 +454,13 @@ def main():
     default_themes = "気になるアニメやVTuberの話題|全国の天気予報|本日の経済指標(S&P500, 日経平均, 為替ドル円, ビットコイン, 金)|経済関連ニュース|国内の政治経済ニュース|最新テックニュース"
     parser.add_argument("--themes", type=str, default=default_themes, help="パイプ(|)区切りのテーマ")
     parser.add_argument("--date", type=str, default=None, help="対象日 (YYYY-MM-DD)。デフォルトは今日。")
+    parser.add_argument("--parallel", action="store_true", default=os.getenv("NEWS_PARALLEL", "false").lower() == "true",
+                        help="テーマごとにエージェントを並列実行する")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="並列モードの同時実行数")
+    parser.add_argument("--theme-timeout", type=float, default=DEFAULT_THEME_TIMEOUT, help="並列モードのテーマごとのタイムアウト秒数")
+    parser.add_argument("--incremental", action="store_true", default=os.getenv("NEWS_INCREMENTAL", "false").lower() == "true",
+                        help="前回の収集結果をキャッシュし、新しい話題・鮮度切れのテーマのみ収集する")
+    parser.add_argument("--theme-ttl-hours", type=float, default=DEFAULT_THEME_TTL_HOURS, help="差分モードでテーマを再利用できる時間")
 
     args = parser.parse_args()
 
@@ -222,7 +470,15 @@ def main():
 
     themes = [t.strip() for t in args.themes.split("|")]
 
-    asyncio.run(run_agent(themes, target_date))
+    asyncio.run(run_agent(
+        themes,
+        target_date,
+        parallel=args.parallel,
+        concurrency=args.concurrency,
+        theme_timeout=args.theme_timeout,
+        incremental=args.incremental,
+        theme_ttl_hours=args.theme_ttl_hours,
+    ))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,181 @@
+"""
+ニュース収集の差分実行用キャッシュ。
+
+過去に生成したテーマごとのセクションと、各ニュース項目のフィンガープリント
+（正規化したテキストのハッシュ）を StorageClient 経由で永続化します。
+鮮度の残っているテーマは LLM を呼ばずに再利用し、既に取り上げた項目は
+再要約の対象から外します。
+
+天気予報や経済指標のように毎日同じ内容が続きうるテーマ（定例テーマ）は、
+日をまたいだ重複除外の対象にしません。
+"""
+import hashlib
+import json
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+logger = logging.getLogger("news_agent")
+
+CACHE_KEY = "news/news_cache.json"
+
+# テーマ名にこれらの語を含むテーマは定例テーマとして扱う
+DEFAULT_RECURRING_THEMES = ("天気", "経済指標")
+
+# 箇条書き・番号付きリストの行頭記号
+_ITEM_PREFIX = re.compile(r"^\s*(?:[*\-・]|\d+[.)．])\s*")
+
+
+def fingerprint(text: str) -> str:
+    """
+    ニュース項目の同一性判定用フィンガープリントを返します。
+    全角/半角・空白・記号・大文字小文字の違いは無視されます。
+    """
+    normalized = unicodedata.normalize("NFKC", _ITEM_PREFIX.sub("", text)).lower()
+    normalized = "".join(ch for ch in normalized if ch.isalnum())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def split_section(section: str) -> tuple[str, list[str]]:
+    """'## テーマ' セクションを見出し行と項目行のリストに分割します。"""
+    lines = [line for line in section.strip().split("\n") if line.strip()]
+    if lines and lines[0].startswith("##"):
+        return lines[0], lines[1:]
+    return "", lines
+
+
+@dataclass
+class CollectionStats:
+    """1 回の収集で発生した外部呼び出しとキャッシュ利用の集計。"""
+    llm_calls: int = 0
+    search_queries: int = 0
+    themes_reused: int = 0
+    themes_collected: int = 0
+    items_skipped: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"LLM呼び出し={self.llm_calls}, 検索クエリ={self.search_queries}, "
+            f"再利用テーマ={self.themes_reused}, 収集テーマ={self.themes_collected}, "
+            f"スキップ項目={self.items_skipped}"
+        )
+
+
+class NewsCache:
+    """テーマ単位のセクションと項目フィンガープリントを保持するキャッシュ。"""
+
+    def __init__(self, theme_ttl: float = 6 * 3600, retention: float = 3 * 86400,
+                 recurring_themes: Iterable[str] = DEFAULT_RECURRING_THEMES):
+        """
+        Args:
+            theme_ttl: 同じ対象日のテーマセクションを再利用できる秒数
+            retention: 項目フィンガープリントを保持する秒数
+            recurring_themes: 定例テーマを表す語（テーマ名に含まれていれば定例テーマ）
+        """
+        self.theme_ttl = theme_ttl
+        self.retention = retention
+        self.recurring_themes = tuple(k for k in recurring_themes if k)
+        self.themes: dict[str, dict] = {}
+        self.items: dict[str, dict] = {}
+
+    # --- 永続化 ---
+
+    @classmethod
+    def load(cls, storage, **kwargs) -> "NewsCache":
+        """ストレージからキャッシュを読み込みます。存在しない・壊れている場合は空で開始します。"""
+        cache = cls(**kwargs)
+        try:
+            data = json.loads(storage.read_text(key=CACHE_KEY))
+            cache.themes = data.get("themes", {})
+            cache.items = data.get("items", {})
+            logger.info(f"ニュースキャッシュを読み込みました: テーマ={len(cache.themes)}, 項目={len(cache.items)}")
+        except FileNotFoundError:
+            logger.info("ニュースキャッシュが見つかりません。空のキャッシュで開始します。")
+        except Exception as e:
+            logger.warning(f"ニュースキャッシュの読み込みに失敗しました（空で開始）: {e}")
+        return cache
+
+    def to_json(self) -> str:
+        return json.dumps({"themes": self.themes, "items": self.items}, ensure_ascii=False, indent=2)
+
+    def prune(self, now: Optional[float] = None):
+        """保持期間を過ぎた項目とテーマを削除します。"""
+        now = time.time() if now is None else now
+        self.items = {fp: v for fp, v in self.items.items() if now - v.get("seen_at", 0) <= self.retention}
+        self.themes = {t: v for t, v in self.themes.items() if now - v.get("fetched_at", 0) <= self.retention}
+
+    # --- テーマ ---
+
+    def is_recurring(self, theme: str) -> bool:
+        """毎日同じ内容が続きうる定例テーマかどうかを返します。"""
+        return any(keyword in theme for keyword in self.recurring_themes)
+
+    def get_fresh_section(self, theme: str, target_date: str, now: Optional[float] = None) -> Optional[str]:
+        """同じ対象日で TTL 内に生成済みのセクションがあれば返します。"""
+        now = time.time() if now is None else now
+        entry = self.themes.get(theme)
+        if not entry or entry.get("date") != target_date:
+            return None
+        if now - entry.get("fetched_at", 0) > self.theme_ttl:
+            return None
+        return entry.get("section") or None
+
+    def same_day_section(self, theme: str, target_date: str) -> Optional[str]:
+        """同じ対象日に生成済みのセクションを TTL に関係なく返します。"""
+        entry = self.themes.get(theme)
+        if not entry or entry.get("date") != target_date:
+            return None
+        return entry.get("section") or None
+
+    def record_section(self, theme: str, target_date: str, section: str, now: Optional[float] = None):
+        """
+        生成したセクションと、その項目のフィンガープリントを記録します。
+        既知の項目は最初に取り上げた対象日を保ったまま、最終確認時刻だけを更新します。
+        """
+        now = time.time() if now is None else now
+        self.themes[theme] = {"date": target_date, "fetched_at": now, "section": section}
+        if self.is_recurring(theme):
+            # 定例テーマの項目は、他の日・他のテーマの項目を除外する根拠にしない
+            return
+        _, items = split_section(section)
+        for item in items:
+            entry = self.items.setdefault(fingerprint(item), {"theme": theme, "date": target_date, "text": item})
+            entry["seen_at"] = now
+
+    # --- 項目 ---
+
+    def covered_items(self, theme: str, target_date: str) -> list[str]:
+        """
+        テーマ内で以前の対象日に取り上げた項目のテキストを返します（プロンプトの除外指示用）。
+        同じ対象日の項目は再実行時にも原稿に残すため含めません。
+        """
+        if self.is_recurring(theme):
+            return []
+        return [v["text"] for v in self.items.values()
+                if v.get("theme") == theme and v.get("date") != target_date]
+
+    def filter_new_items(self, section: str, target_date: str, theme: Optional[str] = None) -> tuple[str, int]:
+        """
+        以前の対象日で既に取り上げた項目をセクションから除外します。
+        定例テーマのセクションはそのまま返します。
+
+        Returns:
+            (除外後のセクション, 除外した項目数)
+        """
+        if theme is not None and self.is_recurring(theme):
+            return section, 0
+        heading, items = split_section(section)
+        kept = []
+        skipped = 0
+        for item in items:
+            known = self.items.get(fingerprint(item))
+            if known and known.get("date") != target_date:
+                skipped += 1
+                continue
+            kept.append(item)
+        if not kept:
+            return "", skipped
+        return "\n".join(([heading] if heading else []) + kept), skipped
@@ -4,7 +4,7 @@ MCPツール実装モジュール。
 """
 from typing import Optional, Dict, Any
 from .io_adapter import io_adapter
-from ..service import BodyServiceBase
+from ..service import BodyServiceBase, wait_for_items
 
 
 class CLIBodyService(BodyServiceBase):
@@ -20,10 +20,10 @@ class CLIBodyService(BodyServiceBase):
         """アバターの感情を変更します。"""
         return f"Emotion changed to {emotion}"
 
-    async def get_comments(self) -> str:
-        """キューに蓄積されたユーザーコメントを取得します。"""
+    async def get_comments(self, wait: float = 0.0) -> str:
+        """キューに蓄積されたユーザーコメントを取得します（wait 秒まで入力を待機）。"""
         import json
-        inputs = io_adapter.get_inputs()
+        inputs = await wait_for_items(io_adapter.get_inputs, wait)
         if not inputs:
             return json.dumps([])
         
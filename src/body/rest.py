@@ -4,13 +4,18 @@ Ensures consistent REST interface across different body implementations.
 """
 import logging
 import json
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, Response
 from starlette.requests import Request
 from starlette.routing import Route
+from infra import tracing
+from infra.metrics import CONTENT_TYPE, REGISTRY
 from .service import BodyServiceBase
 
 logger = logging.getLogger(__name__)
 
+# GET /api/comments?wait= で受け付ける最大待機時間（秒）
+MAX_COMMENT_WAIT = 30.0
+
 class BodyApp:
     """
     Body サービスの REST API を管理する基底クラス。
@@ -22,6 +27,10 @@ class BodyApp:
     async def health_check(self, request: Request) -> JSONResponse:
         return JSONResponse({"status": "ok"})
 
+    async def metrics(self, request: Request) -> Response:
+        """Prometheus 形式のメトリクス（キュー、音声合成、OBS、コメント、イベントループ遅延、シークレット取得）"""
+        return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
     async def speak_api(self, request: Request) -> JSONResponse:
         try:
             body = await request.json()
@@ -46,7 +55,8 @@ class BodyApp:
 
     async def get_comments_api(self, request: Request) -> JSONResponse:
         try:
-            result = await self.service.get_comments()
+            wait = min(max(float(request.query_params.get("wait", 0)), 0.0), MAX_COMMENT_WAIT)
+            result = await self.service.get_comments(wait=wait) if wait > 0 else await self.service.get_comments()
             comments = json.loads(result) if result else []
             return JSONResponse({"status": "ok", "comments": comments})
         except Exception as e:
@@ -70,6 +80,15 @@ class BodyApp:
             logger.error(f"Error in stop_broadcast API: {e}")
             return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
+    async def shutdown_broadcast_api(self, request: Request) -> JSONResponse:
+        try:
+            body = await request.json() if request.headers.get("content-type") == "application/json" else {}
+            result = await self.service.shutdown_broadcast(float(body.get("deadline", 8.0)))
+            return JSONResponse({"status": "ok", "result": result})
+        except Exception as e:
+            logger.error(f"Error in shutdown_broadcast API: {e}")
+            return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
+
     async def wait_for_queue_api(self, request: Request) -> JSONResponse:
         try:
             result = await self.service.wait_for_queue()
@@ -78,14 +97,24 @@ class BodyApp:
             logger.error(f"Error in wait_for_queue API: {e}")
             return JSONResponse({"status": "error", "message": str(e)}, status_code=500)
 
+    @staticmethod
+    def _traced(handler):
+        """リクエストヘッダーの traceparent を引き継いだスパン内でハンドラーを実行します。"""
+        async def wrapper(request: Request) -> JSONResponse:
+            with tracing.span_from_headers(f"body {request.method} {request.url.path}", request.headers):
+                return await handler(request)
+        return wrapper
+
     def get_routes(self) -> list[Route]:
         """共通のルート定義を返します。"""
         return [
             Route("/health", self.health_check, methods=["GET"]),
-            Route("/api/speak", self.speak_api, methods=["POST"]),
-            Route("/api/change_emotion", self.change_emotion_api, methods=["POST"]),
-            Route("/api/comments", self.get_comments_api, methods=["GET"]),
-            Route("/api/broadcast/start", self.start_broadcast_api, methods=["POST"]),
-            Route("/api/broadcast/stop", self.stop_broadcast_api, methods=["POST"]),
-            Route("/api/queue/wait", self.wait_for_queue_api, methods=["POST"]),
+            Route("/metrics", self.metrics, methods=["GET"]),
+            Route("/api/speak", self._traced(self.speak_api), methods=["POST"]),
+            Route("/api/change_emotion", self._traced(self.change_emotion_api), methods=["POST"]),
+            Route("/api/comments", self._traced(self.get_comments_api), methods=["GET"]),
+            Route("/api/broadcast/start", self._traced(self.start_broadcast_api), methods=["POST"]),
+            Route("/api/broadcast/stop", self._traced(self.stop_broadcast_api), methods=["POST"]),
+            Route("/api/broadcast/shutdown", self._traced(self.shutdown_broadcast_api), methods=["POST"]),
+            Route("/api/queue/wait", self._traced(self.wait_for_queue_api), methods=["POST"]),
         ]
@@ -2,8 +2,13 @@
 
 CLI / Streamer 両モードが準拠すべき抽象基底クラスを定義します。
 """
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+# get_comments(wait) でコメントの到着を確認する間隔（秒）
+COMMENT_WAIT_STEP = 0.1
 
 
 class BodyServiceBase(ABC):
@@ -20,8 +25,12 @@ class BodyServiceBase(ABC):
         ...
 
     @abstractmethod
-    async def get_comments(self) -> str:
-        """コメントを取得します。JSON 文字列（List[Dict]）を返します。"""
+    async def get_comments(self, wait: float = 0.0) -> str:
+        """
+        コメントを取得します。JSON 文字列（List[Dict]）を返します。
+
+        wait > 0 の場合、コメントがなければ最大 wait 秒まで到着を待ちます（long-poll）。
+        """
         ...
 
     @abstractmethod
@@ -33,3 +42,31 @@ class BodyServiceBase(ABC):
     async def wait_for_queue(self) -> str:
         """すべての処理が完了するまで待機します。"""
         ...
+
+    async def shutdown_broadcast(self, deadline: float = 8.0) -> str:
+        """
+        停止要求（SIGTERM 等）を受けたときに配信を止めます。
+
+        既定では stop_broadcast を deadline 秒で打ち切ります。未再生の発話を破棄して
+        すぐに止められる実装は、これをオーバーライドしてください。
+        """
+        try:
+            return await asyncio.wait_for(self.stop_broadcast(), timeout=deadline)
+        except asyncio.TimeoutError:
+            return f"Error: broadcast did not stop within {deadline}s"
+
+
+async def wait_for_items(fetch: Callable[[], List[Any]], wait: float) -> List[Any]:
+    """
+    fetch() が空でない結果を返すか wait 秒経つまで繰り返し呼び出します。
+
+    コメントの取得元（標準入力・コメント取得プロセス）はスレッド側のキューに溜まるため、
+    ループ内で短い間隔で確認します。HTTP のポーリングとは違い、Body 内で完結します。
+    """
+    deadline = time.monotonic() + max(0.0, wait)
+    while True:
+        items = fetch()
+        remaining = deadline - time.monotonic()
+        if items or remaining <= 0:
+            return items
+        await asyncio.sleep(min(COMMENT_WAIT_STEP, remaining))
@@ -0,0 +1,201 @@
+"""事前に作成した YouTube Live 配信枠のプール。
+
+配信前ジョブ (scripts/provision_live.py) が配信枠とストリームを作成・紐付けし、
+その ID をストレージ上のプール (JSON) に保存します。
+配信開始時はプールから 1 件取り出して OBS を接続するだけで済むため、
+API 呼び出しの連鎖を待たずに配信を開始できます。
+
+ストリームキーは認証情報のため共有バケットには保存せず、取り出すときに API から取得します。
+プールの更新は世代番号（GCS generation）を条件にした書き込みで行い、
+複数の Streamer が同時に取り出しても同じ配信枠を受け取らないようにしています。
+"""
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from infra.storage_client import PreconditionFailedError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_KEY = "live/broadcast_pool.json"
+
+# 再利用できる配信枠の状態（それ以外は終了済み・配信中などとして破棄する）
+REUSABLE_LIFECYCLE = ("created", "ready")
+# 他の Streamer / 配信前ジョブと更新が競合したときの再試行回数
+MAX_UPDATE_ATTEMPTS = 5
+
+
+@dataclass
+class PreparedLive:
+    """作成・紐付け済みの配信枠とストリーム。"""
+    broadcast_id: str
+    stream_id: str
+    live_chat_id: Optional[str] = None
+    title: str = ""
+    scheduled_start_time: str = ""
+    created_at: str = ""
+    # 取り出し時に API から取得する（プールには保存しない）
+    stream_key: Optional[str] = field(default=None, repr=False)
+
+    @classmethod
+    def from_live_response(cls, live_response: dict) -> "PreparedLive":
+        """create_live / acreate_live の戻り値から作成します。"""
+        broadcast = live_response["broadcast"]
+        stream = live_response["stream"]
+        snippet = broadcast.get("snippet", {})
+        return cls(
+            broadcast_id=broadcast["id"],
+            stream_id=stream["id"],
+            live_chat_id=snippet.get("liveChatId"),
+            title=snippet.get("title", ""),
+            scheduled_start_time=snippet.get("scheduledStartTime", ""),
+            created_at=datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        )
+
+    def to_dict(self) -> dict:
+        """プールに保存する内容（ストリームキーを除く）。"""
+        data = asdict(self)
+        data.pop("stream_key")
+        return data
+
+    def to_live_response(self) -> dict:
+        """create_live と同じ形の辞書に変換します。"""
+        return {
+            "broadcast": {"id": self.broadcast_id, "snippet": {"liveChatId": self.live_chat_id}},
+            "thumbnail": None,
+            "stream": {"id": self.stream_id, "cdn": {"ingestionInfo": {"streamName": self.stream_key}}},
+            "bind": None,
+        }
+
+
+class LivePool:
+    """StorageClient 上の JSON に保存された配信枠プール。"""
+
+    def __init__(self, storage, key: Optional[str] = None):
+        """
+        Args:
+            storage: StorageClient
+            key: プールを保存するキー（デフォルト: YOUTUBE_LIVE_POOL_KEY または live/broadcast_pool.json）
+        """
+        self.storage = storage
+        self.key = key or os.getenv("YOUTUBE_LIVE_POOL_KEY", DEFAULT_POOL_KEY)
+
+    def entries(self) -> List[PreparedLive]:
+        """プール内の配信枠を古い順に返します。"""
+        return self._load()[0]
+
+    def _load(self) -> Tuple[List[PreparedLive], Optional[int]]:
+        """プールと、その世代番号（存在しなければ 0 = 新規作成のみ許可）を返します。"""
+        try:
+            text, generation = self.storage.read_text_with_generation(self.key)
+        except FileNotFoundError:
+            return [], 0
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Ignoring corrupt live pool {self.key}: {e}")
+            return [], generation
+        # 以前の形式で保存されたストリームキーは読み捨て、次の書き込みで消える
+        return [PreparedLive(**{k: v for k, v in entry.items() if k != "stream_key"}) for entry in data], generation
+
+    def _save(self, entries: List[PreparedLive], generation: Optional[int]) -> None:
+        """読み込んだ時点から変更されていなければ書き込みます（変更されていれば PreconditionFailedError）。"""
+        self.storage.write_text(
+            self.key,
+            json.dumps([e.to_dict() for e in entries], ensure_ascii=False, indent=2),
+            content_type="application/json",
+            if_generation_match=generation,
+        )
+
+    def add(self, prepared: PreparedLive) -> None:
+        """配信枠をプールに追加します。"""
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            entries, generation = self._load()
+            try:
+                self._save(entries + [prepared], generation)
+            except PreconditionFailedError:
+                logger.info(f"Live pool {self.key} changed concurrently. Retrying add.")
+                continue
+            logger.info(f"Added broadcast {prepared.broadcast_id} to live pool {self.key}")
+            return
+        raise RuntimeError(f"Could not add broadcast {prepared.broadcast_id} to live pool {self.key}: "
+                           f"too many concurrent updates")
+
+    def claim(self, adapter=None, youtube=None) -> Optional[PreparedLive]:
+        """
+        プールから配信枠を 1 件取り出します。
+
+        adapter と youtube が渡された場合は、配信枠がまだ使える状態か API で確認し、
+        終了済み・削除済みのものは破棄して次を試します。ストリームキーもこのとき取得します。
+        API エラーなどで確認できなかった場合は、その配信枠も残りも破棄せずに取り出しを中止します。
+
+        Returns:
+            使用できる配信枠。プールが空、または確認できなかった場合は None。
+        """
+        for _ in range(MAX_UPDATE_ATTEMPTS):
+            entries, generation = self._load()
+            if not entries:
+                return None
+
+            claimed = None
+            discarded = 0
+            while entries:
+                candidate = entries[0]
+                reusable = True if adapter is None or youtube is None else self._is_reusable(adapter, youtube, candidate)
+                if reusable is None:
+                    # 一時的なエラーでプールを空にしないよう、未確認の配信枠はプールに残す
+                    logger.warning(f"Could not verify pooled broadcast {candidate.broadcast_id}. "
+                                   f"Keeping the pool and skipping it this time.")
+                    break
+                entries.pop(0)
+                if reusable:
+                    claimed = candidate
+                    break
+                discarded += 1
+                logger.info(f"Discarding stale pooled broadcast {candidate.broadcast_id}")
+
+            if claimed is None and not discarded:
+                return None
+            try:
+                self._save(entries, generation)
+            except PreconditionFailedError:
+                # 他の Streamer が先に取り出した。最新のプールでやり直す
+                logger.info(f"Live pool {self.key} changed concurrently. Retrying claim.")
+                continue
+            if claimed:
+                logger.info(f"Claimed pooled broadcast {claimed.broadcast_id} ({len(entries)} left)")
+            return claimed
+
+        logger.warning(f"Could not claim from live pool {self.key}: too many concurrent updates")
+        return None
+
+    @staticmethod
+    def _is_reusable(adapter, youtube, prepared: PreparedLive) -> Optional[bool]:
+        """
+        配信枠が再利用できるかを返します。
+
+        Returns:
+            True: 再利用できる（ストリームキーも取得済み）
+            False: 削除済み・終了済みなど、破棄してよい
+            None: API エラーなどで確認できなかった
+        """
+        try:
+            broadcast = adapter.get_broadcast(youtube, prepared.broadcast_id)
+        except Exception as e:
+            logger.warning(f"Could not check pooled broadcast {prepared.broadcast_id}: {e}")
+            return None
+        if broadcast is None:
+            return False
+        if not prepared.live_chat_id:
+            prepared.live_chat_id = broadcast.get("snippet", {}).get("liveChatId")
+        if broadcast.get("status", {}).get("lifeCycleStatus") not in REUSABLE_LIFECYCLE:
+            return False
+        try:
+            prepared.stream_key = adapter.get_stream_key(youtube, prepared.stream_id)
+        except Exception as e:
+            logger.warning(f"Could not fetch the stream key of pooled broadcast {prepared.broadcast_id}: {e}")
+            return None
+        return True
@@ -3,6 +3,7 @@ import os
 import logging
 import uvicorn
 from starlette.applications import Starlette
+from infra.tracing import setup_tracing
 from .service import body_service
 from .utils import ensure_youtube_secrets
 from ..rest import BodyApp
@@ -21,9 +22,18 @@ body_app = BodyApp(body_service)
 
 async def startup():
     """アプリケーション起動時の処理"""
+    # TRACING_EXPORTER が設定されていれば saint_graph から伝搬されたトレースを出力
+    setup_tracing("body-streamer")
     await body_service.start_worker()
 
-app = Starlette(routes=body_app.get_routes(), on_startup=[startup])
+async def shutdown():
+    """コンテナ停止時（SIGTERM）に配信が続いていれば、期限内に止める"""
+    if body_service.broadcast_live:
+        logger.warning("Body is shutting down while the broadcast is live. Stopping it.")
+        await body_service.shutdown_broadcast(float(os.getenv("SHUTDOWN_DEADLINE", "8")))
+    await body_service.stop_worker()
+
+app = Starlette(routes=body_app.get_routes(), on_startup=[startup], on_shutdown=[shutdown])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,57 @@
+"""Body Streamer のメトリクス定義。"""
+import asyncio
+import time
+
+from infra.metrics import REGISTRY
+# シークレット取得のメトリクス（secret_fetch_seconds / secret_lookups_total）も /metrics に含める
+from infra import secret_provider  # noqa: F401
+
+# 音声合成・再生は秒単位になるため、ネットワーク向けの既定より長めのバケットを使う
+SPEECH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0)
+
+ACTION_QUEUE_DEPTH = REGISTRY.gauge(
+    "body_action_queue_depth", "Actions waiting in the body action queue")
+QUEUED_AUDIO_SECONDS = REGISTRY.gauge(
+    "body_queued_audio_seconds",
+    "Audio queued or playing, in seconds (estimated from text until synthesized)")
+QUEUED_SPEECH_CHARS = REGISTRY.gauge(
+    "body_queued_speech_chars", "Characters of speech queued but not yet synthesized")
+QUEUE_WAIT = REGISTRY.histogram(
+    "body_action_queue_wait_seconds", "Time an action waited in the queue", ["action"], buckets=SPEECH_BUCKETS)
+SYNTHESIS_LATENCY = REGISTRY.histogram(
+    "body_synthesis_latency_seconds", "VoiceVox synthesis latency", ["stage"], buckets=SPEECH_BUCKETS)
+OBS_REQUEST_LATENCY = REGISTRY.histogram(
+    "body_obs_request_latency_seconds", "Latency of OBS WebSocket requests", ["request"])
+OBS_REQUEST_ERRORS = REGISTRY.counter(
+    "body_obs_request_errors_total", "OBS WebSocket requests that raised", ["request"])
+OBS_RECONNECTS = REGISTRY.counter(
+    "body_obs_reconnects_total", "OBS WebSocket (re)connection attempts", ["result"])
+PLAYBACK_START_DELAY = REGISTRY.histogram(
+    "body_playback_start_delay_seconds", "Delay from OBS play trigger to the playback-started event")
+PLAYBACK_START_TIMEOUTS = REGISTRY.counter(
+    "body_playback_start_timeouts_total", "Playbacks where the OBS playback-started event never arrived")
+COMMENTS_INGESTED = REGISTRY.counter(
+    "body_comments_ingested_total", "Comments received from the YouTube comment fetcher")
+COMMENTS_DROPPED = REGISTRY.counter(
+    "body_comments_dropped_total", "Comment fetcher lines that were discarded", ["reason"])
+DEAD_AIR = REGISTRY.histogram(
+    "body_dead_air_seconds", "Silent gaps between audio clips by primary cause", ["cause"], buckets=SPEECH_BUCKETS)
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    "body_event_loop_lag_seconds", "Most recent event loop scheduling lag")
+EVENT_LOOP_LAG_HISTOGRAM = REGISTRY.histogram(
+    "body_event_loop_lag_distribution_seconds", "Event loop scheduling lag")
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """
+    イベントループの遅延を計測し続けます（キャンセルされるまで）。
+
+    interval 秒のスリープが実際にどれだけ遅れて戻ってきたかを遅延とみなします。
+    同期的な OBS 呼び出しなどでループが詰まっていると値が大きくなります。
+    """
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.perf_counter() - start - interval)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_HISTOGRAM.observe(lag)
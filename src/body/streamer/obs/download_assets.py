@@ -2,10 +2,19 @@
 
 StorageClient を使用して、ローカル (data/) または GCS から
 キャラクター画像・BGM を /app/assets/ に配置します。
+
+前回の同期結果をローカルのマニフェスト (.assets_manifest.json) に記録し、
+サイズ・CRC32C・更新時刻が変わったオブジェクトだけを並列にダウンロードします。
+ダウンロードしたファイルはチェックサムを検証してから配置し、
+すべてのアセットの検証が終わった時点でのみ .assets_ready を作成します。
 """
+import asyncio
+import json
 import os
 import sys
 import logging
+from dataclasses import dataclass, field
+from typing import Optional
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,18 +22,205 @@ logging.basicConfig(
 )
 logger = logging.getLogger("download_assets")
 
+MARKER_NAME = ".assets_ready"
+MANIFEST_NAME = ".assets_manifest.json"
+PART_SUFFIX = ".part"
+
+# 同時ダウンロード数と、失敗したファイルの再試行回数
+DEFAULT_WORKERS = int(os.getenv("ASSET_SYNC_WORKERS", "8"))
+DEFAULT_RETRIES = int(os.getenv("ASSET_SYNC_RETRIES", "2"))
+
+
+@dataclass
+class SyncResult:
+    """アセット同期の結果。"""
+    total: int = 0
+    skipped: int = 0
+    downloaded: int = 0
+    removed: int = 0
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def verified(self) -> bool:
+        return not self.failed
+
+    def summary(self) -> str:
+        return (
+            f"{self.total} assets: {self.downloaded} downloaded, {self.skipped} unchanged, "
+            f"{self.removed} removed, {len(self.failed)} failed"
+        )
+
+
+def crc32c_base64(path: str) -> Optional[str]:
+    """ファイルの CRC32C を GCS と同じ形式 (base64, big-endian) で返します。google-crc32c が無い場合は None。"""
+    try:
+        import base64
+        import google_crc32c
+    except ImportError:
+        return None
+
+    checksum = google_crc32c.Checksum()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            checksum.update(chunk)
+    return base64.b64encode(checksum.digest()).decode("ascii")
+
+
+def load_manifest(dest_dir: str) -> dict:
+    """前回の同期で記録したマニフェストを読み込みます。存在しない・壊れている場合は空。"""
+    path = os.path.join(dest_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable manifest {path}: {e}")
+        return {}
+
+
+def save_manifest(dest_dir: str, manifest: dict) -> None:
+    """マニフェストを一時ファイル経由でアトミックに書き込みます。"""
+    path = os.path.join(dest_dir, MANIFEST_NAME)
+    tmp_path = path + PART_SUFFIX
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _remote_state(info) -> dict:
+    return {"key": info.key, "size": info.size, "crc32c": info.crc32c, "updated": info.updated}
+
+
+def is_up_to_date(info, entry: Optional[dict], path: str) -> bool:
+    """
+    リモートのメタデータがマニフェストと一致し、ローカルファイルも
+    記録時から変更されていなければ True を返します。
+    """
+    if not entry or info.size is None:
+        return False
+    if any(entry.get(k) != v for k, v in _remote_state(info).items()):
+        return False
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+    return stat.st_size == entry.get("local_size") and stat.st_mtime_ns == entry.get("local_mtime_ns")
+
+
+def verify_download(path: str, info) -> Optional[str]:
+    """ダウンロードしたファイルを検証し、問題があればその理由を返します。"""
+    size = os.path.getsize(path)
+    if info.size is not None and size != info.size:
+        return f"size mismatch (expected {info.size}, got {size})"
+    if info.crc32c:
+        actual = crc32c_base64(path)
+        if actual is not None and actual != info.crc32c:
+            return f"crc32c mismatch (expected {info.crc32c}, got {actual})"
+    return None
+
+
+async def sync_assets(storage, prefix: str, dest_dir: str,
+                      workers: int = DEFAULT_WORKERS, retries: int = DEFAULT_RETRIES) -> SyncResult:
+    """
+    prefix 配下のアセットを dest_dir に差分同期します。
+
+    Args:
+        storage: StorageClient
+        prefix: 同期元のプレフィックス (例: mind/ren/assets/)
+        dest_dir: 同期先ディレクトリ
+        workers: 同時ダウンロード数
+        retries: 失敗したファイルを再試行する回数
+
+    Returns:
+        SyncResult
+    """
+    infos = await asyncio.to_thread(storage.list_object_info, prefix)
+    manifest = load_manifest(dest_dir)
+    result = SyncResult()
+
+    # ファイル名 -> ObjectInfo（マーカー等のドットファイルは同期対象外）
+    remote = {}
+    for info in infos:
+        filename = os.path.basename(info.key)
+        if filename and not filename.startswith("."):
+            remote[filename] = info
+    result.total = len(remote)
+
+    pending = {}
+    for filename, info in remote.items():
+        if is_up_to_date(info, manifest.get(filename), os.path.join(dest_dir, filename)):
+            result.skipped += 1
+        else:
+            pending[filename] = info
+
+    for attempt in range(retries + 1):
+        if not pending:
+            break
+        if attempt:
+            logger.info(f"Retrying {len(pending)} failed assets (attempt {attempt + 1})")
+
+        names = list(pending)
+        items = [(pending[n].key, os.path.join(dest_dir, n + PART_SUFFIX)) for n in names]
+        errors = await storage.adownload_many(items, max_concurrency=workers)
+
+        for filename, (_, part_path), error in zip(names, items, errors):
+            info = pending[filename]
+            if error is None:
+                error = await asyncio.to_thread(verify_download, part_path, info)
+            if error is not None:
+                logger.warning(f"  ✗ {filename}: {error}")
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                continue
+
+            final_path = os.path.join(dest_dir, filename)
+            os.replace(part_path, final_path)
+            stat = os.stat(final_path)
+            manifest[filename] = {
+                **_remote_state(info),
+                "local_size": stat.st_size,
+                "local_mtime_ns": stat.st_mtime_ns,
+            }
+            del pending[filename]
+            result.downloaded += 1
+            logger.info(f"  ✓ {filename}")
+
+    result.failed = sorted(pending)
+    for filename in result.failed:
+        manifest.pop(filename, None)
+
+    # リモートから削除されたアセットは、マニフェストで管理しているものに限り削除する
+    for filename in [n for n in manifest if n not in remote]:
+        try:
+            os.remove(os.path.join(dest_dir, filename))
+        except FileNotFoundError:
+            pass
+        del manifest[filename]
+        result.removed += 1
+        logger.info(f"  - {filename} (removed from storage)")
+
+    save_manifest(dest_dir, manifest)
+    return result
+
+
 def main():
     character = os.getenv("CHARACTER_NAME", "ren")
     # OBS のシーン設定 (Untitled.json) が /app/data/mind/{character}/assets/ を参照するため合わせる
     default_dest = f"/app/data/mind/{character}/assets"
     dest_dir = os.getenv("ASSETS_DIR", default_dest)
-    
-    logger.info(f"Downloading assets for character: {character}")
+
+    logger.info(f"Syncing assets for character: {character}")
     logger.info(f"Storage type: {os.getenv('STORAGE_TYPE', 'filesystem')}")
-    logger.info(f"Destination: {dest_dir}")
-    
+    logger.info(f"Destination: {dest_dir} (workers={DEFAULT_WORKERS})")
+
     os.makedirs(dest_dir, exist_ok=True)
-    
+
+    # 前回のマーカーが残っていると、検証前に OBS が起動してしまうため先に消す
+    marker_path = os.path.join(dest_dir, MARKER_NAME)
+    if os.path.exists(marker_path):
+        os.remove(marker_path)
+
     # 後方互換: /app/assets が別パスなら symlink を作成（start_obs.sh のマーカー待機用）
     legacy_dir = "/app/assets"
     if os.path.abspath(dest_dir) != os.path.abspath(legacy_dir):
@@ -35,52 +231,36 @@ def main():
                 logger.info(f"Created symlink {legacy_dir} -> {dest_dir}")
             except OSError as e:
                 logger.warning(f"Could not create symlink {legacy_dir}: {e}")
-    
+
     try:
-        from infra.storage_client import create_storage_client
+        from infra.storage_client import CachingStorageClient, create_storage_client
         storage = create_storage_client()
+        # バージョン管理はマニフェストで行うため、読み込みキャッシュに二重に保存しない
+        if isinstance(storage, CachingStorageClient):
+            storage = storage.inner
     except Exception as e:
         logger.error(f"Failed to initialize StorageClient: {e}")
         sys.exit(1)
-    
-    success_count = 0
-    fail_count = 0
-    
+
     prefix = f"mind/{character}/assets/"
     try:
-        asset_keys = storage.list_objects(prefix=prefix)
+        result = asyncio.run(sync_assets(storage, prefix, dest_dir))
     except Exception as e:
-        logger.error(f"Failed to list assets: {e}")
+        logger.error(f"Failed to sync assets: {e}")
         sys.exit(1)
 
-    if not asset_keys:
+    if result.total == 0:
         logger.warning(f"No assets found with prefix: {prefix}")
 
-    for key in asset_keys:
-        filename = os.path.basename(key)
-        if not filename:
-            continue
+    logger.info(f"Asset sync complete: {result.summary()}")
+
+    if not result.verified:
+        logger.error(f"Assets could not be verified: {', '.join(result.failed)}. Not marking assets as ready.")
+        sys.exit(1)
 
-        dest = os.path.join(dest_dir, filename)
-        
-        try:
-            storage.download_file(key=key, dest=dest)
-            logger.info(f"  ✓ {filename}")
-            success_count += 1
-        except Exception as e:
-            logger.error(f"  ✗ {filename} failed: {e}")
-            fail_count += 1
-    
     # 完了マーカーファイルを作成（OBS 起動ガード用）
-    marker_path = os.path.join(dest_dir, ".assets_ready")
     with open(marker_path, "w") as f:
-        f.write(f"ok: {success_count} downloaded, {fail_count} failed\n")
-    
-    logger.info(f"Asset download complete: {success_count} ok, {fail_count} failed")
-    
-    if fail_count > 0 and success_count == 0:
-        logger.error("All assets failed to download. Exiting with error.")
-        sys.exit(1)
+        f.write(f"ok: {result.summary()}\n")
 
 
 if __name__ == "__main__":
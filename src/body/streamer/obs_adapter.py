@@ -3,6 +3,13 @@ import os
 import logging
 from typing import Optional
 import asyncio
+import time
+
+from infra import tracing
+from .metrics import (
+    OBS_RECONNECTS, OBS_REQUEST_ERRORS, OBS_REQUEST_LATENCY,
+    PLAYBACK_START_DELAY, PLAYBACK_START_TIMEOUTS,
+)
 
 try:
     from obswebsocket import obsws, requests as obs_requests, events as obs_events
@@ -13,6 +20,7 @@ except ImportError:
 
 
 logger = logging.getLogger(__name__)
+_tracer = tracing.get_tracer(__name__)
 
 # OBS configuration from environment
 OBS_HOST = os.getenv("OBS_HOST", "obs-studio")
@@ -39,12 +47,27 @@ LIP_SYNC_ADJUST_MS = int(os.getenv("LIP_SYNC_ADJUST_MS", "500"))
 ws_client: Optional[obsws] = None
 _playback_event = asyncio.Event()
 _main_loop: Optional[asyncio.AbstractEventLoop] = None
+# 直近の音声が実際に再生を開始した時刻（time.monotonic）。再生開始イベントが届かなかった場合は None
+last_playback_started_at: Optional[float] = None
 
 
 # Scene Item ID Cache (to avoid redundant API calls)
 _source_id_cache = {}
 _current_scene_name = None
 
+def _call(request):
+    """OBS にリクエストを送信し、リクエスト種別ごとのレイテンシとエラーを記録します。"""
+    name = type(request).__name__
+    start = time.perf_counter()
+    try:
+        return ws_client.call(request)
+    except Exception:
+        OBS_REQUEST_ERRORS.inc(request=name)
+        raise
+    finally:
+        OBS_REQUEST_LATENCY.observe(time.perf_counter() - start, request=name)
+
+
 def _on_media_start(event):
     """OBSからのメディア再生開始イベントを受け取るコールバック"""
     try:
@@ -68,7 +91,7 @@ async def connect() -> bool:
     # 接続確認
     if ws_client is not None:
         try:
-            ws_client.call(obs_requests.GetVersion())
+            _call(obs_requests.GetVersion())
             return True
         except Exception:
             ws_client = None
@@ -85,9 +108,11 @@ async def connect() -> bool:
 
         
         logger.info("Connected to OBS WebSocket and registered event listeners")
+        OBS_RECONNECTS.inc(result="success")
         return True
     except Exception as e:
         logger.debug(f"Failed to connect to OBS: {e}")
+        OBS_RECONNECTS.inc(result="failure")
         ws_client = None
         return False
 
@@ -119,7 +144,7 @@ async def set_source_visibility(source_name: str, visible: bool, scene_name: Opt
         # シーン名の取得とキャッシュのリフレッシュ
         if scene_name is None:
             if _current_scene_name is None:
-                resp = ws_client.call(obs_requests.GetCurrentProgramScene())
+                resp = _call(obs_requests.GetCurrentProgramScene())
                 _current_scene_name = resp.getSceneName()
             scene_name = _current_scene_name
 
@@ -129,7 +154,7 @@ async def set_source_visibility(source_name: str, visible: bool, scene_name: Opt
 
         if scene_item_id is None:
             # キャッシュにない場合は取得
-            scene_items = ws_client.call(obs_requests.GetSceneItemList(sceneName=scene_name))
+            scene_items = _call(obs_requests.GetSceneItemList(sceneName=scene_name))
             for item in scene_items.getSceneItems():
                 item_name = item["sourceName"]
                 item_id = item["sceneItemId"]
@@ -142,7 +167,7 @@ async def set_source_visibility(source_name: str, visible: bool, scene_name: Opt
             return False
             
         # シーンアイテムの表示/非表示を設定
-        ws_client.call(obs_requests.SetSceneItemEnabled(
+        _call(obs_requests.SetSceneItemEnabled(
             sceneName=scene_name,
             sceneItemId=scene_item_id,
             sceneItemEnabled=visible
@@ -201,7 +226,7 @@ async def refresh_media_source(source_name: str, file_path: str) -> bool:
     
     try:
         # 1. メディアソースの設定を更新
-        ws_client.call(obs_requests.SetInputSettings(
+        _call(obs_requests.SetInputSettings(
             inputName=source_name,
             inputSettings={"local_file": abs_path},
             overlay=True
@@ -209,8 +234,8 @@ async def refresh_media_source(source_name: str, file_path: str) -> bool:
         
         # 2. 音量をリセットし、ミュートを解除 (v5 API)
         try:
-            ws_client.call(obs_requests.SetInputVolume(inputName=source_name, inputVolumeMul=1.0))
-            ws_client.call(obs_requests.SetInputMute(inputName=source_name, inputMuted=False))
+            _call(obs_requests.SetInputVolume(inputName=source_name, inputVolumeMul=1.0))
+            _call(obs_requests.SetInputMute(inputName=source_name, inputMuted=False))
         except Exception:
             pass
 
@@ -219,7 +244,7 @@ async def refresh_media_source(source_name: str, file_path: str) -> bool:
         
         # 4. 再生をリスタート (v5 API)
         try:
-            ws_client.call(obs_requests.TriggerMediaInputAction(
+            _call(obs_requests.TriggerMediaInputAction(
                 inputName=source_name,
                 mediaAction="OBS_WEBSOCKET_MEDIA_INPUT_ACTION_RESTART"
             ))
@@ -227,7 +252,7 @@ async def refresh_media_source(source_name: str, file_path: str) -> bool:
         except Exception as e:
             logger.warning(f"Failed to trigger media restart (might be v4 protocol): {e}")
             try:
-                ws_client.call(obs_requests.RestartMedia(sourceName=source_name))
+                _call(obs_requests.RestartMedia(sourceName=source_name))
             except:
                 pass
 
@@ -240,7 +265,7 @@ async def refresh_media_source(source_name: str, file_path: str) -> bool:
         await disconnect()
         if await connect():
             try:
-                ws_client.call(obs_requests.SetInputSettings(
+                _call(obs_requests.SetInputSettings(
                     inputName=source_name,
                     inputSettings={"local_file": abs_path},
                     overlay=True
@@ -259,7 +284,7 @@ async def start_recording() -> bool:
         return False
     
     try:
-        response = ws_client.call(obs_requests.StartRecord())
+        response = _call(obs_requests.StartRecord())
         if response.status:
             logger.info(f"Started OBS recording: {response.status}")
             return True
@@ -277,7 +302,7 @@ async def stop_recording() -> bool:
         return False
     
     try:
-        ws_client.call(obs_requests.StopRecord())
+        _call(obs_requests.StopRecord())
         logger.info("Stopped OBS recording")
         return True
     except Exception as e:
@@ -291,7 +316,7 @@ async def get_record_status() -> bool:
         return False
     
     try:
-        response = ws_client.call(obs_requests.GetRecordStatus())
+        response = _call(obs_requests.GetRecordStatus())
         return response.getOutputActive()
     except Exception as e:
         logger.error(f"Error getting OBS recording status: {e}")
@@ -319,7 +344,7 @@ async def start_streaming(stream_key: str) -> bool:
             "use_auth": False
         }
         
-        ws_client.call(obs_requests.SetStreamServiceSettings(
+        _call(obs_requests.SetStreamServiceSettings(
             streamServiceType="rtmp_custom",
             streamServiceSettings=custom_settings
         ))
@@ -327,7 +352,7 @@ async def start_streaming(stream_key: str) -> bool:
         logger.info(f"Updated OBS stream settings with new key")
         
         # Start streaming
-        ws_client.call(obs_requests.StartStream())
+        _call(obs_requests.StartStream())
         logger.info("Started OBS streaming")
         return True
     except Exception as e:
@@ -341,7 +366,7 @@ async def stop_streaming() -> bool:
         return False
     
     try:
-        ws_client.call(obs_requests.StopStream())
+        _call(obs_requests.StopStream())
         logger.info("Stopped OBS streaming")
         return True
     except Exception as e:
@@ -355,7 +380,7 @@ async def get_streaming_status() -> bool:
         return False
     
     try:
-        response = ws_client.call(obs_requests.GetStreamStatus())
+        response = _call(obs_requests.GetStreamStatus())
         return response.getOutputActive()
     except Exception as e:
         logger.error(f"Error getting OBS streaming status: {e}")
@@ -368,61 +393,75 @@ async def play_media_with_emotion(audio_source: str, file_path: str, emotion: st
     if not await connect():
         return False
         
+    global last_playback_started_at
     abs_path = os.path.abspath(file_path)
+    last_playback_started_at = None
 
-    try:
-        # --- 準備フェーズ ---
-        # 1. 音声ソースを必ず「表示」状態にする（ミキサー消失防止）
-        await set_source_visibility(audio_source, True)
-
-        # 2. 音声ファイルの「装填」を済ませる
-        ws_client.call(obs_requests.SetInputSettings(
-            inputName=audio_source,
-            inputSettings={"local_file": abs_path},
-            overlay=True
-        ))
-        
-        # 3. 音量/ミュート設定
+    # 装填 → 再生トリガー → 再生開始イベント → 口パク表示 の各時点をスパンのイベントとして記録
+    with _tracer.start_as_current_span("obs.play_media", attributes={"obs.source": audio_source}) as span:
         try:
-            ws_client.call(obs_requests.SetInputVolume(inputName=audio_source, inputVolumeMul=1.0))
-            ws_client.call(obs_requests.SetInputMute(inputName=audio_source, inputMuted=False))
-        except Exception:
-            pass
+            # --- 準備フェーズ ---
+            # 1. 音声ソースを必ず「表示」状態にする（ミキサー消失防止）
+            await set_source_visibility(audio_source, True)
+
+            # 2. 音声ファイルの「装填」を済ませる
+            _call(obs_requests.SetInputSettings(
+                inputName=audio_source,
+                inputSettings={"local_file": abs_path},
+                overlay=True
+            ))
+        
+            # 3. 音量/ミュート設定
+            try:
+                _call(obs_requests.SetInputVolume(inputName=audio_source, inputVolumeMul=1.0))
+                _call(obs_requests.SetInputMute(inputName=audio_source, inputMuted=False))
+            except Exception:
+                pass
             
-        # 4. OBS側での読み込み完了を待つ (0.1s)
-        await asyncio.sleep(0.1)
+            # 4. OBS側での読み込み完了を待つ (0.1s)
+            await asyncio.sleep(0.1)
+            span.add_event("obs.media_loaded")
         
-        # --- 発火フェーズ ---
-        # 5. イベントフラグをリセット
-        _playback_event.clear()
-
-        # 6. 音声再生トリガーを引く
-        ws_client.call(obs_requests.TriggerMediaInputAction(
-            inputName=audio_source,
-            mediaAction="OBS_WEBSOCKET_MEDIA_INPUT_ACTION_RESTART"
-        ))
+            # --- 発火フェーズ ---
+            # 5. イベントフラグをリセット
+            _playback_event.clear()
+
+            # 6. 音声再生トリガーを引く
+            _call(obs_requests.TriggerMediaInputAction(
+                inputName=audio_source,
+                mediaAction="OBS_WEBSOCKET_MEDIA_INPUT_ACTION_RESTART"
+            ))
+            triggered_at = time.perf_counter()
+            span.add_event("obs.playback_triggered")
         
-        # 7. OBSから「再生が始まったよ！」というイベントが来るのを待つ（最大5秒）
-        # これにより内部のバッファリング時間を完璧に同期させます
-        try:
-            logger.info("Waiting for OBS playback event...")
-            await asyncio.wait_for(_playback_event.wait(), timeout=5.0)
-            logger.info(f"Playback event received! Delaying {LIP_SYNC_ADJUST_MS}ms before showing mouth.")
+            # 7. OBSから「再生が始まったよ！」というイベントが来るのを待つ（最大5秒）
+            # これにより内部のバッファリング時間を完璧に同期させます
+            try:
+                logger.info("Waiting for OBS playback event...")
+                await asyncio.wait_for(_playback_event.wait(), timeout=5.0)
+                last_playback_started_at = time.monotonic()
+                delay = time.perf_counter() - triggered_at
+                PLAYBACK_START_DELAY.observe(delay)
+                span.add_event("obs.playback_started", {"obs.playback_start_delay_ms": delay * 1000})
+                logger.info(f"Playback event received! Delaying {LIP_SYNC_ADJUST_MS}ms before showing mouth.")
             
-            # リップシンク微調整：イベント受信から実際に表示を切り替えるまで待機
-            # 映像より音声が遅れる場合はここを増やす
-            if LIP_SYNC_ADJUST_MS > 0:
-                await asyncio.sleep(LIP_SYNC_ADJUST_MS / 1000.0)
+                # リップシンク微調整：イベント受信から実際に表示を切り替えるまで待機
+                # 映像より音声が遅れる場合はここを増やす
+                if LIP_SYNC_ADJUST_MS > 0:
+                    await asyncio.sleep(LIP_SYNC_ADJUST_MS / 1000.0)
                 
-            logger.info("Showing mouth movement now.")
-        except asyncio.TimeoutError:
-            logger.warning("Timeout waiting for OBS playback event. Showing mouth anyway.")
+                logger.info("Showing mouth movement now.")
+            except asyncio.TimeoutError:
+                logger.warning("Timeout waiting for OBS playback event. Showing mouth anyway.")
+                PLAYBACK_START_TIMEOUTS.inc()
+                span.add_event("obs.playback_timeout")
 
 
-        # 8. 表情変更（口パク開始）を実行
-        await set_visible_source(emotion)
+            # 8. 表情変更（口パク開始）を実行
+            await set_visible_source(emotion)
+            span.add_event("obs.mouth_shown")
         
-        return True
-    except Exception as e:
-        logger.error(f"Error in play_media_with_emotion: {e}")
-        return False
+            return True
+        except Exception as e:
+            logger.error(f"Error in play_media_with_emotion: {e}")
+            return False
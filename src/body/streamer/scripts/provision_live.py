@@ -0,0 +1,72 @@
+"""Pre-broadcast job: provision YouTube Live broadcasts into the live pool.
+
+Creates and binds broadcast/stream pairs ahead of the scheduled start and
+stores their IDs in storage, so the streamer (YOUTUBE_LIVE_POOL=true) only
+has to attach OBS to them when it goes live.
+
+Usage:
+    python -m body.streamer.scripts.provision_live --count 1 --title "AI Tuber Live"
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+
+from body.streamer.live_pool import LivePool, PreparedLive
+from body.streamer.youtube_live_adapter import YoutubeLiveAdapter
+
+
+async def provision(pool: LivePool, adapter: YoutubeLiveAdapter, count: int, title: str,
+                    description: str, scheduled_start_time: str, privacy_status: str,
+                    thumbnail_path: str = None) -> list:
+    """Create `count` broadcasts concurrently and add them to the pool."""
+    youtube = adapter.youtube
+    responses = await asyncio.gather(*[
+        adapter.acreate_live(youtube, title, description, scheduled_start_time,
+                             thumbnail_path, privacy_status)
+        for _ in range(count)
+    ])
+    prepared = [PreparedLive.from_live_response(r) for r in responses]
+    for p in prepared:
+        await asyncio.to_thread(pool.add, p)
+    return prepared
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+
+    now_iso = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    parser = argparse.ArgumentParser(description="Provision YouTube Live broadcasts into the live pool")
+    parser.add_argument("--count", type=int, default=1, help="Number of broadcasts to provision")
+    parser.add_argument("--title", default=os.getenv("STREAM_TITLE", f"AI Tuber Live Stream - {now_iso}"))
+    parser.add_argument("--description", default=os.getenv("STREAM_DESCRIPTION", "AI Tuber Live Stream"))
+    parser.add_argument("--scheduled-start-time", default=now_iso, help="ISO 8601 timestamp")
+    parser.add_argument("--privacy", default=os.getenv("STREAM_PRIVACY", "private"))
+    parser.add_argument("--thumbnail", default=None, help="Path to a thumbnail image")
+    args = parser.parse_args()
+
+    try:
+        from infra.storage_client import create_storage_client
+        pool = LivePool(create_storage_client())
+        adapter = YoutubeLiveAdapter()
+        prepared = asyncio.run(provision(
+            pool, adapter, args.count, args.title, args.description,
+            args.scheduled_start_time, args.privacy, args.thumbnail,
+        ))
+    except Exception as e:
+        logger.error(f"Provisioning failed: {e}")
+        sys.exit(1)
+
+    for p in prepared:
+        logger.info(f"Provisioned broadcast {p.broadcast_id} (stream {p.stream_id})")
+    logger.info(f"Live pool {pool.key} now holds {len(pool.entries())} broadcasts")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,22 @@ from typing import Optional, Dict, Any
 import logging
 import json
 import asyncio
+import time
+from infra import tracing
 from . import voice_adapter, obs_adapter
-from ..service import BodyServiceBase
+from . import metrics
+from .timeline import ClipRecord, PlaybackTimeline
+from ..service import BodyServiceBase, wait_for_items
 
 logger = logging.getLogger(__name__)
+_tracer = tracing.get_tracer(__name__)
+
+# 緊急停止時に再生する締めの一言（SHUTDOWN_CLOSING_LINE または配信設定の closing_line で変更可能）
+DEFAULT_CLOSING_LINE = "本日の配信はここまでとさせていただきます。ご視聴ありがとうございました。"
+# 緊急停止の期限のうち、OBS / YouTube の停止 API のために残しておく時間（秒）
+SHUTDOWN_STOP_RESERVE = 2.0
+# まだ合成していない発話の長さの見積もり（1 文字あたりの秒数。VOICEVOX の標準話速で約 7 文字/秒）
+ESTIMATED_SECONDS_PER_CHAR = float(os.getenv("ESTIMATED_SECONDS_PER_CHAR", "0.14"))
 
 
 class StreamerBodyService(BodyServiceBase):
@@ -20,15 +32,27 @@ class StreamerBodyService(BodyServiceBase):
         self._action_queue = asyncio.Queue()
         self._worker_task = None
         self._pending_broadcast_config = None
+        self._live_setup_task: Optional[asyncio.Task] = None
+        self._lag_monitor_task: Optional[asyncio.Task] = None
+        self._closing_clip_task: Optional[asyncio.Task] = None
+        self._closing_line = DEFAULT_CLOSING_LINE
+        self.broadcast_live = False
+        self.timeline = PlaybackTimeline()
+        metrics.ACTION_QUEUE_DEPTH.set_function(self._action_queue.qsize)
 
     async def start_worker(self):
-        """バックグラウンドワーカーを開始します。"""
+        """バックグラウンドワーカー（とイベントループ遅延の計測）を開始します。"""
         if self._worker_task is None:
             self._worker_task = asyncio.create_task(self._action_worker())
             logger.info("Action worker started")
+        if self._lag_monitor_task is None:
+            self._lag_monitor_task = asyncio.create_task(metrics.monitor_event_loop_lag())
 
     async def stop_worker(self):
         """バックグラウンドワーカーを停止します。"""
+        if self._lag_monitor_task:
+            self._lag_monitor_task.cancel()
+            self._lag_monitor_task = None
         if self._worker_task:
             self._worker_task.cancel()
             try:
@@ -45,36 +69,67 @@ class StreamerBodyService(BodyServiceBase):
             try:
                 task = await self._action_queue.get()
                 task_type = task.get("type")
-                
+                # 投入元（REST リクエスト）のトレースを引き継ぎ、キュー待ち時間をスパンとして記録
+                parent = task.get("trace_context")
+                _tracer.start_span("body.queue_wait", context=parent,
+                                   start_time=task.get("enqueued_ns")).end()
+                if task.get("enqueued_ns"):
+                    metrics.QUEUE_WAIT.observe((time.time_ns() - task["enqueued_ns"]) / 1e9,
+                                               action=task_type or "unknown")
+
                 if task_type == "speak":
                     text = task.get("text")
                     style = task.get("style")
                     speaker_id = task.get("speaker_id")
+                    if not task.get("file_path"):
+                        metrics.QUEUED_SPEECH_CHARS.dec(len(text or ""))
+                    # キュー投入時に見積もった長さは、合成後に実際の長さへ置き換える
+                    queued_audio = task.get("audio_seconds", 0.0)
+                    clip = ClipRecord(text or "", enqueued_at=task.get("enqueued_at", time.monotonic()))
                     
                     try:
-                        # 1. 音声生成（2〜3秒かかる）
-                        file_path, duration = await voice_adapter.generate_and_save(text, style, speaker_id)
+                        with _tracer.start_as_current_span("body.speak", context=parent,
+                                                           attributes={"text.length": len(text or "")}):
+                            # 1. 音声生成（2〜3秒かかる）。合成済みの音声（締めの一言）はそのまま使う
+                            clip.synthesis_started_at = time.monotonic()
+                            if task.get("file_path"):
+                                file_path, duration = task["file_path"], task["duration"]
+                            else:
+                                file_path, duration = await voice_adapter.generate_and_save(text, style, speaker_id)
+                            clip.synthesis_finished_at = time.monotonic()
+                            clip.duration = duration
+                            metrics.QUEUED_AUDIO_SECONDS.inc(duration - queued_audio)
+                            queued_audio = duration
                         
-                        # 2. 【配信開始の同期（初回のみ）】
-                        if self._pending_broadcast_config is not None:
-                            config = self._pending_broadcast_config
-                            self._pending_broadcast_config = None
-                            await self._execute_actual_broadcast_start(config)
-
-                        # 3. 表情変更と音声再生を「同時」に開始（ズレをゼロに近づける）
-                        await self.play_audio_with_sync_emotion(file_path, duration, style)
+                            # 2. 【配信開始の同期（初回のみ）】
+                            if self._pending_broadcast_config is not None:
+                                config = self._pending_broadcast_config
+                                self._pending_broadcast_config = None
+                                await self._execute_actual_broadcast_start(config)
+                                self._prepare_closing_clip()
+
+                            # 3. 表情変更と音声再生を「同時」に開始（ズレをゼロに近づける）
+                            clip.triggered_at = time.monotonic()
+                            await self.play_audio_with_sync_emotion(file_path, duration, style)
+                            # 再生開始イベントが届かなかった場合はトリガー時刻で代用する
+                            clip.started_at = obs_adapter.last_playback_started_at or clip.triggered_at
+                            self.timeline.add_clip(clip)
                         
-                        # 4. 音声再生終了後、即座に口を閉じる
-                        await obs_adapter.set_visible_source("silent")
+                            # 4. 音声再生終了後、即座に口を閉じる
+                            await obs_adapter.set_visible_source("silent")
 
-                        logger.info(f"[Worker:speak] Completed: {text[:30]}...")
+                            logger.info(f"[Worker:speak] Completed: {text[:30]}...")
                     except Exception as e:
                         logger.error(f"Error in worker speak task: {e}")
+                    finally:
+                        metrics.QUEUED_AUDIO_SECONDS.dec(queued_audio)
                 
                 elif task_type == "change_emotion":
                     emotion = task.get("emotion")
                     try:
-                        await obs_adapter.set_visible_source(emotion)
+                        with _tracer.start_as_current_span("body.change_emotion", context=parent,
+                                                           attributes={"emotion": emotion or ""}):
+                            await obs_adapter.set_visible_source(emotion)
                         logger.info(f"[Worker:emotion] Changed to {emotion}")
                     except Exception as e:
                         logger.error(f"Error in worker emotion task: {e}")
@@ -88,31 +143,51 @@ class StreamerBodyService(BodyServiceBase):
 
     async def speak(self, text: str, style: str = "neutral", speaker_id: Optional[int] = None) -> str:
         """視聴者に対してテキストを発話します (キューに追加して即時復帰)。"""
-        await self._action_queue.put({
+        await self._queue_speech({
             "type": "speak",
             "text": text,
             "style": style,
-            "speaker_id": speaker_id
+            "speaker_id": speaker_id,
+            "trace_context": tracing.current_context(),
+            "enqueued_ns": time.time_ns(),
+            "enqueued_at": time.monotonic(),
         })
         logger.info(f"[speak:queued] '{text[:30]}...'")
         return "Speech queued"
 
+    async def _queue_speech(self, task: Dict[str, Any]) -> None:
+        """
+        発話タスクをキューに追加し、キュー内の音声の長さ（メトリクス）に加えます。
+
+        合成済みの音声（締めの一言）はその長さを、未合成のテキストは文字数から見積もった長さを使います。
+        """
+        text = task.get("text") or ""
+        if task.get("file_path"):
+            task["audio_seconds"] = task["duration"]
+        else:
+            task["audio_seconds"] = len(text) * ESTIMATED_SECONDS_PER_CHAR
+            metrics.QUEUED_SPEECH_CHARS.inc(len(text))
+        metrics.QUEUED_AUDIO_SECONDS.inc(task["audio_seconds"])
+        await self._action_queue.put(task)
+
     async def change_emotion(self, emotion: str) -> str:
         """アバターの表情（感情）を変更します (キューに追加して即時復帰)。"""
         await self._action_queue.put({
             "type": "change_emotion",
-            "emotion": emotion
+            "emotion": emotion,
+            "trace_context": tracing.current_context(),
+            "enqueued_ns": time.time_ns(),
         })
         logger.info(f"[change_emotion:queued] {emotion}")
         return "Emotion change queued"
 
-    async def get_comments(self) -> str:
-        """コメントを取得します。"""
+    async def get_comments(self, wait: float = 0.0) -> str:
+        """コメントを取得します。wait 秒まではコメントの到着を待ちます。"""
         streaming_mode = os.getenv("STREAMING_MODE", "false").lower() == "true"
         
         try:
             if streaming_mode and self._youtube_comment_adapter:
-                comments = self._youtube_comment_adapter.get()
+                comments = await wait_for_items(self._youtube_comment_adapter.get, wait)
             else:
                 # 配信モードでない場合やアダプターがない場合は空リストを返す
                 comments = []
@@ -125,10 +200,28 @@ class StreamerBodyService(BodyServiceBase):
         except Exception as e:
             logger.error(f"Error in get_comments tool: {e}")
             return json.dumps([])
+        finally:
+            # 取得を返した時点を saint_graph のターン開始とみなす
+            self.timeline.mark_comment_poll()
 
     async def start_broadcast(self, config: Optional[Dict[str, Any]] = None) -> str:
         """配信または録画の開始を予約します（最初の発話時に同期して開始されます）。"""
+        if self.broadcast_live:
+            # saint_graph が再起動してチェックポイントから再開した場合は、同じ配信をそのまま続ける
+            logger.info("[start_broadcast] Broadcast already live. Continuing the current broadcast.")
+            return "配信中のため、現在の配信を継続します。"
         self._pending_broadcast_config = config or {}
+        self._closing_line = (self._pending_broadcast_config.get("closing_line")
+                              or os.getenv("SHUTDOWN_CLOSING_LINE", DEFAULT_CLOSING_LINE))
+        self.timeline.reset()
+        streaming_mode = os.getenv("STREAMING_MODE", "false").lower() == "true"
+        if streaming_mode:
+            # YouTube 側の準備（配信枠・ストリーム作成と紐付け）は最初の発話を待たずに裏で進める
+            if self._reusable_live_setup():
+                # 取り消すと作成途中の配信枠が YouTube に残るため、進行中・完了済みの準備をそのまま使う
+                logger.info("[start_broadcast] Reusing the YouTube Live setup already in progress.")
+            else:
+                self._live_setup_task = asyncio.create_task(self._prepare_live(self._pending_broadcast_config))
         logger.info("[start_broadcast] Broadcast start deferred until first speech.")
         return "配信開始を予約しました。最初の発話に合わせて開始されます。"
 
@@ -136,18 +229,19 @@ class StreamerBodyService(BodyServiceBase):
         """実際に配信または録画を開始する内部メソッド。"""
         streaming_mode = os.getenv("STREAMING_MODE", "false").lower() == "true"
         
+        # broadcast_live は開始が成功した時点で _start_streaming / start_obs_recording が立てる
+        self.broadcast_live = False
         try:
             if streaming_mode:
-                result = await self._start_streaming(config)
-                # ストリーミング開始後の安定化待機（YouTube側にデータが届き始めるまで数秒待つ）
-                await asyncio.sleep(3)
-                return result
+                # YouTube 側にデータが届き始めるまでの待機は、ストリームの状態をポーリングして行う
+                return await self._start_streaming(config)
             else:
                 result = await self.start_obs_recording()
                 # OBS録画開始後の安定化待機
                 await asyncio.sleep(2)
                 return result
         except Exception as e:
+            self.broadcast_live = False
             logger.error(f"Error in _execute_actual_broadcast_start: {e}")
             return f"配信開始エラー: {str(e)}"
 
@@ -160,7 +254,77 @@ class StreamerBodyService(BodyServiceBase):
         # BROADCAST_STOP_DELAY で調整可能（デフォルト 3秒）
         stop_delay = float(os.getenv("BROADCAST_STOP_DELAY", "5.0"))
         logger.info(f"Queue empty. Waiting {stop_delay}s before stopping broadcast...")
-        await asyncio.sleep(stop_delay)
+        return await self._finish_broadcast(stop_delay)
+
+    async def shutdown_broadcast(self, deadline: float = 8.0) -> str:
+        """
+        停止要求（SIGTERM 等）を受けたときに、deadline 秒以内に配信を止めます。
+
+        未再生の発話を破棄し、配信開始時に合成しておいた締めの一言だけを再生してから停止します。
+        再生中のクリップや締めの一言が期限に間に合わない場合は、再生の完了を待たずに停止します。
+        """
+        loop = asyncio.get_running_loop()
+        stop_by = loop.time() + max(0.0, deadline - SHUTDOWN_STOP_RESERVE)
+        dropped = self._discard_pending_actions()
+        logger.warning(f"[shutdown_broadcast] Discarded {dropped} queued actions (deadline {deadline}s)")
+
+        if self._pending_broadcast_config is not None:
+            # まだ何も発話しておらず、配信も始まっていない
+            self._pending_broadcast_config = None
+            self._cancel_live_setup()
+            return "配信開始前のため、停止する配信はありません。"
+
+        clip = self._closing_clip_task
+        if clip is not None and clip.done() and not clip.cancelled() and clip.exception() is None:
+            file_path, duration = clip.result()
+            await self._queue_speech({
+                "type": "speak",
+                "text": self._closing_line,
+                "style": "neutral",
+                "file_path": file_path,
+                "duration": duration,
+                "enqueued_at": time.monotonic(),
+            })
+        else:
+            logger.warning("[shutdown_broadcast] Closing line is not ready. Stopping without it.")
+
+        try:
+            await asyncio.wait_for(self._action_queue.join(), timeout=max(0.0, stop_by - loop.time()))
+        except asyncio.TimeoutError:
+            logger.warning("[shutdown_broadcast] Playback did not finish before the deadline. Stopping now.")
+
+        stop_delay = min(float(os.getenv("BROADCAST_STOP_DELAY", "5.0")), max(0.0, stop_by - loop.time()))
+        return await self._finish_broadcast(stop_delay)
+
+    def _discard_pending_actions(self) -> int:
+        """キューに残っている未処理のアクションを破棄し、その件数を返します。"""
+        dropped = 0
+        while True:
+            try:
+                task = self._action_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return dropped
+            if task.get("type") == "speak":
+                if not task.get("file_path"):
+                    metrics.QUEUED_SPEECH_CHARS.dec(len(task.get("text") or ""))
+                metrics.QUEUED_AUDIO_SECONDS.dec(task.get("audio_seconds", 0.0))
+            self._action_queue.task_done()
+            dropped += 1
+
+    def _prepare_closing_clip(self) -> None:
+        """緊急停止用の締めの一言をバックグラウンドで合成しておきます。"""
+        if self._closing_clip_task is None:
+            self._closing_clip_task = asyncio.create_task(
+                voice_adapter.generate_and_save(self._closing_line, "neutral"))
+
+    async def _finish_broadcast(self, stop_delay: float) -> str:
+        """stop_delay 秒待ってから配信または録画を停止します。"""
+        self.broadcast_live = False
+        if self._closing_clip_task is not None:
+            self._closing_clip_task.cancel()
+            self._closing_clip_task = None
+        # 猶予時間の間に再生タイムライン（無音時間）のレポートを保存する
+        await asyncio.gather(asyncio.sleep(stop_delay), self._save_timeline_report())
 
         streaming_mode = os.getenv("STREAMING_MODE", "false").lower() == "true"
         
@@ -173,6 +337,19 @@ class StreamerBodyService(BodyServiceBase):
             logger.error(f"Error in stop_broadcast: {e}")
             return f"配信停止エラー: {str(e)}"
 
+    async def _save_timeline_report(self) -> Optional[str]:
+        """再生タイムラインのレポートを保存します（TIMELINE_REPORT=false で無効）。"""
+        if os.getenv("TIMELINE_REPORT", "true").lower() != "true":
+            return None
+        name = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        if self._current_broadcast_id:
+            name = f"{name}_{self._current_broadcast_id}"
+        try:
+            return await self.timeline.save_report(name=name)
+        except Exception as e:
+            logger.error(f"Error saving timeline report: {e}")
+            return None
+
     async def wait_for_queue(self) -> str:
         """キューが空になるまで待機します。"""
         logger.info("Waiting for action queue to be empty...")
@@ -208,6 +385,7 @@ class StreamerBodyService(BodyServiceBase):
         try:
             success = await obs_adapter.start_recording()
             if success:
+                self.broadcast_live = True
                 logger.info("[start_obs_recording] Success")
                 return "OBS録画を開始しました。"
             else:
@@ -231,12 +409,18 @@ class StreamerBodyService(BodyServiceBase):
             logger.error(f"Error in stop_obs_recording tool: {e}")
             return f"録画停止エラー: {str(e)}"
 
-    async def _start_streaming(self, config: dict) -> str:
-        """YouTube Live 配信を開始する内部関数。"""
+    async def _prepare_live(self, config: dict) -> dict:
+        """
+        YouTube Live の配信枠・ストリームを作成して紐付けます。
+        API 呼び出しはすべてワーカースレッドで行い、イベントループを止めません。
+        """
         from .youtube_live_adapter import YoutubeLiveAdapter
         
-        self._youtube_live_adapter = YoutubeLiveAdapter()
-        youtube_client, _ = self._youtube_live_adapter.authenticate_youtube()
+        # 認証情報と API クライアントはプロセス内で共有されるため、再認証は発生しない
+        if self._youtube_live_adapter is None:
+            self._youtube_live_adapter = await asyncio.to_thread(YoutubeLiveAdapter)
+        adapter = self._youtube_live_adapter
+        youtube_client = await asyncio.to_thread(lambda: adapter.youtube)
         
         title = config.get("title", "AI Tuber Live Stream")
         description = config.get("description", "")
@@ -244,13 +428,60 @@ class StreamerBodyService(BodyServiceBase):
         thumbnail_path = config.get("thumbnail_path")
         privacy_status = config.get("privacy_status", "private")
         
+        if os.getenv("YOUTUBE_LIVE_POOL", "false").lower() == "true":
+            # 配信前ジョブで作成済みの配信枠があれば、それに接続するだけで済ませる
+            prepared = await asyncio.to_thread(self._claim_pooled_live, adapter, youtube_client)
+            if prepared is not None:
+                logger.info(f"Attaching to pre-provisioned broadcast: {prepared.broadcast_id}")
+                return prepared.to_live_response()
+            logger.warning("No usable pooled broadcast. Creating a broadcast now.")
+
         logger.info(f"Creating YouTube Live broadcast: {title}")
-        live_response = self._youtube_live_adapter.create_live(
+        live_response = await adapter.acreate_live(
             youtube_client, title, description, scheduled_start_time,
             thumbnail_path, privacy_status
         )
+        logger.info(f"YouTube Live broadcast prepared: {live_response['broadcast']['id']}")
+        return live_response
+
+    @staticmethod
+    def _claim_pooled_live(adapter, youtube_client):
+        """ストレージ上の配信枠プールから使用可能なものを 1 件取り出します。"""
+        from infra.storage_client import create_storage_client
+        from .live_pool import LivePool
+        try:
+            return LivePool(create_storage_client()).claim(adapter, youtube_client)
+        except Exception as e:
+            logger.error(f"Failed to claim a pooled broadcast: {e}")
+            return None
+
+    def _reusable_live_setup(self) -> bool:
+        """進行中、または成功して未使用の事前準備タスクがあれば True を返します。"""
+        task = self._live_setup_task
+        if task is None:
+            return False
+        if not task.done():
+            return True
+        return not task.cancelled() and task.exception() is None
+
+    def _cancel_live_setup(self) -> None:
+        """未使用の事前準備タスクを取り消します。"""
+        if self._live_setup_task is not None and not self._live_setup_task.done():
+            self._live_setup_task.cancel()
+        self._live_setup_task = None
+
+    async def _start_streaming(self, config: dict) -> str:
+        """YouTube Live 配信を開始する内部関数。"""
+        # start_broadcast で始めた事前準備があれば、その結果を使う
+        task, self._live_setup_task = self._live_setup_task, None
+        if task is not None:
+            live_response = await task
+        else:
+            live_response = await self._prepare_live(config)
         
         stream_key = live_response['stream']['cdn']['ingestionInfo']['streamName']
+        stream_id = live_response['stream']['id']
+        live_chat_id = live_response['broadcast'].get('snippet', {}).get('liveChatId')
         self._current_broadcast_id = live_response['broadcast']['id']
         
         logger.info("Starting OBS streaming with YouTube stream key")
@@ -258,25 +489,37 @@ class StreamerBodyService(BodyServiceBase):
         
         if not success:
             return "OBSストリーミングの開始に失敗しました。"
+
+        # YouTube がストリームを受信し始める（= 自動で Live に移行する）まで待つ
+        adapter = self._youtube_live_adapter
+        # トークンの更新が走る場合があるため、クライアントの取得もワーカースレッドで行う
+        youtube_client = await asyncio.to_thread(lambda: adapter.youtube)
+        timeout = float(os.getenv("YOUTUBE_STREAM_ACTIVE_TIMEOUT", "30"))
+        await adapter.wait_for_stream_active(youtube_client, stream_id, timeout=timeout)
         
         from .youtube_comment_adapter import YouTubeCommentAdapter
-        self._youtube_comment_adapter = YouTubeCommentAdapter(self._current_broadcast_id)
+        self._youtube_comment_adapter = await asyncio.to_thread(
+            YouTubeCommentAdapter, self._current_broadcast_id, live_chat_id
+        )
         
+        self.broadcast_live = True
         logger.info(f"[start_streaming] Success - Broadcast ID: {self._current_broadcast_id}")
         return f"YouTube Live配信を開始しました。ブロードキャストID: {self._current_broadcast_id}"
 
     async def _stop_streaming(self) -> str:
         """YouTube Live 配信を停止する内部関数。"""
+        self._cancel_live_setup()
         logger.info("Stopping OBS streaming")
         await obs_adapter.stop_streaming()
         
         if self._youtube_live_adapter and self._current_broadcast_id:
-            youtube_client, _ = self._youtube_live_adapter.authenticate_youtube()
-            self._youtube_live_adapter.stop_live(youtube_client, self._current_broadcast_id)
+            adapter = self._youtube_live_adapter
+            broadcast_id = self._current_broadcast_id
+            await asyncio.to_thread(lambda: adapter.stop_live(adapter.youtube, broadcast_id))
             logger.info(f"Stopped YouTube broadcast: {self._current_broadcast_id}")
         
         if self._youtube_comment_adapter:
-            self._youtube_comment_adapter.close()
+            await asyncio.to_thread(self._youtube_comment_adapter.close)
             self._youtube_comment_adapter = None
         
         self._current_broadcast_id = None
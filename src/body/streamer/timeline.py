@@ -0,0 +1,203 @@
+"""再生タイムラインの記録とデッドエア（無音時間）の集計。
+
+アクションワーカーが音声クリップごとに「発話キュー投入 → 音声合成 → OBS 再生トリガー →
+再生開始イベント → 再生終了」の時刻をモノトニッククロックで記録し、クリップ間の無音区間を
+次の要因に分解します。
+
+- poll_interval: 前のクリップ終了から、次のターンを始める直前のコメント取得まで（ループの待機・ポーリング）
+- llm_wait: そこから次の発話テキストが届くまで（LLM の生成待ち）
+- tts_wait: 発話テキストが届いてから音声合成が終わるまで（キュー待ちを含む）
+- obs_switch: 音声合成の完了から OBS で再生が始まるまで（ファイル装填・再生開始待ち）
+
+配信終了時に StorageClient 経由で JSON レポートとして保存します。
+
+長時間の配信でもメモリとクリップごとの処理量が増え続けないよう、クリップは集計値だけを持ち、
+無音区間はクリップの追加時に一度だけ要因を割り当てます。割り当てに使い終えたコメント取得時刻は捨てます。
+"""
+import bisect
+import json
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+from .metrics import DEAD_AIR
+
+logger = logging.getLogger(__name__)
+
+GAP_CAUSES = ("poll_interval", "llm_wait", "tts_wait", "obs_switch")
+DEFAULT_REPORT_PREFIX = "reports/timeline"
+
+
+@dataclass
+class ClipRecord:
+    """音声クリップ 1 本の各段階の時刻（モノトニッククロック、秒）。"""
+    text: str
+    enqueued_at: float
+    synthesis_started_at: Optional[float] = None
+    synthesis_finished_at: Optional[float] = None
+    triggered_at: Optional[float] = None
+    started_at: Optional[float] = None
+    duration: float = 0.0
+
+    @property
+    def ended_at(self) -> float:
+        return self.started_at + self.duration
+
+
+@dataclass
+class Gap:
+    """クリップ間の無音区間と、その要因別の内訳（秒）。"""
+    start: float
+    end: float
+    causes: Dict[str, float] = field(default_factory=dict)
+    next_text: str = ""
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    @property
+    def primary_cause(self) -> str:
+        return max(self.causes, key=self.causes.get) if self.causes else "unknown"
+
+
+def percentile(values: List[float], q: float) -> float:
+    """最近傍順位法によるパーセンタイル（q は 0〜100）。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class PlaybackTimeline:
+    """配信中の音声クリップと無音区間を記録します。"""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self.reset()
+
+    def reset(self) -> None:
+        """記録を破棄し、現在時刻を配信開始とします。"""
+        self.started_at = self.clock()
+        self.clip_count = 0
+        self.audio_seconds = 0.0
+        # 再生済みクリップの最も遅い終了時刻
+        self.ended_at = self.started_at
+        self._gaps: List[Gap] = []
+        # 最後のクリップの終了より後のコメント取得時刻（昇順）
+        self._comment_polls: List[float] = []
+
+    def mark_comment_poll(self) -> None:
+        """saint_graph がコメントを取得した時刻を記録します（ターンの区切りの目安）。"""
+        self._comment_polls.append(self.clock())
+
+    def add_clip(self, clip: ClipRecord) -> None:
+        """再生を開始したクリップを追加し、直前の無音区間をメトリクスに記録します。"""
+        if clip.started_at is None:
+            return
+        previous_end = self.ended_at
+        self.clip_count += 1
+        self.audio_seconds += clip.duration
+        if clip.started_at > previous_end:
+            gap = self._attribute(previous_end, clip)
+            self._gaps.append(gap)
+            DEAD_AIR.observe(gap.duration, cause=gap.primary_cause)
+        self.ended_at = max(previous_end, clip.ended_at)
+        # 以降の無音区間は ended_at より後から始まるため、それ以前のコメント取得時刻は使わない
+        del self._comment_polls[:bisect.bisect_right(self._comment_polls, self.ended_at)]
+
+    def _attribute(self, previous_end: float, clip: ClipRecord) -> Gap:
+        gap = Gap(start=previous_end, end=clip.started_at, next_text=clip.text[:40])
+        causes = dict.fromkeys(GAP_CAUSES, 0.0)
+        ready = max(previous_end, clip.enqueued_at)
+        if clip.enqueued_at > previous_end:
+            # previous_end < t <= enqueued_at を満たす最後のコメント取得をターンの開始とみなす
+            i = bisect.bisect_right(self._comment_polls, clip.enqueued_at)
+            last_poll = self._comment_polls[i - 1] if i else None
+            turn_start = last_poll if last_poll is not None and last_poll > previous_end else previous_end
+            causes["poll_interval"] = turn_start - previous_end
+            causes["llm_wait"] = clip.enqueued_at - turn_start
+        synthesized = clip.synthesis_finished_at if clip.synthesis_finished_at is not None else ready
+        synthesized = min(max(synthesized, ready), clip.started_at)
+        causes["tts_wait"] = synthesized - ready
+        causes["obs_switch"] = clip.started_at - synthesized
+        gap.causes = causes
+        return gap
+
+    def gaps(self) -> List[Gap]:
+        """配信開始から最後のクリップまでの無音区間を返します。"""
+        return list(self._gaps)
+
+    def report(self, worst: int = 5) -> dict:
+        """
+        エアタイム利用率のレポートを作成します。
+
+        Returns:
+            クリップ数、音声時間、無音時間とその割合、無音区間のパーセンタイル、
+            要因別の合計、最も長い無音区間 (worst 件) を含む辞書。
+        """
+        gaps = self.gaps()
+        durations = [g.duration for g in gaps]
+        audio = self.audio_seconds
+        span = self.ended_at - self.started_at
+        dead_air = sum(durations)
+        by_cause = {cause: round(sum(g.causes.get(cause, 0.0) for g in gaps), 3) for cause in GAP_CAUSES}
+        return {
+            "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "clips": self.clip_count,
+            "duration_seconds": round(span, 3),
+            "audio_seconds": round(audio, 3),
+            "dead_air_seconds": round(dead_air, 3),
+            "airtime_utilisation": round(audio / span, 4) if span > 0 else 0.0,
+            "gap_percentiles": {
+                f"p{q}": round(percentile(durations, q), 3) for q in (50, 90, 99)
+            } | {"max": round(max(durations, default=0.0), 3)},
+            "dead_air_by_cause": by_cause,
+            "worst_gaps": [
+                {
+                    "offset_seconds": round(g.start - self.started_at, 3),
+                    "duration_seconds": round(g.duration, 3),
+                    "primary_cause": g.primary_cause,
+                    "causes": {k: round(v, 3) for k, v in g.causes.items()},
+                    "next_text": g.next_text,
+                }
+                for g in sorted(gaps, key=lambda g: g.duration, reverse=True)[:worst]
+            ],
+        }
+
+    async def save_report(self, storage=None, name: Optional[str] = None) -> Optional[str]:
+        """
+        レポートを StorageClient に保存します。
+
+        Args:
+            storage: StorageClient（省略時は共有クライアント）
+            name: ファイル名（省略時は UTC 時刻）。TIMELINE_REPORT_PREFIX の下に保存されます。
+
+        Returns:
+            保存したキー。クリップがない、または保存に失敗した場合は None。
+        """
+        if not self.clip_count:
+            return None
+        if storage is None:
+            from infra.storage_client import create_storage_client
+            storage = create_storage_client()
+        prefix = os.getenv("TIMELINE_REPORT_PREFIX", DEFAULT_REPORT_PREFIX).rstrip("/")
+        name = name or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        key = f"{prefix}/{name}.json"
+        report = self.report()
+        try:
+            await storage.awrite_text(key, json.dumps(report, ensure_ascii=False, indent=2),
+                                      content_type="application/json")
+        except Exception as e:
+            logger.error(f"Failed to save playback timeline report to {key}: {e}")
+            return None
+        logger.info(
+            f"Saved playback timeline report to {key}: dead air {report['dead_air_seconds']}s "
+            f"(utilisation {report['airtime_utilisation']:.1%}, p90 gap {report['gap_percentiles']['p90']}s)"
+        )
+        return key
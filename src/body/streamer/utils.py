@@ -3,6 +3,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Secrets the streamer reads through the SecretProvider when they are not in the environment
+YOUTUBE_SECRET_NAMES = ("YOUTUBE_TOKEN_JSON",)
+
 def ensure_youtube_secrets():
     """
     Ensure that YouTube secrets are available.
@@ -17,3 +20,22 @@ def ensure_youtube_secrets():
     else:
         logger.info("No YouTube secrets JSON found in environment; falling back to file paths if available")
 
+    prefetch_youtube_secrets()
+
+
+def prefetch_youtube_secrets():
+    """
+    Fetch the YouTube secrets from the SecretProvider at startup, so the first
+    broadcast start is served from its cache instead of Secret Manager.
+    """
+    if os.getenv("SECRET_PROVIDER_TYPE", "env").lower() == "env":
+        return
+    names = [name for name in YOUTUBE_SECRET_NAMES if not os.getenv(name)]
+    if not names:
+        return
+    try:
+        from infra.secret_provider import create_secret_provider
+        found = create_secret_provider().prefetch(names)
+        logger.info(f"Prefetched YouTube secrets: {sorted(found)}")
+    except Exception as e:
+        logger.warning(f"Could not prefetch YouTube secrets: {e}")
@@ -5,7 +5,11 @@ from typing import Optional
 from pathlib import Path
 import httpx
 
+from infra import tracing
+from .metrics import SYNTHESIS_LATENCY
+
 logger = logging.getLogger(__name__)
+_tracer = tracing.get_tracer(__name__)
 
 # VoiceVox configuration from environment
 VOICEVOX_HOST = os.getenv("VOICEVOX_HOST", "voicevox")
@@ -63,22 +67,26 @@ async def generate_speech(text: str, speaker_id: int = 1) -> bytes:
     """
     async with httpx.AsyncClient() as client:
         # Step 1: クエリの生成
-        query_response = await client.post(
-            f"{VOICEVOX_BASE_URL}/audio_query",
-            params={"text": text, "speaker": speaker_id},
-            timeout=10.0
-        )
-        query_response.raise_for_status()
-        audio_query = query_response.json()
+        with _tracer.start_as_current_span("voicevox.audio_query", attributes={"voicevox.speaker": speaker_id}), \
+                SYNTHESIS_LATENCY.time(stage="audio_query"):
+            query_response = await client.post(
+                f"{VOICEVOX_BASE_URL}/audio_query",
+                params={"text": text, "speaker": speaker_id},
+                timeout=10.0
+            )
+            query_response.raise_for_status()
+            audio_query = query_response.json()
         
         # Step 2: 音声合成
-        synthesis_response = await client.post(
-            f"{VOICEVOX_BASE_URL}/synthesis",
-            params={"speaker": speaker_id},
-            json=audio_query,
-            timeout=30.0
-        )
-        synthesis_response.raise_for_status()
+        with _tracer.start_as_current_span("voicevox.synthesis", attributes={"voicevox.speaker": speaker_id}), \
+                SYNTHESIS_LATENCY.time(stage="synthesis"):
+            synthesis_response = await client.post(
+                f"{VOICEVOX_BASE_URL}/synthesis",
+                params={"speaker": speaker_id},
+                json=audio_query,
+                timeout=30.0
+            )
+            synthesis_response.raise_for_status()
         
         return synthesis_response.content
 
@@ -122,9 +130,10 @@ async def generate_and_save(text: str, style: str = "neutral", speaker_id: Optio
     logger.info(f"Generating speech: '{text}' with style '{style}' (speaker {speaker_id})")
     
     try:
-        audio_data = await generate_speech(text, speaker_id)
-        filename = f"speech_{hash(text) % 10000}.wav"
-        file_path = await save_to_shared_volume(audio_data, filename)
+        with SYNTHESIS_LATENCY.time(stage="total"):
+            audio_data = await generate_speech(text, speaker_id)
+            filename = f"speech_{hash(text) % 10000}.wav"
+            file_path = await save_to_shared_volume(audio_data, filename)
         duration = get_wav_duration(file_path)
         return file_path, duration
     except Exception as e:
@@ -1,11 +1,16 @@
 import os
 import json
 import logging
+import threading
+from datetime import datetime, timedelta, timezone
 from typing import Optional, Tuple, Any
+import google_auth_httplib2
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +18,14 @@ logger = logging.getLogger(__name__)
 YOUTUBE_CLIENT_SECRET_PATH = os.path.join("data", "youtube_client_secret.json")
 YOUTUBE_TOKEN_PATH = os.path.join("data", "youtube_token.json")
 
+# Refresh the access token this many seconds before it expires
+TOKEN_REFRESH_MARGIN = float(os.getenv("YOUTUBE_TOKEN_REFRESH_MARGIN", "300"))
+
+# Process-wide credentials and API client shared by live, thumbnail and chat calls
+_shared_lock = threading.RLock()
+_shared_creds: Optional[Credentials] = None
+_shared_service: Any = None
+
 class YouTubeAuth:
     """Centralized authentication management for YouTube Data API v3."""
 
@@ -26,8 +39,8 @@ class YouTubeAuth:
         """
         creds = None
         
-        # 1. Try to load from environment variable (JSON string) first
-        token_json_str = os.getenv("YOUTUBE_TOKEN_JSON")
+        # 1. Try to load from environment variable / secret provider (JSON string) first
+        token_json_str = cls._load_token_json()
         if token_json_str:
             try:
                 # Remove UTF-8 BOM if present
@@ -37,7 +50,7 @@ class YouTubeAuth:
                 # Use scopes from token or default
                 scopes = token_info.get('scopes', cls.SCOPES)
                 creds = Credentials.from_authorized_user_info(token_info, scopes)
-                logger.info("Loaded YouTube credentials from YOUTUBE_TOKEN_JSON environment variable")
+                logger.info("Loaded YouTube credentials from YOUTUBE_TOKEN_JSON")
             except Exception as e:
                 logger.error(f"Failed to load credentials from YOUTUBE_TOKEN_JSON: {e}")
 
@@ -61,19 +74,112 @@ class YouTubeAuth:
         
         return creds
 
+    @staticmethod
+    def _load_token_json() -> Optional[str]:
+        """Read YOUTUBE_TOKEN_JSON from the environment, then from the configured SecretProvider."""
+        token_json_str = os.getenv("YOUTUBE_TOKEN_JSON")
+        if token_json_str or os.getenv("SECRET_PROVIDER_TYPE", "env").lower() == "env":
+            return token_json_str
+        try:
+            from infra.secret_provider import create_secret_provider
+            return create_secret_provider().get_secret("YOUTUBE_TOKEN_JSON")
+        except Exception as e:
+            logger.warning(f"Could not load YOUTUBE_TOKEN_JSON from SecretProvider: {e}")
+            return None
+
+    @staticmethod
+    def needs_refresh(creds: Credentials, margin: float = TOKEN_REFRESH_MARGIN) -> bool:
+        """Return True if the access token is invalid or expires within `margin` seconds."""
+        if not creds.valid:
+            return True
+        if creds.expiry is None:
+            return False
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now < timedelta(seconds=margin)
+
     @classmethod
     def get_service(cls, creds: Optional[Credentials] = None) -> Any:
         """
         Build and return the YouTube service client.
         If creds is not provided, it will attempt to load them.
+
+        The client uses the discovery document bundled with googleapiclient
+        (no network fetch) and a per-thread HTTP connection, so it can be
+        shared and used from worker threads.
         """
         if not creds:
             creds = cls.get_credentials()
             
         if not creds or not creds.valid:
             raise ValueError("No valid YouTube credentials found. Authorization required.")
-            
-        return build('youtube', 'v3', credentials=creds)
+
+        local = threading.local()
+
+        def build_request(_http, *args, **kwargs):
+            # httplib2.Http is not thread-safe; keep one authorized connection per thread
+            http = getattr(local, "http", None)
+            if http is None:
+                http = local.http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+            return HttpRequest(http, *args, **kwargs)
+
+        return build('youtube', 'v3', credentials=creds, requestBuilder=build_request,
+                     static_discovery=True, cache_discovery=False)
+
+    @classmethod
+    def get_shared_credentials(cls) -> Optional[Credentials]:
+        """
+        Return the process-wide credentials, loading them on first use.
+        The access token is refreshed proactively when it is about to expire.
+        """
+        global _shared_creds
+        with _shared_lock:
+            if _shared_creds is None:
+                _shared_creds = cls.get_credentials()
+            creds = _shared_creds
+            if creds and creds.refresh_token and cls.needs_refresh(creds):
+                try:
+                    creds.refresh(Request())
+                    logger.info(f"YouTube token refreshed ahead of expiry (expires {creds.expiry})")
+                except Exception as e:
+                    logger.warning(f"Failed to refresh YouTube token: {e}")
+            return creds
+
+    @classmethod
+    def get_shared_service(cls) -> Any:
+        """Return the process-wide YouTube client, building it once."""
+        global _shared_service
+        creds = cls.get_shared_credentials()
+        with _shared_lock:
+            if _shared_service is None:
+                _shared_service = cls.get_service(creds)
+                logger.info("Built shared YouTube API client")
+            return _shared_service
+
+    @classmethod
+    def set_shared_credentials(cls, creds: Credentials) -> None:
+        """Replace the shared credentials (e.g. after an OAuth flow) and drop the cached client."""
+        global _shared_creds, _shared_service
+        with _shared_lock:
+            _shared_creds = creds
+            _shared_service = None
+
+    @classmethod
+    def reset_shared(cls) -> None:
+        """Forget the shared credentials and client."""
+        global _shared_creds, _shared_service
+        with _shared_lock:
+            _shared_creds = None
+            _shared_service = None
+
+    @classmethod
+    def export_token_json(cls) -> Optional[str]:
+        """
+        Serialize the current shared credentials (including a fresh access token),
+        for handing to a subprocess so it does not need to refresh again.
+        """
+        creds = cls.get_shared_credentials()
+        return creds.to_json() if creds else None
 
     @classmethod
     def start_oauth_flow(cls) -> Tuple[Any, Credentials]:
@@ -136,4 +242,5 @@ class YouTubeAuth:
         except Exception as e:
             logger.warning(f"Could not save tokens to {YOUTUBE_TOKEN_PATH}: {e}")
 
-        return cls.get_service(creds), creds
+        cls.set_shared_credentials(creds)
+        return cls.get_shared_service(), creds
@@ -7,27 +7,40 @@ import json
 import logging
 from typing import List, Dict, Optional
 
+from .metrics import COMMENTS_DROPPED, COMMENTS_INGESTED
+
 logger = logging.getLogger(__name__)
 
 
 class YouTubeCommentAdapter:
     """Adapter for fetching YouTube Live comments using subprocess"""
     
-    def __init__(self, video_id: str):
+    def __init__(self, video_id: str, live_chat_id: Optional[str] = None):
         """
         Initialize the comment adapter.
         
         Args:
             video_id: YouTube video/broadcast ID
+            live_chat_id: Live chat ID if already known (skips the lookup in the fetcher)
         """
+        env = os.environ.copy()  # 環境変数を子プロセスに渡す（YOUTUBE_API_KEY等）
+        # 親プロセスでリフレッシュ済みのトークンを渡し、子プロセスでの再リフレッシュを省く
+        token_json = self._current_token_json()
+        if token_json:
+            env["YOUTUBE_TOKEN_JSON"] = token_json
+
+        args = ['python', '-m', 'body.streamer.youtube_comment_fetcher', video_id]
+        if live_chat_id:
+            args.append(live_chat_id)
+
         # Run the fetcher as a module to handle imports correctly
         self.process = subprocess.Popen(
-            ['python', '-m', 'body.streamer.youtube_comment_fetcher', video_id], 
+            args, 
             stdout=subprocess.PIPE, 
             stderr=subprocess.PIPE, 
             text=True, 
             bufsize=1,
-            env=os.environ.copy()  # 環境変数を子プロセスに渡す（YOUTUBE_API_KEY等）
+            env=env
         )
         self.q: queue.Queue = queue.Queue()
         self.error_q: queue.Queue = queue.Queue()
@@ -44,6 +57,16 @@ class YouTubeCommentAdapter:
         
         logger.info(f"Started YouTube comment adapter for video: {video_id}")
 
+    @staticmethod
+    def _current_token_json() -> Optional[str]:
+        """共有認証情報を JSON で返す。取得できない場合は None（子プロセスが自前で読み込む）。"""
+        try:
+            from body.streamer.youtube_auth import YouTubeAuth
+            return YouTubeAuth.export_token_json()
+        except Exception as e:
+            logger.warning(f"Could not export YouTube credentials for comment fetcher: {e}")
+            return None
+
     def enqueue_output(self, out, queue: queue.Queue):
         """Read output lines and enqueue them."""
         for line in iter(out.readline, ''):
@@ -87,10 +110,14 @@ class YouTubeCommentAdapter:
                     comment_data = json.loads(line.strip())
                     if "error" in comment_data:
                         logger.error(f"YouTube API error: {comment_data['error']}")
+                        COMMENTS_DROPPED.inc(reason="api_error")
                     else:
                         new_comments.append(comment_data)
                 except json.JSONDecodeError as e:
                     logger.warning(f"Failed to parse comment JSON: {e}, line: {line.strip()}")
+                    COMMENTS_DROPPED.inc(reason="malformed")
+        if new_comments:
+            COMMENTS_INGESTED.inc(len(new_comments))
         return new_comments
 
     def close(self):
@@ -3,22 +3,24 @@ import sys
 import json
 import time
 import os
+from typing import Optional
 from googleapiclient.errors import HttpError
 from body.streamer.youtube_auth import YouTubeAuth
 
 
-def fetch_comments(video_id: str):
+def fetch_comments(video_id: str, live_chat_id: Optional[str] = None):
     """
     Fetch comments from YouTube Live chat and output as JSON lines.
     
     Args:
         video_id: YouTube broadcast/video ID
+        live_chat_id: Live chat ID if already known (from the broadcast resource)
     """
     print(f"DEBUG: Starting comment fetch for video {video_id} using YouTubeAuth", file=sys.stderr, flush=True)
     
     try:
         # Build YouTube API client using centralized auth
-        youtube = YouTubeAuth.get_service()
+        youtube = YouTubeAuth.get_shared_service()
         print(f"DEBUG: Successfully authenticated with YouTubeAuth", file=sys.stderr, flush=True)
         
     except Exception as e:
@@ -27,10 +29,11 @@ def fetch_comments(video_id: str):
         print(f"ERROR: {error_msg}", file=sys.stderr, flush=True)
         return
     
-    # Get the live chat ID from the video (with retry logic)
-    live_chat_id = None
-    max_retries = 10
+    # Get the live chat ID from the video (with retry logic) unless it was given
+    max_retries = 10 if not live_chat_id else 0
     retry_interval = 10
+    if live_chat_id:
+        print(f"DEBUG: Using live chat ID from broadcast: {live_chat_id}", file=sys.stderr, flush=True)
     
     for attempt in range(max_retries):
         try:
@@ -118,8 +121,9 @@ def fetch_comments(video_id: str):
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: youtube_comment_fetcher.py <video_id>"}), flush=True)
+        print(json.dumps({"error": "Usage: youtube_comment_fetcher.py <video_id> [live_chat_id]"}), flush=True)
         sys.exit(1)
     
     video_id = sys.argv[1]
-    fetch_comments(video_id)
+    live_chat_id = sys.argv[2] if len(sys.argv) > 2 else None
+    fetch_comments(video_id, live_chat_id)
@@ -1,7 +1,9 @@
 """YouTube Live API adapter for creating and managing live streams"""
+import asyncio
 import os
 import json
 import logging
+import time
 from typing import Dict, Optional
 from body.streamer.youtube_auth import YouTubeAuth
 
@@ -16,17 +18,22 @@ class YoutubeLiveAdapter:
     """Adapter for YouTube Live API operations"""
     
     def __init__(self) -> None:
-        self.youtube, self.creds = self.authenticate_youtube()
+        _, self.creds = self.authenticate_youtube()
+
+    @property
+    def youtube(self):
+        """Shared YouTube API client (token refreshed ahead of expiry)."""
+        return YouTubeAuth.get_shared_service()
 
     def authenticate_youtube(self):
         """Authenticate to the YouTube API and return the API client."""
         try:
-            creds = YouTubeAuth.get_credentials()
+            # Credentials and client are cached per process, so this is cheap after the first call
+            creds = YouTubeAuth.get_shared_credentials()
             
-            # If creds are valid (or were successfully refreshed), build service
+            # If creds are valid (or were successfully refreshed), reuse the shared service
             if creds and creds.valid:
-                service = YouTubeAuth.get_service(creds)
-                return service, creds
+                return YouTubeAuth.get_shared_service(), creds
             
             # If we reach here, we either have no creds or they are invalid/expired
             # Attempt interactive flow
@@ -70,6 +77,42 @@ class YoutubeLiveAdapter:
             "bind": bind_response
         }
 
+    async def acreate_live(self, youtube, title: str, description: str, scheduledStartTime: str,
+                           thumbnail_path: Optional[str] = None, privacy_status: str = "private") -> Dict:
+        """
+        Non-blocking version of create_live.
+
+        Each API call runs in a worker thread. The broadcast and the stream are
+        independent, so they are created concurrently; the thumbnail upload and
+        the bind, which need the broadcast (and stream) IDs, run after that.
+
+        Returns:
+            Dictionary containing broadcast, thumbnail, stream, and bind responses
+        """
+        broadcast_response, stream_response = await asyncio.gather(
+            asyncio.to_thread(self._create_broadcast, youtube, title, description,
+                              scheduledStartTime, privacy_status),
+            asyncio.to_thread(self._create_stream, youtube, title + "_Stream"),
+        )
+
+        async def _thumbnail() -> Optional[Dict]:
+            if not thumbnail_path:
+                return None
+            return await asyncio.to_thread(self._set_thumbnail, youtube, broadcast_response['id'], thumbnail_path)
+
+        thumbnail_response, bind_response = await asyncio.gather(
+            _thumbnail(),
+            asyncio.to_thread(self._bind_broadcast_to_stream, youtube,
+                              broadcast_response['id'], stream_response['id']),
+        )
+
+        return {
+            "broadcast": broadcast_response,
+            "thumbnail": thumbnail_response,
+            "stream": stream_response,
+            "bind": bind_response
+        }
+
     def _create_broadcast(self, youtube, title: str, description: str, 
                          scheduledStartTime: str, privacy_status: str = "private") -> Dict:
         """Create a live broadcast on YouTube."""
@@ -135,6 +178,66 @@ class YoutubeLiveAdapter:
         logger.info(f"Bound broadcast {broadcast_id} to stream {stream_id}")
         return bind_response
 
+    def get_broadcast(self, youtube, broadcast_id: str) -> Optional[Dict]:
+        """Return the broadcast resource (snippet, status), or None if it no longer exists."""
+        res = youtube.liveBroadcasts().list(
+            part="id,snippet,status",
+            id=broadcast_id
+        ).execute()
+        items = res.get("items", [])
+        return items[0] if items else None
+
+    def get_stream_key(self, youtube, stream_id: str) -> str:
+        """Return the RTMP stream key (ingestion stream name) of a live stream."""
+        res = youtube.liveStreams().list(
+            part="id,cdn",
+            id=stream_id
+        ).execute()
+        items = res.get("items", [])
+        if not items:
+            raise ValueError(f"Stream {stream_id} not found")
+        return items[0]["cdn"]["ingestionInfo"]["streamName"]
+
+    def get_stream_status(self, youtube, stream_id: str) -> Dict:
+        """Return the status of a live stream (streamStatus and healthStatus)."""
+        res = youtube.liveStreams().list(
+            part="id,status",
+            id=stream_id
+        ).execute()
+        items = res.get("items", [])
+        if not items:
+            raise ValueError(f"Stream {stream_id} not found")
+        return items[0].get("status", {})
+
+    async def wait_for_stream_active(self, youtube, stream_id: str,
+                                     timeout: float = 30.0, interval: float = 1.0) -> bool:
+        """
+        Poll the stream until YouTube reports that it receives data.
+
+        The broadcast is created with enableAutoStart, so it goes live on its
+        own once the stream is active.
+
+        Returns:
+            True if the stream became active within `timeout` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                status = await asyncio.to_thread(self.get_stream_status, youtube, stream_id)
+                stream_status = status.get("streamStatus")
+                health = status.get("healthStatus", {}).get("status")
+                if stream_status == "active":
+                    logger.info(f"Stream {stream_id} is active (health: {health})")
+                    return True
+                logger.debug(f"Stream {stream_id} status: {stream_status} (health: {health})")
+            except Exception as e:
+                logger.warning(f"Failed to get status of stream {stream_id}: {e}")
+
+            if time.monotonic() + interval > deadline:
+                logger.warning(f"Stream {stream_id} did not become active within {timeout}s")
+                return False
+            await asyncio.sleep(interval)
+
     def stop_live(self, youtube, broadcast_id: str) -> Dict:
         """Stop a live broadcast on YouTube."""
         res = youtube.liveBroadcasts().transition(
@@ -1 +1 @@
-"""Infrastructure abstraction layer for storage and secrets."""
+"""Infrastructure abstraction layer for storage, secrets and metrics."""
@@ -1,11 +1,36 @@
 """Secret management abstraction layer."""
+import json
 import os
+import tempfile
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
 import logging
 
+from infra.metrics import REGISTRY
+
 logger = logging.getLogger(__name__)
 
+# How long a fetched secret is reused before it is fetched again (seconds)
+DEFAULT_SECRET_TTL = float(os.getenv("SECRET_CACHE_TTL", "300"))
+
+# Default concurrency for prefetch()
+DEFAULT_PREFETCH_CONCURRENCY = 8
+
+SECRET_FETCH_LATENCY = REGISTRY.histogram(
+    "secret_fetch_seconds",
+    "Latency of fetching a secret from its backend",
+    ["provider"],
+)
+SECRET_LOOKUPS = REGISTRY.counter(
+    "secret_lookups_total",
+    "Secret lookups by result (hit, disk_hit, miss, stale, error)",
+    ["result"],
+)
+
 
 class SecretProvider(ABC):
     """Abstract interface for secret management."""
@@ -15,6 +40,32 @@ class SecretProvider(ABC):
         """Get secret value by name."""
         pass
 
+    def prefetch(self, names: Iterable[str],
+                 max_concurrency: int = DEFAULT_PREFETCH_CONCURRENCY) -> Dict[str, str]:
+        """
+        Fetch several secrets concurrently.
+
+        Secrets that cannot be fetched are logged and left out of the result,
+        so a later get_secret() raises the usual error for them.
+
+        Returns:
+            Mapping of secret name to value for the secrets that were found.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+
+        def _fetch(name: str) -> Tuple[str, Optional[str]]:
+            try:
+                return name, self.get_secret(name)
+            except Exception as e:
+                logger.warning(f"Prefetch failed for secret '{name}': {e}")
+                return name, None
+
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(names))) as pool:
+            results = dict(pool.map(_fetch, names))
+        return {name: value for name, value in results.items() if value is not None}
+
 
 class EnvSecretProvider(SecretProvider):
     """Secret provider that reads from environment variables."""
@@ -56,16 +107,160 @@ class GcpSecretProvider(SecretProvider):
         secret_id = name.lower().replace("_", "-")
         secret_name = f"projects/{self.project_id}/secrets/{secret_id}/versions/latest"
         try:
-            response = self.client.access_secret_version(request={"name": secret_name})
+            with SECRET_FETCH_LATENCY.time(provider="gcp"):
+                response = self.client.access_secret_version(request={"name": secret_name})
             return response.payload.data.decode("UTF-8")
         except Exception as e:
             logger.error(f"Failed to access secret '{name}' (as '{secret_id}'): {e}")
             raise ValueError(f"Secret '{name}' not found in Secret Manager") from e
 
 
+class CachingSecretProvider(SecretProvider):
+    """
+    TTL cache in front of another SecretProvider.
+
+    Values are kept in memory for `ttl` seconds. When an encryption key is
+    given, they are also persisted to an encrypted file so a restarted
+    process on the same machine can skip the backend round-trip. If a
+    refresh fails, the last known value is served.
+    """
+
+    CACHE_FILE = "secrets.enc"
+
+    def __init__(self, inner: SecretProvider, ttl: float = DEFAULT_SECRET_TTL,
+                 cache_dir: Optional[str] = None, encryption_key: Optional[str] = None):
+        """
+        Args:
+            inner: SecretProvider to cache.
+            ttl: Seconds a value is reused before it is fetched again.
+            cache_dir: Directory for the encrypted cache file. Defaults to
+                       SECRET_CACHE_DIR or <tmp>/ai-tuber-secret-cache.
+            encryption_key: Fernet key for the on-disk cache. Defaults to
+                            SECRET_CACHE_KEY; without a key nothing is written to disk.
+        """
+        self.inner = inner
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._name_locks: Dict[str, threading.Lock] = {}
+        # name -> (value, fetched_at wall-clock time)
+        self._values: Dict[str, Tuple[str, float]] = {}
+
+        self._fernet = None
+        key = encryption_key or os.getenv("SECRET_CACHE_KEY")
+        if key:
+            try:
+                from cryptography.fernet import Fernet
+                self._fernet = Fernet(key.encode("ascii") if isinstance(key, str) else key)
+            except ImportError:
+                logger.warning("cryptography is not installed; encrypted secret cache disabled")
+            except ValueError as e:
+                logger.warning(f"Invalid SECRET_CACHE_KEY; encrypted secret cache disabled: {e}")
+
+        self.cache_path = Path(cache_dir or os.getenv("SECRET_CACHE_DIR")
+                               or os.path.join(tempfile.gettempdir(), "ai-tuber-secret-cache")) / self.CACHE_FILE
+        if self._fernet is not None:
+            self._values.update(self._load_disk_cache())
+        logger.info(f"CachingSecretProvider initialized for {inner.__class__.__name__} "
+                    f"(ttl={ttl}s, disk cache={'on' if self._fernet else 'off'})")
+
+    # --- encrypted disk cache ---
+
+    def _load_disk_cache(self) -> Dict[str, Tuple[str, float]]:
+        try:
+            token = self.cache_path.read_bytes()
+            data = json.loads(self._fernet.decrypt(token))
+            return {name: (entry["value"], entry["fetched_at"]) for name, entry in data.items()}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            # Wrong key or corrupt file: ignore it, it will be overwritten
+            logger.warning(f"Ignoring unreadable secret cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_disk_cache(self) -> None:
+        # Caller must hold _lock
+        if self._fernet is None:
+            return
+        data = {name: {"value": value, "fetched_at": fetched_at}
+                for name, (value, fetched_at) in self._values.items()}
+        token = self._fernet.encrypt(json.dumps(data).encode("utf-8"))
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.cache_path.parent, prefix=".secrets.", suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(token)
+            os.chmod(tmp_name, 0o600)
+            os.replace(tmp_name, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write secret cache {self.cache_path}: {e}")
+
+    # --- cache ---
+
+    def _name_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._name_locks.setdefault(name, threading.Lock())
+
+    def _fresh(self, name: str) -> Optional[str]:
+        with self._lock:
+            entry = self._values.get(name)
+        if entry is not None and time.time() - entry[1] < self.ttl:
+            return entry[0]
+        return None
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop one cached secret, or all of them when name is None."""
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
+            self._save_disk_cache()
+
+    def get_secret(self, name: str) -> str:
+        """Get a secret from the cache, fetching it from the wrapped provider when expired."""
+        value = self._fresh(name)
+        if value is not None:
+            SECRET_LOOKUPS.inc(result="hit")
+            return value
+
+        # Only one thread fetches a given secret; the others wait and reuse its result
+        with self._name_lock(name):
+            value = self._fresh(name)
+            if value is not None:
+                SECRET_LOOKUPS.inc(result="hit")
+                return value
+
+            try:
+                value = self.inner.get_secret(name)
+            except Exception as e:
+                with self._lock:
+                    stale = self._values.get(name)
+                if stale is not None:
+                    SECRET_LOOKUPS.inc(result="stale")
+                    logger.warning(f"Refreshing secret '{name}' failed, serving cached value: {e}")
+                    return stale[0]
+                SECRET_LOOKUPS.inc(result="error")
+                raise
+
+            SECRET_LOOKUPS.inc(result="miss")
+            with self._lock:
+                self._values[name] = (value, time.time())
+                self._save_disk_cache()
+            return value
+
+
+# Shared providers keyed by their resolved configuration
+_shared_providers: Dict[Tuple[str, ...], SecretProvider] = {}
+_shared_providers_lock = threading.Lock()
+
+
 def create_secret_provider(provider_type: Optional[str] = None) -> SecretProvider:
     """
     Factory function to create appropriate SecretProvider.
+
+    Providers are shared per configuration, so every caller in a process
+    reuses one Secret Manager client and its cache. GCP providers are
+    wrapped in a CachingSecretProvider unless SECRET_CACHE=false.
     
     Args:
         provider_type: Type of provider ('env' or 'gcp'). 
@@ -80,9 +275,20 @@ def create_secret_provider(provider_type: Optional[str] = None) -> SecretProvide
     provider_type = provider_type.lower()
     
     if provider_type == "env":
+        # Environment variables are already local; caching would hide changes
         return EnvSecretProvider()
     elif provider_type == "gcp":
         project_id = os.getenv("GCP_PROJECT_ID")
-        return GcpSecretProvider(project_id=project_id)
+        use_cache = os.getenv("SECRET_CACHE", "true").lower() == "true"
+        config_key = (provider_type, project_id or "", str(use_cache))
     else:
         raise ValueError(f"Unknown secret provider type: {provider_type}")
+
+    with _shared_providers_lock:
+        provider = _shared_providers.get(config_key)
+        if provider is None:
+            provider = GcpSecretProvider(project_id=project_id)
+            if use_cache:
+                provider = CachingSecretProvider(provider)
+            _shared_providers[config_key] = provider
+        return provider
@@ -1,12 +1,52 @@
 """Storage abstraction layer for filesystem and GCS."""
+import asyncio
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, ContextManager, Dict, Iterable, Iterator, List, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Chunk size for resumable GCS uploads (must be a multiple of 256 KiB)
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Default concurrency for batched async transfers
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("STORAGE_MAX_CONCURRENCY", "8"))
+
+# Process umask, read once at import (os.umask can only be read by setting it)
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _new_file_mode(dest_path: Path) -> int:
+    """Mode for a file replacing dest_path: keep the existing mode, else what open() would give."""
+    try:
+        return dest_path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+class PreconditionFailedError(Exception):
+    """Raised when a write's if_generation_match precondition does not hold."""
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    """Metadata of a stored object, as returned by list_object_info."""
+    key: str
+    size: Optional[int] = None
+    crc32c: Optional[str] = None  # base64-encoded big-endian CRC32C (GCS format)
+    updated: Optional[float] = None  # last modification time (epoch seconds)
+
 
 class StorageClient(ABC):
     """Abstract interface for storage operations."""
@@ -31,6 +71,104 @@ class StorageClient(ABC):
         """List objects in storage with given prefix."""
         pass
 
+    @abstractmethod
+    def open_write(self, key: str, bucket: Optional[str] = None,
+                   content_type: Optional[str] = None,
+                   if_generation_match: Optional[int] = None) -> ContextManager[BinaryIO]:
+        """
+        Open a binary stream that writes directly to storage.
+
+        The object becomes visible only when the context exits without error.
+        if_generation_match is a GCS generation precondition (0 = create only);
+        backends without object generations ignore it.
+        """
+        pass
+
+    @abstractmethod
+    def write_bytes(self, key: str, data: bytes, bucket: Optional[str] = None,
+                    content_type: Optional[str] = None,
+                    if_generation_match: Optional[int] = None) -> None:
+        """Write bytes to storage without staging a local file."""
+        pass
+
+    def read_text_with_generation(self, key: str, bucket: Optional[str] = None) -> Tuple[str, Optional[int]]:
+        """
+        Read text together with the object generation, for read-modify-write.
+
+        Pass the generation as if_generation_match to the following write; it
+        raises PreconditionFailedError if the object changed in between.
+        Backends without object generations return None.
+        """
+        return self.read_text(key, bucket=bucket), None
+
+    def write_text(self, key: str, text: str, bucket: Optional[str] = None,
+                   content_type: str = "text/plain; charset=utf-8",
+                   if_generation_match: Optional[int] = None) -> None:
+        """Write UTF-8 text to storage without staging a local file."""
+        self.write_bytes(key, text.encode("utf-8"), bucket=bucket, content_type=content_type,
+                         if_generation_match=if_generation_match)
+
+    def download_if_changed(self, key: str, dest: str, version: Optional[str] = None,
+                            bucket: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Download a file unless the stored object still matches `version`.
+
+        Returns:
+            (downloaded, version) where version is an opaque token identifying
+            the current object, or None if the backend cannot provide one.
+        """
+        self.download_file(key, dest, bucket=bucket)
+        return True, None
+
+    def list_object_info(self, prefix: str, bucket: Optional[str] = None) -> List[ObjectInfo]:
+        """
+        List objects with their size/checksum/mtime metadata.
+
+        Backends that cannot provide metadata return entries with only the key set.
+        """
+        return [ObjectInfo(key=key) for key in self.list_objects(prefix, bucket=bucket)]
+
+    # --- async facade ---
+    # The synchronous clients block on network I/O, so the async variants run
+    # them on the default thread pool to keep the event loop responsive.
+
+    async def aread_text(self, key: str, bucket: Optional[str] = None) -> str:
+        """Read text content without blocking the event loop."""
+        return await asyncio.to_thread(self.read_text, key, bucket)
+
+    async def adownload_file(self, key: str, dest: str, bucket: Optional[str] = None) -> None:
+        """Download a file without blocking the event loop."""
+        await asyncio.to_thread(self.download_file, key, dest, bucket)
+
+    async def awrite_text(self, key: str, text: str, bucket: Optional[str] = None, **kwargs) -> None:
+        """Write text content without blocking the event loop."""
+        await asyncio.to_thread(self.write_text, key, text, bucket, **kwargs)
+
+    async def adownload_many(self, items: Iterable[Tuple[str, str]], bucket: Optional[str] = None,
+                             max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> List[Optional[BaseException]]:
+        """
+        Download several files concurrently with bounded concurrency.
+
+        Args:
+            items: (key, dest) pairs.
+            max_concurrency: Maximum number of transfers in flight.
+
+        Returns:
+            One entry per item, in order: None on success, or the raised exception.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _download(key: str, dest: str) -> Optional[BaseException]:
+            async with semaphore:
+                try:
+                    await self.adownload_file(key, dest, bucket)
+                    return None
+                except Exception as e:
+                    logger.warning(f"Download failed for {key}: {e}")
+                    return e
+
+        return list(await asyncio.gather(*(_download(key, dest) for key, dest in items)))
+
 
 class FileSystemStorageClient(StorageClient):
     """Storage client that reads from local filesystem."""
@@ -109,6 +247,63 @@ class FileSystemStorageClient(StorageClient):
         
         return results
 
+    @contextmanager
+    def open_write(self, key: str, bucket: Optional[str] = None,
+                   content_type: Optional[str] = None,
+                   if_generation_match: Optional[int] = None) -> Iterator[BinaryIO]:
+        """Write to a temporary file next to the target and atomically rename it into place."""
+        dest_path = self._resolve_path(bucket or "", key)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=dest_path.parent, prefix=f".{dest_path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                yield f
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates 0600 files; other containers (OBS) read this volume
+            os.chmod(tmp_name, _new_file_mode(dest_path))
+            os.replace(tmp_name, dest_path)
+        except BaseException:
+            # 書き込み途中の一時ファイルを残さない（既存ファイルはそのまま）
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+        logger.debug(f"Wrote {dest_path}")
+
+    def write_bytes(self, key: str, data: bytes, bucket: Optional[str] = None,
+                    content_type: Optional[str] = None,
+                    if_generation_match: Optional[int] = None) -> None:
+        """Atomically write bytes to filesystem storage."""
+        with self.open_write(key, bucket=bucket) as f:
+            f.write(data)
+
+    def download_if_changed(self, key: str, dest: str, version: Optional[str] = None,
+                            bucket: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """Copy the file unless its mtime/size still match `version`."""
+        src_path = self._resolve_path(bucket or "", key)
+        if not src_path.exists():
+            raise FileNotFoundError(f"File not found: {src_path}")
+
+        stat = src_path.stat()
+        current = f"{stat.st_mtime_ns}:{stat.st_size}"
+        if version == current:
+            return False, current
+
+        self.download_file(key, dest, bucket=bucket)
+        return True, current
+
+    def list_object_info(self, prefix: str, bucket: Optional[str] = None) -> List[ObjectInfo]:
+        """List files with size and mtime (no checksum is stored on the filesystem)."""
+        base_path = self.base_path / (bucket or "")
+        infos = []
+        for key in self.list_objects(prefix, bucket=bucket):
+            stat = (base_path / key).stat()
+            infos.append(ObjectInfo(key=key, size=stat.st_size, updated=stat.st_mtime))
+        return infos
+
 
 class GcsStorageClient(StorageClient):
     """Storage client for Google Cloud Storage."""
@@ -155,9 +350,26 @@ class GcsStorageClient(StorageClient):
 
     def read_text(self, key: str, bucket: Optional[str] = None) -> str:
         """Read text content from GCS."""
+        from google.api_core.exceptions import NotFound
+
         bucket_obj = self._get_bucket(bucket)
         blob = bucket_obj.blob(key)
-        return blob.download_as_text()
+        try:
+            return blob.download_as_text()
+        except NotFound as e:
+            raise FileNotFoundError(f"Object not found: gs://{bucket_obj.name}/{key}") from e
+
+    def read_text_with_generation(self, key: str, bucket: Optional[str] = None) -> Tuple[str, Optional[int]]:
+        """Read text and the generation it was served from (taken from the download response)."""
+        from google.api_core.exceptions import NotFound
+
+        bucket_obj = self._get_bucket(bucket)
+        blob = bucket_obj.blob(key)
+        try:
+            text = blob.download_as_text()
+        except NotFound as e:
+            raise FileNotFoundError(f"Object not found: gs://{bucket_obj.name}/{key}") from e
+        return text, int(blob.generation) if blob.generation else None
 
     def list_objects(self, prefix: str, bucket: Optional[str] = None) -> List[str]:
         """List objects in GCS bucket with given prefix."""
@@ -165,10 +377,287 @@ class GcsStorageClient(StorageClient):
         blobs = bucket_obj.list_blobs(prefix=prefix)
         return [blob.name for blob in blobs]
 
+    def list_object_info(self, prefix: str, bucket: Optional[str] = None) -> List[ObjectInfo]:
+        """List objects with size, CRC32C and update time from the listing response."""
+        bucket_obj = self._get_bucket(bucket)
+        return [
+            ObjectInfo(
+                key=blob.name,
+                size=blob.size,
+                crc32c=blob.crc32c,
+                updated=blob.updated.timestamp() if blob.updated else None,
+            )
+            for blob in bucket_obj.list_blobs(prefix=prefix)
+        ]
+
+    @contextmanager
+    def open_write(self, key: str, bucket: Optional[str] = None,
+                   content_type: Optional[str] = None,
+                   if_generation_match: Optional[int] = None) -> Iterator[BinaryIO]:
+        """Stream to GCS with a resumable upload; the object is finalized on close."""
+        bucket_obj = self._get_bucket(bucket)
+        blob = bucket_obj.blob(key, chunk_size=UPLOAD_CHUNK_SIZE)
+        kwargs = {}
+        if content_type:
+            kwargs["content_type"] = content_type
+        if if_generation_match is not None:
+            kwargs["if_generation_match"] = if_generation_match
+
+        from google.api_core.exceptions import PreconditionFailed
+
+        try:
+            with blob.open("wb", **kwargs) as f:
+                yield f
+        except PreconditionFailed as e:
+            raise PreconditionFailedError(f"gs://{bucket_obj.name}/{key} changed (generation != {if_generation_match})") from e
+        logger.debug(f"Wrote gs://{bucket_obj.name}/{key} (resumable)")
+
+    def write_bytes(self, key: str, data: bytes, bucket: Optional[str] = None,
+                    content_type: Optional[str] = None,
+                    if_generation_match: Optional[int] = None) -> None:
+        """
+        Write bytes to GCS.
+
+        Small payloads go up in a single multipart request; payloads above the
+        client's multipart threshold switch to a resumable upload.
+        """
+        from google.api_core.exceptions import PreconditionFailed
+
+        bucket_obj = self._get_bucket(bucket)
+        blob = bucket_obj.blob(key)
+        try:
+            blob.upload_from_string(data, content_type=content_type or "application/octet-stream",
+                                    if_generation_match=if_generation_match)
+        except PreconditionFailed as e:
+            raise PreconditionFailedError(f"gs://{bucket_obj.name}/{key} changed (generation != {if_generation_match})") from e
+        logger.debug(f"Wrote {len(data)} bytes to gs://{bucket_obj.name}/{key}")
+
+    def download_if_changed(self, key: str, dest: str, version: Optional[str] = None,
+                            bucket: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Download the blob unless its generation still equals `version`.
+
+        Revalidation and download share a single request: GCS answers
+        304 Not Modified when the if_generation_not_match precondition fails.
+        """
+        from google.api_core.exceptions import NotFound, NotModified
+
+        bucket_obj = self._get_bucket(bucket)
+        blob = bucket_obj.blob(key)
+        Path(dest).parent.mkdir(parents=True, exist_ok=True)
+
+        kwargs = {}
+        if version:
+            kwargs["if_generation_not_match"] = int(version)
+        try:
+            blob.download_to_filename(dest, **kwargs)
+        except NotModified:
+            return False, version
+        except NotFound as e:
+            raise FileNotFoundError(f"Object not found: gs://{bucket_obj.name}/{key}") from e
+        logger.debug(f"Downloaded gs://{bucket_obj.name}/{key} (generation {blob.generation})")
+        return True, str(blob.generation) if blob.generation else None
+
+
+class CachingStorageClient(StorageClient):
+    """
+    Read-through on-disk cache in front of another StorageClient.
+
+    Reads are served from a local copy after revalidating it against the
+    backend's object version (GCS generation), so unchanged files skip the
+    download. Writes go straight to the wrapped client and invalidate the
+    cached copy.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, inner: StorageClient, cache_dir: Optional[str] = None, max_workers: int = 8):
+        """
+        Args:
+            inner: StorageClient to cache.
+            cache_dir: Directory for cached copies. Defaults to STORAGE_CACHE_DIR
+                       or <tmp>/ai-tuber-storage-cache.
+            max_workers: Concurrency for prefetch().
+        """
+        self.inner = inner
+        self.cache_dir = Path(cache_dir or os.getenv("STORAGE_CACHE_DIR")
+                              or os.path.join(tempfile.gettempdir(), "ai-tuber-storage-cache"))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self._index_lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._index: Dict[str, Optional[str]] = self._load_index()
+        logger.info(f"CachingStorageClient initialized for {inner.__class__.__name__} at {self.cache_dir}")
+
+    # --- index ---
+
+    def _load_index(self) -> Dict[str, Optional[str]]:
+        try:
+            with open(self.cache_dir / self.INDEX_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring corrupt storage cache index: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        # Caller must hold _index_lock
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, prefix=".index.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_name, self.cache_dir / self.INDEX_FILE)
+
+    @staticmethod
+    def _cache_id(key: str, bucket: Optional[str]) -> str:
+        return f"{bucket or ''}/{key}"
+
+    def _cache_path(self, cache_id: str) -> Path:
+        return self.cache_dir / "objects" / hashlib.sha256(cache_id.encode("utf-8")).hexdigest()
+
+    def _key_lock(self, cache_id: str) -> threading.Lock:
+        with self._index_lock:
+            return self._key_locks.setdefault(cache_id, threading.Lock())
+
+    def invalidate(self, key: str, bucket: Optional[str] = None) -> None:
+        """Drop the cached copy of a key."""
+        cache_id = self._cache_id(key, bucket)
+        with self._index_lock:
+            if cache_id in self._index:
+                del self._index[cache_id]
+                self._save_index()
+        self._cache_path(cache_id).unlink(missing_ok=True)
+
+    # --- read-through ---
+
+    def _refresh(self, key: str, bucket: Optional[str] = None) -> Path:
+        """Revalidate (and if needed download) a key, returning the local cached path."""
+        cache_id = self._cache_id(key, bucket)
+        path = self._cache_path(cache_id)
+        with self._key_lock(cache_id):
+            with self._index_lock:
+                version = self._index.get(cache_id) if path.exists() else None
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            os.close(fd)
+            try:
+                downloaded, new_version = self.inner.download_if_changed(key, tmp_name, version, bucket=bucket)
+            except FileNotFoundError:
+                # The inner client may already have removed dest (GCS does on NotFound)
+                Path(tmp_name).unlink(missing_ok=True)
+                self.invalidate(key, bucket)
+                raise
+            except Exception as e:
+                Path(tmp_name).unlink(missing_ok=True)
+                if version is not None and path.exists():
+                    logger.warning(f"Revalidation failed for {cache_id}, serving cached copy: {e}")
+                    return path
+                raise
+
+            if downloaded:
+                os.replace(tmp_name, path)
+                with self._index_lock:
+                    self._index[cache_id] = new_version
+                    self._save_index()
+                logger.debug(f"Storage cache miss: {cache_id}")
+            else:
+                os.unlink(tmp_name)
+                logger.debug(f"Storage cache hit: {cache_id}")
+        return path
+
+    def prefetch(self, prefix: str, bucket: Optional[str] = None, suffixes: Tuple[str, ...] = ()) -> int:
+        """
+        Concurrently warm the cache for every object under `prefix`.
+
+        Args:
+            prefix: Key prefix to list (e.g. "mind/ren/").
+            suffixes: If given, only keys ending with one of these are fetched.
+
+        Returns:
+            Number of objects that are now cached.
+        """
+        keys = [k for k in self.inner.list_objects(prefix, bucket=bucket)
+                if not k.endswith("/") and (not suffixes or k.endswith(suffixes))]
+        if not keys:
+            return 0
+
+        def _fetch(key: str) -> bool:
+            try:
+                self._refresh(key, bucket)
+                return True
+            except Exception as e:
+                logger.warning(f"Prefetch failed for {key}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as pool:
+            count = sum(pool.map(_fetch, keys))
+        logger.info(f"Prefetched {count}/{len(keys)} objects under {prefix}")
+        return count
+
+    # --- StorageClient ---
+
+    def read_text(self, key: str, bucket: Optional[str] = None) -> str:
+        """Read text through the local cache."""
+        return self._refresh(key, bucket).read_text(encoding="utf-8")
+
+    def download_file(self, key: str, dest: str, bucket: Optional[str] = None) -> None:
+        """Copy a cached (revalidated) file to the destination."""
+        path = self._refresh(key, bucket)
+        dest_path = Path(dest)
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, dest_path)
+
+    def download_if_changed(self, key: str, dest: str, version: Optional[str] = None,
+                            bucket: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+        return self.inner.download_if_changed(key, dest, version, bucket=bucket)
+
+    def read_text_with_generation(self, key: str, bucket: Optional[str] = None) -> Tuple[str, Optional[int]]:
+        """Read straight from the backend: a cached copy could hold a stale generation."""
+        return self.inner.read_text_with_generation(key, bucket=bucket)
+
+    def upload_file(self, key: str, src: str, bucket: Optional[str] = None) -> None:
+        self.inner.upload_file(key, src, bucket=bucket)
+        self.invalidate(key, bucket)
+
+    def list_objects(self, prefix: str, bucket: Optional[str] = None) -> List[str]:
+        return self.inner.list_objects(prefix, bucket=bucket)
+
+    def list_object_info(self, prefix: str, bucket: Optional[str] = None) -> List[ObjectInfo]:
+        return self.inner.list_object_info(prefix, bucket=bucket)
+
+    @contextmanager
+    def open_write(self, key: str, bucket: Optional[str] = None,
+                   content_type: Optional[str] = None,
+                   if_generation_match: Optional[int] = None) -> Iterator[BinaryIO]:
+        try:
+            with self.inner.open_write(key, bucket=bucket, content_type=content_type,
+                                       if_generation_match=if_generation_match) as f:
+                yield f
+        finally:
+            self.invalidate(key, bucket)
+
+    def write_bytes(self, key: str, data: bytes, bucket: Optional[str] = None,
+                    content_type: Optional[str] = None,
+                    if_generation_match: Optional[int] = None) -> None:
+        self.inner.write_bytes(key, data, bucket=bucket, content_type=content_type,
+                               if_generation_match=if_generation_match)
+        self.invalidate(key, bucket)
+
+
+# Shared clients keyed by their resolved configuration
+_shared_clients: Dict[Tuple[str, ...], StorageClient] = {}
+_shared_clients_lock = threading.Lock()
+
 
 def create_storage_client(storage_type: Optional[str] = None) -> StorageClient:
     """
     Factory function to create appropriate StorageClient.
+
+    Clients are shared per configuration, so consumers that call the factory
+    independently (PromptLoader, NewsService, ...) reuse one client and its
+    connection pool and cache. GCS clients are wrapped in a
+    CachingStorageClient unless STORAGE_CACHE=false.
     
     Args:
         storage_type: Type of storage ('filesystem' or 'gcs'). 
@@ -184,9 +673,22 @@ def create_storage_client(storage_type: Optional[str] = None) -> StorageClient:
     
     if storage_type == "filesystem":
         base_path = os.getenv("STORAGE_BASE_PATH")
-        return FileSystemStorageClient(base_path=base_path)
+        config_key = (storage_type, base_path or "")
     elif storage_type == "gcs":
         project_id = os.getenv("GCP_PROJECT_ID")
-        return GcsStorageClient(project_id=project_id)
+        use_cache = os.getenv("STORAGE_CACHE", "true").lower() == "true"
+        config_key = (storage_type, project_id or "", os.getenv("GCS_BUCKET_NAME", ""), str(use_cache))
     else:
         raise ValueError(f"Unknown storage type: {storage_type}")
+
+    with _shared_clients_lock:
+        client = _shared_clients.get(config_key)
+        if client is None:
+            if storage_type == "filesystem":
+                client = FileSystemStorageClient(base_path=base_path)
+            else:
+                client = GcsStorageClient(project_id=project_id)
+                if use_cache:
+                    client = CachingStorageClient(client)
+            _shared_clients[config_key] = client
+        return client
@@ -0,0 +1,194 @@
+"""Optional OpenTelemetry tracing shared by saint_graph and body.
+
+Instrumented code gets a tracer from `get_tracer()` and wraps each stage in
+a span. Nothing is exported until `setup_tracing()` installs a provider, and
+when the opentelemetry packages are not installed a no-op tracer is
+returned, so instrumentation costs close to nothing when tracing is off.
+
+Spans are exported through a BatchSpanProcessor on a background thread:
+
+- TRACING_EXPORTER=otlp: OTLP over HTTP (needs opentelemetry-exporter-otlp-proto-http;
+  the endpoint comes from the standard OTEL_EXPORTER_OTLP_* variables)
+- TRACING_EXPORTER=file: one JSON span per line in TRACING_FILE, for offline analysis
+- TRACING_EXPORTER=console: pretty-printed spans on stdout
+- TRACING_EXPORTER=none (default): tracing disabled
+
+Trace context is carried between services in W3C `traceparent` headers via
+`inject_headers()` / `span_from_headers()`.
+"""
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+try:
+    from opentelemetry import context as otel_context
+    from opentelemetry import propagate, trace
+except ImportError:  # pragma: no cover - exercised only without opentelemetry
+    otel_context = None
+    propagate = None
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_FILE = "traces.jsonl"
+
+
+class _NoopSpan:
+    """Stand-in for a span when opentelemetry is not installed."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Mapping[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Mapping[str, Any]] = None,
+                  timestamp: Optional[int] = None) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException, **kwargs) -> None:
+        pass
+
+    def set_status(self, *args, **kwargs) -> None:
+        pass
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+class _NoopTracer:
+    """Stand-in for a tracer when opentelemetry is not installed."""
+
+    def start_span(self, name: str, context=None, **kwargs) -> _NoopSpan:
+        return _NoopSpan()
+
+    @contextmanager
+    def start_as_current_span(self, name: str, context=None, **kwargs) -> Iterator[_NoopSpan]:
+        yield _NoopSpan()
+
+
+def get_tracer(name: str):
+    """Return a tracer for `name`. Spans are recorded once setup_tracing() has run."""
+    if trace is None:
+        return _NoopTracer()
+    return trace.get_tracer(name)
+
+
+# --- context propagation ---
+
+def inject_headers(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Add the current trace context (traceparent) to HTTP headers."""
+    headers = dict(headers or {})
+    if propagate is not None:
+        propagate.inject(headers)
+    return headers
+
+
+def current_context():
+    """Capture the current trace context, e.g. to continue a trace in a queued task."""
+    if otel_context is None:
+        return None
+    return otel_context.get_current()
+
+
+@contextmanager
+def span_from_headers(name: str, headers: Mapping[str, str], **attributes) -> Iterator[Any]:
+    """Start a server span that continues the trace carried in incoming HTTP headers."""
+    tracer = get_tracer(__name__)
+    if propagate is None:
+        with tracer.start_as_current_span(name) as span:
+            yield span
+        return
+    parent = propagate.extract(dict(headers))
+    with tracer.start_as_current_span(name, context=parent, kind=trace.SpanKind.SERVER,
+                                      attributes=attributes or None) as span:
+        yield span
+
+
+# --- exporters ---
+
+def _json_lines_exporter(path: str):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        """Append finished spans to a file, one JSON object per line."""
+
+        def __init__(self, file_path: str):
+            self.file_path = file_path
+            self._lock = threading.Lock()
+
+        def export(self, spans) -> "SpanExportResult":
+            lines = [json.dumps(json.loads(span.to_json()), ensure_ascii=False) for span in spans]
+            try:
+                with self._lock, open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write spans to {self.file_path}: {e}")
+                return SpanExportResult.FAILURE
+            return SpanExportResult.SUCCESS
+
+        def shutdown(self) -> None:
+            pass
+
+    return JsonLinesSpanExporter(path)
+
+
+def _create_exporter(kind: str):
+    if kind == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter()
+    if kind == "file":
+        return _json_lines_exporter(os.getenv("TRACING_FILE", DEFAULT_TRACE_FILE))
+    if kind == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    raise ValueError(f"Unknown tracing exporter: {kind}")
+
+
+def setup_tracing(service_name: str, exporter: Optional[str] = None) -> bool:
+    """
+    Install a tracer provider that batches spans to the configured exporter.
+
+    Args:
+        service_name: Reported as the service.name resource attribute.
+        exporter: 'otlp', 'file', 'console' or 'none'. Defaults to TRACING_EXPORTER.
+
+    Returns:
+        True if spans will be exported.
+    """
+    kind = (exporter or os.getenv("TRACING_EXPORTER", "none")).lower()
+    if kind == "none":
+        return False
+    if trace is None:
+        logger.warning("opentelemetry is not installed; tracing disabled")
+        return False
+
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        span_exporter = _create_exporter(kind)
+    except ImportError as e:
+        logger.warning(f"Tracing exporter '{kind}' is not available ({e}); tracing disabled")
+        return False
+
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        trace.set_tracer_provider(provider)
+    # Export on a background thread so span end never blocks the event loop
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    logger.info(f"Tracing enabled for {service_name} (exporter: {kind})")
+    return True
@@ -1,69 +1,98 @@
 """Body REST API Client for saint_graph.
 
-Provides HTTP client for calling body-cli/body-streamer REST APIs.
+Provides HTTP client for calling body-cli/body-streamer REST APIs, and a
+fan-out client that mirrors one mind's actions to several bodies.
 """
+import asyncio
 import httpx
 import logging
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, List, Dict, Any, Sequence, Tuple
 
-from .config import BODY_URL
+from infra import tracing
+from .config import load_config
 
 logger = logging.getLogger(__name__)
+_tracer = tracing.get_tracer(__name__)
 
 # Default timeout for HTTP requests
 DEFAULT_TIMEOUT = 30.0
+# Default per-request timeout for mirror sinks
+DEFAULT_MIRROR_TIMEOUT = 5.0
+# Timeout for a mirrored stop_broadcast, which drains the mirror's queue and waits BROADCAST_STOP_DELAY
+MIRROR_STOP_TIMEOUT = 300.0
+# Actions buffered per mirror sink before the oldest is dropped
+DEFAULT_MIRROR_QUEUE_SIZE = 256
 
 
 class BodyClient:
     """REST API client for body services (CLI/Streamer)."""
     
-    def __init__(self, base_url: Optional[str] = None):
+    def __init__(self, base_url: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         """
         Initialize the body client.
         
         Args:
             base_url: Base URL for the body service. If not provided,
                       uses the BODY_URL from config.
+            http_client: Shared client (connection pool) to send requests with.
+                         If not provided, each request opens its own client.
+                         The caller owns and closes a shared client.
         """
-        self.base_url = (base_url or BODY_URL).rstrip("/")
+        self.base_url = (base_url or load_config().body_url).rstrip("/")
+        self._http_client = http_client
         logger.info(f"BodyClient initialized with base_url: {self.base_url}")
 
-    async def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT) -> Optional[Dict[str, Any]]:
-        """共通のリクエスト処理。"""
+    @asynccontextmanager
+    async def _client(self, timeout: float) -> AsyncIterator[httpx.AsyncClient]:
+        """Yields the shared client, or a short-lived one when none was given."""
+        if self._http_client is not None:
+            yield self._http_client
+        else:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                yield client
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None, timeout: float = DEFAULT_TIMEOUT,
+                       params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """共通のリクエスト処理。トレースコンテキストを traceparent ヘッダーで Body に伝搬します。"""
         url = f"{self.base_url}{path}"
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            try:
-                if method.upper() == "POST":
-                    response = await client.post(url, json=payload)
-                else:
-                    response = await client.get(url)
-                response.raise_for_status()
-                return response.json()
-            except httpx.ConnectError as e:
-                logger.error(
-                    f"Error calling {path} API: Connection failed to {url} -- "
-                    f"cause: {e.__cause__ or e} "
-                    f"(Check DNS resolution, firewall rules, and that the body node is running)"
-                )
-                return None
-            except httpx.TimeoutException as e:
-                logger.error(
-                    f"Error calling {path} API: Request timed out after {timeout}s to {url} -- "
-                    f"{type(e).__name__}: {e}"
-                )
-                return None
-            except httpx.HTTPStatusError as e:
-                logger.error(
-                    f"Error calling {path} API: HTTP {e.response.status_code} from {url} -- "
-                    f"response body: {e.response.text[:500]}"
-                )
-                return None
-            except Exception as e:
-                logger.error(
-                    f"Error calling {path} API: Unexpected {type(e).__name__}: {e}",
-                    exc_info=True,
-                )
-                return None
+        with _tracer.start_as_current_span(f"body_client {method.upper()} {path}",
+                                           attributes={"http.url": url}) as span:
+            async with self._client(timeout) as client:
+                try:
+                    headers = tracing.inject_headers()
+                    if method.upper() == "POST":
+                        response = await client.post(url, json=payload, headers=headers, timeout=timeout)
+                    else:
+                        response = await client.get(url, headers=headers, params=params, timeout=timeout)
+                    span.set_attribute("http.status_code", response.status_code)
+                    response.raise_for_status()
+                    return response.json()
+                except httpx.ConnectError as e:
+                    logger.error(
+                        f"Error calling {path} API: Connection failed to {url} -- "
+                        f"cause: {e.__cause__ or e} "
+                        f"(Check DNS resolution, firewall rules, and that the body node is running)"
+                    )
+                    return None
+                except httpx.TimeoutException as e:
+                    logger.error(
+                        f"Error calling {path} API: Request timed out after {timeout}s to {url} -- "
+                        f"{type(e).__name__}: {e}"
+                    )
+                    return None
+                except httpx.HTTPStatusError as e:
+                    logger.error(
+                        f"Error calling {path} API: HTTP {e.response.status_code} from {url} -- "
+                        f"response body: {e.response.text[:500]}"
+                    )
+                    return None
+                except Exception as e:
+                    logger.error(
+                        f"Error calling {path} API: Unexpected {type(e).__name__}: {e}",
+                        exc_info=True,
+                    )
+                    return None
     
     async def speak(self, text: str, style: Optional[str] = None, speaker_id: Optional[int] = None) -> str:
         """アバターに発話させます。"""
@@ -85,9 +114,18 @@ class BodyClient:
             return data.get("result", f"Emotion changed to {emotion}")
         return f"Error: Failed to change emotion to {emotion}"
     
-    async def get_comments(self) -> List[Dict[str, Any]]:
-        """直近のユーザーコメントを取得します。"""
-        data = await self._request("GET", "/api/comments")
+    async def get_comments(self, wait: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        直近のユーザーコメントを取得します。
+
+        Args:
+            wait: コメントがまだない場合に Body 側で到着を待つ最大秒数（long-poll）
+        """
+        if wait > 0:
+            data = await self._request("GET", "/api/comments", params={"wait": wait},
+                                       timeout=DEFAULT_TIMEOUT + wait)
+        else:
+            data = await self._request("GET", "/api/comments")
         if data:
             return data.get("comments", [])
         return []
@@ -106,6 +144,14 @@ class BodyClient:
             return data.get("result", "Broadcast stopped")
         return "Error: Failed to stop broadcast"
 
+    async def shutdown_broadcast(self, deadline: float) -> str:
+        """未再生の発話を破棄し、締めの一言だけを再生して deadline 秒以内に配信を停止します。"""
+        data = await self._request("POST", "/api/broadcast/shutdown", {"deadline": deadline},
+                                   timeout=deadline + 2.0)
+        if data:
+            return data.get("result", "Broadcast stopped")
+        return "Error: Failed to shut down broadcast"
+
     async def wait_for_queue(self, timeout: float = 300.0) -> str:
         """キュー内のすべての処理が完了するまで待機します。"""
         data = await self._request("POST", "/api/queue/wait", timeout=timeout)
@@ -113,12 +159,15 @@ class BodyClient:
             return data.get("result", "Wait completed")
         return "Error: Failed to wait for queue"
 
+    async def close(self) -> None:
+        """Releases resources owned by this client (a shared http_client is left open)."""
+
     async def health_check(self) -> bool:
         """Body サービスの稼働状態を確認します。"""
         url = f"{self.base_url}/health"
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with self._client(5.0) as client:
             try:
-                response = await client.get(url)
+                response = await client.get(url, timeout=5.0)
                 is_ok = response.status_code == 200
                 if not is_ok:
                     logger.warning(f"health_check: {url} returned HTTP {response.status_code}")
@@ -132,3 +181,165 @@ class BodyClient:
             except Exception as e:
                 logger.warning(f"health_check: Unexpected error for {url}: {type(e).__name__}: {e}")
                 return False
+
+
+class _MirrorSink:
+    """A secondary body fed through its own ordered queue and worker task."""
+
+    def __init__(self, client: BodyClient, timeout: float, queue_size: int):
+        self.client = client
+        self.timeout = timeout
+        self.queue: "asyncio.Queue[Tuple[str, tuple, dict, float, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.failed = 0
+        # Longest per-request timeout among the queued actions; close() waits at least this long
+        self.longest_pending = 0.0
+        self._worker: Optional[asyncio.Task] = None
+
+    def submit(self, method: str, args: tuple, kwargs: dict, timeout: Optional[float] = None) -> None:
+        if self.queue.full():
+            # A sink that cannot keep up loses its oldest actions instead of growing without bound
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"Mirror {self.client.base_url} is falling behind; dropped {self.dropped} actions")
+        # The worker outlives the caller's turn, so each action carries the trace it belongs to
+        timeout = self.timeout if timeout is None else timeout
+        self.longest_pending = max(self.longest_pending, timeout)
+        self.queue.put_nowait((method, args, kwargs, timeout, tracing.current_context()))
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            method, args, kwargs, timeout, parent = await self.queue.get()
+            try:
+                with _tracer.start_as_current_span(f"body_client.mirror {method}", context=parent,
+                                                   attributes={"http.url": self.client.base_url}):
+                    result = await asyncio.wait_for(getattr(self.client, method)(*args, **kwargs),
+                                                    timeout=timeout)
+                # BodyClient reports HTTP and connection errors as an "Error: ..." result
+                if isinstance(result, str) and result.startswith("Error:"):
+                    self.failed += 1
+                    logger.warning(f"Mirror {self.client.base_url} {method} failed: {result}")
+            except asyncio.TimeoutError:
+                self.failed += 1
+                logger.warning(f"Mirror {self.client.base_url} {method} timed out after {timeout}s")
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Mirror {self.client.base_url} {method} failed: {type(e).__name__}: {e}")
+            finally:
+                self.queue.task_done()
+                if self.queue.empty():
+                    self.longest_pending = 0.0
+
+    async def close(self, timeout: float) -> None:
+        # A queued stop/shutdown keeps its own timeout instead of being cut off by the drain timeout
+        timeout = max(timeout, self.longest_pending)
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Mirror {self.client.base_url} did not drain within {timeout}s; "
+                           f"discarding {self.queue.qsize()} actions")
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+        await self.client.close()
+
+
+class FanOutBodyClient:
+    """
+    Sends each action to a primary body and mirrors it to secondary bodies.
+
+    The primary is authoritative: its results are returned, and comments and
+    ``wait_for_queue`` come from it alone. Every mirror has its own ordered
+    queue, worker and per-request timeout, so a slow or unreachable mirror
+    (a CLI log, a transcript recorder) never delays the primary.
+    """
+
+    def __init__(self, primary: BodyClient, mirrors: Sequence[BodyClient],
+                 mirror_timeout: float = DEFAULT_MIRROR_TIMEOUT,
+                 queue_size: int = DEFAULT_MIRROR_QUEUE_SIZE):
+        """
+        Args:
+            primary: Body whose results, comments and queue state drive the broadcast.
+            mirrors: Bodies that receive a copy of every speak/emotion/broadcast action.
+            mirror_timeout: Timeout for each speak/emotion/start request to a mirror.
+                stop_broadcast and shutdown_broadcast use their own, longer timeouts.
+            queue_size: Actions buffered per mirror before the oldest is dropped.
+        """
+        self.primary = primary
+        self.base_url = primary.base_url
+        self.mirror_timeout = mirror_timeout
+        self._sinks = [_MirrorSink(m, mirror_timeout, queue_size) for m in mirrors]
+        logger.info(f"FanOutBodyClient mirroring {self.base_url} to {[m.base_url for m in mirrors]}")
+
+    @property
+    def mirrors(self) -> List[BodyClient]:
+        return [sink.client for sink in self._sinks]
+
+    def _mirror(self, method: str, *args, _timeout: Optional[float] = None, **kwargs) -> None:
+        for sink in self._sinks:
+            sink.submit(method, args, kwargs, timeout=_timeout)
+
+    async def speak(self, text: str, style: Optional[str] = None, speaker_id: Optional[int] = None) -> str:
+        self._mirror("speak", text, style=style, speaker_id=speaker_id)
+        return await self.primary.speak(text, style=style, speaker_id=speaker_id)
+
+    async def change_emotion(self, emotion: str) -> str:
+        self._mirror("change_emotion", emotion)
+        return await self.primary.change_emotion(emotion)
+
+    async def get_comments(self, wait: float = 0.0) -> List[Dict[str, Any]]:
+        return await self.primary.get_comments(wait=wait)
+
+    async def start_broadcast(self, config: Optional[Dict[str, Any]] = None) -> str:
+        self._mirror("start_broadcast", config)
+        return await self.primary.start_broadcast(config)
+
+    async def stop_broadcast(self) -> str:
+        # A streamer mirror drains its queue and waits before stopping, far longer than a speak request
+        self._mirror("stop_broadcast", _timeout=MIRROR_STOP_TIMEOUT)
+        return await self.primary.stop_broadcast()
+
+    async def shutdown_broadcast(self, deadline: float) -> str:
+        self._mirror("shutdown_broadcast", deadline, _timeout=deadline + 2.0)
+        return await self.primary.shutdown_broadcast(deadline)
+
+    async def wait_for_queue(self, timeout: float = 300.0) -> str:
+        return await self.primary.wait_for_queue(timeout=timeout)
+
+    async def health_check(self) -> bool:
+        return await self.primary.health_check()
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Gives mirrors up to ``timeout`` seconds (default: mirror_timeout) to drain, then stops them.
+        A mirror with a queued stop/shutdown gets at least that action's own timeout.
+        """
+        timeout = self.mirror_timeout if timeout is None else timeout
+        await asyncio.gather(*(sink.close(timeout) for sink in self._sinks))
+        await self.primary.close()
+
+
+def create_body_client(body_url: str, mirror_urls: str = "", mirror_timeout: float = DEFAULT_MIRROR_TIMEOUT,
+                       http_client: Optional[httpx.AsyncClient] = None):
+    """
+    Builds the body client for ``body_url``.
+
+    Args:
+        body_url: Primary (authoritative) body.
+        mirror_urls: Comma-separated bodies to mirror actions to (BODY_MIRROR_URLS).
+        mirror_timeout: Per-request timeout for each mirror.
+        http_client: Shared connection pool for all bodies.
+
+    Returns:
+        A BodyClient, or a FanOutBodyClient when mirrors are configured.
+    """
+    primary = BodyClient(base_url=body_url, http_client=http_client)
+    urls = [u.strip() for u in mirror_urls.split(",") if u.strip()]
+    if not urls:
+        return primary
+    mirrors = [BodyClient(base_url=url, http_client=http_client) for url in urls]
+    return FanOutBodyClient(primary, mirrors, mirror_timeout=mirror_timeout)
@@ -3,17 +3,33 @@
 
 BroadcastPhase (Enum) と各フェーズのハンドラで構成されます。
 各ハンドラは BroadcastContext を受け取り、次の BroadcastPhase を返します。
+
+ループは固定間隔で sleep せず、イベント（コメントの到着、発話キューの消化、
+停止要求）を待ちます。ニュースは間を置かずに続けて読み上げ、IDLE の沈黙
+タイムアウトは実時間の期限で判定します。
+
+ctx.checkpoints が設定されていれば、フェーズの遷移ごとに配信状態を保存します
+（書き込みはバックグラウンドで行われ、ターンを待たせません）。
 """
 import asyncio
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from .config import logger, POLL_INTERVAL, MAX_WAIT_CYCLES
-from .saint_graph import SaintGraph
+from .checkpoint import FINISHED, BroadcastCheckpoint, CheckpointStore
+from .config import logger, load_config
 from .news_service import NewsService
 from .body_client import BodyClient
 
+if TYPE_CHECKING:
+    # ADK の読み込みは重いため、型注釈のためだけにはインポートしない
+    from .saint_graph import SaintGraph
+
+# 1 回のコメント取得で Body 側に到着を待たせる最大時間（秒, long-poll）
+COMMENT_LONG_POLL = 10.0
+# ハンドラで予期しないエラーが起きたときの再試行までの待機（秒）
+ERROR_BACKOFF = 5.0
+
 
 class BroadcastPhase(Enum):
     """配信のフェーズを表す列挙型。"""
@@ -26,24 +42,75 @@ class BroadcastPhase(Enum):
 @dataclass
 class BroadcastContext:
     """ハンドラ間で共有される配信コンテキスト。"""
-    saint_graph: SaintGraph
+    saint_graph: "SaintGraph"
     news_service: NewsService
-    idle_counter: int = 0
+    # IDLE の沈黙タイムアウトの期限（イベントループの時刻）。発話キューが空になった時点から数える
+    idle_deadline: Optional[float] = None
+    # セットされると、進行中のターンや待機を打ち切って CLOSING へ移る（shutdown.py）
+    shutdown: asyncio.Event = field(default_factory=asyncio.Event)
+    # 配信状態の保存先（None なら保存しない）
+    checkpoints: Optional[CheckpointStore] = None
+    _speech_drained: Optional["asyncio.Future[float]"] = field(default=None, init=False, repr=False)
 
 
 # ---------------------------------------------------------------------------
 # 共通ユーティリティ
 # ---------------------------------------------------------------------------
 
-async def _poll_and_respond(ctx: BroadcastContext) -> bool:
+async def _wait_for_shutdown(ctx: BroadcastContext, timeout: float) -> bool:
+    """停止要求か timeout 秒の経過まで待ちます。停止要求があれば True。"""
+    if timeout <= 0:
+        return ctx.shutdown.is_set()
+    try:
+        await asyncio.wait_for(ctx.shutdown.wait(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def _fetch_comments(ctx: BroadcastContext, wait: float = 0.0) -> List[Dict[str, Any]]:
+    """
+    コメントを取得します。
+
+    wait > 0 の場合は Body 側でコメントの到着を最大 wait 秒待ちます（long-poll）。
+    待機中に停止要求があれば打ち切って空リストを返します。
+    """
+    body = ctx.saint_graph.body
+    if wait <= 0:
+        return await body.get_comments()
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    fetch = asyncio.ensure_future(body.get_comments(wait=wait))
+    stop = asyncio.ensure_future(ctx.shutdown.wait())
+    try:
+        done, _ = await asyncio.wait({fetch, stop}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        stop.cancel()
+    if fetch not in done:
+        fetch.cancel()
+        return []
+
+    comments = fetch.result()
+    if not comments:
+        # long-poll 非対応の Body や接続エラーで即座に返ってきた場合に空回りしない
+        min_interval = min(wait, load_config().poll_interval)
+        await _wait_for_shutdown(ctx, min_interval - (loop.time() - started))
+    return comments
+
+
+async def _poll_and_respond(ctx: BroadcastContext, wait: float = 0.0) -> bool:
     """
-    コメントをポーリングし、あれば応答します。
+    コメントを取得し、あれば応答します。
+
+    Args:
+        wait: コメントの到着を待つ最大時間（秒）。0 なら待たずに確認だけ行う
 
     Returns:
         コメントがあり応答した場合 True
     """
     try:
-        comments_data = await ctx.saint_graph.body.get_comments()
+        comments_data = await _fetch_comments(ctx, wait)
 
         if comments_data:
             comments_text = "\n".join(
@@ -59,6 +126,37 @@ async def _poll_and_respond(ctx: BroadcastContext) -> bool:
     return False
 
 
+async def _wait_until_drained(ctx: BroadcastContext) -> float:
+    """Body の発話キューが空になるまで待ち、その時刻を返します。"""
+    try:
+        await ctx.saint_graph.body.wait_for_queue()
+    except Exception as e:
+        logger.warning(f"Failed to wait for speech queue: {e}")
+    return asyncio.get_running_loop().time()
+
+
+def _save_checkpoint(ctx: BroadcastContext, phase: str) -> None:
+    """次に実行するフェーズとニュースの進み具合の保存を予約します。"""
+    if ctx.checkpoints is None:
+        return
+    ctx.checkpoints.save(
+        BroadcastCheckpoint(
+            phase=phase,
+            news_index=ctx.news_service.current_index,
+            news_total=len(ctx.news_service.items),
+        ),
+        history_source=ctx.saint_graph,
+    )
+
+
+def _reset_idle(ctx: BroadcastContext) -> None:
+    """沈黙タイムアウトの計測をやり直します（次の発話の消化から数え直す）。"""
+    ctx.idle_deadline = None
+    if ctx._speech_drained is not None:
+        ctx._speech_drained.cancel()
+        ctx._speech_drained = None
+
+
 # ---------------------------------------------------------------------------
 # フェーズハンドラ
 # ---------------------------------------------------------------------------
@@ -74,9 +172,8 @@ async def handle_news(ctx: BroadcastContext) -> BroadcastPhase:
     NEWS: コメント優先で確認し、なければニュースを 1 本読み上げる。
     ニュースを全消化したら IDLE へ遷移する。
     """
-    # コメント優先
+    # コメント優先（待たずに確認だけ行い、なければ即座に次のニュースへ）
     if await _poll_and_respond(ctx):
-        ctx.idle_counter = 0
         return BroadcastPhase.NEWS
 
     # 次のニュースを読み上げ
@@ -93,22 +190,39 @@ async def handle_news(ctx: BroadcastContext) -> BroadcastPhase:
     # ニュース全消化 → IDLE へ
     logger.info("All news items read. Waiting for final comments.")
     await ctx.saint_graph.process_news_finished()
+    _reset_idle(ctx)
     return BroadcastPhase.IDLE
 
 
 async def handle_idle(ctx: BroadcastContext) -> BroadcastPhase:
     """
-    IDLE: コメントを待ち、あれば応答してカウンタをリセットする。
-    タイムアウトしたら CLOSING へ遷移する。
+    IDLE: コメントの到着を待ち、あれば応答して沈黙タイムアウトをやり直す。
+    直前の発話を再生し終えてから IDLE_TIMEOUT 秒コメントがなければ CLOSING へ遷移する。
     """
-    if await _poll_and_respond(ctx):
-        ctx.idle_counter = 0
+    loop = asyncio.get_running_loop()
+    idle_timeout = load_config().idle_timeout
+
+    # 発話キューの消化はコメント待ちと並行して待ち、消化した時刻から期限を決める
+    if ctx.idle_deadline is None:
+        if ctx._speech_drained is None:
+            ctx._speech_drained = asyncio.ensure_future(_wait_until_drained(ctx))
+        if ctx._speech_drained.done() or idle_timeout <= 0:
+            ctx.idle_deadline = await ctx._speech_drained + idle_timeout
+            ctx._speech_drained = None
+
+    if ctx.idle_deadline is not None:
+        remaining = ctx.idle_deadline - loop.time()
+    else:
+        # 消化前なので期限はまだ先。消化直後に期限を迎えても idle_timeout 以上は待たない
+        remaining = idle_timeout
+
+    if remaining > 0 and await _poll_and_respond(ctx, wait=min(remaining, COMMENT_LONG_POLL)):
+        _reset_idle(ctx)
         return BroadcastPhase.IDLE
 
-    ctx.idle_counter += 1
-    if ctx.idle_counter > MAX_WAIT_CYCLES:
+    if ctx.idle_deadline is not None and loop.time() >= ctx.idle_deadline:
         logger.info(
-            f"Silence timeout ({MAX_WAIT_CYCLES} cycles) reached. "
+            f"Silence timeout ({idle_timeout:g}s) reached. "
             "Finishing broadcast."
         )
         return BroadcastPhase.CLOSING
@@ -118,6 +232,11 @@ async def handle_idle(ctx: BroadcastContext) -> BroadcastPhase:
 
 async def handle_closing(ctx: BroadcastContext) -> BroadcastPhase:
     """CLOSING: 締めの挨拶をしてリソースを解放する。None を返しループ終了。"""
+    if ctx.shutdown.is_set():
+        # 停止要求時は LLM での挨拶を省き、締めの一言と停止は ShutdownCoordinator に任せる
+        logger.info("Shutdown requested. Skipping the generated closing talk.")
+        return None
+
     await ctx.saint_graph.process_closing()
     
     # すべての発話が完了するまで待機（キューの消化待機）
@@ -139,34 +258,77 @@ _HANDLERS = {
 }
 
 
-async def run_broadcast_loop(ctx: BroadcastContext) -> None:
+async def _run_handler(ctx: BroadcastContext, phase: BroadcastPhase) -> Optional[BroadcastPhase]:
+    """
+    フェーズのハンドラを実行します。
+
+    停止要求が来たら進行中のハンドラ（LLM のターンやコメント待ち）を取り消して CLOSING を返します。
+    CLOSING のハンドラは取り消しません。
+    """
+    handler = asyncio.ensure_future(_HANDLERS[phase](ctx))
+    if phase is BroadcastPhase.CLOSING:
+        return await handler
+
+    stop = asyncio.ensure_future(ctx.shutdown.wait())
+    try:
+        await asyncio.wait({handler, stop}, return_when=asyncio.FIRST_COMPLETED)
+        if handler.done():
+            return handler.result()
+    finally:
+        stop.cancel()
+        handler.cancel()  # 完了済みなら何もしない
+
+    try:
+        await handler
+    except asyncio.CancelledError:
+        pass
+    logger.info(f"Preempted the {phase.value} handler for shutdown.")
+    return BroadcastPhase.CLOSING
+
+
+async def run_broadcast_loop(ctx: BroadcastContext, start_phase: BroadcastPhase = BroadcastPhase.INTRO) -> None:
     """
     ステートマシンのメインループ。
 
-    INTRO から始まり、各ハンドラが返す次フェーズに従って遷移します。
-    ハンドラが None を返すとループを終了します。
+    start_phase（通常は INTRO、チェックポイントからの再開時はその続き）から始まり、
+    各ハンドラが返す次フェーズに従って遷移します。
+    ハンドラ間で sleep はせず、待機は各ハンドラがイベントに対して行います。
+    ctx.shutdown がセットされると CLOSING に移り、ハンドラが None を返すとループを終了します。
     """
-    phase = BroadcastPhase.INTRO
+    phase = start_phase
     logger.info("Entering Broadcast Loop (state machine)...")
 
-    while phase is not None:
-        try:
-            handler = _HANDLERS[phase]
-            next_phase = await handler(ctx)
-
-            if next_phase is not None:
-                if next_phase != phase:
-                    logger.info(f"Phase transition: {phase.value} -> {next_phase.value}")
-                phase = next_phase
-                await asyncio.sleep(POLL_INTERVAL)
-            else:
-                # CLOSING ハンドラが None を返した → 終了
-                logger.info(f"Phase {phase.value} completed. Exiting loop.")
-                phase = None
-
-        except Exception as e:
-            logger.error(f"Unexpected error in phase {phase.value}: {e}", exc_info=True)
-            await asyncio.sleep(5)
-        except BaseException as e:
-            logger.critical(f"Critical System Error in phase {phase.value}: {e}", exc_info=True)
-            raise
+    try:
+        while phase is not None:
+            if ctx.shutdown.is_set() and phase is not BroadcastPhase.CLOSING:
+                logger.info(f"Shutdown requested in phase {phase.value}. Moving to closing.")
+                phase = BroadcastPhase.CLOSING
+
+            try:
+                next_phase = await _run_handler(ctx, phase)
+
+                if next_phase is not None:
+                    if next_phase != phase:
+                        logger.info(f"Phase transition: {phase.value} -> {next_phase.value}")
+                    phase = next_phase
+                    # 停止要求で打ち切った場合は、最後に完了したターンの状態を残す
+                    if not ctx.shutdown.is_set():
+                        _save_checkpoint(ctx, phase.value)
+                else:
+                    # CLOSING ハンドラが None を返した → 終了
+                    logger.info(f"Phase {phase.value} completed. Exiting loop.")
+                    phase = None
+                    if not ctx.shutdown.is_set():
+                        _save_checkpoint(ctx, FINISHED)
+
+            except Exception as e:
+                logger.error(f"Unexpected error in phase {phase.value}: {e}", exc_info=True)
+                if phase is BroadcastPhase.CLOSING:
+                    await asyncio.sleep(ERROR_BACKOFF)
+                else:
+                    await _wait_for_shutdown(ctx, ERROR_BACKOFF)
+            except BaseException as e:
+                logger.critical(f"Critical System Error in phase {phase.value}: {e}", exc_info=True)
+                raise
+    finally:
+        _reset_idle(ctx)
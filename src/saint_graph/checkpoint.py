@@ -0,0 +1,157 @@
+"""
+配信状態のチェックポイント。
+
+saint_graph が配信の途中で落ちて再起動したときに続きから再開できるよう、
+配信フェーズ・ニュースの進み具合・会話履歴（直近のやり取りに圧縮したもの）を
+StorageClient 上の JSON に保存します。
+
+書き込みはバックグラウンドのタスクで行い、ターンの待ち時間には含めません。
+書き込み中に次の保存要求が来た場合は最新のものだけを書き、内容が変わっていなければ書きません。
+ただし長い待機中でも保存時刻が古くならないよう、一定間隔ごとに内容が同じでも書き直します。
+"""
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Protocol
+
+from .config import logger
+
+DEFAULT_CHECKPOINT_KEY = "checkpoints/broadcast.json"
+# 内容が変わらなくても保存時刻を更新する間隔（秒）。CHECKPOINT_MAX_AGE より十分短くする
+DEFAULT_REFRESH_INTERVAL = 60.0
+CHECKPOINT_VERSION = 1
+# 配信を最後まで終えたことを表すフェーズ（再開しない）
+FINISHED = "finished"
+
+
+class HistorySource(Protocol):
+    """会話履歴を圧縮して返すもの（SaintGraph）。"""
+
+    async def export_history(self) -> List[Dict[str, str]]: ...
+
+
+@dataclass
+class BroadcastCheckpoint:
+    """再開に必要な配信状態。"""
+    phase: str
+    news_index: int = 0
+    news_total: int = 0
+    history: List[Dict[str, str]] = field(default_factory=list)
+    saved_at: str = ""
+    version: int = CHECKPOINT_VERSION
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BroadcastCheckpoint":
+        return cls(
+            phase=data["phase"],
+            news_index=int(data.get("news_index", 0)),
+            news_total=int(data.get("news_total", 0)),
+            history=list(data.get("history", [])),
+            saved_at=data.get("saved_at", ""),
+            version=int(data.get("version", CHECKPOINT_VERSION)),
+        )
+
+    def age_seconds(self) -> float:
+        """保存からの経過秒数。保存時刻が読めない場合は無限大。"""
+        try:
+            saved = datetime.strptime(self.saved_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return float("inf")
+        return (datetime.now(timezone.utc) - saved).total_seconds()
+
+
+class CheckpointStore:
+    """StorageClient 上の JSON にチェックポイントを保存・読み込みします。"""
+
+    def __init__(self, storage, key: Optional[str] = None, refresh_interval: Optional[float] = None):
+        """
+        Args:
+            storage: StorageClient
+            key: 保存先のキー（デフォルト: CHECKPOINT_KEY または checkpoints/broadcast.json）
+            refresh_interval: 内容が同じでも書き直す間隔（秒）。デフォルト: CHECKPOINT_REFRESH_INTERVAL または 60
+        """
+        self.storage = storage
+        self.key = key or os.getenv("CHECKPOINT_KEY", DEFAULT_CHECKPOINT_KEY)
+        self.refresh_interval = (refresh_interval if refresh_interval is not None
+                                 else float(os.getenv("CHECKPOINT_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL)))
+        self._pending: Optional[BroadcastCheckpoint] = None
+        self._history_source: Optional[HistorySource] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._last_written: Optional[str] = None
+        self._last_written_at = 0.0
+        self._force = False
+        # 最後に保存を予約したチェックポイント（停止時に保存し直す）
+        self.last: Optional[BroadcastCheckpoint] = None
+
+    async def aload(self) -> Optional[BroadcastCheckpoint]:
+        """保存済みのチェックポイントを読み込みます。ない・壊れている場合は None。"""
+        try:
+            data = json.loads(await self.storage.aread_text(self.key))
+            checkpoint = BroadcastCheckpoint.from_dict(data)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Ignoring corrupt checkpoint {self.key}: {e}")
+            return None
+        if checkpoint.version != CHECKPOINT_VERSION:
+            logger.warning(f"Ignoring checkpoint {self.key} with version {checkpoint.version}")
+            return None
+        return checkpoint
+
+    async def aload_resumable(self, max_age: float) -> Optional[BroadcastCheckpoint]:
+        """再開すべきチェックポイント（配信途中で、max_age 秒以内に保存されたもの）を返します。"""
+        checkpoint = await self.aload()
+        if checkpoint is None or checkpoint.phase == FINISHED:
+            return None
+        if checkpoint.age_seconds() > max_age:
+            logger.info(f"Checkpoint {self.key} is older than {max_age:g}s. Starting a new broadcast.")
+            return None
+        return checkpoint
+
+    def save(self, checkpoint: BroadcastCheckpoint, history_source: Optional[HistorySource] = None,
+             force: bool = False) -> None:
+        """
+        チェックポイントの保存を予約してすぐに戻ります。
+
+        Args:
+            checkpoint: 保存する状態。history は history_source から書き込み時に取得します。
+            history_source: 会話履歴の取得元（省略時は checkpoint.history をそのまま保存）
+            force: 内容が変わっていなくても書き込み、保存時刻を更新する
+        """
+        self.last = checkpoint
+        self._pending = checkpoint
+        self._history_source = history_source
+        self._force = self._force or force
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.create_task(self._write_pending())
+
+    async def flush(self) -> None:
+        """予約済みの書き込みが終わるまで待ちます。"""
+        if self._writer is not None:
+            await self._writer
+
+    async def _write_pending(self) -> None:
+        while self._pending is not None:
+            checkpoint, self._pending = self._pending, None
+            source, self._history_source = self._history_source, None
+            force, self._force = self._force, False
+            try:
+                if source is not None:
+                    checkpoint.history = await source.export_history()
+                data = asdict(checkpoint)
+                body = json.dumps({k: v for k, v in data.items() if k != "saved_at"}, ensure_ascii=False, sort_keys=True)
+                # 内容が同じなら書かない（保存時刻が refresh_interval より古くなった場合を除く）
+                fresh = time.monotonic() - self._last_written_at < self.refresh_interval
+                if body == self._last_written and fresh and not force:
+                    continue
+                checkpoint.saved_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                await self.storage.awrite_text(self.key, json.dumps(asdict(checkpoint), ensure_ascii=False),
+                                               content_type="application/json")
+                self._last_written = body
+                self._last_written_at = time.monotonic()
+                logger.debug(f"Saved checkpoint {self.key}: phase={checkpoint.phase}, news={checkpoint.news_index}")
+            except Exception as e:
+                logger.warning(f"Failed to save checkpoint {self.key}: {e}")
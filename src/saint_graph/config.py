@@ -1,15 +1,12 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import logging
 import sys
+import threading
 from dataclasses import dataclass, fields, field
-from dotenv import load_dotenv
-
-# .envファイルを読み込む
-load_dotenv()
 from typing import Optional
-from infra.secret_provider import SecretProvider, create_secret_provider
 
 # ログ設定（初期化）
 logging.basicConfig(
@@ -25,17 +22,42 @@ class Config:
     # 接続設定
     weather_mcp_url: str = field(default_factory=lambda: os.getenv("WEATHER_MCP_URL", "http://tools-weather:8001/sse"))
     body_url: str = field(default_factory=lambda: os.getenv("BODY_URL", "http://localhost:8000"))
+    # 発話・表情・配信操作を複製して送る副 Body（カンマ区切り, body_client.FanOutBodyClient）
+    body_mirror_urls: str = field(default_factory=lambda: os.getenv("BODY_MIRROR_URLS", ""))
+    # 副 Body へのリクエストごとのタイムアウト（秒）。主 Body の処理は待たせない
+    body_mirror_timeout: float = field(default_factory=lambda: float(os.getenv("BODY_MIRROR_TIMEOUT", "5")))
     
     # AI設定
     google_api_key: str | None = None
     model_name: str = field(default_factory=lambda: os.getenv("MODEL_NAME", "gemini-3.1-flash-lite-preview"))
     adk_telemetry: bool = field(default_factory=lambda: os.getenv("ADK_TELEMETRY", "false").lower() == "true")
+    tracing_exporter: str = field(default_factory=lambda: os.getenv("TRACING_EXPORTER", "").lower())
     
     # システム定数
     poll_interval: float = field(default_factory=lambda: float(os.getenv("POLL_INTERVAL", "1.0")))
     news_dir: str = field(default_factory=lambda: os.getenv("NEWS_DIR", "news"))
     max_wait_cycles: int = field(default_factory=lambda: int(os.getenv("MAX_WAIT_CYCLES", "30")))
+    # 沈黙タイムアウト（秒）。未指定時は従来の MAX_WAIT_CYCLES × POLL_INTERVAL 相当
+    idle_timeout: float = field(default_factory=lambda: float(
+        os.getenv("IDLE_TIMEOUT")
+        or int(os.getenv("MAX_WAIT_CYCLES", "30")) * float(os.getenv("POLL_INTERVAL", "1.0"))
+    ))
+    shutdown_deadline: float = field(default_factory=lambda: float(os.getenv("SHUTDOWN_DEADLINE", "8")))
+    # チェックポイントからの再開（checkpoint.py）。この秒数より古いチェックポイントからは再開しない
+    checkpoint_max_age: float = field(default_factory=lambda: float(os.getenv("CHECKPOINT_MAX_AGE", "1800")))
+    # チェックポイントに残す会話履歴のターン数（0 で履歴を保存しない）
+    checkpoint_history_turns: int = field(default_factory=lambda: int(os.getenv("CHECKPOINT_HISTORY_TURNS", "20")))
+    # ADK セッションの保存先（session_store.py）。memory / sqlite
+    session_backend: str = field(default_factory=lambda: os.getenv("SESSION_BACKEND", "memory"))
+    session_db_path: str = field(default_factory=lambda: os.getenv("SESSION_DB_PATH", "data/sessions/saint_graph.sqlite3"))
+    # メモリ上に残す 1 セッションあたりのイベント数
+    session_max_events: int = field(default_factory=lambda: int(os.getenv("SESSION_MAX_EVENTS", "200")))
+    mcp_connect_timeout: float = field(default_factory=lambda: float(os.getenv("MCP_CONNECT_TIMEOUT", "10")))
+    mcp_reconnect_max_backoff: float = field(default_factory=lambda: float(os.getenv("MCP_RECONNECT_MAX_BACKOFF", "300")))
     
+    # 1 プロセスで配信するキャラクター（"name=body_url" のカンマ区切り, multi_character.py）。空なら単独配信
+    characters: str = field(default_factory=lambda: os.getenv("CHARACTERS", ""))
+
     # 動作モード
     run_mode: str = field(default_factory=lambda: os.getenv("RUN_MODE", "cli"))
     is_cloud_run: bool = field(default_factory=lambda: os.getenv("K_SERVICE") is not None or os.getenv("CLOUD_RUN_JOB") is not None)
@@ -69,37 +91,86 @@ class Config:
             logger.info(f"Config: {f.name} = {log_value}")
 
 
+def load_env():
+    """.env ファイルを環境変数に読み込みます（何度呼んでも1回だけ）。"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
 def _load_google_api_key() -> str | None:
-    """SecretProvider を使って GOOGLE_API_KEY を取得。"""
-    secret_provider = create_secret_provider()
-    try:
-        return secret_provider.get_secret("GOOGLE_API_KEY")
-    except (ValueError, FileNotFoundError):
-        logger.warning("Failed to load GOOGLE_API_KEY from SecretProvider, falling back to env var")
-        return os.getenv("GOOGLE_API_KEY")
-
-
-# 設定の初期化
-_google_api_key = _load_google_api_key()
-
-# ADK のための環境変数同期
-if _google_api_key and not os.getenv("GOOGLE_API_KEY"):
-    os.environ["GOOGLE_API_KEY"] = _google_api_key
-
-_config = Config(google_api_key=_google_api_key)
-_config.validate()
-_config.log_config()
-
-# モジュールレベルの定数（互換性維持）
-WEATHER_MCP_URL = _config.weather_mcp_url
-BODY_URL = _config.body_url
-GOOGLE_API_KEY = _config.google_api_key
-MODEL_NAME = _config.model_name
-ADK_TELEMETRY = _config.adk_telemetry
-POLL_INTERVAL = _config.poll_interval
-NEWS_DIR = _config.news_dir
-MAX_WAIT_CYCLES = _config.max_wait_cycles
-RUN_MODE = _config.run_mode
+    """SecretProvider を使って GOOGLE_API_KEY を取得（起動時に必要なシークレットをまとめて取得）。"""
+    from infra.secret_provider import create_secret_provider
+    secrets = create_secret_provider().prefetch(STARTUP_SECRETS)
+    if "GOOGLE_API_KEY" in secrets:
+        return secrets["GOOGLE_API_KEY"]
+    logger.warning("Failed to load GOOGLE_API_KEY from SecretProvider, falling back to env var")
+    return os.getenv("GOOGLE_API_KEY")
+
+
+def load_config(reload: bool = False) -> Config:
+    """
+    設定を解決して返します。初回呼び出し時にシークレット取得・検証・ログ出力を行い、
+    以降はキャッシュした Config を返します。
+
+    Args:
+        reload: True の場合はキャッシュを破棄して再解決します。
+    """
+    global _config
+    with _config_lock:
+        if _config is not None and not reload:
+            return _config
+
+        load_env()
+        google_api_key = _load_google_api_key()
+
+        # ADK のための環境変数同期
+        if google_api_key and not os.getenv("GOOGLE_API_KEY"):
+            os.environ["GOOGLE_API_KEY"] = google_api_key
+
+        config = Config(google_api_key=google_api_key)
+        config.validate()
+        config.log_config()
+        _config = config
+        return config
+
+
+async def aload_config() -> Config:
+    """load_config の非同期版。シークレット取得をイベントループ外で行います。"""
+    return await asyncio.to_thread(load_config)
+
+
+# 起動時に SecretProvider からまとめて取得するシークレット
+STARTUP_SECRETS = ("GOOGLE_API_KEY",)
+
+_env_loaded = False
+_config: Optional[Config] = None
+_config_lock = threading.Lock()
+
+# モジュールレベルの定数（互換性維持）。参照された時点で load_config() が解決される
+_LEGACY_CONSTANTS = {
+    "WEATHER_MCP_URL": "weather_mcp_url",
+    "BODY_URL": "body_url",
+    "GOOGLE_API_KEY": "google_api_key",
+    "MODEL_NAME": "model_name",
+    "ADK_TELEMETRY": "adk_telemetry",
+    "POLL_INTERVAL": "poll_interval",
+    "NEWS_DIR": "news_dir",
+    "MAX_WAIT_CYCLES": "max_wait_cycles",
+    "IDLE_TIMEOUT": "idle_timeout",
+    "MCP_CONNECT_TIMEOUT": "mcp_connect_timeout",
+    "MCP_RECONNECT_MAX_BACKOFF": "mcp_reconnect_max_backoff",
+    "RUN_MODE": "run_mode",
+}
+
+
+def __getattr__(name: str):
+    if name in _LEGACY_CONSTANTS:
+        return getattr(load_config(), _LEGACY_CONSTANTS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # 外部ライブラリのログ抑制
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -1,75 +1,186 @@
+import argparse
 import asyncio
+import importlib
 import sys
 import os
+from typing import TYPE_CHECKING, Any, Awaitable, Optional
 
-from .config import logger, BODY_URL, WEATHER_MCP_URL, NEWS_DIR
-from .saint_graph import SaintGraph
+from .config import logger, Config, load_env, aload_config
+from .startup_profile import StartupProfiler
 from .telemetry import setup_telemetry
 from .prompt_loader import PromptLoader
 from .news_service import NewsService
-from .body_client import BodyClient
-from .broadcast_loop import BroadcastContext, run_broadcast_loop
+from .body_client import BodyClient, create_body_client
+from .broadcast_loop import BroadcastContext, BroadcastPhase, run_broadcast_loop
+from .checkpoint import BroadcastCheckpoint, CheckpointStore
+from .shutdown import ShutdownCoordinator
 
+# 終了時にチェックポイントの書き込みを待つ最大時間（秒）
+CHECKPOINT_FLUSH_TIMEOUT = 5.0
+# 配信フェーズごとのテンプレート（全キャラクター共通）
+TEMPLATE_NAMES = ["intro", "news_reading", "news_finished", "closing"]
 
-async def main():
-    """ニュースキャスター配信のメインエントリーポイント。"""
-    setup_telemetry()
+if TYPE_CHECKING:
+    from .saint_graph import SaintGraph
+
+
+async def main(profile_startup: bool = False):
+    """
+    ニュースキャスター配信のメインエントリーポイント。
+
+    Args:
+        profile_startup: True の場合、起動フェーズごとの所要時間を出力します。
+    """
+    profiler = StartupProfiler(enabled=profile_startup)
     logger.info("Starting Saint Graph in Chat Mode...")
 
-    # プロンプトとテンプレートのロード
-    loader = PromptLoader(character_name="ren")
-    system_instruction = loader.load_system_instruction()
-    
-    template_names = [
-        "intro", "news_reading", "news_finished", "closing"
-    ]
-    templates = loader.load_templates(template_names)
-
-    # ニュースサービスの初期化
-    news_path = os.path.join(NEWS_DIR, "news_script.md")
-    news_service = NewsService(news_path)
-    try:
-        news_service.load_news()
-        if not news_service.items:
-            logger.warning(f"NewsService loaded 0 items from {news_path}.")
-        else:
-            logger.info(f"Loaded {len(news_service.items)} news items from {news_path}.")
-    except Exception as e:
-        logger.error(f"Failed to load news: {e}")
+    # シークレットを必要としない設定（パス等）は .env と環境変数だけで決まる
+    load_env()
+    with profiler.phase("storage client"):
+        loader = PromptLoader()
+    news_path = os.path.join(Config().news_dir, "news_script.md")
+    news_service = NewsService(news_path, storage_client=loader.storage)
+    checkpoints = CheckpointStore(loader.storage)
+
+    # 設定（シークレット取得）・ADK の読み込み・プロンプト・ニュース原稿・チェックポイントを並列に準備
+    # キャラクターのファイル一式の先読みも同時に行い、キャッシュを温めておく
+    config, saint_graph_module, _, system_instruction, templates, mind_config, _, checkpoint = await asyncio.gather(
+        profiler.track("config + secrets", aload_config()),
+        profiler.track("import adk", asyncio.to_thread(importlib.import_module, ".saint_graph", __package__)),
+        profiler.track("mind prefetch", loader.aprefetch()),
+        profiler.track("system instruction", loader.aload_system_instruction()),
+        profiler.track("templates", loader.aload_templates(TEMPLATE_NAMES)),
+        profiler.track("mind config", loader.aload_mind_config()),
+        profiler.track("news", news_service.aload_news()),
+        profiler.track("checkpoint", checkpoints.aload_resumable(Config().checkpoint_max_age)),
+    )
 
-    # キャラクター設定のロード
-    mind_config = loader.load_mind_config()
+    with profiler.phase("telemetry"):
+        setup_telemetry()
+
+    if not news_service.items:
+        logger.warning(f"NewsService loaded 0 items from {news_path}.")
+    else:
+        logger.info(f"Loaded {len(news_service.items)} news items from {news_path}.")
     logger.info(f"Loaded mind config: {mind_config}")
 
-    # BodyClient の初期化
-    body_client = BodyClient(base_url=BODY_URL)
+    # BodyClient の初期化（BODY_MIRROR_URLS があれば副 Body にも同じ操作を送る）
+    body_client = create_body_client(config.body_url, config.body_mirror_urls, config.body_mirror_timeout)
 
     # SaintGraph (ADK + REST Body) の初期化
-    saint_graph = SaintGraph(
-        body=body_client,
-        weather_mcp_url=WEATHER_MCP_URL,
-        system_instruction=system_instruction,
-        mind_config=mind_config,
-        templates=templates
+    with profiler.phase("saint graph init"):
+        saint_graph: "SaintGraph" = saint_graph_module.SaintGraph(
+            body=body_client,
+            weather_mcp_url=config.weather_mcp_url,
+            system_instruction=system_instruction,
+            mind_config=mind_config,
+            templates=templates
+        )
+
+    ctx = BroadcastContext(
+        saint_graph=saint_graph,
+        news_service=news_service,
+        checkpoints=checkpoints,
     )
+    # SIGTERM（Cloud Run / GCE のプリエンプション）では進行中のターンを打ち切り、期限内に配信を止める
+    shutdown = ShutdownCoordinator(ctx, deadline=config.shutdown_deadline)
+    shutdown.install()
+
+    try:
+        await run_character(ctx, shutdown, checkpoint, warm_up=saint_graph.warm_up(), profiler=profiler)
+    finally:
+        shutdown.uninstall()
+        await body_client.close()
+        await saint_graph.close()
+
 
+async def run_character(ctx: BroadcastContext, shutdown: ShutdownCoordinator,
+                        checkpoint: Optional[BroadcastCheckpoint] = None,
+                        warm_up: Optional[Awaitable[Any]] = None,
+                        profiler: Optional[StartupProfiler] = None) -> None:
+    """
+    1 キャラクター分の配信を、開始予約から停止まで実行します。
+
+    Args:
+        ctx: 配信コンテキスト
+        shutdown: ctx の停止要求を管理するコーディネーター（シグナルの登録は呼び出し側で行う）
+        checkpoint: 再開するチェックポイント（None なら INTRO から）
+        warm_up: 配信開始の予約と並行して待つ準備処理（MCP ツールへの接続など）
+        profiler: 起動フェーズの計測
+    """
+    profiler = profiler or StartupProfiler()
+    body_client = ctx.saint_graph.body
+    # 再開や配信開始の予約が先に失敗しても、準備処理が待たれないまま残らないようタスクにしておく
+    warm_up_task = asyncio.ensure_future(warm_up or asyncio.sleep(0))
     try:
+        start_phase = BroadcastPhase.INTRO
+        if checkpoint is not None:
+            start_phase = await _resume_from_checkpoint(ctx, checkpoint)
+
         # 配信パラメータの構築 & 配信開始予約（実際の発話開始まで保留される）
+        # MCP ツールへの接続は配信開始の準備と並行して済ませ、最初のターンで待たないようにする
         broadcast_config = _build_broadcast_config()
-        await _start_broadcast(body_client, broadcast_config)
+        await asyncio.gather(
+            profiler.track("broadcast start", _start_broadcast(body_client, broadcast_config)),
+            profiler.track("mcp warm-up", warm_up_task),
+        )
 
+        if profiler.enabled:
+            logger.info(profiler.report())
         logger.info("Broadcast start requested. Entering broadcast loop immediately.")
 
         # ステートマシンによるメインループ実行
-        ctx = BroadcastContext(
-            saint_graph=saint_graph,
-            news_service=news_service,
+        await run_broadcast_loop(ctx, start_phase=start_phase)
+    finally:
+        if not warm_up_task.done():
+            warm_up_task.cancel()
+            await asyncio.gather(warm_up_task, return_exceptions=True)
+        if shutdown.requested:
+            await shutdown.finish()
+        else:
+            await _stop_broadcast(body_client)
+        if ctx.checkpoints is not None:
+            await _flush_checkpoints(ctx.checkpoints)
+
+
+async def _resume_from_checkpoint(ctx: BroadcastContext, checkpoint: BroadcastCheckpoint) -> BroadcastPhase:
+    """
+    チェックポイントの状態を復元し、再開するフェーズを返します。
+
+    開始挨拶は繰り返さず、ニュース原稿が差し替えられていない場合はニュースの続きから読み上げます。
+    """
+    news_service = ctx.news_service
+    if checkpoint.news_total == len(news_service.items):
+        news_service.current_index = min(checkpoint.news_index, len(news_service.items))
+    else:
+        logger.warning(
+            f"News script changed since the checkpoint ({checkpoint.news_total} -> "
+            f"{len(news_service.items)} items). Reading the news from the beginning."
         )
+    try:
+        await ctx.saint_graph.restore_history(checkpoint.history)
+    except Exception as e:
+        logger.warning(f"Failed to restore conversation history: {e}")
 
-        await run_broadcast_loop(ctx)
-    finally:
-        await _stop_broadcast(body_client)
-        await saint_graph.close()
+    try:
+        phase = BroadcastPhase(checkpoint.phase)
+    except ValueError:
+        phase = BroadcastPhase.NEWS
+    if phase is BroadcastPhase.INTRO:
+        phase = BroadcastPhase.NEWS
+    logger.info(
+        f"Resuming broadcast from checkpoint saved at {checkpoint.saved_at}: "
+        f"phase={phase.value}, news={news_service.current_index}/{len(news_service.items)}"
+    )
+    return phase
+
+
+async def _flush_checkpoints(checkpoints: CheckpointStore):
+    """保存待ちのチェックポイントを書き込みます。"""
+    try:
+        await asyncio.wait_for(checkpoints.flush(), timeout=CHECKPOINT_FLUSH_TIMEOUT)
+    except Exception as e:
+        logger.warning(f"Failed to flush checkpoint: {e}")
 
 
 def _build_broadcast_config() -> dict:
@@ -105,10 +216,29 @@ async def _stop_broadcast(body: BodyClient):
         logger.warning(f"Failed to stop broadcast cleanly: {e}")
 
 
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Saint Graph newscaster")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        default=os.getenv("STARTUP_PROFILE", "false").lower() == "true",
+        help="起動フェーズごとの所要時間を出力する (環境変数 STARTUP_PROFILE=true でも可)",
+    )
+    return parser.parse_args(argv)
+
+
 if __name__ == "__main__":
     import traceback
+    load_env()
+    args = _parse_args()
     try:
-        asyncio.run(main())
+        characters = Config().characters
+        if characters:
+            # 複数キャラクターを 1 プロセスで配信する
+            from .multi_character import main as multi_main, parse_characters
+            asyncio.run(multi_main(parse_characters(characters), profile_startup=args.profile_startup))
+        else:
+            asyncio.run(main(profile_startup=args.profile_startup))
     except Exception:
         traceback.print_exc()
         sys.stderr.flush()
@@ -0,0 +1,142 @@
+"""
+MCP ツールセットの接続管理。
+
+McpToolset をラップし、起動時の事前接続（ウォームアップ）、ツールスキーマの
+キャッシュ、ヘルスチェック付きのバックオフ再接続を行います。
+MCP サーバーが停止している間はツールを LLM に提示せず、ターンを失敗させません。
+"""
+import asyncio
+import time
+from typing import Any, Callable, Optional
+
+import httpx
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+from .config import logger
+
+
+class _GuardedTool(BaseTool):
+    """ツール実行時の例外をエラー応答に変換し、ツールセットに障害を通知するプロキシ。"""
+
+    def __init__(self, inner: BaseTool, on_failure: Callable[[Exception], None]):
+        super().__init__(name=inner.name, description=inner.description,
+                         is_long_running=getattr(inner, "is_long_running", False))
+        self._inner = inner
+        self._on_failure = on_failure
+
+    def _get_declaration(self):
+        return self._inner._get_declaration()
+
+    async def run_async(self, *, args: dict[str, Any], tool_context) -> Any:
+        try:
+            return await self._inner.run_async(args=args, tool_context=tool_context)
+        except Exception as e:
+            self._on_failure(e)
+            return {"error": f"ツール {self.name} は現在利用できません: {e}"}
+
+
+class ManagedMcpToolset(BaseToolset):
+    """
+    接続状態を管理する MCP ツールセット。
+
+    - warm_up() で接続とツール一覧の取得を事前に行い、結果をキャッシュします。
+    - 接続できない間は空のツール一覧を返し、バックグラウンドで再接続を試みます。
+    - 再接続の前に /health を確認し、失敗するたびに待機時間を倍にします。
+    """
+
+    def __init__(self, inner: BaseToolset, name: str, health_url: Optional[str] = None,
+                 connect_timeout: float = 10.0, min_backoff: float = 5.0, max_backoff: float = 300.0):
+        """
+        Args:
+            inner: 実際の McpToolset
+            name: ログ用の名前
+            health_url: 再接続前に確認するヘルスチェック URL（None なら省略）
+            connect_timeout: 接続とツール一覧取得のタイムアウト（秒）
+            min_backoff: 再接続の初回待機時間（秒）
+            max_backoff: 再接続の最大待機時間（秒）
+        """
+        super().__init__()
+        self.inner = inner
+        self.name = name
+        self.health_url = health_url
+        self.connect_timeout = connect_timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self._tools: Optional[list[BaseTool]] = None
+        self._backoff = min_backoff
+        self._retry_at = 0.0
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self._tools is not None
+
+    async def warm_up(self) -> bool:
+        """接続してツール一覧をキャッシュします。成功したら True。"""
+        try:
+            tools = await asyncio.wait_for(self.inner.get_tools(), timeout=self.connect_timeout)
+        except Exception as e:
+            self._mark_unhealthy(e)
+            return False
+
+        self._tools = [_GuardedTool(tool, self._mark_unhealthy) for tool in tools]
+        self._backoff = self.min_backoff
+        logger.info(f"MCP toolset '{self.name}' ready: {[t.name for t in self._tools]}")
+        return True
+
+    async def get_tools(self, readonly_context=None) -> list[BaseTool]:
+        """キャッシュ済みのツールを返します。未接続なら空リスト（再接続はバックグラウンド）。"""
+        if self._tools is not None:
+            return self._tools
+        self._schedule_reconnect()
+        return []
+
+    async def close(self) -> None:
+        if self._reconnect_task and not self._reconnect_task.done():
+            self._reconnect_task.cancel()
+        if hasattr(self.inner, "close"):
+            await self.inner.close()
+
+    # --- 障害と再接続 ---
+
+    def _mark_unhealthy(self, error: Exception) -> None:
+        if self._tools is not None or self._retry_at == 0.0:
+            logger.warning(f"MCP toolset '{self.name}' unavailable, tools dropped until it recovers: {error!r}")
+        else:
+            logger.debug(f"MCP toolset '{self.name}' still unavailable: {error!r}")
+        self._tools = None
+        self._retry_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+
+    def _schedule_reconnect(self) -> None:
+        if self._reconnect_task and not self._reconnect_task.done():
+            return
+        if time.monotonic() < self._retry_at:
+            return
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        if not await self._probe_health():
+            self._mark_unhealthy(ConnectionError(f"health check failed: {self.health_url}"))
+            return
+        if await self.warm_up():
+            logger.info(f"MCP toolset '{self.name}' reconnected")
+
+    async def _probe_health(self) -> bool:
+        if not self.health_url:
+            return True
+        try:
+            async with httpx.AsyncClient(timeout=self.connect_timeout) as client:
+                response = await client.get(self.health_url)
+                return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+
+def health_url_for(sse_url: str) -> Optional[str]:
+    """SSE エンドポイントの URL から同じサーバーの /health の URL を導出します。"""
+    if sse_url.rstrip("/").endswith("/sse"):
+        return sse_url.rstrip("/")[: -len("/sse")] + "/health"
+    return None
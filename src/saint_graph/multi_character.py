@@ -0,0 +1,170 @@
+"""
+1 つのプロセスで複数のキャラクターを同時に配信するランナー。
+
+CHARACTERS（例: "ren=http://body-ren:8000,yuki=http://body-yuki:8000"）に並べた
+キャラクターごとに SaintGraph（ADK セッション）・BodyClient・ニュース原稿・
+チェックポイントを用意し、次のものは全キャラクターで共有します。
+
+- ADK / genai の読み込みとモデルのクライアント（SharedResources）
+- MCP ツールセットとセッションサービス（SharedResources）
+- Body への HTTP 接続プール
+- プロンプトを読むストレージ（キャッシュ）と配信フェーズのテンプレート
+
+各キャラクターの配信は独立しており、1 つが失敗しても他のキャラクターは続行します。
+"""
+import asyncio
+import importlib
+import os
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import httpx
+
+from infra.storage_client import create_storage_client
+from .body_client import DEFAULT_TIMEOUT, BodyClient
+from .broadcast_loop import BroadcastContext
+from .checkpoint import BroadcastCheckpoint, CheckpointStore
+from .config import Config, aload_config, load_env, logger
+from .main import TEMPLATE_NAMES, run_character
+from .news_service import NewsService
+from .prompt_loader import PromptLoader
+from .shutdown import ShutdownCoordinator, ShutdownGroup
+from .startup_profile import StartupProfiler
+from .telemetry import setup_telemetry
+
+
+@dataclass
+class CharacterSpec:
+    """1 キャラクター分の配信設定。"""
+    name: str
+    body_url: str
+    news_path: str
+    checkpoint_key: str
+
+
+def parse_characters(value: str, news_dir: Optional[str] = None) -> List[CharacterSpec]:
+    """
+    CHARACTERS の値（"name=body_url" のカンマ区切り）を解析します。
+
+    ニュース原稿は <NEWS_DIR>/<name>/news_script.md、チェックポイントは
+    checkpoints/<name>.json をキャラクターごとに使います。
+
+    Raises:
+        ValueError: 書式が正しくない、または名前が重複している場合
+    """
+    news_dir = news_dir if news_dir is not None else Config().news_dir
+    specs: List[CharacterSpec] = []
+    for entry in value.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, body_url = (part.strip() for part in entry.partition("="))
+        if not sep or not name or not body_url:
+            raise ValueError(f"Invalid CHARACTERS entry {entry!r} (expected name=body_url)")
+        if any(s.name == name for s in specs):
+            raise ValueError(f"Duplicate character {name!r} in CHARACTERS")
+        specs.append(CharacterSpec(
+            name=name,
+            body_url=body_url,
+            news_path=os.path.join(news_dir, name, "news_script.md"),
+            checkpoint_key=f"checkpoints/{name}.json",
+        ))
+    return specs
+
+
+async def main(specs: Sequence[CharacterSpec], profile_startup: bool = False):
+    """
+    複数キャラクター配信のエントリーポイント。
+
+    Args:
+        specs: 配信するキャラクター
+        profile_startup: True の場合、起動フェーズごとの所要時間を出力します。
+    """
+    profiler = StartupProfiler(enabled=profile_startup)
+    logger.info(f"Starting Saint Graph for {len(specs)} characters: {[s.name for s in specs]}")
+
+    load_env()
+    with profiler.phase("storage client"):
+        storage = create_storage_client()
+    loaders = [PromptLoader(character_name=s.name, storage_client=storage) for s in specs]
+    news_services = [NewsService(s.news_path, storage_client=storage) for s in specs]
+    checkpoint_stores = [CheckpointStore(storage, key=s.checkpoint_key) for s in specs]
+    max_age = Config().checkpoint_max_age
+
+    # 共通部分（設定・ADK・テンプレート）は 1 回だけ、キャラクター固有の読み込みはまとめて並列に行う
+    config, saint_graph_module, _, templates, instructions, mind_configs, _, checkpoints = await asyncio.gather(
+        profiler.track("config + secrets", aload_config()),
+        profiler.track("import adk", asyncio.to_thread(importlib.import_module, ".saint_graph", __package__)),
+        profiler.track("mind prefetch", asyncio.gather(*(l.aprefetch() for l in loaders))),
+        profiler.track("templates", loaders[0].aload_templates(TEMPLATE_NAMES)),
+        profiler.track("system instructions", asyncio.gather(*(l.aload_system_instruction() for l in loaders))),
+        profiler.track("mind configs", asyncio.gather(*(l.aload_mind_config() for l in loaders))),
+        profiler.track("news", asyncio.gather(*(n.aload_news() for n in news_services))),
+        profiler.track("checkpoints", asyncio.gather(*(c.aload_resumable(max_age) for c in checkpoint_stores))),
+    )
+
+    with profiler.phase("telemetry"):
+        setup_telemetry()
+
+    http_client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT)
+    with profiler.phase("saint graph init"):
+        shared = saint_graph_module.SharedResources.create(config.weather_mcp_url)
+        contexts = []
+        for spec, instruction, mind_config, news_service, store in zip(
+                specs, instructions, mind_configs, news_services, checkpoint_stores):
+            logger.info(f"[{spec.name}] body={spec.body_url}, news={len(news_service.items)} items from {spec.news_path}")
+            saint_graph = saint_graph_module.SaintGraph(
+                body=BodyClient(base_url=spec.body_url, http_client=http_client),
+                weather_mcp_url=config.weather_mcp_url,
+                system_instruction=instruction,
+                mind_config=mind_config,
+                templates=templates,
+                shared=shared,
+                session_id=f"{saint_graph_module.SESSION_ID}_{spec.name}",
+            )
+            contexts.append(BroadcastContext(saint_graph=saint_graph, news_service=news_service, checkpoints=store))
+
+    coordinators = [ShutdownCoordinator(ctx, deadline=config.shutdown_deadline) for ctx in contexts]
+    shutdown = ShutdownGroup(coordinators)
+    shutdown.install()
+    try:
+        await run_characters([s.name for s in specs], contexts, coordinators, checkpoints,
+                             warm_up=profiler.track("mcp warm-up", shared.warm_up()))
+        if profiler.enabled:
+            logger.info(profiler.report())
+    finally:
+        shutdown.uninstall()
+        await shared.close()
+        await http_client.aclose()
+
+
+async def run_characters(names: Sequence[str], contexts: Sequence[BroadcastContext],
+                         coordinators: Sequence[ShutdownCoordinator],
+                         checkpoints: Sequence[Optional[BroadcastCheckpoint]],
+                         warm_up=None) -> List[Optional[BaseException]]:
+    """
+    各キャラクターの配信を並行して最後まで実行します。
+
+    共有の準備処理 warm_up は 1 回だけ実行し、全キャラクターの配信開始予約と並行して待ちます。
+
+    Returns:
+        キャラクターごとの失敗（成功なら None）
+    """
+    shared_warm_up = asyncio.ensure_future(warm_up or asyncio.sleep(0))
+    try:
+        results = await asyncio.gather(*(
+            run_character(ctx, coordinator, checkpoint, warm_up=asyncio.shield(shared_warm_up))
+            for ctx, coordinator, checkpoint in zip(contexts, coordinators, checkpoints)
+        ), return_exceptions=True)
+    finally:
+        shared_warm_up.cancel()
+
+    errors: List[Optional[BaseException]] = []
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            logger.error(f"[{name}] Broadcast failed: {result!r}")
+            errors.append(result)
+        else:
+            logger.info(f"[{name}] Broadcast finished.")
+            errors.append(None)
+    return errors
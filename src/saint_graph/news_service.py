@@ -3,7 +3,7 @@ import os
 import re
 from dataclasses import dataclass
 from typing import List, Optional
-from infra.storage_client import create_storage_client
+from infra.storage_client import StorageClient, create_storage_client
 
 @dataclass
 class NewsItem:
@@ -15,27 +15,51 @@ class NewsItem:
 
 class NewsService:
     """Markdown形式のニュース原稿を管理するサービス"""
-    def __init__(self, data_path: str):
+    def __init__(self, data_path: str, storage_client: Optional[StorageClient] = None):
         """
         NewsServiceを初期化します。
         
         Args:
             data_path: ニュース原稿の論理パス（例: "news/news_script.md"）
+            storage_client: StorageClient インスタンス。None の場合は共有クライアントを使用。
         """
         self.data_path = data_path
         self.items: List[NewsItem] = []
         self.current_index = 0
-        self.storage = create_storage_client()
+        self.storage = storage_client or create_storage_client()
 
     def load_news(self):
         """Markdownファイルからニュース項目をロードします。"""
         from .config import logger
 
+        try:
+            content = self.storage.read_text(key=self.data_path)
+        except Exception as e:
+            logger.error(f"Error parsing news markdown: {e}")
+            content = None
+        self._load_content(content)
+
+    async def aload_news(self):
+        """load_news の非同期版。ストレージの読み込み中もイベントループをブロックしません。"""
+        from .config import logger
+
+        try:
+            content = await self.storage.aread_text(key=self.data_path)
+        except Exception as e:
+            logger.error(f"Error parsing news markdown: {e}")
+            content = None
+        self._load_content(content)
+
+    def _load_content(self, content: Optional[str]):
+        """読み込んだ Markdown をパースしてニュース項目を設定します。"""
+        from .config import logger
+
         self.items = []
+        self.current_index = 0
+        if content is None:
+            return
         
-        # ストレージから読み出し
         try:
-            content = self.storage.read_text(key=self.data_path)
             logger.info(f"NewsService loaded content from {self.data_path} using {self.storage.__class__.__name__}")
             
             # 区切り文字（##）に基づいてセクションを分割。セクション冒頭はスキップ。
@@ -65,8 +89,6 @@ class NewsService:
         except Exception as e:
             logger.error(f"Error parsing news markdown: {e}")
             self.items = []
-        
-        self.current_index = 0
 
     def has_next(self) -> bool:
         """未読のニュース項目があるか確認します。"""
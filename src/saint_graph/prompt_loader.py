@@ -1,9 +1,10 @@
+import asyncio
 import json
 import os
 from pathlib import Path
 from typing import Optional
 from .config import logger
-from infra.storage_client import StorageClient, create_storage_client
+from infra.storage_client import CachingStorageClient, StorageClient, create_storage_client
 
 # アプリケーションのルートパス (src directory)
 APP_ROOT = Path(__file__).resolve().parent.parent
@@ -43,6 +44,23 @@ class PromptLoader:
         
         logger.info(f"PromptLoader initialized for character: {self.character_name} (Logical path: {self._mind_base_path})")
 
+    def prefetch(self) -> int:
+        """
+        キャラクターのプロンプト・設定ファイル (mind/{character}/*.md, *.json) を
+        キャッシュ付きストレージへ並列に先読みします。キャッシュ層がない場合は何もしません。
+        """
+        if not isinstance(self.storage, CachingStorageClient):
+            return 0
+        try:
+            return self.storage.prefetch(f"{self._mind_base_path}/", suffixes=(".md", ".json"))
+        except Exception as e:
+            logger.warning(f"Failed to prefetch mind files for {self.character_name}: {e}")
+            return 0
+
+    async def aprefetch(self) -> int:
+        """prefetch の非同期版。イベントループ外で先読みします。"""
+        return await asyncio.to_thread(self.prefetch)
+
     def load_system_instruction(self) -> str:
         """
         core_instructions.md と persona.md を結合してシステム指示を返します。
@@ -83,6 +101,45 @@ class PromptLoader:
         
         return templates
 
+    async def aload_system_instruction(self) -> str:
+        """load_system_instruction の非同期版。core と persona を並列に読み込みます。"""
+        try:
+            core_content, persona_content = await asyncio.gather(
+                self.system_storage.aread_text(key=f"{self._saint_graph_prompts_path}/core_instructions.md"),
+                self.storage.aread_text(key=f"{self._mind_base_path}/persona.md"),
+            )
+            logger.info(f"Loaded core and persona for {self.character_name}")
+            return core_content + "\n\n" + persona_content
+        except Exception as e:
+            logger.error(f"Failed to load system instruction: {e}")
+            raise
+
+    async def aload_templates(self, names: list[str]) -> dict[str, str]:
+        """load_templates の非同期版。テンプレートを並列に読み込みます。"""
+        results = await asyncio.gather(
+            *(self.system_storage.aread_text(key=f"{self._saint_graph_prompts_path}/{name}.md") for name in names),
+            return_exceptions=True,
+        )
+        templates = {}
+        for name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to load template '{name}': {result}")
+            else:
+                templates[name] = result
+        return templates
+
+    async def aload_mind_config(self) -> dict:
+        """load_mind_config の非同期版。"""
+        try:
+            content = await self.storage.aread_text(key=f"{self._mind_base_path}/mind.json")
+            return json.loads(content)
+        except FileNotFoundError:
+            logger.warning(f"mind.json not found for {self.character_name}")
+            return {}
+        except Exception as e:
+            logger.error(f"Error loading mind.json for {self.character_name}: {e}")
+            return {}
+
     def get_retry_templates(self, templates: dict[str, str]) -> dict[str, str]:
         """
         テンプレート辞書から再指示（retry_*）用のものだけを抽出します。
@@ -2,6 +2,7 @@ import asyncio
 import logging
 import re
 import traceback
+from dataclasses import dataclass
 from typing import List, Optional, Any, Iterable
 
 from google.adk import Agent
@@ -10,10 +11,21 @@ from google.adk.models import Gemini
 from google.adk.tools import McpToolset
 from google.adk.tools.mcp_tool.mcp_toolset import SseConnectionParams
 from google.adk.events.event import Event
+from google.adk.sessions.base_session_service import BaseSessionService
 
 from google.genai import types
-from .config import logger, MODEL_NAME
+from infra import tracing
+from .config import logger, load_config
 from .body_client import BodyClient
+from .mcp_toolset import ManagedMcpToolset, health_url_for
+from .session_store import create_session_service
+
+
+_tracer = tracing.get_tracer(__name__)
+
+# 配信全体で 1 つの ADK セッションを使う
+USER_ID = "yt_user"
+SESSION_ID = "yt_session"
 
 
 def _iter_exception_group(e: BaseException) -> Iterable[BaseException]:
@@ -24,6 +36,63 @@ def _iter_exception_group(e: BaseException) -> Iterable[BaseException]:
             yield from _iter_exception_group(sub)
 
 
+def create_toolsets(weather_mcp_url: str) -> List[ManagedMcpToolset]:
+    """MCP ツールセット（天気などの外部ツール用）を作成します。"""
+    config = load_config()
+    toolsets = []
+    if weather_mcp_url:
+        connection_params = SseConnectionParams(url=weather_mcp_url)
+        toolset = McpToolset(connection_params=connection_params)
+        # 接続状態の管理とツールスキーマのキャッシュ。停止中はツールを外してターンを継続する
+        toolsets.append(ManagedMcpToolset(
+            toolset,
+            name="weather",
+            health_url=health_url_for(weather_mcp_url),
+            connect_timeout=config.mcp_connect_timeout,
+            max_backoff=config.mcp_reconnect_max_backoff,
+        ))
+    return toolsets
+
+
+@dataclass
+class SharedResources:
+    """
+    SaintGraph が使うモデル・MCP ツールセット・セッションサービス。
+
+    1 つのプロセスで複数のキャラクターを配信する場合（multi_character.py）は
+    これを共有し、モデルの HTTP クライアントや MCP の接続をキャラクターごとに持たないようにします。
+    """
+    model: Gemini
+    toolsets: List[ManagedMcpToolset]
+    session_service: BaseSessionService
+
+    @classmethod
+    def create(cls, weather_mcp_url: str) -> "SharedResources":
+        """設定に従って作成します。"""
+        config = load_config()
+        return cls(
+            model=Gemini(model=config.model_name),
+            toolsets=create_toolsets(weather_mcp_url),
+            # セッションは直近のイベントだけをメモリに残し、SESSION_BACKEND に応じて永続化する
+            session_service=create_session_service(config),
+        )
+
+    async def warm_up(self):
+        """
+        MCP ツールセットへの接続とツール一覧の取得を並列に事前実行します。
+        接続できなかったツールセットは、回復するまでツールなしで動作します。
+        """
+        results = await asyncio.gather(*(ts.warm_up() for ts in self.toolsets))
+        ready = sum(1 for ok in results if ok)
+        logger.info(f"MCP warm-up finished: {ready}/{len(self.toolsets)} toolsets ready")
+
+    async def close(self):
+        """ツールセットとセッションの保存先の接続を解除します。"""
+        for ts in self.toolsets:
+            await ts.close()
+        await self.session_service.close()
+
+
 class SaintGraph:
     """
     Google ADKを使用してエージェントの振る舞いを管理するコアクラス。
@@ -31,48 +100,58 @@ class SaintGraph:
     外部ツール（天気など）は MCP で管理されます。
     """
 
-    def __init__(self, body: BodyClient, weather_mcp_url: str, system_instruction: str, mind_config: Optional[dict] = None, tools: List[Any] = None, templates: Optional[dict[str, str]] = None):
+    def __init__(self, body: BodyClient, weather_mcp_url: str, system_instruction: str, mind_config: Optional[dict] = None, tools: List[Any] = None, templates: Optional[dict[str, str]] = None,
+                 shared: Optional[SharedResources] = None, session_id: str = SESSION_ID):
         """
         SaintGraphを初期化します。
         
         Args:
             body: BodyClient インスタンス
-            weather_mcp_url: MCPツール用のURL（天気APIなど）
+            weather_mcp_url: MCPツール用のURL（天気APIなど）。shared を渡した場合は使用しません
             system_instruction: システム指示文
             mind_config: キャラクター設定辞書 (speaker_id など)
             tools: 追加のカスタムツール（モック等）
             templates: 配信フェーズごとのテンプレート辞書
+            shared: 他の SaintGraph と共有する資源。None の場合はこのインスタンス専用に作成し、close() で解放します
+            session_id: ADK セッションの ID（セッションサービスを共有する場合はキャラクターごとに変える）
         """
         self.body = body
         self.system_instruction = system_instruction
         self.mind_config = mind_config or {}
         self.templates = templates or {}
         self.speaker_id = self.mind_config.get("speaker_id")
+        self.user_id = USER_ID
+        self.session_id = session_id
 
-        # MCP ツールセットの初期化（天気などの外部ツール用）
-        self.toolsets = []
-        if weather_mcp_url:
-            connection_params = SseConnectionParams(url=weather_mcp_url)
-            toolset = McpToolset(connection_params=connection_params)
-            self.toolsets.append(toolset)
+        self._owns_shared = shared is None
+        self.shared = shared or SharedResources.create(weather_mcp_url)
+        self.toolsets = self.shared.toolsets
+        self.session_service = self.shared.session_service
         
         # ツールの統合
         all_tools = self.toolsets + (tools if tools else [])
 
         self.agent = Agent(
             name="SaintGraph",
-            model=Gemini(model=MODEL_NAME),
+            model=self.shared.model,
             instruction=self.system_instruction,
             tools=all_tools
         )
         self.runner = InMemoryRunner(agent=self.agent)
-        logger.info(f"SaintGraph initialized with model {MODEL_NAME}, weather_mcp_url={weather_mcp_url}")
+        self.runner.session_service = self.session_service
+        logger.info(f"SaintGraph initialized with model {self.shared.model.model}, weather_mcp_url={weather_mcp_url}")
+
+    async def warm_up(self):
+        """
+        MCP ツールセットへの接続とツール一覧の取得を並列に事前実行します。
+        接続できなかったツールセットは、回復するまでツールなしで動作します。
+        """
+        await self.shared.warm_up()
 
     async def close(self):
-        """ツールセットの接続を解除してクリーンアップします。"""
-        for ts in self.agent.tools:
-            if isinstance(ts, McpToolset) and hasattr(ts, 'close'):
-                await ts.close()
+        """このインスタンス専用の資源（ツールセットとセッションの保存先）を解放します。"""
+        if self._owns_shared:
+            await self.shared.close()
 
     async def process_intro(self):
         """開始挨拶を実行します。"""
@@ -95,29 +174,94 @@ class SaintGraph:
         template = self.templates.get("closing", "それでは、本日の配信を終了します。ありがとうございました。")
         await self.process_turn(template, context="Closing")
 
+    # --- 会話履歴（チェックポイント用） ---
+
+    async def _ensure_session(self):
+        """配信用の ADK セッションを取得し、なければ作成します。"""
+        service = self.runner.session_service
+        session = await service.get_session(
+            app_name=self.runner.app_name, user_id=self.user_id, session_id=self.session_id
+        )
+        if not session:
+            session = await service.create_session(
+                app_name=self.runner.app_name, user_id=self.user_id, session_id=self.session_id
+            )
+        return session
+
+    async def export_history(self, max_turns: Optional[int] = None, max_chars: int = 400) -> List[dict]:
+        """
+        会話履歴を圧縮して返します（checkpoint.py で保存し、再起動後に restore_history で戻す）。
+
+        ツール呼び出しなどテキストのないイベントは除き、同じ話者の連続した発言は 1 つにまとめ、
+        直近 max_turns 往復分だけを各 max_chars 文字までに切り詰めて残します。
+
+        Returns:
+            [{"role": "user" | "model", "text": ...}, ...]
+        """
+        if max_turns is None:
+            max_turns = load_config().checkpoint_history_turns
+        if max_turns <= 0:
+            return []
+        session = await self.runner.session_service.get_session(
+            app_name=self.runner.app_name, user_id=self.user_id, session_id=self.session_id
+        )
+        if not session:
+            return []
+
+        history: List[dict] = []
+        for event in session.events:
+            if event.partial:
+                continue
+            text = self._extract_text_from_event(event)
+            if not text or not text.strip():
+                continue
+            role = "user" if event.author == "user" else "model"
+            if history and history[-1]["role"] == role:
+                history[-1]["text"] += "\n" + text.strip()
+            else:
+                history.append({"role": role, "text": text.strip()})
+
+        return [
+            {"role": h["role"], "text": h["text"][:max_chars]}
+            for h in history[-max_turns * 2:]
+        ]
+
+    async def restore_history(self, history: List[dict]) -> None:
+        """
+        export_history で保存した会話履歴をセッションに書き戻します。
+        セッションが永続化されていて履歴が残っている場合は何もしません。
+        """
+        session = await self._ensure_session()
+        if session.events:
+            logger.info(f"Session already has {len(session.events)} events. Skipping history restore.")
+            return
+        for h in history:
+            role = "user" if h.get("role") == "user" else "model"
+            await self.runner.session_service.append_event(session, Event(
+                author="user" if role == "user" else self.agent.name,
+                content=types.Content(role=role, parts=[types.Part(text=h.get("text", ""))]),
+            ))
+        logger.info(f"Restored {len(history)} messages of conversation history.")
+
     # --- メインターン処理 ---
 
     async def process_turn(self, user_input: str, context: Optional[str] = None):
         """
         単一のインタラクションターンを処理します。
         AIからのテキスト出力を取得し、随時パースして文章単位でストリーミング的に Body API (TTS) を実行します。
+        ターン全体を 1 つのスパンとして記録し、Body API 呼び出しはその子スパンになります。
         """
+        with _tracer.start_as_current_span("saint_graph.turn", attributes={"turn.context": context or ""}) as span:
+            await self._run_turn(user_input, context, span)
+
+    async def _run_turn(self, user_input: str, context: Optional[str], span) -> None:
+        """process_turn の本体（一時的なエラーはリトライします）。"""
         logger.info(f"Turn started. Input: {user_input[:50]}..., Context: {context}")
         max_retries = 3
         for attempt in range(max_retries):
             try:
                 # セッションの確保
-                session = await self.runner.session_service.get_session(
-                    app_name=self.runner.app_name, 
-                    user_id="yt_user", 
-                    session_id="yt_session"
-                )
-                if not session:
-                    await self.runner.session_service.create_session(
-                        app_name=self.runner.app_name, 
-                        user_id="yt_user", 
-                        session_id="yt_session"
-                    )
+                await self._ensure_session()
                 
                 current_user_message = user_input
                 if context:
@@ -128,16 +272,21 @@ class SaintGraph:
                 # ターン開始時に「無言」状態へリセット（LLMの思考中に口が動かないようにする）
                 await self.body.change_emotion("silent")
                 sentences_spoken = 0
+                first_token = True
+                span.add_event("llm.request", {"attempt": attempt})
 
                 # AIからのテキスト出力をストリーミング的に処理
                 async for event in self.runner.run_async(
                     new_message=types.Content(role="user", parts=[types.Part(text=current_user_message)]), 
-                    user_id="yt_user", 
-                    session_id="yt_session"
+                    user_id=self.user_id,
+                    session_id=self.session_id
                 ):
                     # テキストパートを抽出
                     t = self._extract_text_from_event(event)
                     if t:
+                        if first_token:
+                            span.add_event("llm.first_token")
+                            first_token = False
                         buffered_text += t
                         
                         # バッファされたテキストから文や感情タグを随時抽出して処理
@@ -146,6 +295,8 @@ class SaintGraph:
                         )
                         sentences_spoken += count
 
+                span.add_event("llm.last_token")
+
                 # 残りのバッファがあれば最後に処理
                 if buffered_text.strip():
                     buffered_text, current_emotion, count = await self._process_buffered_text(
@@ -153,6 +304,7 @@ class SaintGraph:
                     )
                     sentences_spoken += count
 
+                span.set_attribute("turn.sentences", sentences_spoken)
                 if sentences_spoken > 0:
                     # このターンで投げた内容を全て話し終えるまで待機（配信のリズム維持のため）
                     logger.info("Waiting for speech to finish before completing turn...")
@@ -0,0 +1,373 @@
+"""
+ADK セッションの保存先。
+
+InMemoryRunner 標準の InMemorySessionService は全イベントをメモリに持ち続け、
+ターンごとにセッション全体を複製するため、長時間の配信ではメモリとターンの
+オーバーヘッドが増え続けます。また再起動するとセッションが消えます。
+
+BoundedSessionService はメモリ上には直近 SESSION_MAX_EVENTS 件のイベントだけを残し、
+イベントは SessionStore に追記していきます。SessionStore を実装すれば別の保存先も
+使えます。標準ではローカルの SQLite（WAL モード）に保存する SqliteSessionStore を用意しています。
+
+app: / user: プレフィックスの状態はセッションの状態としてそのまま保存します
+（配信では 1 ユーザー・1 セッションしか使わないため）。
+"""
+import abc
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events.event import Event
+from google.adk.sessions import Session
+from google.adk.sessions.base_session_service import BaseSessionService, GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+from .config import Config, logger, load_config
+
+# メモリ上に残すイベント数の既定値
+DEFAULT_MAX_EVENTS = 200
+
+SessionKey = Tuple[str, str, str]
+
+
+def _persistent_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """temp: プレフィックスの一時的な状態を除いた状態を返します。"""
+    return {k: v for k, v in state.items() if not k.startswith(State.TEMP_PREFIX)}
+
+
+class SessionStore(abc.ABC):
+    """BoundedSessionService が使うセッションの永続化先。"""
+
+    @abc.abstractmethod
+    async def load_session(self, app_name: str, user_id: str, session_id: str,
+                           max_events: int) -> Optional[Session]:
+        """セッションを直近 max_events 件のイベント付きで読み込みます。なければ None。"""
+
+    @abc.abstractmethod
+    async def create_session(self, session: Session) -> None:
+        """イベントのない新しいセッションを保存します。"""
+
+    @abc.abstractmethod
+    async def append_event(self, session: Session, event: Event) -> None:
+        """イベントを追記し、セッションの状態を更新します。"""
+
+    @abc.abstractmethod
+    async def list_sessions(self, app_name: str, user_id: Optional[str] = None) -> List[Session]:
+        """セッションの一覧（イベントなし）を更新の古い順に返します。"""
+
+    @abc.abstractmethod
+    async def delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        """セッションとそのイベントを削除します。"""
+
+    async def close(self) -> None:
+        """接続を閉じます。"""
+
+
+class SqliteSessionStore(SessionStore):
+    """
+    ローカルの SQLite ファイルにセッションを保存します。
+
+    WAL モードで開き、イベントは events テーブルに追記のみ行います。
+    セッション単位の読み込みは (app_name, user_id, session_id, seq) のインデックスで
+    直近のイベントだけを取り出します。sqlite3 の呼び出しはスレッドで実行し、
+    イベントループをブロックしません。
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sessions (
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        id TEXT NOT NULL,
+        state TEXT NOT NULL,
+        create_time REAL NOT NULL,
+        update_time REAL NOT NULL,
+        PRIMARY KEY (app_name, user_id, id)
+    );
+    CREATE TABLE IF NOT EXISTS events (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        app_name TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        session_id TEXT NOT NULL,
+        event_data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_events_session ON events (app_name, user_id, session_id, seq);
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: SQLite ファイルのパス（親ディレクトリがなければ作成します）
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL では NORMAL でもコミット済みのデータは壊れない（電源断時に直近のコミットを失う程度）
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+            logger.info(f"Opened session database {self.path}")
+        return self._conn
+
+    async def _run(self, func, *args):
+        def call():
+            with self._lock:
+                return func(self._connect(), *args)
+        return await asyncio.to_thread(call)
+
+    async def load_session(self, app_name: str, user_id: str, session_id: str,
+                           max_events: int) -> Optional[Session]:
+        def load(conn: sqlite3.Connection):
+            row = conn.execute(
+                "SELECT state, update_time FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+            events = conn.execute(
+                "SELECT event_data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (app_name, user_id, session_id, max_events),
+            ).fetchall()
+            return row, events
+
+        result = await self._run(load)
+        if result is None:
+            return None
+        (state, update_time), events = result
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=json.loads(state),
+            events=[Event.model_validate_json(data) for (data,) in reversed(events)],
+            last_update_time=update_time,
+        )
+
+    async def create_session(self, session: Session) -> None:
+        state = json.dumps(_persistent_state(session.state), ensure_ascii=False, default=str)
+
+        def create(conn: sqlite3.Connection):
+            conn.execute(
+                "INSERT INTO sessions (app_name, user_id, id, state, create_time, update_time) VALUES (?, ?, ?, ?, ?, ?)",
+                (session.app_name, session.user_id, session.id, state,
+                 session.last_update_time, session.last_update_time),
+            )
+
+        await self._run(create)
+
+    async def append_event(self, session: Session, event: Event) -> None:
+        data = event.model_dump_json(exclude_none=True)
+        state = None
+        if event.actions and event.actions.state_delta:
+            state = json.dumps(_persistent_state(session.state), ensure_ascii=False, default=str)
+
+        def append(conn: sqlite3.Connection):
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(
+                    "INSERT INTO events (app_name, user_id, session_id, event_data) VALUES (?, ?, ?, ?)",
+                    (session.app_name, session.user_id, session.id, data),
+                )
+                if state is None:
+                    conn.execute(
+                        "UPDATE sessions SET update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (event.timestamp, session.app_name, session.user_id, session.id),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE sessions SET state = ?, update_time = ? WHERE app_name = ? AND user_id = ? AND id = ?",
+                        (state, event.timestamp, session.app_name, session.user_id, session.id),
+                    )
+
+        await self._run(append)
+
+    async def list_sessions(self, app_name: str, user_id: Optional[str] = None) -> List[Session]:
+        def select(conn: sqlite3.Connection):
+            if user_id is None:
+                return conn.execute(
+                    "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ? ORDER BY update_time",
+                    (app_name,),
+                ).fetchall()
+            return conn.execute(
+                "SELECT user_id, id, state, update_time FROM sessions WHERE app_name = ? AND user_id = ? "
+                "ORDER BY update_time",
+                (app_name, user_id),
+            ).fetchall()
+
+        rows = await self._run(select)
+        return [
+            Session(app_name=app_name, user_id=uid, id=sid, state=json.loads(state), last_update_time=updated)
+            for uid, sid, state, updated in rows
+        ]
+
+    async def delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        def delete(conn: sqlite3.Connection):
+            with conn:
+                conn.execute("BEGIN")
+                conn.execute(
+                    "DELETE FROM events WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    (app_name, user_id, session_id),
+                )
+                conn.execute(
+                    "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                    (app_name, user_id, session_id),
+                )
+
+        await self._run(delete)
+
+    async def close(self) -> None:
+        def close():
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+        await asyncio.to_thread(close)
+
+
+class BoundedSessionService(BaseSessionService):
+    """
+    メモリ上のイベント数を制限したセッションサービス。
+
+    store を指定するとイベントを追記保存し、メモリにないセッションは store から
+    直近 max_events 件だけ読み込みます。store が None の場合はメモリのみで動作します。
+    """
+
+    def __init__(self, store: Optional[SessionStore] = None, max_events: int = DEFAULT_MAX_EVENTS):
+        """
+        Args:
+            store: 永続化先（None ならメモリのみ）
+            max_events: メモリ上に残す 1 セッションあたりのイベント数
+        """
+        self.store = store
+        self.max_events = max_events
+        self._sessions: Dict[SessionKey, Session] = {}
+
+    async def create_session(self, *, app_name: str, user_id: str,
+                             state: Optional[Dict[str, Any]] = None,
+                             session_id: Optional[str] = None) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        key = (app_name, user_id, session_id)
+        if key in self._sessions:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        session = Session(app_name=app_name, user_id=user_id, id=session_id,
+                          state=dict(state or {}), last_update_time=time.time())
+        if self.store is not None:
+            try:
+                await self.store.create_session(session)
+            except sqlite3.IntegrityError:
+                raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        self._sessions[key] = session
+        return self._view(session)
+
+    async def get_session(self, *, app_name: str, user_id: str, session_id: str,
+                          config: Optional[GetSessionConfig] = None) -> Optional[Session]:
+        key = (app_name, user_id, session_id)
+        session = self._sessions.get(key)
+        if session is None and self.store is not None:
+            session = await self.store.load_session(app_name, user_id, session_id, self.max_events)
+            if session is not None:
+                if len(session.events) >= self.max_events:
+                    # 読み込んだ先頭がターンの途中かもしれないので、ユーザーの発言まで進める
+                    self._trim(session, self.max_events - 1)
+                self._sessions[key] = session
+        if session is None:
+            return None
+        return self._view(session, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        if self.store is not None:
+            return ListSessionsResponse(sessions=await self.store.list_sessions(app_name, user_id))
+        sessions = [
+            s.model_copy(update={"events": [], "state": dict(s.state)})
+            for (app, uid, _), s in self._sessions.items()
+            if app == app_name and (user_id is None or uid == user_id)
+        ]
+        return ListSessionsResponse(sessions=sorted(sessions, key=lambda s: s.last_update_time))
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        self._sessions.pop((app_name, user_id, session_id), None)
+        if self.store is not None:
+            await self.store.delete_session(app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # 呼び出し元のセッション（Runner が 1 回の実行で使うコピー）に反映
+        event = await super().append_event(session, event)
+        session.last_update_time = event.timestamp
+
+        cached = self._sessions.get((session.app_name, session.user_id, session.id))
+        if cached is None:
+            cached = session
+        elif cached is not session:
+            self._update_session_state(cached, event)
+            cached.events.append(event)
+            cached.last_update_time = event.timestamp
+        self._trim(cached)
+
+        if self.store is not None:
+            await self.store.append_event(cached, event)
+        return event
+
+    async def close(self) -> None:
+        """永続化先の接続を閉じます。"""
+        if self.store is not None:
+            await self.store.close()
+
+    def _trim(self, session: Session, limit: Optional[int] = None) -> None:
+        """
+        古いイベントを捨てて limit（省略時は max_events）件以内にします。
+
+        ツール呼び出しと応答の組を途中で切らないよう、残す先頭はユーザーの発言に揃えます。
+        """
+        excess = len(session.events) - (self.max_events if limit is None else limit)
+        if excess <= 0:
+            return
+        cut = next(
+            (i for i in range(excess, len(session.events)) if session.events[i].author == "user"),
+            excess,
+        )
+        del session.events[:cut]
+
+    @staticmethod
+    def _view(session: Session, config: Optional[GetSessionConfig] = None) -> Session:
+        """呼び出し元に渡すコピー（イベントのリストと状態だけを複製）を返します。"""
+        events = session.events
+        if config is not None:
+            if config.after_timestamp is not None:
+                events = [e for e in events if e.timestamp >= config.after_timestamp]
+            if config.num_recent_events is not None:
+                events = events[-config.num_recent_events:] if config.num_recent_events else []
+        return session.model_copy(update={"events": list(events), "state": dict(session.state)})
+
+
+def create_session_service(config: Optional[Config] = None) -> BaseSessionService:
+    """
+    設定（SESSION_BACKEND）に応じたセッションサービスを作成します。
+
+    - memory: メモリのみ（直近 SESSION_MAX_EVENTS 件を保持）
+    - sqlite: SESSION_DB_PATH の SQLite に保存
+    """
+    config = config or load_config()
+    backend = config.session_backend.lower()
+    if backend == "memory":
+        store = None
+    elif backend == "sqlite":
+        store = SqliteSessionStore(config.session_db_path)
+    else:
+        raise ValueError(f"Unknown session backend: {config.session_backend}")
+    return BoundedSessionService(store=store, max_events=config.session_max_events)
@@ -0,0 +1,166 @@
+"""
+停止要求（SIGTERM / SIGINT）を受けたときの配信の後始末。
+
+Cloud Run や GCE のプリエンプションでは、SIGTERM から強制終了までの猶予が短いため、
+通常の締めの挨拶（LLM での生成と発話キューの消化）を待っていられません。
+ShutdownCoordinator はシグナルを受けると次の順で配信を畳みます。
+
+1. BroadcastContext.shutdown をセットし、進行中のターンを打ち切らせる
+2. Body に未再生の発話を破棄させ、事前に合成した締めの一言だけを再生させる
+3. SHUTDOWN_DEADLINE 秒以内に配信を停止させる（並行して最後に完了したターンのチェックポイントを保存し直す）
+"""
+import asyncio
+import signal
+from typing import Callable, List, Optional, Sequence
+
+from .broadcast_loop import BroadcastContext
+from .checkpoint import FINISHED
+from .config import logger, load_config
+
+
+SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def _add_signal_handlers(callback: Callable[[str], None]) -> List[signal.Signals]:
+    """SIGNALS に callback(シグナル名) を登録し、登録できたシグナルを返します。"""
+    loop = asyncio.get_running_loop()
+    installed = []
+    for sig in SIGNALS:
+        try:
+            loop.add_signal_handler(sig, callback, sig.name)
+            installed.append(sig)
+        except (NotImplementedError, RuntimeError, ValueError) as e:
+            # Windows やメインスレッド以外では登録できない
+            logger.debug(f"Could not install handler for {sig.name}: {e}")
+    return installed
+
+
+def _remove_signal_handlers(installed: List[signal.Signals]) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in installed:
+        loop.remove_signal_handler(sig)
+
+
+class ShutdownCoordinator:
+    """シグナルを受けて配信を期限内に停止させるコーディネーター。"""
+
+    SIGNALS = SIGNALS
+
+    def __init__(self, ctx: BroadcastContext, deadline: Optional[float] = None):
+        """
+        Args:
+            ctx: 配信コンテキスト。停止要求は ctx.shutdown で broadcast_loop に伝えます。
+            deadline: 停止要求から配信停止までの期限（秒）。省略時は SHUTDOWN_DEADLINE。
+        """
+        self.ctx = ctx
+        self.deadline = deadline if deadline is not None else load_config().shutdown_deadline
+        self.reason: Optional[str] = None
+        self._requested_at: Optional[float] = None
+        self._main_task: Optional[asyncio.Task] = None
+        self._installed: List[signal.Signals] = []
+
+    @property
+    def requested(self) -> bool:
+        """停止要求を受けたかどうか。"""
+        return self._requested_at is not None
+
+    def remaining(self) -> float:
+        """期限までの残り時間（秒）。停止要求前は deadline をそのまま返します。"""
+        if self._requested_at is None:
+            return self.deadline
+        elapsed = asyncio.get_running_loop().time() - self._requested_at
+        return max(0.0, self.deadline - elapsed)
+
+    def install(self) -> None:
+        """実行中のイベントループにシグナルハンドラを登録します。"""
+        self._main_task = asyncio.current_task()
+        self._installed = _add_signal_handlers(self.request_shutdown)
+
+    def uninstall(self) -> None:
+        """登録したシグナルハンドラを外します。"""
+        _remove_signal_handlers(self._installed)
+        self._installed = []
+
+    def request_shutdown(self, reason: str = "requested") -> None:
+        """
+        停止を要求します。2 回目の要求では後始末を待たずにメインタスクを取り消します。
+        """
+        if self.requested:
+            logger.warning(f"Second shutdown request ({reason}). Aborting immediately.")
+            if self._main_task is not None:
+                self._main_task.cancel()
+            return
+        logger.warning(f"Shutdown requested ({reason}). Stopping the broadcast within {self.deadline:g}s.")
+        self.reason = reason
+        self._requested_at = asyncio.get_running_loop().time()
+        self.ctx.shutdown.set()
+
+    async def finish(self) -> None:
+        """Body に配信を停止させ、再開用のチェックポイントを保存します。期限を過ぎたら打ち切ります。"""
+        body = self.ctx.saint_graph.body
+        results = await asyncio.gather(
+            asyncio.wait_for(body.shutdown_broadcast(deadline=self.remaining()), timeout=self.remaining() + 1.0),
+            self._save_checkpoint(),
+            return_exceptions=True,
+        )
+        if isinstance(results[0], BaseException):
+            logger.error(f"Failed to shut down the broadcast in time: {results[0]!r}")
+        else:
+            logger.info(f"Broadcast shutdown result: {results[0]}")
+
+    async def _save_checkpoint(self) -> None:
+        """
+        最後に完了したターンのチェックポイントを、保存時刻を更新して期限内に書き込みます。
+
+        打ち切ったターンの状態は保存しないため（broadcast_loop）、ここで保存するのは
+        直前のフェーズ遷移で予約した内容です。再起動後はそこから再開します。
+        """
+        store = self.ctx.checkpoints
+        if store is None:
+            return
+        if store.last is not None and store.last.phase != FINISHED:
+            store.save(store.last, history_source=self.ctx.saint_graph, force=True)
+        try:
+            await asyncio.wait_for(store.flush(), timeout=self.remaining())
+            logger.info(f"Saved checkpoint to {store.key} before shutdown")
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint before shutdown: {e!r}")
+
+
+class ShutdownGroup:
+    """
+    1 つのプロセスで配信する複数のキャラクター（multi_character.py）に停止要求を配ります。
+
+    シグナルを受けると全キャラクターの ShutdownCoordinator に停止を要求し、
+    2 回目の要求ではメインタスクを取り消します。
+    """
+
+    def __init__(self, coordinators: Sequence[ShutdownCoordinator]):
+        self.coordinators = list(coordinators)
+        self._main_task: Optional[asyncio.Task] = None
+        self._installed: List[signal.Signals] = []
+
+    @property
+    def requested(self) -> bool:
+        """停止要求を受けたかどうか。"""
+        return any(c.requested for c in self.coordinators)
+
+    def install(self) -> None:
+        """実行中のイベントループにシグナルハンドラを登録します。"""
+        self._main_task = asyncio.current_task()
+        self._installed = _add_signal_handlers(self.request_shutdown)
+
+    def uninstall(self) -> None:
+        """登録したシグナルハンドラを外します。"""
+        _remove_signal_handlers(self._installed)
+        self._installed = []
+
+    def request_shutdown(self, reason: str = "requested") -> None:
+        """全キャラクターに停止を要求します。2 回目の要求ではメインタスクを取り消します。"""
+        if self.requested:
+            logger.warning(f"Second shutdown request ({reason}). Aborting immediately.")
+            if self._main_task is not None:
+                self._main_task.cancel()
+            return
+        for coordinator in self.coordinators:
+            coordinator.request_shutdown(reason)
@@ -0,0 +1,67 @@
+"""
+起動処理のフェーズ別計測。
+
+`python -m saint_graph.main --profile-startup`（または STARTUP_PROFILE=true）で有効になり、
+各フェーズの開始オフセットと所要時間を表形式でログに出力します。
+並行して実行されるフェーズは開始オフセットが重なって表示されます。
+"""
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Awaitable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class Phase:
+    """計測したフェーズ（時刻は計測開始からの秒数）。"""
+    name: str
+    start: float
+    end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+class StartupProfiler:
+    """起動フェーズの所要時間を記録します。無効時は何もしません。"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.phases: List[Phase] = []
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """with ブロックの所要時間を name として記録します。"""
+        if not self.enabled:
+            yield
+            return
+        entry = Phase(name, self._now())
+        self.phases.append(entry)
+        try:
+            yield
+        finally:
+            entry.end = self._now()
+
+    async def track(self, name: str, awaitable: Awaitable[T]) -> T:
+        """awaitable の完了までを name として記録します（asyncio.gather と組み合わせて使う）。"""
+        with self.phase(name):
+            return await awaitable
+
+    def report(self) -> str:
+        """フェーズ一覧を開始順の表にして返します。"""
+        total = self._now()
+        width = max([len(p.name) for p in self.phases] + [len("phase")])
+        lines = [
+            f"Startup profile (total {total * 1000:.0f} ms):",
+            f"  {'phase':<{width}}  {'start':>8}  {'duration':>9}",
+        ]
+        for p in sorted(self.phases, key=lambda p: p.start):
+            lines.append(f"  {p.name:<{width}}  {p.start * 1000:>6.0f}ms  {p.duration * 1000:>7.0f}ms")
+        return "\n".join(lines)
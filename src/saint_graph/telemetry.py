@@ -1,27 +1,20 @@
-import os
-from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import SimpleSpanProcessor, ConsoleSpanExporter
-from .config import ADK_TELEMETRY, logger
+from .config import logger, load_config
 
 def setup_telemetry():
     """
-    Sets up ADK Telemetry using ConsoleSpanExporter if enabled via environment variable.
+    Sets up trace export for saint_graph (turn, LLM and Body API spans, plus ADK's own spans).
+
+    TRACING_EXPORTER selects the exporter (otlp / file / console). ADK_TELEMETRY=true
+    without TRACING_EXPORTER keeps the previous behaviour of printing spans to the console.
+    Spans are always exported in batches on a background thread.
     """
-    if not ADK_TELEMETRY:
+    config = load_config()
+    exporter = config.tracing_exporter or ("console" if config.adk_telemetry else "none")
+    if exporter == "none":
         return
 
-    logger.info("Initializing ADK Telemetry (ConsoleSpanExporter)...")
-    
-    # Initialize TracerProvider
-    provider = TracerProvider()
-    
-    # Configure ConsoleSpanExporter
-    # We use SimpleSpanProcessor for immediate output to console
-    processor = SimpleSpanProcessor(ConsoleSpanExporter())
-    provider.add_span_processor(processor)
-    
-    # Set the global tracer provider
-    trace.set_tracer_provider(provider)
-    
-    logger.info("ADK Telemetry initialized.")
+    # OpenTelemetry SDK is only imported when telemetry is enabled, to keep startup fast
+    from infra.tracing import setup_tracing
+
+    logger.info(f"Initializing telemetry (exporter: {exporter})...")
+    setup_tracing("saint-graph", exporter)
@@ -1,13 +1,40 @@
 import os
+import json
 import uvicorn
 from mcp.server.fastmcp import FastMCP
-from starlette.responses import JSONResponse
-from .tools import get_weather
+from starlette.responses import JSONResponse, Response
+from infra.metrics import CONTENT_TYPE, REGISTRY
+from .metrics import TOOL_LATENCY
+from .tools import get_weather, get_weather_multi
 
 import logging
 
-# ログ設定：主要な警告のみを出力
-logging.basicConfig(level=logging.WARNING)
+# LogRecord が標準で持つ属性（これ以外は extra で渡された構造化フィールド）
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """1行1 JSON のログを出力するフォーマッタ（Cloud Logging の severity に対応）。"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RESERVED_ATTRS})
+        if record.exc_info:
+            entry["traceback"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+# ログ設定：LOG_FORMAT=json（既定）で構造化ログ、text で従来形式
+_handler = logging.StreamHandler()
+if os.getenv("LOG_FORMAT", "json").lower() == "json":
+    _handler.setFormatter(JsonFormatter())
+logging.basicConfig(level=logging.WARNING, handlers=[_handler])
+logging.getLogger("tools.weather").setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
 logging.getLogger("mcp").setLevel(logging.WARNING)
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
@@ -21,7 +48,19 @@ async def weather_tool(location: str, date: str = None) -> str:
     location: 都市名や地域名（例：東京, 福岡, Tokyo）
     date: 日付 (YYYY-MM-DD) または相対的な指定（today, tomorrow）。未指定時は現在の天気を取得。
     """
-    return await get_weather(location, date)
+    with TOOL_LATENCY.time(tool="get_weather"):
+        return await get_weather(location, date)
+
+@mcp.tool(name="get_weather_multi")
+async def weather_multi_tool(locations: list[str], date: str = None) -> str:
+    """
+    複数地点の天気情報を1回でまとめて取得し、表形式で返します。
+    全国の天気など、複数の都市を紹介する場合は get_weather を繰り返さずにこちらを使ってください。
+    locations: 都市名や地域名のリスト（例：["札幌", "東京", "大阪", "福岡"]）
+    date: 日付 (YYYY-MM-DD) または相対的な指定（today, tomorrow）。未指定時は現在の天気と今日の予報を取得。
+    """
+    with TOOL_LATENCY.time(tool="get_weather_multi"):
+        return await get_weather_multi(locations, date)
 
 # Dockerネットワーク内での接続エラー回避設定
 mcp.settings.transport_security.enable_dns_rebinding_protection = False
@@ -31,6 +70,11 @@ async def health_check(request):
     """ヘルスチェック用エンドポイント"""
     return JSONResponse({"status": "ok"})
 
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics(request):
+    """Prometheus 形式のメトリクス（ツール別レイテンシ、上流呼び出し数、キャッシュヒット率、エラー数）"""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
 # FastMCPからSSE（Server-Sent Events）対応のアプリを取得
 app = mcp.sse_app()
 
@@ -0,0 +1,25 @@
+"""天気 MCP サーバーのメトリクス定義。"""
+from infra.metrics import REGISTRY
+
+TOOL_LATENCY = REGISTRY.histogram(
+    "weather_tool_latency_seconds", "Latency of weather MCP tool calls", ["tool"])
+TOOL_ERRORS = REGISTRY.counter(
+    "weather_tool_errors_total", "Weather tool calls that returned an error", ["tool"])
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "weather_upstream_requests_total", "Requests sent to Open-Meteo", ["endpoint", "outcome"])
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "weather_upstream_latency_seconds", "Latency of Open-Meteo requests", ["endpoint"])
+CACHE_LOOKUPS = REGISTRY.counter(
+    "weather_cache_lookups_total", "Weather cache lookups", ["cache", "result"])
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "weather_cache_hit_ratio", "Share of weather cache lookups served from cache", ["cache"])
+
+
+def _hit_ratio(cache: str) -> float:
+    hits = CACHE_LOOKUPS.value(cache=cache, result="hit")
+    total = hits + CACHE_LOOKUPS.value(cache=cache, result="miss")
+    return hits / total if total else 0.0
+
+
+for _cache in ("geocode", "forecast"):
+    CACHE_HIT_RATIO.set_function(lambda c=_cache: _hit_ratio(c), cache=_cache)
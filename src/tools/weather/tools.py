@@ -1,4 +1,10 @@
-from typing import Optional
+from typing import Awaitable, Callable, Optional
+import asyncio
+import logging
+import os
+import tempfile
+import time
+import unicodedata
 import urllib.request
 import urllib.parse
 import json
@@ -6,6 +12,19 @@ import traceback
 import httpx
 from datetime import datetime
 
+from .metrics import CACHE_LOOKUPS, TOOL_ERRORS, UPSTREAM_LATENCY, UPSTREAM_REQUESTS
+
+logger = logging.getLogger("tools.weather")
+
+# --- Open-Meteo 接続設定 ---
+GEOCODING_URL = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+FORECAST_URL = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+REQUEST_HEADERS = {'User-Agent': 'SaintGraphWeather/1.0'}
+
+# 予報キャッシュの有効期間（秒）。Open-Meteo の current_weather は 15 分間隔で
+# 更新されるため、期限はこの間隔の区切り（00/15/30/45 分）に揃える。
+FORECAST_TTL = int(os.getenv("WEATHER_FORECAST_TTL", "900"))
+
 # --- WMOコード定数 ---
 WMO_CODE_MAP = {
     0: "晴天",
@@ -39,60 +58,273 @@ def _parse_target_date_index(date: Optional[str], available_times: list[str]) ->
     return -1
 
 
+# --- キャッシュ ---
+# ジオコーディング結果は実質的に変わらないため、ディスクに永続化して再起動後も使い回す。
+# 予報は FORECAST_TTL ごとの区切りまでメモリ上で使い回す。
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_geocode_cache: Optional[dict[str, list]] = None
+_forecast_cache: dict[tuple[float, float], tuple[float, dict]] = {}
+_inflight: dict[tuple, asyncio.Future] = {}
+
+
+def _cache_dir() -> str:
+    return os.getenv("WEATHER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ai-tuber-weather-cache"))
+
+
+def reset_caches():
+    """メモリ上のキャッシュと共有クライアントを破棄します（ディスク上のジオコードは次回再読込）。"""
+    global _client, _client_loop, _geocode_cache
+    _client = None
+    _client_loop = None
+    _geocode_cache = None
+    _forecast_cache.clear()
+    _inflight.clear()
+
+
+def _get_client() -> httpx.AsyncClient:
+    """コネクションプールを共有する AsyncClient を返します（イベントループごとに1つ）。"""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            headers=REQUEST_HEADERS,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client():
+    """共有クライアントを閉じます。"""
+    global _client, _client_loop
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+
+
+def _normalize_location(location: str) -> str:
+    return unicodedata.normalize("NFKC", location).strip().lower()
+
+
+def _load_geocode_cache() -> dict[str, list]:
+    global _geocode_cache
+    if _geocode_cache is None:
+        path = os.path.join(_cache_dir(), "geocode.json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                _geocode_cache = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _geocode_cache = {}
+    return _geocode_cache
+
+
+def _save_geocode_cache():
+    directory = _cache_dir()
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(_geocode_cache, f, ensure_ascii=False)
+        os.replace(tmp_path, os.path.join(directory, "geocode.json"))
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+
+def _forecast_expiry(now: float) -> float:
+    """次の更新区切りの時刻を返します。"""
+    return (now // FORECAST_TTL + 1) * FORECAST_TTL
+
+
+async def _coalesce(key: tuple, fetch: Callable[[], Awaitable]):
+    """同じキーの取得が進行中なら、その結果を待って共有します。"""
+    future = _inflight.get(key)
+    if future is not None:
+        return await asyncio.shield(future)
+
+    future = asyncio.ensure_future(fetch())
+    _inflight[key] = future
+    try:
+        return await asyncio.shield(future)
+    finally:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
 # --- メインAPI ---
 async def get_weather(location: str, date: Optional[str] = None) -> str:
     """
     Open-Meteo APIを使用して、指定された場所と日付の天気を取得します。
     """
-    print(f"DEBUG: get_weather called for location='{location}', date='{date}'")
-    headers = {'User-Agent': 'SaintGraphWeather/1.0'}
-    
+    logger.debug("get_weather called", extra={"tool": "get_weather", "location": location, "date": date})
+
     try:
         # ジオコーディング（地名から緯度経度を取得）
-        lat, lon, resolved_name = await _geocode(location, headers)
+        lat, lon, resolved_name = await _geocode(location)
         if lat is None:
             return f"'{location}' という場所は見つかりませんでした。"
 
         # 天気データの取得
-        weather_data = await _fetch_weather(lat, lon, headers)
+        weather_data = await _fetch_weather(lat, lon)
 
         # レスポンスの構築
         return _format_weather_response(resolved_name, weather_data, date)
 
-    except Exception:
-        t = traceback.format_exc()
-        print(f"Weather Error: {t}")
-        return f"{location} の天気取得に失敗しました。エラー: {t.splitlines()[-1]}"
+    except Exception as e:
+        error = _record_error("get_weather", e, location=location)
+        return f"{location} の天気取得に失敗しました。エラー: {error}"
+
+
+async def get_weather_multi(locations: list[str], date: Optional[str] = None) -> str:
+    """
+    複数地点の天気を1回で取得し、表形式で返します。
+    ジオコーディングは並列に行い、予報は1回のリクエストでまとめて取得します。
+    """
+    logger.debug("get_weather_multi called", extra={"tool": "get_weather_multi", "locations": locations, "date": date})
+
+    # 重複を除き、指定順を保つ
+    unique = list(dict.fromkeys(loc.strip() for loc in locations if loc and loc.strip()))
+    if not unique:
+        return "地点が指定されていません。"
+
+    try:
+        geocoded = await asyncio.gather(*(_geocode(loc) for loc in unique), return_exceptions=True)
+
+        resolved = []
+        not_found = []
+        failed = []
+        for loc, geo in zip(unique, geocoded):
+            if isinstance(geo, Exception):
+                failed.append(loc)
+            elif geo[0] is None:
+                not_found.append(loc)
+            else:
+                resolved.append(geo)
+
+        if not resolved:
+            if failed:
+                return f"{', '.join(failed)} の天気取得に失敗しました。"
+            return f"{', '.join(not_found)} という場所は見つかりませんでした。"
+
+        forecasts = await _fetch_weather_many([(lat, lon) for lat, lon, _ in resolved])
+
+        rows = [(name, data) for (_, _, name), data in zip(resolved, forecasts)]
+        return _format_weather_table(rows, date, not_found, failed)
+
+    except Exception as e:
+        error = _record_error("get_weather_multi", e, locations=unique)
+        return f"{', '.join(unique)} の天気取得に失敗しました。エラー: {error}"
 
 
 # --- ヘルパー関数 ---
 
-async def _geocode(location: str, headers: dict) -> tuple[Optional[float], Optional[float], Optional[str]]:
-    """地名から緯度経度を取得します。"""
-    encoded_loc = urllib.parse.quote(location)
-    geo_url = f"https://geocoding-api.open-meteo.com/v1/search?name={encoded_loc}&count=1&language=ja&format=json"
-    
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(geo_url, headers=headers, timeout=10.0)
-        geo_data = resp.json()
-    
-    if not geo_data.get('results'):
-        return None, None, None
-        
-    result = geo_data['results'][0]
-    return result['latitude'], result['longitude'], result['name']
+def _record_error(tool: str, e: Exception, **fields) -> str:
+    """ツールのエラーを記録し、応答に含めるエラー概要を返します。"""
+    TOOL_ERRORS.inc(tool=tool)
+    summary = traceback.format_exception_only(type(e), e)[-1].strip()
+    # トレースバックはデバッグ時のみ出力する
+    logger.warning("Weather lookup failed", extra={"tool": tool, "error": summary, **fields},
+                   exc_info=logger.isEnabledFor(logging.DEBUG))
+    return summary
 
 
-async def _fetch_weather(lat: float, lon: float, headers: dict) -> dict:
-    """Open-Meteo APIから天気データを取得します。"""
-    weather_url = (f"https://api.open-meteo.com/v1/forecast?"
-                   f"latitude={lat}&longitude={lon}&current_weather=true&"
-                   f"daily=weathercode,temperature_2m_max,temperature_2m_min&"
-                   f"timezone=auto")
-    
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(weather_url, headers=headers, timeout=10.0)
-        return resp.json()
+async def _upstream_get(endpoint: str, url: str):
+    """Open-Meteo にリクエストし、JSON を返します。"""
+    with UPSTREAM_LATENCY.time(endpoint=endpoint):
+        try:
+            resp = await _get_client().get(url)
+            resp.raise_for_status()
+            data = resp.json()
+        except Exception:
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, outcome="error")
+            raise
+    UPSTREAM_REQUESTS.inc(endpoint=endpoint, outcome="ok")
+    return data
+
+
+async def _geocode(location: str) -> tuple[Optional[float], Optional[float], Optional[str]]:
+    """地名から緯度経度を取得します（ディスクキャッシュ付き）。"""
+    key = _normalize_location(location)
+    cache = _load_geocode_cache()
+    if key in cache:
+        CACHE_LOOKUPS.inc(cache="geocode", result="hit")
+        return tuple(cache[key])
+    CACHE_LOOKUPS.inc(cache="geocode", result="miss")
+
+    async def fetch():
+        encoded_loc = urllib.parse.quote(location)
+        geo_url = f"{GEOCODING_URL}?name={encoded_loc}&count=1&language=ja&format=json"
+        geo_data = await _upstream_get("geocode", geo_url)
+
+        if not geo_data.get('results'):
+            return None, None, None
+
+        result = geo_data['results'][0]
+        resolved = (result['latitude'], result['longitude'], result['name'])
+        cache[key] = list(resolved)
+        _save_geocode_cache()
+        return resolved
+
+    return await _coalesce(("geocode", key), fetch)
+
+
+async def _fetch_weather(lat: float, lon: float) -> dict:
+    """Open-Meteo APIから天気データを取得します（次の更新区切りまでキャッシュ）。"""
+    key = (round(lat, 4), round(lon, 4))
+    cached = _forecast_cache.get(key)
+    if cached and time.time() < cached[0]:
+        CACHE_LOOKUPS.inc(cache="forecast", result="hit")
+        return cached[1]
+    CACHE_LOOKUPS.inc(cache="forecast", result="miss")
+
+    async def fetch():
+        data = await _upstream_get("forecast", _forecast_url([lat], [lon]))
+        _forecast_cache[key] = (_forecast_expiry(time.time()), data)
+        return data
+
+    return await _coalesce(("forecast",) + key, fetch)
+
+
+async def _fetch_weather_many(coords: list[tuple[float, float]]) -> list[dict]:
+    """
+    複数地点の天気データを取得します。
+    キャッシュにない地点だけを、カンマ区切りの緯度経度で1回のリクエストにまとめます。
+    """
+    keys = [(round(lat, 4), round(lon, 4)) for lat, lon in coords]
+    now = time.time()
+    missing = list(dict.fromkeys(
+        key for key in keys if not (key in _forecast_cache and now < _forecast_cache[key][0])
+    ))
+
+    CACHE_LOOKUPS.inc(len(keys) - len(missing), cache="forecast", result="hit")
+
+    if len(missing) == 1:
+        await _fetch_weather(*missing[0])
+    elif missing:
+        CACHE_LOOKUPS.inc(len(missing), cache="forecast", result="miss")
+
+        async def fetch():
+            data = await _upstream_get("forecast", _forecast_url([k[0] for k in missing], [k[1] for k in missing]))
+            # 複数地点を指定した場合はリストで返る
+            results = data if isinstance(data, list) else [data]
+            expiry = _forecast_expiry(time.time())
+            for key, result in zip(missing, results):
+                _forecast_cache[key] = (expiry, result)
+
+        await _coalesce(("forecast_many",) + tuple(missing), fetch)
+
+    return [_forecast_cache[key][1] for key in keys]
+
+
+def _forecast_url(lats: list[float], lons: list[float]) -> str:
+    return (f"{FORECAST_URL}?"
+            f"latitude={','.join(map(str, lats))}&longitude={','.join(map(str, lons))}&current_weather=true&"
+            f"daily=weathercode,temperature_2m_max,temperature_2m_min&"
+            f"timezone=auto")
 
 
 def _format_weather_response(resolved_name: str, w_data: dict, date: Optional[str]) -> str:
@@ -124,3 +356,40 @@ def _format_weather_response(resolved_name: str, w_data: dict, date: Optional[st
         res_strings.append(f"{label}: {d_desc}, 最高 {d_max}°C, 最低 {d_min}°C")
     
     return "\n".join(res_strings)
+
+
+def _format_weather_table(rows: list[tuple[str, dict]], date: Optional[str],
+                          not_found: list[str], failed: list[str]) -> str:
+    """複数地点の天気データをコンパクトな表にフォーマットします。"""
+    label = "今日" if not date else date
+    if not date:
+        lines = [f"各地の天気（{label}、参照元: Open-Meteo）:",
+                 "| 地点 | 現在 | 気温 | 予報 | 最高 | 最低 |",
+                 "|---|---|---|---|---|---|"]
+    else:
+        lines = [f"各地の天気（{label}、参照元: Open-Meteo）:",
+                 "| 地点 | 予報 | 最高 | 最低 |",
+                 "|---|---|---|---|"]
+
+    for name, w_data in rows:
+        times = w_data['daily']['time']
+        idx = _parse_target_date_index(date, times)
+        if idx != -1 and idx < len(times):
+            daily = [get_wmo_description(w_data['daily']['weathercode'][idx]),
+                     f"{w_data['daily']['temperature_2m_max'][idx]}°C",
+                     f"{w_data['daily']['temperature_2m_min'][idx]}°C"]
+        else:
+            daily = ["予報なし", "-", "-"]
+
+        if not date:
+            curr = w_data.get('current_weather', {})
+            current = [get_wmo_description(curr.get('weathercode')), f"{curr.get('temperature')}°C"]
+            lines.append("| " + " | ".join([name] + current + daily) + " |")
+        else:
+            lines.append("| " + " | ".join([name] + daily) + " |")
+
+    if not_found:
+        lines.append(f"見つからなかった地点: {', '.join(not_found)}")
+    if failed:
+        lines.append(f"取得に失敗した地点: {', '.join(failed)}")
+    return "\n".join(lines)
@@ -0,0 +1,381 @@
+"""
+配信リプレイベンチマーク。
+
+Gemini・VOICEVOX・OBS を決定的なフェイクに置き換え、収録済みのニュース原稿とチャットログを
+run_broadcast_loop で再生して、無音時間（デッドエア）・ターンごとの初回音声までの時間・配信全体の長さを計測します。
+saint_graph → BodyClient → Body REST API → アクションキュー → voice/obs アダプターの経路は本物のコードを使います。
+
+Usage:
+    python tests/benchmarks/replay_harness.py --preset realistic --output replay_report.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import wave
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+_SRC_DIR = str(Path(__file__).resolve().parents[2] / "src")
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+REPLAY_BODY_URL = "http://body-replay"
+
+
+@dataclass(frozen=True)
+class ReplayConfig:
+    """フェイクの速度設定（秒）。"""
+    first_token_latency: float = 0.8    # LLM が最初のトークンを返すまで
+    token_interval: float = 0.05        # ストリーミングのトークン間隔
+    chars_per_token: int = 4
+    synthesis_seconds: float = 0.6      # VOICEVOX の合成時間（1 リクエストあたり）
+    seconds_per_char: float = 0.12      # 合成される音声の長さ（1 文字あたり）
+    playback_start_delay: float = 0.3   # OBS の再生トリガーから MediaInputPlaybackStarted まで
+    lip_sync_adjust_ms: int = 500
+    poll_interval: float = 1.0
+    idle_timeout: float = 3.0
+    chat_time_scale: float = 1.0        # チャットログの到着時刻に掛ける係数
+
+
+PRESETS: Dict[str, ReplayConfig] = {
+    "realistic": ReplayConfig(),
+    # CI 用。比率は realistic と同程度のまま、全体を数秒で終わらせる
+    "fast": ReplayConfig(
+        first_token_latency=0.03,
+        token_interval=0.002,
+        synthesis_seconds=0.02,
+        seconds_per_char=0.002,
+        playback_start_delay=0.01,
+        lip_sync_adjust_ms=0,
+        poll_interval=0.01,
+        idle_timeout=0.05,
+        chat_time_scale=0.05,
+    ),
+}
+
+
+# ---------------------------------------------------------------------------
+# フェイク
+# ---------------------------------------------------------------------------
+
+class ScriptedRunner:
+    """InMemoryRunner の代わりに、台本どおりの応答を一定のトークンレートでストリーミングする。"""
+
+    app_name = "replay"
+
+    def __init__(self, responses: Dict[str, str], config: ReplayConfig):
+        from google.adk.sessions import InMemorySessionService
+        self.session_service = InMemorySessionService()
+        self.responses = responses
+        self.config = config
+
+    def respond(self, message: str) -> str:
+        """ユーザーメッセージ先頭の [Context] から応答を決める。ニュースは原稿をそのまま読み上げる。"""
+        first_line, _, body = message.partition("\n")
+        match = re.fullmatch(r"\[([^\]:]+)(?::[^\]]*)?\]", first_line.strip())
+        context = match.group(1) if match else None
+        if context == "News Reading":
+            return f"[emotion: neutral] {body}"
+        return self.responses.get(context or "", self.responses["comment"])
+
+    async def run_async(self, new_message, user_id: str, session_id: str):
+        from google.adk.events.event import Event
+        from google.genai import types
+
+        text = self.respond(new_message.parts[0].text)
+        await asyncio.sleep(self.config.first_token_latency)
+        step = self.config.chars_per_token
+        for i in range(0, len(text), step):
+            if i:
+                await asyncio.sleep(self.config.token_interval)
+            yield Event(
+                author="SaintGraph",
+                partial=True,
+                content=types.Content(role="model", parts=[types.Part(text=text[i:i + step])]),
+            )
+
+
+def silent_wav(duration: float, rate: int = 8000) -> bytes:
+    """指定秒数の無音 WAV を生成する。"""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x00" * int(duration * rate))
+    return buf.getvalue()
+
+
+class FakeVoiceVox:
+    """voice_adapter.generate_speech の代わり。合成時間を待ってから文字数に比例した長さの音声を返す。"""
+
+    def __init__(self, config: ReplayConfig):
+        self.config = config
+        self.requests = 0
+
+    async def generate_speech(self, text: str, speaker_id: int = 1) -> bytes:
+        self.requests += 1
+        await asyncio.sleep(self.config.synthesis_seconds)
+        return silent_wav(len(text) * self.config.seconds_per_char)
+
+
+@dataclass
+class Clip:
+    """OBS で再生された音声 1 本。"""
+    start: float
+    end: float
+    file_path: str
+
+
+class FakeObsWebSocket:
+    """
+    obsws の代わり。シーン・ソース操作に応答し、メディアの再生トリガーから
+    playback_start_delay 後に MediaInputPlaybackStarted を発火して再生区間を記録する。
+    """
+
+    def __init__(self, config: ReplayConfig, sources: List[str]):
+        self.config = config
+        self.sources = sources
+        self.clips: List[Clip] = []
+        self._media: Dict[str, str] = {}
+
+    def call(self, request):
+        data = request.dataout
+        if request.name == "GetCurrentProgramScene":
+            request.datain = {"sceneName": "replay"}
+        elif request.name == "GetSceneItemList":
+            request.datain = {"sceneItems": [
+                {"sourceName": name, "sceneItemId": i} for i, name in enumerate(self.sources)
+            ]}
+        elif request.name == "SetInputSettings":
+            self._media[data["inputName"]] = data["inputSettings"].get("local_file")
+        elif request.name == "TriggerMediaInputAction":
+            asyncio.get_running_loop().call_later(
+                self.config.playback_start_delay, self._playback_started, data["inputName"])
+        return request
+
+    def _playback_started(self, input_name: str) -> None:
+        from obswebsocket import events as obs_events
+        from body.streamer import obs_adapter, voice_adapter
+
+        file_path = self._media.get(input_name, "")
+        start = time.perf_counter()
+        self.clips.append(Clip(start, start + voice_adapter.get_wav_duration(file_path), file_path))
+        event = obs_events.MediaInputPlaybackStarted()
+        event.input({"inputName": input_name})
+        obs_adapter._on_media_start(event)
+
+
+class ReplayCommentSource:
+    """YouTubeCommentAdapter の代わり。チャットログの到着時刻になったコメントを返す。"""
+
+    def __init__(self, entries: List[dict], time_scale: float):
+        self.pending = sorted(entries, key=lambda e: e["at"])
+        self.time_scale = time_scale
+        self.started_at = time.perf_counter()
+
+    def get(self) -> List[dict]:
+        elapsed = time.perf_counter() - self.started_at
+        due = [e for e in self.pending if e["at"] * self.time_scale <= elapsed]
+        self.pending = self.pending[len(due):]
+        return [{"author": e["author"], "message": e["message"]} for e in due]
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------------------------------------------------------
+# 計測とレポート
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TurnRecord:
+    """process_turn 1 回分の記録。"""
+    context: str
+    start: float
+    end: float = 0.0
+    time_to_first_audio: Optional[float] = None
+
+
+@dataclass
+class ReplayReport:
+    """リプレイ結果。時間はすべて秒。"""
+    total_duration: float
+    audio_seconds: float
+    dead_air_seconds: float
+    dead_air_ratio: float
+    longest_gap: float
+    clips: int
+    synthesis_requests: int
+    turns: List[TurnRecord] = field(default_factory=list)
+    dead_air_by_cause: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        lines = [
+            f"total duration     : {self.total_duration:8.2f}s",
+            f"audio              : {self.audio_seconds:8.2f}s ({self.clips} clips)",
+            f"dead air           : {self.dead_air_seconds:8.2f}s ({self.dead_air_ratio:.1%}), longest gap {self.longest_gap:.2f}s",
+        ]
+        if self.dead_air_by_cause:
+            causes = ", ".join(f"{k} {v:.2f}s" for k, v in self.dead_air_by_cause.items())
+            lines.append(f"  by cause         : {causes}")
+        lines.append("time to first audio:")
+        for turn in self.turns:
+            ttfa = f"{turn.time_to_first_audio:.2f}s" if turn.time_to_first_audio is not None else "-"
+            lines.append(f"  {turn.context:<40} {ttfa:>8}")
+        return "\n".join(lines)
+
+
+def build_report(started: float, finished: float, clips: List[Clip], turns: List[TurnRecord],
+                 synthesis_requests: int = 0) -> ReplayReport:
+    """再生区間とターンの記録から、デッドエアと初回音声までの時間を集計する。"""
+    clips = sorted(clips, key=lambda c: c.start)
+    audio = 0.0
+    gaps = []
+    cursor = started
+    for clip in clips:
+        start, end = max(clip.start, cursor), min(clip.end, finished)
+        if start > cursor:
+            gaps.append(start - cursor)
+        if end > start:
+            audio += end - start
+        cursor = max(cursor, end)
+    if finished > cursor:
+        gaps.append(finished - cursor)
+
+    for turn in turns:
+        first = next((c for c in clips if turn.start <= c.start <= turn.end), None)
+        turn.time_to_first_audio = first.start - turn.start if first else None
+
+    total = finished - started
+    dead_air = sum(gaps)
+    return ReplayReport(
+        total_duration=total,
+        audio_seconds=audio,
+        dead_air_seconds=dead_air,
+        dead_air_ratio=dead_air / total if total else 0.0,
+        longest_gap=max(gaps, default=0.0),
+        clips=len(clips),
+        synthesis_requests=synthesis_requests,
+        turns=turns,
+    )
+
+
+# ---------------------------------------------------------------------------
+# リプレイ実行
+# ---------------------------------------------------------------------------
+
+def _load_chat_log(path: Path) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def run_replay(config: ReplayConfig = PRESETS["fast"],
+                     news_path: Path = DATA_DIR / "news_script.md",
+                     chat_log_path: Path = DATA_DIR / "chat_log.jsonl",
+                     responses_path: Path = DATA_DIR / "llm_responses.json") -> ReplayReport:
+    """ニュース原稿とチャットログを run_broadcast_loop で再生し、レポートを返す。"""
+    import httpx
+    from starlette.applications import Starlette
+
+    from body.rest import BodyApp
+    from body.streamer import obs_adapter, voice_adapter
+    from body.streamer.service import StreamerBodyService
+    from infra.storage_client import FileSystemStorageClient
+    from saint_graph import body_client as body_client_module
+    from saint_graph import config as config_module
+    from saint_graph.broadcast_loop import BroadcastContext, run_broadcast_loop
+    from saint_graph.news_service import NewsService
+    from saint_graph.saint_graph import SaintGraph
+
+    env = {
+        "GOOGLE_API_KEY": os.getenv("GOOGLE_API_KEY") or "replay-benchmark",
+        "POLL_INTERVAL": str(config.poll_interval),
+        "IDLE_TIMEOUT": str(config.idle_timeout),
+        "STREAMING_MODE": "true",
+        "TIMELINE_REPORT": "false",
+    }
+    responses = json.loads(Path(responses_path).read_text(encoding="utf-8"))
+    service = StreamerBodyService()
+    app = Starlette(routes=BodyApp(service).get_routes())
+    real_async_client = httpx.AsyncClient
+
+    def asgi_client(timeout=None, **kwargs):
+        return real_async_client(transport=httpx.ASGITransport(app=app), timeout=timeout)
+
+    voicevox = FakeVoiceVox(config)
+    obs = FakeObsWebSocket(config, sorted(set(obs_adapter.EMOTION_MAP.values()) | {"voice"}))
+
+    with tempfile.TemporaryDirectory() as voice_dir, \
+         patch.dict(os.environ, env), \
+         patch.object(config_module, "_config", None), \
+         patch.object(body_client_module.httpx, "AsyncClient", asgi_client), \
+         patch.object(voice_adapter, "generate_speech", voicevox.generate_speech), \
+         patch.object(voice_adapter, "VOICE_DIR", Path(voice_dir)), \
+         patch.object(obs_adapter, "ws_client", obs), \
+         patch.object(obs_adapter, "_main_loop", asyncio.get_running_loop()), \
+         patch.object(obs_adapter, "_source_id_cache", {}), \
+         patch.object(obs_adapter, "_current_scene_name", None), \
+         patch.object(obs_adapter, "LIP_SYNC_ADJUST_MS", config.lip_sync_adjust_ms):
+        news_path = Path(news_path)
+        news = NewsService(news_path.name, FileSystemStorageClient(base_path=str(news_path.parent)))
+        news.load_news()
+        saint_graph = SaintGraph(body_client_module.BodyClient(REPLAY_BODY_URL), "", "replay benchmark")
+        saint_graph.runner = ScriptedRunner(responses, config)
+
+        turns: List[TurnRecord] = []
+        process_turn = saint_graph.process_turn
+
+        async def recorded_turn(user_input: str, context: Optional[str] = None):
+            turn = TurnRecord(context=context or "Comment", start=time.perf_counter())
+            turns.append(turn)
+            try:
+                await process_turn(user_input, context)
+            finally:
+                turn.end = time.perf_counter()
+
+        saint_graph.process_turn = recorded_turn
+
+        await service.start_worker()
+        service._youtube_comment_adapter = ReplayCommentSource(_load_chat_log(chat_log_path), config.chat_time_scale)
+        started = time.perf_counter()
+        try:
+            await run_broadcast_loop(BroadcastContext(saint_graph=saint_graph, news_service=news))
+            finished = time.perf_counter()
+        finally:
+            await service.stop_worker()
+
+    report = build_report(started, finished, obs.clips, turns, voicevox.requests)
+    report.dead_air_by_cause = service.timeline.report()["dead_air_by_cause"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded broadcast against fake LLM, VoiceVox and OBS")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="realistic")
+    parser.add_argument("--news", type=Path, default=DATA_DIR / "news_script.md")
+    parser.add_argument("--chat-log", type=Path, default=DATA_DIR / "chat_log.jsonl")
+    parser.add_argument("--responses", type=Path, default=DATA_DIR / "llm_responses.json")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_replay(PRESETS[args.preset], args.news, args.chat_log, args.responses))
+    print(report.summary())
+    if args.output:
+        args.output.write_text(json.dumps(report.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+配信リプレイベンチマークの回帰テスト。
+
+fast プリセットで配信全体を再生し、デッドエアや初回音声までの時間が予算内に収まることを確認します。
+"""
+import logging
+
+import pytest
+
+pytest.importorskip("obswebsocket")
+
+from replay_harness import PRESETS, Clip, TurnRecord, build_report, run_replay
+
+pytestmark = pytest.mark.benchmark
+
+logger = logging.getLogger(__name__)
+
+# fast プリセットでの予算（秒）。固定の待ち時間（OBS の装填待ち 0.1 秒など）を含む
+MAX_TOTAL_DURATION = 15.0
+MAX_TIME_TO_FIRST_AUDIO = 1.0
+# fast プリセットの実測値は約 0.81（クリップが短いため無音の割合が高い）。回帰を検出できるよう +0.1 の余裕に留める
+MAX_DEAD_AIR_RATIO = 0.91
+
+
+def test_build_report_counts_gaps_between_clips():
+    turns = [TurnRecord("Intro", start=0.0, end=4.0), TurnRecord("Closing", start=6.0, end=10.0)]
+    clips = [Clip(1.0, 3.0, "a.wav"), Clip(2.5, 4.0, "b.wav"), Clip(7.0, 9.0, "c.wav")]
+
+    report = build_report(0.0, 10.0, clips, turns)
+
+    assert report.audio_seconds == pytest.approx(5.0)
+    assert report.dead_air_seconds == pytest.approx(5.0)  # 0-1, 4-7, 9-10
+    assert report.longest_gap == pytest.approx(3.0)
+    assert [t.time_to_first_audio for t in report.turns] == [pytest.approx(1.0), pytest.approx(1.0)]
+
+
+async def test_replay_broadcast_within_budget():
+    report = await run_replay(PRESETS["fast"])
+    # 失敗時は pytest の captured log にサマリーが表示される
+    logger.info("\n" + report.summary())
+
+    contexts = [t.context for t in report.turns]
+    assert contexts[0] == "Intro" and contexts[-1] == "Closing"
+    assert sum(c.startswith("News Reading") for c in contexts) == 3
+    assert "Comment" in contexts
+    assert report.clips == report.synthesis_requests
+    assert all(t.time_to_first_audio is not None for t in report.turns)
+
+    assert report.total_duration < MAX_TOTAL_DURATION
+    assert max(t.time_to_first_audio for t in report.turns) < MAX_TIME_TO_FIRST_AUDIO
+    assert report.dead_air_ratio < MAX_DEAD_AIR_RATIO
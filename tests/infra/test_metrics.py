@@ -0,0 +1,67 @@
+"""Tests for the Prometheus text metrics registry."""
+import pytest
+from infra.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Test metric types and text exposition."""
+
+    def test_counter_with_labels(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests", ["endpoint"])
+
+        counter.inc(endpoint="geocode")
+        counter.inc(2, endpoint="geocode")
+        counter.inc(endpoint="forecast")
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{endpoint="geocode"} 3' in text
+        assert 'requests_total{endpoint="forecast"} 1' in text
+
+    def test_counter_rejects_wrong_labels(self):
+        counter = MetricsRegistry().counter("requests_total", "Requests", ["endpoint"])
+
+        with pytest.raises(ValueError):
+            counter.inc(tool="x")
+        with pytest.raises(ValueError):
+            counter.inc(-1, endpoint="geocode")
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency", ["tool"], buckets=(0.1, 1.0))
+
+        histogram.observe(0.05, tool="a")
+        histogram.observe(0.5, tool="a")
+        histogram.observe(3.0, tool="a")
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{tool="a",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{tool="a",le="1"} 2' in text
+        assert 'latency_seconds_bucket{tool="a",le="+Inf"} 3' in text
+        assert 'latency_seconds_sum{tool="a"} 3.55' in text
+        assert 'latency_seconds_count{tool="a"} 3' in text
+
+    def test_gauge_function_is_evaluated_on_render(self):
+        registry = MetricsRegistry()
+        gauge = registry.gauge("queue_depth", "Queue depth")
+        items = [1, 2]
+        gauge.set_function(lambda: len(items))
+
+        assert "queue_depth 2" in registry.render()
+        items.append(3)
+        assert "queue_depth 3" in registry.render()
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("errors_total", "Errors", ["error"]).inc(error='bad "quote"\n')
+
+        assert 'errors_total{error="bad \\"quote\\"\\n"} 1' in registry.render()
+
+    def test_reregistering_returns_existing_metric(self):
+        registry = MetricsRegistry()
+        first = registry.counter("calls_total", "Calls", ["tool"])
+
+        assert registry.counter("calls_total", "Calls", ["tool"]) is first
+        with pytest.raises(ValueError):
+            registry.gauge("calls_total", "Calls", ["tool"])
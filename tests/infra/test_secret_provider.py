@@ -1,12 +1,39 @@
 """Tests for SecretProvider abstraction."""
 import os
+import threading
+import time
 import pytest
+from unittest.mock import patch
 from infra.secret_provider import (
+    CachingSecretProvider,
     EnvSecretProvider,
+    SECRET_LOOKUPS,
+    SecretProvider,
     create_secret_provider,
 )
 
 
+class CountingProvider(SecretProvider):
+    """Backend stub that records every fetch."""
+
+    def __init__(self, values, delay=0.0):
+        self.values = dict(values)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def get_secret(self, name: str) -> str:
+        with self._lock:
+            self.calls.append(name)
+        time.sleep(self.delay)
+        if name not in self.values:
+            raise ValueError(f"Secret '{name}' not found")
+        value = self.values[name]
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+
 class TestEnvSecretProvider:
     """Test EnvSecretProvider implementation."""
 
@@ -50,3 +77,90 @@ class TestSecretProviderFactory:
         """Test invalid provider type raises error."""
         with pytest.raises(ValueError, match="Unknown secret provider type"):
             create_secret_provider("invalid_type")
+
+
+class TestCachingSecretProvider:
+    """Test the TTL / encrypted disk cache wrapper."""
+
+    def test_cached_within_ttl(self, tmp_path):
+        inner = CountingProvider({"API_KEY": "v1"})
+        provider = CachingSecretProvider(inner, ttl=60, cache_dir=str(tmp_path))
+        hits_before = SECRET_LOOKUPS.value(result="hit")
+
+        assert provider.get_secret("API_KEY") == "v1"
+        assert provider.get_secret("API_KEY") == "v1"
+
+        assert inner.calls == ["API_KEY"]
+        assert SECRET_LOOKUPS.value(result="hit") == hits_before + 1
+
+    def test_refetched_after_ttl(self, tmp_path):
+        inner = CountingProvider({"API_KEY": "v1"})
+        provider = CachingSecretProvider(inner, ttl=60, cache_dir=str(tmp_path))
+        provider.get_secret("API_KEY")
+
+        inner.values["API_KEY"] = "v2"
+        with patch("infra.secret_provider.time.time", return_value=time.time() + 61):
+            assert provider.get_secret("API_KEY") == "v2"
+        assert inner.calls == ["API_KEY", "API_KEY"]
+
+    def test_stale_value_served_when_refresh_fails(self, tmp_path):
+        inner = CountingProvider({"API_KEY": "v1"})
+        provider = CachingSecretProvider(inner, ttl=0, cache_dir=str(tmp_path))
+        provider.get_secret("API_KEY")
+
+        inner.values["API_KEY"] = ConnectionError("unavailable")
+        assert provider.get_secret("API_KEY") == "v1"
+
+    def test_missing_secret_raises(self, tmp_path):
+        provider = CachingSecretProvider(CountingProvider({}), cache_dir=str(tmp_path))
+
+        with pytest.raises(ValueError, match="not found"):
+            provider.get_secret("MISSING")
+
+    def test_prefetch_is_concurrent(self, tmp_path):
+        names = [f"SECRET_{i}" for i in range(4)]
+        inner = CountingProvider({n: n.lower() for n in names}, delay=0.1)
+        provider = CachingSecretProvider(inner, cache_dir=str(tmp_path))
+
+        start = time.perf_counter()
+        result = provider.prefetch(names + ["MISSING"])
+        elapsed = time.perf_counter() - start
+
+        assert result == {n: n.lower() for n in names}
+        assert elapsed < 0.3
+        # 以降の取得はキャッシュから返る
+        assert provider.get_secret("SECRET_0") == "secret_0"
+        assert sorted(inner.calls) == sorted(names + ["MISSING"])
+
+    def test_encrypted_disk_cache_survives_restart(self, tmp_path):
+        fernet = pytest.importorskip("cryptography.fernet")
+        key = fernet.Fernet.generate_key().decode()
+        inner = CountingProvider({"API_KEY": "super-secret"})
+
+        CachingSecretProvider(inner, cache_dir=str(tmp_path), encryption_key=key).get_secret("API_KEY")
+        restarted = CachingSecretProvider(inner, cache_dir=str(tmp_path), encryption_key=key)
+
+        assert restarted.get_secret("API_KEY") == "super-secret"
+        assert inner.calls == ["API_KEY"]
+        cache_file = tmp_path / CachingSecretProvider.CACHE_FILE
+        assert b"super-secret" not in cache_file.read_bytes()
+        assert cache_file.stat().st_mode & 0o077 == 0
+
+    def test_disk_cache_with_wrong_key_is_ignored(self, tmp_path):
+        fernet = pytest.importorskip("cryptography.fernet")
+        inner = CountingProvider({"API_KEY": "v1"})
+        CachingSecretProvider(inner, cache_dir=str(tmp_path),
+                              encryption_key=fernet.Fernet.generate_key().decode()).get_secret("API_KEY")
+
+        other = CachingSecretProvider(inner, cache_dir=str(tmp_path),
+                                      encryption_key=fernet.Fernet.generate_key().decode())
+
+        assert other.get_secret("API_KEY") == "v1"
+        assert inner.calls == ["API_KEY", "API_KEY"]
+
+    def test_no_disk_cache_without_key(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("SECRET_CACHE_KEY", raising=False)
+        provider = CachingSecretProvider(CountingProvider({"API_KEY": "v1"}), cache_dir=str(tmp_path))
+        provider.get_secret("API_KEY")
+
+        assert not (tmp_path / CachingSecretProvider.CACHE_FILE).exists()
@@ -1,10 +1,16 @@
 """Tests for StorageClient abstraction."""
 import os
+import threading
+import time
 import tempfile
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 import pytest
 from infra.storage_client import (
+    CachingStorageClient,
     FileSystemStorageClient,
+    GcsStorageClient,
+    PreconditionFailedError,
     create_storage_client,
 )
 
@@ -72,6 +78,280 @@ class TestFileSystemStorageClient:
             client.read_text("nonexistent/file.txt")
 
 
+    def test_write_text(self, tmp_path):
+        """Test writing text directly to storage."""
+        client = FileSystemStorageClient(base_path=str(tmp_path))
+
+        client.write_text("news/news_script.md", "# News Script")
+
+        assert (tmp_path / "news" / "news_script.md").read_text(encoding="utf-8") == "# News Script"
+        # No temporary files are left behind after the atomic rename
+        assert os.listdir(tmp_path / "news") == ["news_script.md"]
+
+    def test_open_write_streams(self, tmp_path):
+        """Test streaming writes through open_write."""
+        client = FileSystemStorageClient(base_path=str(tmp_path))
+
+        with client.open_write("assets/blob.bin") as f:
+            f.write(b"chunk1")
+            f.write(b"chunk2")
+
+        assert (tmp_path / "assets" / "blob.bin").read_bytes() == b"chunk1chunk2"
+
+    def test_open_write_failure_keeps_existing_file(self, tmp_path):
+        """Test that a failed write leaves the previous content intact."""
+        client = FileSystemStorageClient(base_path=str(tmp_path))
+        client.write_bytes("data.txt", b"old")
+
+        with pytest.raises(RuntimeError):
+            with client.open_write("data.txt") as f:
+                f.write(b"partial")
+                raise RuntimeError("interrupted")
+
+        assert (tmp_path / "data.txt").read_bytes() == b"old"
+        assert os.listdir(tmp_path) == ["data.txt"]
+
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_write_honors_umask_and_keeps_existing_mode(self, tmp_path):
+        """Test that atomic writes do not leave mkstemp's 0600 mode on shared files."""
+        client = FileSystemStorageClient(base_path=str(tmp_path))
+        umask = os.umask(0)
+        os.umask(umask)
+
+        client.write_text("news/news_script.md", "v1")
+        assert (tmp_path / "news" / "news_script.md").stat().st_mode & 0o777 == 0o666 & ~umask
+
+        os.chmod(tmp_path / "news" / "news_script.md", 0o640)
+        client.write_text("news/news_script.md", "v2")
+        assert (tmp_path / "news" / "news_script.md").stat().st_mode & 0o777 == 0o640
+
+class TestGcsStorageClient:
+    """Test GcsStorageClient write paths with a mocked GCS client."""
+
+    @pytest.fixture
+    def gcs_client(self):
+        with patch("google.cloud.storage.Client") as mock_client_cls:
+            client = GcsStorageClient(default_bucket="test-bucket")
+            yield client, mock_client_cls.return_value.bucket.return_value
+
+    def test_write_text_uploads_from_string(self, gcs_client):
+        """Test write_text uploads without staging a local file."""
+        client, bucket = gcs_client
+
+        client.write_text("news/news_script.md", "本文", if_generation_match=0)
+
+        blob = bucket.blob.return_value
+        blob.upload_from_string.assert_called_once_with(
+            "本文".encode("utf-8"),
+            content_type="text/plain; charset=utf-8",
+            if_generation_match=0,
+        )
+
+    def test_open_write_uses_resumable_writer(self, gcs_client):
+        """Test open_write streams through a resumable blob writer with preconditions."""
+        client, bucket = gcs_client
+        writer = MagicMock()
+        bucket.blob.return_value.open.return_value.__enter__.return_value = writer
+
+        with client.open_write("news/news_script.md", content_type="text/markdown", if_generation_match=42) as f:
+            f.write(b"data")
+
+        bucket.blob.return_value.open.assert_called_once_with(
+            "wb", content_type="text/markdown", if_generation_match=42
+        )
+        writer.write.assert_called_once_with(b"data")
+
+
+    def test_download_if_changed_skips_unchanged(self, gcs_client, tmp_path):
+        """Test that a 304 from the generation precondition skips the download."""
+        from google.api_core.exceptions import NotModified
+        client, bucket = gcs_client
+        blob = bucket.blob.return_value
+        blob.download_to_filename.side_effect = NotModified("not modified")
+
+        downloaded, version = client.download_if_changed("mind/ren/persona.md", str(tmp_path / "p.md"), "123")
+
+        assert (downloaded, version) == (False, "123")
+        blob.download_to_filename.assert_called_once_with(str(tmp_path / "p.md"), if_generation_not_match=123)
+
+    def test_download_if_changed_returns_new_generation(self, gcs_client, tmp_path):
+        """Test that a changed blob is downloaded and its generation returned."""
+        client, bucket = gcs_client
+        blob = bucket.blob.return_value
+        blob.generation = 456
+
+        downloaded, version = client.download_if_changed("mind/ren/persona.md", str(tmp_path / "p.md"))
+
+        assert (downloaded, version) == (True, "456")
+
+    def test_missing_object_raises_file_not_found(self, gcs_client, tmp_path):
+        """Test that GCS NotFound is reported like the filesystem backend."""
+        from google.api_core.exceptions import NotFound
+        client, bucket = gcs_client
+        blob = bucket.blob.return_value
+        blob.download_as_text.side_effect = NotFound("missing")
+        blob.download_to_filename.side_effect = NotFound("missing")
+
+        with pytest.raises(FileNotFoundError):
+            client.read_text("live/broadcast_pool.json")
+        with pytest.raises(FileNotFoundError):
+            client.download_if_changed("live/broadcast_pool.json", str(tmp_path / "p.json"))
+
+    def test_read_modify_write_with_generation(self, gcs_client):
+        """Test that the read generation guards the write and conflicts are reported portably."""
+        from google.api_core.exceptions import PreconditionFailed
+        client, bucket = gcs_client
+        blob = bucket.blob.return_value
+        blob.download_as_text.return_value = "[]"
+        blob.generation = "789"
+
+        assert client.read_text_with_generation("live/broadcast_pool.json") == ("[]", 789)
+
+        blob.upload_from_string.side_effect = PreconditionFailed("conditionNotMet")
+        with pytest.raises(PreconditionFailedError):
+            client.write_text("live/broadcast_pool.json", "[{}]", if_generation_match=789)
+
+    def test_list_object_info_reads_listing_metadata(self, gcs_client):
+        from datetime import datetime, timezone
+        client, bucket = gcs_client
+        blob = MagicMock()
+        blob.name = "mind/ren/assets/bgm.mp3"
+        blob.size = 1024
+        blob.crc32c = "yZRlqg=="
+        blob.updated = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        bucket.list_blobs.return_value = [blob]
+
+        [info] = client.list_object_info("mind/ren/assets/")
+
+        assert (info.key, info.size, info.crc32c) == ("mind/ren/assets/bgm.mp3", 1024, "yZRlqg==")
+        assert info.updated == blob.updated.timestamp()
+
+
+class TestCachingStorageClient:
+    """Test the read-through cache layer using a filesystem backend."""
+
+    @pytest.fixture
+    def backend(self, tmp_path):
+        root = tmp_path / "remote"
+        (root / "mind" / "ren" / "assets").mkdir(parents=True)
+        (root / "mind" / "ren" / "persona.md").write_text("persona v1", encoding="utf-8")
+        (root / "mind" / "ren" / "mind.json").write_text("{}", encoding="utf-8")
+        (root / "mind" / "ren" / "assets" / "bgm.mp3").write_bytes(b"mp3")
+        return root, FileSystemStorageClient(base_path=str(root))
+
+    def test_unchanged_file_is_not_downloaded_again(self, backend, tmp_path):
+        root, inner = backend
+        client = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+
+        with patch.object(inner, "download_file", wraps=inner.download_file) as spy:
+            assert client.read_text("mind/ren/persona.md") == "persona v1"
+            assert client.read_text("mind/ren/persona.md") == "persona v1"
+            assert spy.call_count == 1
+
+            # Changed files are revalidated and downloaded again
+            (root / "mind" / "ren" / "persona.md").write_text("persona v2 (longer)", encoding="utf-8")
+            assert client.read_text("mind/ren/persona.md") == "persona v2 (longer)"
+            assert spy.call_count == 2
+
+    def test_cache_survives_restart(self, backend, tmp_path):
+        _, inner = backend
+        CachingStorageClient(inner, cache_dir=str(tmp_path / "cache")).read_text("mind/ren/persona.md")
+
+        client = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+        with patch.object(inner, "download_file") as spy:
+            assert client.read_text("mind/ren/persona.md") == "persona v1"
+            spy.assert_not_called()
+
+    def test_prefetch_with_suffix_filter(self, backend, tmp_path):
+        _, inner = backend
+        client = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+
+        assert client.prefetch("mind/ren/", suffixes=(".md", ".json")) == 2
+        with patch.object(inner, "download_file") as spy:
+            client.read_text("mind/ren/mind.json")
+            spy.assert_not_called()
+
+    def test_write_invalidates_cache(self, backend, tmp_path):
+        _, inner = backend
+        client = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+        client.read_text("mind/ren/persona.md")
+
+        client.write_text("mind/ren/persona.md", "updated")
+
+        assert client.read_text("mind/ren/persona.md") == "updated"
+
+    def test_missing_file_raises(self, backend, tmp_path):
+        _, inner = backend
+        client = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+
+        with pytest.raises(FileNotFoundError):
+            client.read_text("mind/ren/missing.md")
+
+    def test_deleted_object_is_evicted_when_backend_removes_dest(self, backend, tmp_path):
+        root, inner = backend
+        client = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+        client.read_text("mind/ren/persona.md")
+        (root / "mind" / "ren" / "persona.md").unlink()
+
+        def not_found(key, dest, version=None, bucket=None):
+            # Like Blob.download_to_filename, drop the partial file before raising
+            os.remove(dest)
+            raise FileNotFoundError(f"Object not found: {key}")
+
+        with patch.object(inner, "download_if_changed", side_effect=not_found):
+            with pytest.raises(FileNotFoundError, match="mind/ren/persona.md"):
+                client.read_text("mind/ren/persona.md")
+
+        assert client._index == {}
+        assert not list((tmp_path / "cache").rglob("*.tmp"))
+
+
+class TestAsyncFacade:
+    """Test the async wrappers on StorageClient."""
+
+    async def test_aread_text(self, tmp_path):
+        (tmp_path / "a.txt").write_text("hello", encoding="utf-8")
+        client = FileSystemStorageClient(base_path=str(tmp_path))
+
+        assert await client.aread_text("a.txt") == "hello"
+
+    async def test_adownload_many_reports_per_item_errors(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "a.bin").write_bytes(b"a")
+        client = FileSystemStorageClient(base_path=str(tmp_path / "src"))
+
+        results = await client.adownload_many([
+            ("a.bin", str(tmp_path / "out" / "a.bin")),
+            ("missing.bin", str(tmp_path / "out" / "missing.bin")),
+        ])
+
+        assert results[0] is None
+        assert isinstance(results[1], FileNotFoundError)
+        assert (tmp_path / "out" / "a.bin").read_bytes() == b"a"
+
+    async def test_adownload_many_bounds_concurrency(self, tmp_path):
+        client = FileSystemStorageClient(base_path=str(tmp_path))
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def slow_download(key, dest, bucket=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+
+        with patch.object(client, "download_file", side_effect=slow_download):
+            results = await client.adownload_many(
+                [(f"{i}.bin", str(tmp_path / f"{i}.bin")) for i in range(8)], max_concurrency=2
+            )
+
+        assert results == [None] * 8
+        assert state["peak"] == 2
+
+
 class TestStorageClientFactory:
     """Test storage client factory function."""
 
@@ -89,6 +369,22 @@ class TestStorageClientFactory:
         client = create_storage_client()
         assert isinstance(client, FileSystemStorageClient)
 
+    def test_factory_returns_shared_client(self, monkeypatch):
+        """Test the factory reuses one client per configuration."""
+        monkeypatch.setenv("STORAGE_TYPE", "filesystem")
+
+        assert create_storage_client() is create_storage_client()
+
+    def test_gcs_client_is_cached(self, monkeypatch, tmp_path):
+        """Test GCS clients are wrapped in the read-through cache."""
+        monkeypatch.setenv("STORAGE_CACHE_DIR", str(tmp_path))
+        monkeypatch.setenv("GCS_BUCKET_NAME", "factory-test-bucket")
+        with patch("google.cloud.storage.Client"):
+            client = create_storage_client("gcs")
+
+        assert isinstance(client, CachingStorageClient)
+        assert isinstance(client.inner, GcsStorageClient)
+
     def test_invalid_storage_type(self):
         """Test invalid storage type raises error."""
         with pytest.raises(ValueError, match="Unknown storage type"):
@@ -0,0 +1,134 @@
+"""Tests for trace propagation from saint_graph through the body REST API and action queue."""
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+pytest.importorskip("opentelemetry.sdk")
+
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from starlette.applications import Starlette
+
+from infra import tracing
+from body.rest import BodyApp
+from body.streamer.service import StreamerBodyService
+from saint_graph.body_client import BodyClient, FanOutBodyClient
+
+
+@pytest.fixture(scope="module")
+def memory_exporter():
+    exporter = InMemorySpanExporter()
+    provider = trace.get_tracer_provider()
+    if not isinstance(provider, TracerProvider):
+        provider = TracerProvider()
+        trace.set_tracer_provider(provider)
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    return exporter
+
+
+@pytest.fixture
+def spans(memory_exporter):
+    memory_exporter.clear()
+    yield memory_exporter
+    memory_exporter.clear()
+
+
+def by_name(finished):
+    return {span.name: span for span in finished}
+
+
+class TestPropagation:
+    def test_headers_continue_the_trace(self, spans):
+        with tracing.get_tracer("test").start_as_current_span("client") as client_span:
+            headers = tracing.inject_headers({"content-type": "application/json"})
+
+        assert "traceparent" in headers
+        assert headers["content-type"] == "application/json"
+        with tracing.span_from_headers("server", headers):
+            pass
+
+        server = by_name(spans.get_finished_spans())["server"]
+        assert server.context.trace_id == client_span.get_span_context().trace_id
+        assert server.parent.span_id == client_span.get_span_context().span_id
+
+    def test_without_headers_starts_a_new_trace(self, spans):
+        with tracing.span_from_headers("server", {}):
+            pass
+
+        assert by_name(spans.get_finished_spans())["server"].parent is None
+
+    async def test_turn_trace_spans_client_api_and_worker(self, spans):
+        service = StreamerBodyService()
+        app = Starlette(routes=BodyApp(service).get_routes())
+        real_client = httpx.AsyncClient
+
+        def asgi_client(timeout):
+            return real_client(transport=httpx.ASGITransport(app=app), timeout=timeout)
+
+        with patch("saint_graph.body_client.httpx.AsyncClient", asgi_client), \
+             patch("body.streamer.service.voice_adapter.generate_and_save", AsyncMock(return_value=("a.wav", 1.0))), \
+             patch.object(service, "play_audio_with_sync_emotion", AsyncMock()), \
+             patch("body.streamer.service.obs_adapter.set_visible_source", AsyncMock()):
+            with tracing.get_tracer("test").start_as_current_span("turn") as turn:
+                result = await BodyClient("http://body").speak("こんにちは", style="joyful")
+            await service.start_worker()
+            await service.wait_for_queue()
+            await service.stop_worker()
+
+        assert result == "Speech queued"
+        finished = by_name(spans.get_finished_spans())
+        trace_id = turn.get_span_context().trace_id
+        for name in ("body_client POST /api/speak", "body POST /api/speak", "body.queue_wait", "body.speak"):
+            assert finished[name].context.trace_id == trace_id, name
+        assert finished["body POST /api/speak"].parent.span_id == \
+            finished["body_client POST /api/speak"].context.span_id
+        # キュー待ちスパンは投入時刻から始まる
+        assert finished["body.queue_wait"].start_time <= finished["body.speak"].start_time
+
+
+    async def test_mirror_spans_follow_each_turn(self, spans):
+        def handler(request):
+            return httpx.Response(200, json={"status": "ok", "result": "ok"})
+
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            body = FanOutBodyClient(BodyClient("http://streamer", http_client=http_client),
+                                    [BodyClient("http://cli", http_client=http_client)])
+            turns = []
+            for text in ("一ターン目", "二ターン目"):
+                with tracing.get_tracer("test").start_as_current_span("turn") as turn:
+                    await body.speak(text)
+                turns.append(turn.get_span_context().trace_id)
+            await body.close()
+
+        mirrored = [s for s in spans.get_finished_spans() if s.name == "body_client.mirror speak"]
+        # ワーカーは 1 つでも、複製した操作はそれぞれ投入したターンのトレースに属する
+        assert [s.context.trace_id for s in mirrored] == turns
+
+class TestSetup:
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("TRACING_EXPORTER", raising=False)
+
+        assert tracing.setup_tracing("test") is False
+
+    def test_unknown_exporter_is_rejected(self):
+        with pytest.raises(ValueError):
+            tracing.setup_tracing("test", "zipkin")
+
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        exporter = tracing._json_lines_exporter(str(tmp_path / "traces.jsonl"))
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+        with provider.get_tracer("test").start_as_current_span("a") as span:
+            span.add_event("llm.first_token")
+        with provider.get_tracer("test").start_as_current_span("b"):
+            pass
+
+        lines = (tmp_path / "traces.jsonl").read_text(encoding="utf-8").splitlines()
+        records = [json.loads(line) for line in lines]
+        assert [r["name"] for r in records] == ["a", "b"]
+        assert records[0]["events"][0]["name"] == "llm.first_token"
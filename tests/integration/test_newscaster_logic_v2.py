@@ -3,11 +3,13 @@
 
 broadcast_loop のハンドラを使って、以下を検証します:
 1. ニュース本文が省略されずに process_turn に渡されること
-2. IDLE フェーズでコメントが来た場合に idle_counter がリセットされること
+2. IDLE フェーズでコメントが来た場合に沈黙タイムアウトがやり直されること
 """
 import pytest
+import asyncio
 import os
 import tempfile
+from types import SimpleNamespace
 from unittest.mock import MagicMock, AsyncMock, patch
 
 from saint_graph.news_service import NewsService, NewsItem
@@ -38,6 +40,7 @@ def _make_ctx(news_service=None, comments=None):
     mock_saint.process_news_finished = AsyncMock()
     mock_saint.body = MagicMock()
     mock_saint.body.get_comments = AsyncMock(return_value=comments or [])
+    mock_saint.body.wait_for_queue = AsyncMock()
 
     mock_news = news_service or MagicMock()
 
@@ -73,31 +76,36 @@ async def test_full_news_content_reading(news_file_path):
 async def test_closing_interruption_logic():
     """
     検証項目:
-    IDLE フェーズでコメントが来た場合に idle_counter がリセットされ、
+    IDLE フェーズでコメントが来た場合に沈黙タイムアウトの期限がリセットされ、
     CLOSING に遷移しないこと。
     """
-    # --- ループ1: コメントあり → counter リセット ---
-    ctx = _make_ctx(
-        comments=[{"author": "User", "message": "Don't go!"}]
-    )
-    ctx.idle_counter = 5  # すでにカウントが進んでいる
+    config = SimpleNamespace(poll_interval=0.01, idle_timeout=0.05)
+    loop = asyncio.get_running_loop()
+
+    with patch("saint_graph.broadcast_loop.load_config", return_value=config):
+        # --- ループ1: コメントあり → 期限リセット ---
+        ctx = _make_ctx(
+            comments=[{"author": "User", "message": "Don't go!"}]
+        )
+        ctx.idle_deadline = loop.time() + 0.01  # 期限が迫っている
 
-    phase = await handle_idle(ctx)
+        phase = await handle_idle(ctx)
 
-    assert phase == BroadcastPhase.IDLE
-    assert ctx.idle_counter == 0  # リセットされた
-    ctx.saint_graph.process_turn.assert_called_once()
-    assert "User: Don't go!" in ctx.saint_graph.process_turn.call_args.args[0]
+        assert phase == BroadcastPhase.IDLE
+        assert ctx.idle_deadline is None  # リセットされた
+        ctx.saint_graph.process_turn.assert_called_once()
+        assert "User: Don't go!" in ctx.saint_graph.process_turn.call_args.args[0]
 
-    # --- ループ2: コメントなし → counter インクリメント ---
-    ctx.saint_graph.body.get_comments.return_value = []
-    ctx.saint_graph.process_turn.reset_mock()
+        # --- ループ2: コメントなし → 応答の発話が終わってから期限を数え直す ---
+        ctx.saint_graph.body.get_comments.return_value = []
+        ctx.saint_graph.process_turn.reset_mock()
 
-    phase = await handle_idle(ctx)
+        phase = await handle_idle(ctx)
 
-    assert phase == BroadcastPhase.IDLE
-    assert ctx.idle_counter == 1
-    ctx.saint_graph.process_turn.assert_not_called()
+        assert phase == BroadcastPhase.IDLE
+        ctx.saint_graph.process_turn.assert_not_called()
+        ctx.saint_graph.body.wait_for_queue.assert_awaited_once()
 
-    # CLOSING にはまだ遷移していない
-    assert ctx.idle_counter < 20  # MAX_WAIT_CYCLES のデフォルト値
+        # CLOSING にはまだ遷移していない
+        phase = await handle_idle(ctx)
+        assert ctx.idle_deadline is not None
@@ -75,3 +75,14 @@ def test_stop_broadcast_api():
         assert response.status_code == 200
         assert response.json()["status"] == "ok"
         assert "CLI mode" in response.json()["result"]
+
+def test_get_comments_api_long_poll_waits_for_input():
+    from body.cli.io_adapter import io_adapter
+    import threading
+    io_adapter.get_inputs()  # 残っている入力を捨てる
+    threading.Timer(0.1, io_adapter.add_input, args=("late comment",)).start()
+
+    response = client.get("/api/comments", params={"wait": 2})
+
+    assert response.status_code == 200
+    assert response.json()["comments"] == [{"author": "User", "message": "late comment"}]
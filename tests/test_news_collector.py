@@ -8,7 +8,15 @@ project_root = os.path.dirname(current_dir)
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from scripts.news_collector.news_agent import clean_news_script
+import asyncio
+
+from scripts.news_collector.news_agent import (
+    clean_news_script,
+    collect_incrementally,
+    collect_themes_concurrently,
+    merge_news_scripts,
+)
+from scripts.news_collector.news_cache import CollectionStats, NewsCache, fingerprint
 
 def test_clean_news_script_basic():
     """
@@ -45,3 +53,186 @@ def test_clean_news_script_but_handling():
     assert "一般的な傾向をお伝えします。" in result
     assert "最新の状況は良好です。" in result
     assert "具体的なデータは見つかりませんでした" not in result
+
+def test_merge_news_scripts():
+    """
+    テーマごとの応答を 1 つの原稿にまとめ、失敗したテーマを除外することをテスト
+    """
+    results = [
+        ("テーマA", "```markdown\n# News Script\n## テーマA\nA の内容\n```"),
+        ("テーマB", None),
+        ("テーマC", "C の内容"),
+    ]
+    result = merge_news_scripts(results)
+    assert result == "# News Script\n## テーマA\nA の内容\n## テーマC\nC の内容"
+
+
+def test_merge_news_scripts_all_failed():
+    """
+    すべてのテーマが失敗した場合は空文字を返すことをテスト
+    """
+    assert merge_news_scripts([("テーマA", None), ("テーマB", "")]) == ""
+
+
+@pytest.mark.asyncio
+async def test_collect_themes_concurrently_isolates_failures():
+    """
+    一部のテーマが失敗・タイムアウトしても、他のテーマの結果が得られることをテスト
+    """
+    async def fake_runner(prompt_text, session_id):
+        if "遅いテーマ" in prompt_text:
+            await asyncio.sleep(1)
+        if "失敗テーマ" in prompt_text:
+            raise RuntimeError("boom")
+        return f"# News Script\n## {session_id}\n本文"
+
+    results = await collect_themes_concurrently(
+        ["成功テーマ", "失敗テーマ", "遅いテーマ"],
+        "2026-01-01",
+        fake_runner,
+        concurrency=3,
+        theme_timeout=0.1,
+    )
+    assert [theme for theme, _ in results] == ["成功テーマ", "失敗テーマ", "遅いテーマ"]
+    assert results[0][1] == "# News Script\n## news_session_0\n本文"
+    assert results[1][1] is None
+    assert results[2][1] is None
+
+
+@pytest.mark.asyncio
+async def test_collect_themes_concurrently_respects_limit():
+    """
+    同時実行数の上限が守られることをテスト
+    """
+    running = 0
+    peak = 0
+
+    async def fake_runner(prompt_text, session_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return "本文"
+
+    results = await collect_themes_concurrently(
+        [f"テーマ{i}" for i in range(6)], "2026-01-01", fake_runner, concurrency=2
+    )
+    assert len(results) == 6
+    assert peak == 2
+
+
+def test_fingerprint_normalization():
+    """
+    行頭記号・全角半角・空白の違いを無視して同一項目と判定することをテスト
+    """
+    assert fingerprint("*   日経平均は５４，２９３円で終了") == fingerprint("- 日経平均は 54,293円で終了。")
+    assert fingerprint("日経平均は上昇") != fingerprint("日経平均は下落")
+
+
+def test_news_cache_fresh_section():
+    """
+    同じ対象日かつ TTL 内のテーマのみ再利用されることをテスト
+    """
+    cache = NewsCache(theme_ttl=60)
+    cache.record_section("テーマA", "2026-01-01", "## テーマA\n* 項目1", now=1000)
+
+    assert cache.get_fresh_section("テーマA", "2026-01-01", now=1030) == "## テーマA\n* 項目1"
+    assert cache.get_fresh_section("テーマA", "2026-01-01", now=1100) is None
+    assert cache.get_fresh_section("テーマA", "2026-01-02", now=1030) is None
+
+
+def test_news_cache_filters_previously_covered_items():
+    """
+    以前の対象日に取り上げた項目のみ除外されることをテスト
+    """
+    cache = NewsCache()
+    cache.record_section("テーマA", "2026-01-01", "## テーマA\n* 古い話題", now=1000)
+
+    section, skipped = cache.filter_new_items("## テーマA\n* 古い話題\n* 新しい話題", "2026-01-02")
+    assert section == "## テーマA\n* 新しい話題"
+    assert skipped == 1
+
+    # 同じ対象日の再実行では除外しない
+    section, skipped = cache.filter_new_items("## テーマA\n* 古い話題", "2026-01-01")
+    assert section == "## テーマA\n* 古い話題"
+    assert skipped == 0
+
+
+
+def test_news_cache_keeps_recurring_themes_across_days():
+    """
+    天気予報などの定例テーマは日をまたいでも同じ項目を除外しないことをテスト
+    """
+    cache = NewsCache()
+    cache.record_section("全国の天気予報", "2026-01-01", "## 全国の天気予報\n* 東京: 晴れ", now=1000)
+    cache.record_section("テーマA", "2026-01-01", "## テーマA\n* 古い話題", now=1000)
+
+    assert cache.covered_items("全国の天気予報", "2026-01-02") == []
+    section, skipped = cache.filter_new_items("## 全国の天気予報\n* 東京: 晴れ", "2026-01-02", "全国の天気予報")
+    assert section == "## 全国の天気予報\n* 東京: 晴れ"
+    assert skipped == 0
+
+    # ニュースのテーマは従来どおり除外する
+    section, skipped = cache.filter_new_items("## テーマA\n* 古い話題\n* 新しい話題", "2026-01-02", "テーマA")
+    assert section == "## テーマA\n* 新しい話題"
+    assert skipped == 1
+
+@pytest.mark.asyncio
+async def test_collect_incrementally_only_calls_llm_for_stale_themes():
+    """
+    鮮度の残るテーマは LLM を呼ばず、新しいテーマのみ収集することをテスト
+    """
+    cache = NewsCache(theme_ttl=3600)
+    cache.record_section("天気", "2026-01-02", "## 天気\n* 晴れ")
+    cache.record_section("経済", "2026-01-01", "## 経済\n* 昨日の話題")
+
+    prompts = []
+
+    async def fake_runner(prompt_text, session_id):
+        prompts.append(prompt_text)
+        return "# News Script\n## 経済\n* 昨日の話題\n* 今日の話題"
+
+    stats = CollectionStats()
+    result = await collect_incrementally(
+        ["天気", "経済"], "2026-01-02", fake_runner, cache, stats
+    )
+
+    assert len(prompts) == 1
+    assert "昨日の話題" in prompts[0]  # 取り上げ済みとして除外を指示
+    assert result == "# News Script\n## 天気\n* 晴れ\n## 経済\n* 今日の話題"
+    assert stats.themes_reused == 1
+    assert stats.themes_collected == 1
+    assert stats.items_skipped == 1
+
+
+@pytest.mark.asyncio
+async def test_collect_incrementally_same_day_rerun_after_ttl_keeps_morning_items():
+    """
+    TTL 切れ後の同日再実行で、当日に取り上げた項目が原稿から落ちないことをテスト
+    """
+    cache = NewsCache(theme_ttl=60)
+    cache.record_section("経済", "2026-01-02", "## 経済\n* 朝の話題", now=1000)
+    cache.record_section("政治", "2026-01-02", "## 政治\n* 朝の政治", now=1000)
+
+    prompts = []
+
+    async def fake_runner(prompt_text, session_id):
+        prompts.append(prompt_text)
+        if "経済" in prompt_text:
+            return "# News Script\n## 経済\n* 朝の話題\n* 昼の話題"
+        return "# News Script\n## 政治\n"
+
+    stats = CollectionStats()
+    result = await collect_incrementally(
+        ["経済", "政治"], "2026-01-02", fake_runner, cache, stats
+    )
+
+    assert len(prompts) == 2
+    assert all("取り上げ済み" not in p for p in prompts)  # 当日の項目は除外を指示しない
+    assert result == "# News Script\n## 経済\n* 朝の話題\n* 昼の話題\n## 政治\n* 朝の政治"
+    assert stats.items_skipped == 0
+    # 既知の項目は最初の対象日を保ったまま最終確認時刻が更新される
+    entry = cache.items[fingerprint("* 朝の話題")]
+    assert entry["date"] == "2026-01-02"
+    assert entry["seen_at"] > 1000
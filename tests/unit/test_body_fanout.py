@@ -0,0 +1,114 @@
+"""
+Unit tests for mirroring body actions to several bodies.
+"""
+import asyncio
+import json
+import time
+
+import httpx
+
+from saint_graph.body_client import BodyClient, FanOutBodyClient, create_body_client
+
+
+def _transport(log: list, delays: dict) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delays.get(request.url.host, 0.0))
+        body = json.loads(request.content) if request.content else None
+        log.append((request.url.host, request.url.path, body))
+        if request.url.path == "/api/comments":
+            return httpx.Response(200, json={"comments": [{"author": request.url.host, "message": "hi"}]})
+        return httpx.Response(200, json={"status": "ok", "result": f"{request.url.host} ok"})
+    return httpx.MockTransport(handler)
+
+
+async def test_slow_mirror_does_not_delay_primary():
+    log = []
+    async with httpx.AsyncClient(transport=_transport(log, {"recorder": 0.2})) as http_client:
+        body = FanOutBodyClient(
+            BodyClient("http://streamer:8000", http_client=http_client),
+            [BodyClient("http://cli:8000", http_client=http_client),
+             BodyClient("http://recorder:8000", http_client=http_client)],
+            mirror_timeout=1.0,
+        )
+        start = time.perf_counter()
+        assert await body.change_emotion("joyful") == "streamer ok"
+        assert await body.speak("こんにちは", style="joyful") == "streamer ok"
+        assert await body.wait_for_queue() == "streamer ok"
+        # コメントとキューの待機は主 Body だけが対象
+        assert await body.get_comments() == [{"author": "streamer", "message": "hi"}]
+        assert time.perf_counter() - start < 0.2
+
+        await body.close()
+
+    # 副 Body にも同じ順序で届く
+    for host in ("cli", "recorder"):
+        assert [(path, payload) for h, path, payload in log if h == host] == [
+            ("/api/change_emotion", {"emotion": "joyful"}),
+            ("/api/speak", {"text": "こんにちは", "style": "joyful"}),
+        ]
+    assert [path for h, path, _ in log if h == "streamer"] == [
+        "/api/change_emotion", "/api/speak", "/api/queue/wait", "/api/comments",
+    ]
+
+
+async def test_mirror_timeout_and_backlog_are_bounded():
+    log = []
+    async with httpx.AsyncClient(transport=_transport(log, {"recorder": 10.0})) as http_client:
+        body = FanOutBodyClient(
+            BodyClient("http://streamer:8000", http_client=http_client),
+            [BodyClient("http://recorder:8000", http_client=http_client)],
+            mirror_timeout=0.05, queue_size=2,
+        )
+        for i in range(5):
+            await body.speak(f"文 {i}")
+        sink = body._sinks[0]
+        # 1 件目は処理中、残り 4 件のうち古い 2 件を捨てる
+        assert sink.dropped == 2
+
+        await asyncio.wait_for(body.close(timeout=1.0), timeout=2)
+        assert sink.failed == 3
+
+    assert [payload["text"] for h, path, payload in log if h == "streamer"] == [f"文 {i}" for i in range(5)]
+
+
+def test_create_body_client():
+    assert type(create_body_client("http://streamer:8000")) is BodyClient
+    body = create_body_client("http://streamer:8000", " http://cli:8000 ,http://recorder:8000", mirror_timeout=2.0)
+    assert isinstance(body, FanOutBodyClient)
+    assert [m.base_url for m in body.mirrors] == ["http://cli:8000", "http://recorder:8000"]
+    assert body.mirror_timeout == 2.0
+
+
+async def test_mirror_http_errors_are_counted():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "recorder":
+            return httpx.Response(503, text="unavailable")
+        return httpx.Response(200, json={"status": "ok", "result": "ok"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        body = FanOutBodyClient(
+            BodyClient("http://streamer:8000", http_client=http_client),
+            [BodyClient("http://recorder:8000", http_client=http_client)],
+        )
+        assert await body.speak("こんにちは") == "ok"
+        await body.close()
+
+    # BodyClient はエラーを例外でなく "Error: ..." で返すため、戻り値で失敗を数える
+    assert body._sinks[0].failed == 1
+
+
+async def test_lifecycle_calls_outlive_the_mirror_timeout():
+    log = []
+    async with httpx.AsyncClient(transport=_transport(log, {"recorder": 0.2})) as http_client:
+        body = FanOutBodyClient(
+            BodyClient("http://streamer:8000", http_client=http_client),
+            [BodyClient("http://recorder:8000", http_client=http_client)],
+            mirror_timeout=0.05,
+        )
+        # 副 Body の停止は発話の消化と停止前の待機を含むため、発話用のタイムアウトでは打ち切らない
+        assert await body.stop_broadcast() == "streamer ok"
+        assert await body.shutdown_broadcast(deadline=1.0) == "streamer ok"
+        await asyncio.wait_for(body.close(), timeout=2)
+
+    assert body._sinks[0].failed == 0
+    assert [path for h, path, _ in log if h == "recorder"] == ["/api/broadcast/stop", "/api/broadcast/shutdown"]
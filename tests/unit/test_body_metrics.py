@@ -0,0 +1,115 @@
+"""
+Unit tests for the body streamer metrics and the /metrics endpoint.
+"""
+import asyncio
+import json
+import queue
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from body.rest import BodyApp
+from body.streamer import metrics, obs_adapter
+from body.streamer.service import ESTIMATED_SECONDS_PER_CHAR, StreamerBodyService
+from body.streamer.youtube_comment_adapter import YouTubeCommentAdapter
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    service = StreamerBodyService()
+    client = TestClient(Starlette(routes=BodyApp(service).get_routes()))
+
+    client.post("/api/speak", json={"text": "こんにちは"})
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "body_action_queue_depth 1" in response.text
+    assert "# TYPE body_synthesis_latency_seconds histogram" in response.text
+    assert "# TYPE secret_lookups_total counter" in response.text
+
+
+async def test_worker_updates_queue_and_audio_metrics():
+    service = StreamerBodyService()
+    chars_before = metrics.QUEUED_SPEECH_CHARS.value()
+    audio_before = metrics.QUEUED_AUDIO_SECONDS.value()
+    waits_before = metrics.QUEUE_WAIT.count(action="speak")
+    audio_during_playback = []
+
+    async def play(file_path, duration, emotion):
+        audio_during_playback.append(metrics.QUEUED_AUDIO_SECONDS.value())
+
+    with patch("body.streamer.service.voice_adapter.generate_and_save", AsyncMock(return_value=("a.wav", 2.5))), \
+         patch.object(service, "play_audio_with_sync_emotion", play), \
+         patch("body.streamer.service.obs_adapter.set_visible_source", AsyncMock()):
+        await service.speak("hello")
+        assert metrics.ACTION_QUEUE_DEPTH.value() == 1
+        assert metrics.QUEUED_SPEECH_CHARS.value() == chars_before + 5
+        # 未合成の発話も、文字数から見積もった長さでキュー内の音声に数える
+        assert metrics.QUEUED_AUDIO_SECONDS.value() == pytest.approx(audio_before + 5 * ESTIMATED_SECONDS_PER_CHAR)
+
+        await service.start_worker()
+        await service.wait_for_queue()
+        await service.stop_worker()
+
+    assert metrics.ACTION_QUEUE_DEPTH.value() == 0
+    assert metrics.QUEUED_SPEECH_CHARS.value() == chars_before
+    assert audio_during_playback == [pytest.approx(audio_before + 2.5)]
+    assert metrics.QUEUED_AUDIO_SECONDS.value() == pytest.approx(audio_before)
+    assert metrics.QUEUE_WAIT.count(action="speak") == waits_before + 1
+
+
+async def test_discarded_speech_leaves_queued_audio():
+    service = StreamerBodyService()
+    audio_before = metrics.QUEUED_AUDIO_SECONDS.value()
+
+    await service.speak("一文目です")
+    await service.speak("二文目です")
+    assert metrics.QUEUED_AUDIO_SECONDS.value() == pytest.approx(audio_before + 10 * ESTIMATED_SECONDS_PER_CHAR)
+
+    assert service._discard_pending_actions() == 2
+    assert metrics.QUEUED_AUDIO_SECONDS.value() == pytest.approx(audio_before)
+
+
+def test_obs_call_records_latency_and_errors():
+    class GetVersion:
+        pass
+
+    before = metrics.OBS_REQUEST_LATENCY.count(request="GetVersion")
+    errors_before = metrics.OBS_REQUEST_ERRORS.value(request="GetVersion")
+    with patch.object(obs_adapter, "ws_client", MagicMock()) as ws:
+        obs_adapter._call(GetVersion())
+        ws.call.side_effect = ConnectionError("closed")
+        with pytest.raises(ConnectionError):
+            obs_adapter._call(GetVersion())
+
+    assert metrics.OBS_REQUEST_LATENCY.count(request="GetVersion") == before + 2
+    assert metrics.OBS_REQUEST_ERRORS.value(request="GetVersion") == errors_before + 1
+
+
+def test_comment_adapter_counts_ingested_and_dropped():
+    adapter = YouTubeCommentAdapter.__new__(YouTubeCommentAdapter)
+    adapter.q, adapter.error_q = queue.Queue(), queue.Queue()
+    for line in (json.dumps({"author": "a", "message": "hi"}), json.dumps({"error": "quota"}), "not json"):
+        adapter.q.put(line + "\n")
+    ingested = metrics.COMMENTS_INGESTED.value()
+    malformed = metrics.COMMENTS_DROPPED.value(reason="malformed")
+    api_errors = metrics.COMMENTS_DROPPED.value(reason="api_error")
+
+    assert len(adapter.get()) == 1
+    assert metrics.COMMENTS_INGESTED.value() == ingested + 1
+    assert metrics.COMMENTS_DROPPED.value(reason="malformed") == malformed + 1
+    assert metrics.COMMENTS_DROPPED.value(reason="api_error") == api_errors + 1
+
+
+async def test_event_loop_lag_monitor_detects_blocking():
+    lag_before = metrics.EVENT_LOOP_LAG_HISTOGRAM.sum()
+    task = asyncio.create_task(metrics.monitor_event_loop_lag(interval=0.01))
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # ループを同期的にブロック
+    await asyncio.sleep(0.02)
+    task.cancel()
+
+    assert metrics.EVENT_LOOP_LAG_HISTOGRAM.sum() - lag_before >= 0.05
@@ -2,6 +2,10 @@
 broadcast_loop.py のフェーズハンドラのユニットテスト。
 SaintGraph の高レベルメソッド (process_intro 等) を呼び出すことを検証します。
 """
+import asyncio
+import time
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
 from saint_graph.broadcast_loop import (
@@ -11,8 +15,16 @@ from saint_graph.broadcast_loop import (
     handle_news,
     handle_idle,
     handle_closing,
+    run_broadcast_loop,
 )
-from saint_graph.config import MAX_WAIT_CYCLES
+
+
+@pytest.fixture
+def loop_config():
+    """短いポーリング間隔・沈黙タイムアウトの設定に差し替える"""
+    config = SimpleNamespace(poll_interval=0.01, idle_timeout=0.2)
+    with patch("saint_graph.broadcast_loop.load_config", return_value=config):
+        yield config
 
 def _make_ctx(news_service=None, comments=None):
     mock_saint = MagicMock()
@@ -88,21 +100,113 @@ async def test_handle_news_finished():
 
 
 @pytest.mark.asyncio
-async def test_handle_idle_wait():
+async def test_handle_idle_wait(loop_config):
     ctx = _make_ctx()
     phase = await handle_idle(ctx)
     
     assert phase == BroadcastPhase.IDLE
-    assert ctx.idle_counter == 1
+    # Body 側でコメントの到着を待つ（long-poll）
+    assert ctx.saint_graph.body.get_comments.call_args.kwargs["wait"] == pytest.approx(0.2)
+    ctx.saint_graph.body.wait_for_queue.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_handle_idle_timeout():
+async def test_handle_idle_timeout(loop_config):
     ctx = _make_ctx()
-    ctx.idle_counter = MAX_WAIT_CYCLES  # Set to max so next increment triggers timeout
+    ctx.idle_deadline = asyncio.get_running_loop().time() - 0.01  # 期限切れ
     phase = await handle_idle(ctx)
     
     assert phase == BroadcastPhase.CLOSING
+    ctx.saint_graph.body.get_comments.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_idle_timeout_is_wall_clock(loop_config):
+    """沈黙タイムアウトはハンドラの呼び出し回数ではなく、発話キュー消化からの実時間で決まる"""
+    ctx = _make_ctx()
+    drained = asyncio.Event()
+
+    async def wait_for_queue():
+        await asyncio.sleep(0.1)
+        drained.set()
+
+    ctx.saint_graph.body.wait_for_queue = AsyncMock(side_effect=wait_for_queue)
+    start = time.monotonic()
+    phase = BroadcastPhase.IDLE
+    while phase == BroadcastPhase.IDLE:
+        phase = await handle_idle(ctx)
+    elapsed = time.monotonic() - start
+
+    assert phase == BroadcastPhase.CLOSING
+    assert 0.3 <= elapsed < 0.45  # 消化 0.1 秒 + 沈黙 0.2 秒
+
+
+@pytest.mark.asyncio
+async def test_idle_comment_restarts_timeout(loop_config):
+    ctx = _make_ctx(comments=[{"author": "User", "message": "Don't go!"}])
+    ctx.idle_deadline = asyncio.get_running_loop().time() + 0.05
+
+    phase = await handle_idle(ctx)
+
+    assert phase == BroadcastPhase.IDLE
+    assert ctx.idle_deadline is None
+    ctx.saint_graph.process_turn.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_news_items_chain_without_delay(loop_config):
+    """ニュースの間に POLL_INTERVAL の sleep を挟まない"""
+    loop_config.poll_interval = 1.0
+    loop_config.idle_timeout = 0
+    news_service = MagicMock()
+    news_service.has_next.side_effect = [True, True, True, False]
+    ctx = _make_ctx(news_service=news_service)
+
+    start = time.monotonic()
+    await run_broadcast_loop(ctx)
+
+    assert time.monotonic() - start < 0.5
+    assert ctx.saint_graph.process_news_reading.await_count == 3
+    ctx.saint_graph.process_closing.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_interrupts_idle_wait(loop_config):
+    loop_config.idle_timeout = 60
+    news_service = MagicMock()
+    news_service.has_next.return_value = False
+    ctx = _make_ctx(news_service=news_service)
+
+    async def long_poll(wait=0.0):
+        await asyncio.sleep(wait)
+        return []
+
+    ctx.saint_graph.body.get_comments = AsyncMock(side_effect=long_poll)
+    asyncio.get_running_loop().call_later(0.1, ctx.shutdown.set)
+
+    await asyncio.wait_for(run_broadcast_loop(ctx), timeout=2)
+
+    # 停止要求時の締めは ShutdownCoordinator が行うため、LLM の挨拶は生成しない
+    ctx.saint_graph.process_closing.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_shutdown_preempts_running_turn(loop_config):
+    news_service = MagicMock()
+    news_service.has_next.return_value = True
+    ctx = _make_ctx(news_service=news_service)
+
+    async def read_slowly(**kwargs):
+        await asyncio.sleep(10)
+
+    ctx.saint_graph.process_news_reading = AsyncMock(side_effect=read_slowly)
+    asyncio.get_running_loop().call_later(0.1, ctx.shutdown.set)
+
+    await asyncio.wait_for(run_broadcast_loop(ctx), timeout=2)
+
+    # 読み上げ途中で打ち切ったニュースは既読にしない
+    news_service.get_next_item.assert_not_called()
+    ctx.saint_graph.process_closing.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,216 @@
+"""
+Unit tests for broadcast checkpointing and resuming after a restart.
+"""
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from body.streamer.service import StreamerBodyService
+from infra.storage_client import FileSystemStorageClient
+from saint_graph.broadcast_loop import BroadcastContext, BroadcastPhase, run_broadcast_loop
+from saint_graph.checkpoint import FINISHED, BroadcastCheckpoint, CheckpointStore
+from saint_graph.main import _resume_from_checkpoint
+from saint_graph.news_service import NewsService
+from saint_graph.saint_graph import SaintGraph
+
+KEY = "checkpoints/broadcast.json"
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return FileSystemStorageClient(base_path=str(tmp_path))
+
+
+@pytest.fixture
+def loop_config():
+    config = SimpleNamespace(poll_interval=0.01, idle_timeout=0.05)
+    with patch("saint_graph.broadcast_loop.load_config", return_value=config):
+        yield config
+
+
+@pytest.fixture
+def news_service(storage):
+    storage.write_text("news/news_script.md", "# News\n\n## Weather\nSunny.\n\n## Economy\nUp.\n\n## Sports\nWon.")
+    service = NewsService("news/news_script.md", storage_client=storage)
+    service.load_news()
+    return service
+
+
+class SlowStorage:
+    """書き込みに時間がかかるストレージ（書き込み内容を記録する）。"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = []
+
+    async def awrite_text(self, key, text, content_type=None):
+        await asyncio.sleep(self.delay)
+        self.writes.append(json.loads(text))
+
+
+async def test_store_round_trip_and_resumable(storage):
+    store = CheckpointStore(storage, key=KEY)
+    assert await store.aload() is None
+
+    history = [{"role": "user", "text": "[Intro]\nこんにちは"}, {"role": "model", "text": "こんにちは！"}]
+    store.save(BroadcastCheckpoint(phase="news", news_index=2, news_total=3, history=history))
+    await store.flush()
+
+    loaded = await store.aload_resumable(max_age=60)
+    assert loaded.phase == "news"
+    assert loaded.news_index == 2
+    assert loaded.history == history
+    assert await store.aload_resumable(max_age=-1) is None
+
+    store.save(BroadcastCheckpoint(phase=FINISHED))
+    await store.flush()
+    assert await store.aload_resumable(max_age=60) is None
+
+
+async def test_corrupt_checkpoint_is_ignored(storage):
+    storage.write_text(KEY, "{not json")
+    assert await CheckpointStore(storage, key=KEY).aload() is None
+
+
+async def test_save_returns_immediately_and_coalesces():
+    slow = SlowStorage(delay=0.1)
+    store = CheckpointStore(slow, key=KEY)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    store.save(BroadcastCheckpoint(phase="news", news_index=0))
+    await asyncio.sleep(0)  # 1 件目の書き込みを開始させる
+    for i in range(1, 5):
+        store.save(BroadcastCheckpoint(phase="news", news_index=i))
+    assert loop.time() - start < 0.05
+
+    await store.flush()
+    # 書き込み中に来た保存要求は最新の 1 件にまとめられる
+    assert [w["news_index"] for w in slow.writes] == [0, 4]
+
+    # 内容が変わっていなければ書き込まない
+    store.save(BroadcastCheckpoint(phase="news", news_index=4))
+    await store.flush()
+    assert len(slow.writes) == 2
+
+
+async def test_unchanged_checkpoint_is_refreshed_after_interval():
+    slow = SlowStorage(delay=0)
+    store = CheckpointStore(slow, key=KEY, refresh_interval=0.05)
+
+    for _ in range(3):
+        store.save(BroadcastCheckpoint(phase="idle", news_index=3))
+        await store.flush()
+    assert len(slow.writes) == 1
+
+    # 長い待機中でも保存時刻が古くなりすぎないよう、間隔を過ぎたら同じ内容でも書き直す
+    await asyncio.sleep(0.06)
+    store.save(BroadcastCheckpoint(phase="idle", news_index=3))
+    await store.flush()
+    assert len(slow.writes) == 2
+    assert slow.writes[1]["saved_at"]
+
+async def test_loop_checkpoints_and_resume_skips_intro(storage, news_service, loop_config):
+    saint_graph = MagicMock()
+    saint_graph.body.get_comments = AsyncMock(return_value=[])
+    saint_graph.body.wait_for_queue = AsyncMock()
+    saint_graph.export_history = AsyncMock(return_value=[{"role": "model", "text": "天気は晴れです。"}])
+    saint_graph.restore_history = AsyncMock()
+    saint_graph.process_intro = AsyncMock()
+    saint_graph.process_closing = AsyncMock()
+    saint_graph.process_news_finished = AsyncMock()
+    read = []
+
+    async def crash_after_first_item(title, content):
+        read.append(title)
+        if len(read) == 2:
+            raise asyncio.CancelledError  # 2 本目の途中でプロセスが落ちた
+
+    saint_graph.process_news_reading = AsyncMock(side_effect=crash_after_first_item)
+    store = CheckpointStore(storage, key=KEY)
+    ctx = BroadcastContext(saint_graph=saint_graph, news_service=news_service, checkpoints=store)
+
+    with pytest.raises(asyncio.CancelledError):
+        await run_broadcast_loop(ctx)
+    await store.flush()
+
+    # --- 再起動 ---
+    checkpoint = await CheckpointStore(storage, key=KEY).aload_resumable(max_age=60)
+    assert checkpoint.phase == "news"
+    assert checkpoint.news_index == 1
+
+    restarted = NewsService("news/news_script.md", storage_client=storage)
+    restarted.load_news()
+    saint_graph.process_intro.reset_mock()
+    saint_graph.process_news_reading = AsyncMock()
+    store = CheckpointStore(storage, key=KEY)
+    ctx = BroadcastContext(saint_graph=saint_graph, news_service=restarted, checkpoints=store)
+
+    start_phase = await _resume_from_checkpoint(ctx, checkpoint)
+    await run_broadcast_loop(ctx, start_phase=start_phase)
+    await store.flush()
+
+    assert start_phase is BroadcastPhase.NEWS
+    saint_graph.restore_history.assert_awaited_once_with([{"role": "model", "text": "天気は晴れです。"}])
+    saint_graph.process_intro.assert_not_awaited()
+    titles = [c.kwargs["title"] for c in saint_graph.process_news_reading.call_args_list]
+    assert titles == ["Economy", "Sports"]
+    assert (await store.aload()).phase == FINISHED
+
+
+async def test_resume_restarts_news_when_script_changed(news_service):
+    saint_graph = MagicMock()
+    saint_graph.restore_history = AsyncMock()
+    ctx = BroadcastContext(saint_graph=saint_graph, news_service=news_service)
+
+    phase = await _resume_from_checkpoint(ctx, BroadcastCheckpoint(phase="intro", news_index=2, news_total=5))
+
+    assert phase is BroadcastPhase.NEWS
+    assert news_service.current_index == 0
+
+
+async def test_history_export_and_restore_with_adk_session():
+    saint_graph = SaintGraph(MagicMock(), "", "checkpoint test")
+    await saint_graph.restore_history([
+        {"role": "user", "text": "[Intro]\nこんにちは"},
+        {"role": "model", "text": "こんにちは！"},
+        {"role": "model", "text": "今日のニュースです。"},
+        {"role": "user", "text": "視聴者: " + "長" * 1000},
+    ])
+
+    history = await saint_graph.export_history(max_turns=20, max_chars=100)
+
+    assert [h["role"] for h in history] == ["user", "model", "user"]
+    assert history[1]["text"] == "こんにちは！\n今日のニュースです。"
+    assert len(history[2]["text"]) == 100
+    assert await saint_graph.export_history(max_turns=1, max_chars=100) == history[-2:]
+
+    restarted = SaintGraph(MagicMock(), "", "checkpoint test")
+    await restarted.restore_history(history)
+    assert await restarted.export_history(max_turns=20, max_chars=100) == history
+
+
+async def test_body_retries_start_after_failed_start():
+    service = StreamerBodyService()
+    start_recording = AsyncMock(side_effect=[False, True])
+
+    with patch("body.streamer.service.obs_adapter.start_recording", start_recording), \
+         patch("body.streamer.service.asyncio.sleep", AsyncMock()), \
+         patch.dict(os.environ, {"STREAMING_MODE": "false"}):
+        assert (await service.start_broadcast({})).startswith("配信開始を予約しました")
+        config, service._pending_broadcast_config = service._pending_broadcast_config, None
+        assert await service._execute_actual_broadcast_start(config) == "OBS録画の開始に失敗しました。接続を確認してください。"
+
+        # 失敗した後の開始要求は「配信中」とみなさず、もう一度開始を予約する
+        assert (await service.start_broadcast({})).startswith("配信開始を予約しました")
+        config, service._pending_broadcast_config = service._pending_broadcast_config, None
+        assert await service._execute_actual_broadcast_start(config) == "OBS録画を開始しました。"
+        assert service.broadcast_live
+
+        # 再起動した saint_graph からの開始要求では、現在の配信を続ける
+        assert await service.start_broadcast({}) == "配信中のため、現在の配信を継続します。"
+        assert service._pending_broadcast_config is None
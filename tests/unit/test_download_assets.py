@@ -0,0 +1,130 @@
+"""
+Unit tests for the delta-only OBS asset sync.
+"""
+import json
+import os
+from dataclasses import replace
+from unittest.mock import patch
+
+import pytest
+
+from body.streamer.obs import download_assets
+from body.streamer.obs.download_assets import MANIFEST_NAME, sync_assets
+from infra.storage_client import FileSystemStorageClient
+
+PREFIX = "mind/ren/assets/"
+
+
+@pytest.fixture
+def remote(tmp_path):
+    """リモート側のアセットを持つファイルシステムストレージ"""
+    assets = tmp_path / "remote" / "mind" / "ren" / "assets"
+    assets.mkdir(parents=True)
+    (assets / "normal.png").write_bytes(b"png")
+    (assets / "bgm.mp3").write_bytes(b"mp3" * 100)
+    return assets, FileSystemStorageClient(base_path=str(tmp_path / "remote"))
+
+
+async def test_first_sync_downloads_all_and_writes_manifest(remote, tmp_path):
+    _, storage = remote
+    dest = tmp_path / "dest"
+    dest.mkdir()
+
+    result = await sync_assets(storage, PREFIX, str(dest))
+
+    assert (result.total, result.downloaded, result.skipped) == (2, 2, 0)
+    assert result.verified
+    assert (dest / "bgm.mp3").read_bytes() == b"mp3" * 100
+    manifest = json.loads((dest / MANIFEST_NAME).read_text())
+    assert set(manifest) == {"normal.png", "bgm.mp3"}
+    assert not list(dest.glob("*.part"))
+
+
+async def test_unchanged_assets_are_not_downloaded_again(remote, tmp_path):
+    assets, storage = remote
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    await sync_assets(storage, PREFIX, str(dest))
+
+    (assets / "normal.png").write_bytes(b"png v2")
+    with patch.object(storage, "download_file", wraps=storage.download_file) as spy:
+        result = await sync_assets(storage, PREFIX, str(dest))
+
+    assert (result.downloaded, result.skipped) == (1, 1)
+    assert [c.args[0] for c in spy.call_args_list] == [PREFIX + "normal.png"]
+    assert (dest / "normal.png").read_bytes() == b"png v2"
+
+
+async def test_locally_modified_asset_is_restored(remote, tmp_path):
+    _, storage = remote
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    await sync_assets(storage, PREFIX, str(dest))
+
+    (dest / "bgm.mp3").write_bytes(b"corrupted")
+    result = await sync_assets(storage, PREFIX, str(dest))
+
+    assert result.downloaded == 1
+    assert (dest / "bgm.mp3").read_bytes() == b"mp3" * 100
+
+
+async def test_checksum_mismatch_is_not_placed(remote, tmp_path):
+    pytest.importorskip("google_crc32c")
+    _, storage = remote
+    dest = tmp_path / "dest"
+    dest.mkdir()
+
+    infos = storage.list_object_info(PREFIX)
+    bad = [replace(i, crc32c="AAAAAA==") if i.key.endswith("bgm.mp3") else i for i in infos]
+    with patch.object(storage, "list_object_info", return_value=bad):
+        result = await sync_assets(storage, PREFIX, str(dest), retries=1)
+
+    assert result.failed == ["bgm.mp3"]
+    assert not result.verified
+    assert not (dest / "bgm.mp3").exists()
+    assert "bgm.mp3" not in json.loads((dest / MANIFEST_NAME).read_text())
+
+
+async def test_failed_download_is_retried(remote, tmp_path):
+    _, storage = remote
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    original = storage.download_file
+    calls = []
+
+    def flaky(key, dest, bucket=None):
+        calls.append(key)
+        if key.endswith("normal.png") and calls.count(key) == 1:
+            raise ConnectionError("transient")
+        original(key, dest, bucket)
+
+    with patch.object(storage, "download_file", side_effect=flaky):
+        result = await sync_assets(storage, PREFIX, str(dest), retries=1)
+
+    assert result.verified
+    assert result.downloaded == 2
+    assert calls.count(PREFIX + "normal.png") == 2
+
+
+async def test_removed_remote_asset_is_deleted_locally(remote, tmp_path):
+    assets, storage = remote
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    await sync_assets(storage, PREFIX, str(dest))
+    (dest / "user_file.txt").write_text("not managed")
+
+    os.remove(assets / "normal.png")
+    result = await sync_assets(storage, PREFIX, str(dest))
+
+    assert result.removed == 1
+    assert not (dest / "normal.png").exists()
+    assert (dest / "user_file.txt").exists()
+
+
+def test_crc32c_matches_gcs_format(tmp_path):
+    pytest.importorskip("google_crc32c")
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"hello world")
+
+    # gsutil hash -c で得られる "hello world" の CRC32C
+    assert download_assets.crc32c_base64(str(path)) == "yZRlqg=="
@@ -0,0 +1,198 @@
+"""
+Unit tests for the pre-provisioned YouTube Live pool and stream health polling.
+"""
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from body.streamer.live_pool import LivePool, PreparedLive
+from body.streamer.service import StreamerBodyService
+from body.streamer.youtube_live_adapter import YoutubeLiveAdapter
+from infra.storage_client import FileSystemStorageClient, PreconditionFailedError
+
+
+def live_response(n: int) -> dict:
+    return {
+        "broadcast": {"id": f"b{n}", "snippet": {"title": "t", "liveChatId": f"chat{n}"}},
+        "stream": {"id": f"s{n}", "cdn": {"ingestionInfo": {"streamName": f"key{n}"}}},
+    }
+
+
+class GenerationStorage:
+    """世代番号の条件付き書き込みを再現するメモリ上のストレージ（GCS 相当）。"""
+
+    def __init__(self):
+        self.objects = {}
+        self.writes = 0
+
+    def read_text_with_generation(self, key, bucket=None):
+        if key not in self.objects:
+            raise FileNotFoundError(key)
+        return self.objects[key]
+
+    def write_text(self, key, text, bucket=None, content_type=None, if_generation_match=None):
+        current = self.objects.get(key, (None, 0))[1]
+        if if_generation_match is not None and if_generation_match != current:
+            raise PreconditionFailedError(key)
+        self.objects[key] = (text, current + 1)
+        self.writes += 1
+
+
+def reusable_adapter(on_check=None) -> MagicMock:
+    adapter = MagicMock()
+
+    def get_broadcast(yt, broadcast_id):
+        if on_check:
+            on_check(broadcast_id)
+        return {"status": {"lifeCycleStatus": "ready"}}
+
+    adapter.get_broadcast.side_effect = get_broadcast
+    adapter.get_stream_key.side_effect = lambda yt, stream_id: f"key-of-{stream_id}"
+    return adapter
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return LivePool(FileSystemStorageClient(base_path=str(tmp_path)), key="live/pool.json")
+
+
+def test_claim_returns_oldest_and_removes_it(pool):
+    pool.add(PreparedLive.from_live_response(live_response(1)))
+    pool.add(PreparedLive.from_live_response(live_response(2)))
+
+    claimed = pool.claim()
+
+    assert (claimed.broadcast_id, claimed.live_chat_id) == ("b1", "chat1")
+    assert [e.broadcast_id for e in pool.entries()] == ["b2"]
+
+
+def test_stream_key_is_not_stored_but_fetched_on_claim(pool):
+    pool.add(PreparedLive.from_live_response(live_response(1)))
+
+    assert "key1" not in pool.storage.read_text(pool.key)
+    claimed = pool.claim(reusable_adapter(), MagicMock())
+
+    assert claimed.stream_key == "key-of-s1"
+    assert claimed.to_live_response()["stream"]["cdn"]["ingestionInfo"]["streamName"] == "key-of-s1"
+
+
+def test_claim_from_empty_pool(pool):
+    assert pool.claim() is None
+
+
+def test_empty_pool_is_not_rewritten():
+    storage = GenerationStorage()
+    storage.objects["live/pool.json"] = ("[]", 1)
+
+    assert LivePool(storage, key="live/pool.json").claim() is None
+    assert storage.writes == 0
+
+
+def test_concurrent_claims_never_share_a_broadcast():
+    storage = GenerationStorage()
+    first, second = LivePool(storage, key="live/pool.json"), LivePool(storage, key="live/pool.json")
+    first.add(PreparedLive.from_live_response(live_response(1)))
+    first.add(PreparedLive.from_live_response(live_response(2)))
+    rival = []
+
+    def race(broadcast_id):
+        # 1 台目が b1 を確認している間に、2 台目が先に b1 を取り出す
+        if not rival:
+            rival.append(second.claim(reusable_adapter(), MagicMock()))
+
+    claimed = first.claim(reusable_adapter(on_check=race), MagicMock())
+
+    assert rival[0].broadcast_id == "b1"
+    assert claimed.broadcast_id == "b2"
+    assert first.entries() == []
+
+
+def test_claim_discards_finished_broadcasts(pool):
+    pool.add(PreparedLive.from_live_response(live_response(1)))
+    pool.add(PreparedLive.from_live_response(live_response(2)))
+    adapter = reusable_adapter()
+    adapter.get_broadcast.side_effect = lambda yt, bid: {
+        "b1": {"status": {"lifeCycleStatus": "complete"}},
+        "b2": {"status": {"lifeCycleStatus": "ready"}},
+    }[bid]
+
+    claimed = pool.claim(adapter, MagicMock())
+
+    assert claimed.broadcast_id == "b2"
+    assert pool.entries() == []
+    adapter.get_stream_key.assert_called_once()
+
+
+def test_claim_keeps_pool_when_api_check_fails():
+    storage = GenerationStorage()
+    pool = LivePool(storage, key="live/pool.json")
+    pool.add(PreparedLive.from_live_response(live_response(1)))
+    pool.add(PreparedLive.from_live_response(live_response(2)))
+    writes = storage.writes
+    adapter = reusable_adapter()
+    adapter.get_broadcast.side_effect = RuntimeError("quota exceeded")
+
+    assert pool.claim(adapter, MagicMock()) is None
+    assert [e.broadcast_id for e in pool.entries()] == ["b1", "b2"]
+    assert storage.writes == writes
+    adapter.get_broadcast.assert_called_once()
+
+
+def test_claim_drops_stale_entries_before_an_unverifiable_one(pool):
+    pool.add(PreparedLive.from_live_response(live_response(1)))
+    pool.add(PreparedLive.from_live_response(live_response(2)))
+    adapter = reusable_adapter()
+
+    def get_broadcast(yt, bid):
+        if bid == "b1":
+            return None
+        raise RuntimeError("503")
+
+    adapter.get_broadcast.side_effect = get_broadcast
+
+    assert pool.claim(adapter, MagicMock()) is None
+    assert [e.broadcast_id for e in pool.entries()] == ["b2"]
+
+def test_to_live_response_matches_create_live_shape():
+    prepared = PreparedLive.from_live_response(live_response(1))
+    prepared.stream_key = "key1"
+    response = prepared.to_live_response()
+
+    assert response["stream"]["cdn"]["ingestionInfo"]["streamName"] == "key1"
+    assert response["broadcast"]["snippet"]["liveChatId"] == "chat1"
+
+
+async def test_wait_for_stream_active_polls_until_active():
+    adapter = YoutubeLiveAdapter.__new__(YoutubeLiveAdapter)
+    statuses = iter([{"streamStatus": "ready"}, {"streamStatus": "ready"},
+                     {"streamStatus": "active", "healthStatus": {"status": "good"}}])
+    adapter.get_stream_status = MagicMock(side_effect=lambda yt, sid: next(statuses))
+
+    assert await adapter.wait_for_stream_active(MagicMock(), "s1", timeout=1, interval=0.01)
+    assert adapter.get_stream_status.call_count == 3
+
+
+async def test_wait_for_stream_active_times_out():
+    adapter = YoutubeLiveAdapter.__new__(YoutubeLiveAdapter)
+    adapter.get_stream_status = MagicMock(return_value={"streamStatus": "inactive"})
+
+    assert not await adapter.wait_for_stream_active(MagicMock(), "s1", timeout=0.05, interval=0.01)
+
+
+async def test_pool_mode_attaches_without_creating(monkeypatch, pool):
+    monkeypatch.setenv("YOUTUBE_LIVE_POOL", "true")
+    monkeypatch.setenv("YOUTUBE_LIVE_POOL_KEY", pool.key)
+    pool.add(PreparedLive.from_live_response(live_response(1)))
+    service = StreamerBodyService()
+    adapter = MagicMock(spec=YoutubeLiveAdapter)
+    adapter.acreate_live = AsyncMock()
+    adapter.get_broadcast.return_value = {"status": {"lifeCycleStatus": "ready"}}
+    adapter.get_stream_key.return_value = "key1"
+    service._youtube_live_adapter = adapter
+
+    with patch("infra.storage_client.create_storage_client", return_value=pool.storage):
+        response = await service._prepare_live({"title": "t"})
+
+    assert response["broadcast"]["id"] == "b1"
+    assert response["stream"]["cdn"]["ingestionInfo"]["streamName"] == "key1"
+    adapter.acreate_live.assert_not_awaited()
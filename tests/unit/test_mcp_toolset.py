@@ -0,0 +1,108 @@
+"""
+Unit tests for ManagedMcpToolset (warm-up, schema caching, reconnect).
+"""
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from google.adk.tools.base_tool import BaseTool
+
+from saint_graph.mcp_toolset import ManagedMcpToolset, health_url_for
+
+
+class FakeTool(BaseTool):
+    def __init__(self, name="get_weather", error=None):
+        super().__init__(name=name, description="天気を取得")
+        self.error = error
+
+    async def run_async(self, *, args, tool_context):
+        if self.error:
+            raise self.error
+        return {"result": "晴れ"}
+
+
+def make_toolset(get_tools, **kwargs):
+    inner = MagicMock()
+    inner.get_tools = AsyncMock(side_effect=get_tools)
+    inner.close = AsyncMock()
+    kwargs.setdefault("min_backoff", 0.0)
+    return inner, ManagedMcpToolset(inner, name="weather", **kwargs)
+
+
+async def test_warm_up_caches_tool_schemas():
+    inner, toolset = make_toolset(lambda: [FakeTool()])
+
+    assert await toolset.warm_up()
+    first = await toolset.get_tools()
+    second = await toolset.get_tools()
+
+    assert [t.name for t in first] == ["get_weather"]
+    assert first is second
+    inner.get_tools.assert_awaited_once()
+
+
+async def test_unavailable_server_drops_tools_and_reconnects():
+    calls = []
+
+    def get_tools():
+        calls.append(1)
+        if len(calls) == 1:
+            raise ConnectionError("refused")
+        return [FakeTool()]
+
+    _, toolset = make_toolset(get_tools)
+
+    assert not await toolset.warm_up()
+    assert await toolset.get_tools() == []
+
+    # バックグラウンドの再接続が終わるとツールが戻る
+    await toolset._reconnect_task
+    assert toolset.healthy
+    assert [t.name for t in await toolset.get_tools()] == ["get_weather"]
+
+
+async def test_slow_server_times_out_during_warm_up():
+    async def hang():
+        await asyncio.sleep(10)
+
+    inner = MagicMock()
+    inner.get_tools = hang
+    toolset = ManagedMcpToolset(inner, name="weather", connect_timeout=0.01)
+
+    assert not await toolset.warm_up()
+    assert not toolset.healthy
+
+
+async def test_tool_failure_returns_error_and_drops_toolset():
+    _, toolset = make_toolset(lambda: [FakeTool(error=ConnectionError("server gone"))], min_backoff=60)
+    await toolset.warm_up()
+    [tool] = await toolset.get_tools()
+
+    result = await tool.run_async(args={"location": "東京"}, tool_context=MagicMock())
+
+    assert "error" in result
+    assert not toolset.healthy
+    # バックオフ中は再接続を試みない
+    assert await toolset.get_tools() == []
+    assert toolset._reconnect_task is None
+
+
+async def test_failed_health_check_backs_off():
+    inner, toolset = make_toolset(lambda: [FakeTool()], health_url="http://weather/health", max_backoff=40)
+    toolset._backoff = 10.0
+
+    with patch.object(toolset, "_probe_health", AsyncMock(return_value=False)):
+        await toolset._reconnect()
+
+    assert not toolset.healthy
+    assert toolset._backoff == 20.0
+    inner.get_tools.assert_not_awaited()
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("http://tools-weather:8001/sse", "http://tools-weather:8001/health"),
+    ("http://tools-weather:8001/sse/", "http://tools-weather:8001/health"),
+    ("http://tools-weather:8001/mcp", None),
+])
+def test_health_url_for(url, expected):
+    assert health_url_for(url) == expected
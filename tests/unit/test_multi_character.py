@@ -0,0 +1,139 @@
+"""
+Unit tests for hosting several characters in one saint_graph process.
+"""
+import asyncio
+import inspect
+import os
+import signal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from infra.storage_client import FileSystemStorageClient
+from saint_graph.body_client import BodyClient
+from saint_graph.broadcast_loop import BroadcastContext
+from saint_graph.main import run_character
+from saint_graph.multi_character import parse_characters, run_characters
+from saint_graph.news_service import NewsService
+from saint_graph.saint_graph import SaintGraph, SharedResources
+from saint_graph.shutdown import ShutdownCoordinator, ShutdownGroup
+
+
+@pytest.fixture
+def loop_config():
+    config = SimpleNamespace(poll_interval=0.01, idle_timeout=0.05)
+    with patch("saint_graph.broadcast_loop.load_config", return_value=config):
+        yield config
+
+
+def test_parse_characters():
+    specs = parse_characters(" ren=http://body-ren:8000 , yuki=http://body-yuki:8000,", news_dir="news")
+
+    assert [(s.name, s.body_url) for s in specs] == [("ren", "http://body-ren:8000"), ("yuki", "http://body-yuki:8000")]
+    assert specs[1].news_path == os.path.join("news", "yuki", "news_script.md")
+    assert specs[1].checkpoint_key == "checkpoints/yuki.json"
+    with pytest.raises(ValueError):
+        parse_characters("ren")
+    with pytest.raises(ValueError):
+        parse_characters("ren=http://a:8000,ren=http://b:8000")
+
+
+async def test_characters_share_resources_but_not_sessions():
+    shared = SharedResources.create("http://tools-weather:8001/sse")
+    ren = SaintGraph(MagicMock(), "", "ren", shared=shared, session_id="yt_session_ren")
+    yuki = SaintGraph(MagicMock(), "", "yuki", shared=shared, session_id="yt_session_yuki")
+
+    assert ren.agent.model is yuki.agent.model
+    assert ren.toolsets == yuki.toolsets and len(ren.toolsets) == 1
+    assert ren.runner.session_service is yuki.runner.session_service
+
+    await ren.restore_history([{"role": "user", "text": "ren だけの話題"}])
+    assert await ren.export_history() == [{"role": "user", "text": "ren だけの話題"}]
+    assert await yuki.export_history() == []
+
+    # 共有資源はキャラクター側では解放しない
+    with patch.object(shared, "close", AsyncMock()) as close:
+        await ren.close()
+        close.assert_not_awaited()
+
+
+def _make_ctx(tmp_path, name: str, start_result: str) -> BroadcastContext:
+    storage = FileSystemStorageClient(base_path=str(tmp_path))
+    storage.write_text(f"news/{name}/news_script.md", "# News\n\n## Weather\nSunny.")
+    news = NewsService(f"news/{name}/news_script.md", storage_client=storage)
+    news.load_news()
+    saint_graph = MagicMock()
+    for method in ("process_intro", "process_news_reading", "process_news_finished", "process_closing"):
+        setattr(saint_graph, method, AsyncMock())
+    saint_graph.body.start_broadcast = AsyncMock(return_value=start_result)
+    saint_graph.body.stop_broadcast = AsyncMock(return_value="stopped")
+    saint_graph.body.get_comments = AsyncMock(return_value=[])
+    saint_graph.body.wait_for_queue = AsyncMock()
+    return BroadcastContext(saint_graph=saint_graph, news_service=news)
+
+
+async def test_run_characters_isolates_failures_and_warms_up_once(tmp_path, loop_config):
+    ren = _make_ctx(tmp_path, "ren", "配信開始を予約しました。")
+    yuki = _make_ctx(tmp_path, "yuki", "Error: Failed to start broadcast")
+    contexts = [ren, yuki]
+    warm_up = AsyncMock()
+
+    errors = await asyncio.wait_for(run_characters(
+        ["ren", "yuki"], contexts, [ShutdownCoordinator(c, deadline=1.0) for c in contexts], [None, None],
+        warm_up=warm_up(),
+    ), timeout=5)
+
+    assert errors[0] is None
+    assert isinstance(errors[1], RuntimeError)
+    warm_up.assert_awaited_once()
+    ren.saint_graph.process_news_reading.assert_awaited_once()
+    ren.saint_graph.process_closing.assert_awaited_once()
+    yuki.saint_graph.process_intro.assert_not_awaited()
+    yuki.saint_graph.body.stop_broadcast.assert_awaited_once()
+
+
+async def test_shutdown_group_stops_every_character():
+    contexts = [BroadcastContext(saint_graph=MagicMock(), news_service=MagicMock()) for _ in range(2)]
+    group = ShutdownGroup([ShutdownCoordinator(c, deadline=1.0) for c in contexts])
+    group.install()
+    try:
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(asyncio.gather(*(c.shutdown.wait() for c in contexts)), timeout=1)
+    finally:
+        group.uninstall()
+
+    assert [c.reason for c in group.coordinators] == ["SIGTERM", "SIGTERM"]
+
+
+async def test_body_clients_reuse_shared_http_pool():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url))
+        return httpx.Response(200, json={"comments": [{"author": "a", "message": "hi"}]})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        ren = BodyClient("http://body-ren:8000", http_client=http_client)
+        yuki = BodyClient("http://body-yuki:8000", http_client=http_client)
+        assert await ren.get_comments() == [{"author": "a", "message": "hi"}]
+        await yuki.get_comments(wait=1.0)
+        # 共有プールはリクエストごとに閉じない
+        assert not http_client.is_closed
+
+    assert seen == ["http://body-ren:8000/api/comments", "http://body-yuki:8000/api/comments?wait=1.0"]
+
+
+async def test_failed_resume_cancels_warm_up(tmp_path):
+    ctx = _make_ctx(tmp_path, "ren", "配信開始を予約しました。")
+    warm_up = asyncio.sleep(10)
+
+    with patch("saint_graph.main._resume_from_checkpoint", AsyncMock(side_effect=RuntimeError("corrupt"))):
+        with pytest.raises(RuntimeError):
+            await run_character(ctx, ShutdownCoordinator(ctx, deadline=1.0), checkpoint=MagicMock(),
+                                warm_up=warm_up)
+
+    # 開始前に失敗しても、準備処理は待たれないまま残らずに取り消される
+    assert inspect.getcoroutinestate(warm_up) == inspect.CORO_CLOSED
+    ctx.saint_graph.body.stop_broadcast.assert_awaited_once()
@@ -0,0 +1,120 @@
+"""
+Unit tests for the playback timeline recorder and dead-air report.
+"""
+import json
+
+import pytest
+
+from body.streamer.timeline import ClipRecord, PlaybackTimeline, percentile
+from infra.storage_client import FileSystemStorageClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def clip(text, enqueued, synthesized, started, duration):
+    return ClipRecord(text, enqueued_at=enqueued, synthesis_started_at=enqueued,
+                      synthesis_finished_at=synthesized, triggered_at=synthesized,
+                      started_at=started, duration=duration)
+
+
+@pytest.fixture
+def timeline():
+    clock = FakeClock()
+    return PlaybackTimeline(clock=clock), clock
+
+
+def test_gap_is_split_into_poll_llm_tts_and_obs(timeline):
+    tl, clock = timeline
+    tl.add_clip(clip("intro", enqueued=1.0, synthesized=2.0, started=2.5, duration=3.0))  # 0 - 5.5
+    clock.now = 6.5
+    tl.mark_comment_poll()
+    tl.add_clip(clip("news", enqueued=8.0, synthesized=9.0, started=9.25, duration=2.0))
+
+    first, second = tl.gaps()
+
+    # 配信開始直後はポーリングなしで LLM を待っている
+    assert first.causes == {"poll_interval": 0.0, "llm_wait": 1.0, "tts_wait": 1.0, "obs_switch": 0.5}
+    assert second.duration == pytest.approx(3.75)
+    assert second.causes == pytest.approx(
+        {"poll_interval": 1.0, "llm_wait": 1.5, "tts_wait": 1.0, "obs_switch": 0.25})
+    assert second.primary_cause == "llm_wait"
+
+
+def test_text_ready_before_previous_clip_ends_is_not_llm_wait(timeline):
+    tl, _ = timeline
+    tl.add_clip(clip("a", enqueued=0.0, synthesized=0.0, started=0.0, duration=5.0))
+    # 次の文は再生中に届いているが、合成が終わったのは再生終了後
+    tl.add_clip(clip("b", enqueued=2.0, synthesized=6.0, started=6.5, duration=1.0))
+
+    (gap,) = tl.gaps()
+
+    assert gap.causes == {"poll_interval": 0.0, "llm_wait": 0.0, "tts_wait": 1.0, "obs_switch": 0.5}
+
+
+def test_overlapping_clips_have_no_gap(timeline):
+    tl, _ = timeline
+    tl.add_clip(clip("a", enqueued=0.0, synthesized=0.0, started=0.0, duration=5.0))
+    tl.add_clip(clip("b", enqueued=1.0, synthesized=2.0, started=4.0, duration=1.0))
+
+    assert tl.gaps() == []
+
+
+def test_polls_before_the_last_clip_end_are_dropped(timeline):
+    tl, clock = timeline
+    for i in range(100):
+        clock.now = i * 10.0 + 1.0
+        tl.mark_comment_poll()
+        tl.add_clip(clip(f"c{i}", enqueued=i * 10.0 + 2.0, synthesized=i * 10.0 + 2.0,
+                         started=i * 10.0 + 2.0, duration=5.0))
+
+    # 割り当て済みのコメント取得時刻は残らず、無音区間ごとの内訳も変わらない
+    assert tl._comment_polls == []
+    assert tl.clip_count == 100
+    assert len(tl.gaps()) == 100
+    assert tl.gaps()[-1].causes == pytest.approx(
+        {"poll_interval": 4.0, "llm_wait": 1.0, "tts_wait": 0.0, "obs_switch": 0.0})
+
+def test_report_contains_percentiles_and_worst_gaps(timeline):
+    tl, _ = timeline
+    start = 0.0
+    for i, gap in enumerate([0.5, 1.0, 4.0, 0.25]):
+        start += gap
+        tl.add_clip(clip(f"c{i}", enqueued=start, synthesized=start, started=start, duration=1.0))
+        start += 1.0
+
+    report = tl.report(worst=2)
+
+    assert report["clips"] == 4
+    assert report["audio_seconds"] == 4.0
+    assert report["dead_air_seconds"] == 5.75
+    assert report["airtime_utilisation"] == pytest.approx(4.0 / 9.75, abs=1e-4)
+    assert report["gap_percentiles"]["p50"] == 0.5
+    assert report["gap_percentiles"]["max"] == 4.0
+    assert [g["duration_seconds"] for g in report["worst_gaps"]] == [4.0, 1.0]
+    assert report["worst_gaps"][0]["next_text"] == "c2"
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 90) == 0.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 90) == 4.0
+
+
+async def test_save_report_writes_json_to_storage(timeline, tmp_path, monkeypatch):
+    monkeypatch.setenv("TIMELINE_REPORT_PREFIX", "reports/test")
+    tl, _ = timeline
+    storage = FileSystemStorageClient(base_path=str(tmp_path))
+    assert await tl.save_report(storage, name="empty") is None
+
+    tl.add_clip(clip("a", enqueued=1.0, synthesized=1.0, started=1.0, duration=1.0))
+    key = await tl.save_report(storage, name="b1")
+
+    assert key == "reports/test/b1.json"
+    report = json.loads(storage.read_text(key))
+    assert report["dead_air_by_cause"]["llm_wait"] == 1.0
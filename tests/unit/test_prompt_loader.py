@@ -96,3 +96,50 @@ def test_load_mind_config_only_speaker_id():
         
         assert result == {"speaker_id": 58}
         assert result["speaker_id"] == 58
+
+
+async def test_aload_mind_config_matches_sync():
+    """非同期版でも同期版と同じ内容が読み込まれる"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mind_dir = Path(tmpdir) / "mind" / "test_char"
+        mind_dir.mkdir(parents=True)
+
+        config = {"speaker_id": 7}
+        (mind_dir / "mind.json").write_text(json.dumps(config))
+
+        storage = FileSystemStorageClient(base_path=tmpdir)
+        loader = PromptLoader("test_char", storage_client=storage)
+
+        assert await loader.aload_mind_config() == loader.load_mind_config() == config
+
+
+async def test_aload_templates_skips_missing():
+    """存在しないテンプレートは警告のみで、他のテンプレートは読み込まれる"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = FileSystemStorageClient(base_path=tmpdir)
+        loader = PromptLoader("test_char", storage_client=storage)
+
+        result = await loader.aload_templates(["intro", "does_not_exist"])
+
+        assert list(result) == ["intro"]
+        assert result["intro"] == loader.load_templates(["intro"])["intro"]
+
+
+async def test_aprefetch_warms_cached_storage(tmp_path):
+    """キャッシュ付きストレージでは mind/{character}/ の .md / .json を先読みする"""
+    from unittest.mock import patch
+    from infra.storage_client import CachingStorageClient
+
+    mind_dir = tmp_path / "data" / "mind" / "test_char"
+    mind_dir.mkdir(parents=True)
+    (mind_dir / "persona.md").write_text("# Test Persona")
+    (mind_dir / "mind.json").write_text("{}")
+    (mind_dir / "bgm.mp3").write_bytes(b"\0")
+    inner = FileSystemStorageClient(base_path=str(tmp_path / "data"))
+    storage = CachingStorageClient(inner, cache_dir=str(tmp_path / "cache"))
+
+    assert await PromptLoader("test_char", storage_client=inner).aprefetch() == 0
+    assert await PromptLoader("test_char", storage_client=storage).aprefetch() == 2
+    with patch.object(inner, "download_file") as spy:
+        assert storage.read_text("mind/test_char/persona.md") == "# Test Persona"
+        spy.assert_not_called()
@@ -47,6 +47,19 @@ async def test_saint_graph_initialization(mock_adk):
     mock_adk["Agent"].assert_called_once()
     mock_adk["InMemoryRunner"].assert_called_once_with(agent=sg.agent)
 
+@pytest.mark.asyncio
+async def test_warm_up_connects_mcp_toolsets(mock_adk):
+    mock_toolset = mock_adk["McpToolset"].return_value
+    mock_toolset.get_tools = AsyncMock(side_effect=ConnectionError("weather down"))
+    sg = SaintGraph(mock_adk["BodyClient"](), "http://weather:8001/sse", "Instruction")
+
+    # 天気サーバーが落ちていても warm_up は失敗せず、ツールなしで続行する
+    await sg.warm_up()
+
+    mock_toolset.get_tools.assert_awaited_once()
+    assert await sg.toolsets[0].get_tools() == []
+    assert mock_adk["Agent"].call_args.kwargs["tools"] == sg.toolsets
+
 @pytest.mark.asyncio
 async def test_process_turn_parses_emotion_tag(mock_adk):
     # Setup
@@ -0,0 +1,98 @@
+"""
+Unit tests for the bounded ADK session service and its SQLite store.
+"""
+import sqlite3
+from unittest.mock import MagicMock
+
+import pytest
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from saint_graph.saint_graph import SaintGraph, SharedResources
+from saint_graph.session_store import BoundedSessionService, SqliteSessionStore
+
+APP, USER, SESSION = "app", "yt_user", "yt_session"
+
+
+def _event(author: str, text: str, **kwargs) -> Event:
+    role = "user" if author == "user" else "model"
+    return Event(author=author, content=types.Content(role=role, parts=[types.Part(text=text)]), **kwargs)
+
+
+async def _append_turns(service, turns: int):
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+    for i in range(turns):
+        await service.append_event(session, _event("user", f"質問 {i}"))
+        await service.append_event(session, _event("SaintGraph", f"回答 {i}"))
+
+
+async def test_memory_service_keeps_recent_events_from_a_user_turn():
+    service = BoundedSessionService(max_events=5)
+    await service.create_session(app_name=APP, user_id=USER, session_id=SESSION)
+    await _append_turns(service, 10)
+
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+
+    # 5 件を超えたら、ユーザーの発言から始まるように古い方を捨てる
+    assert [e.content.parts[0].text for e in session.events] == ["質問 8", "回答 8", "質問 9", "回答 9"]
+    recent = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION,
+                                       config=GetSessionConfig(num_recent_events=1))
+    assert [e.content.parts[0].text for e in recent.events] == ["回答 9"]
+    with pytest.raises(AlreadyExistsError):
+        await service.create_session(app_name=APP, user_id=USER, session_id=SESSION)
+
+
+async def test_sqlite_store_persists_events_and_state(tmp_path):
+    path = str(tmp_path / "sessions" / "test.sqlite3")
+    service = BoundedSessionService(SqliteSessionStore(path), max_events=4)
+    await service.create_session(app_name=APP, user_id=USER, session_id=SESSION)
+    await _append_turns(service, 3)
+    session = await service.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+    await service.append_event(session, _event("SaintGraph", "状態更新",
+                                               actions=EventActions(state_delta={"topic": "天気", "temp:x": 1})))
+    await service.close()
+
+    # 別プロセスを想定して、新しいサービスで読み込み直す
+    restarted = BoundedSessionService(SqliteSessionStore(path), max_events=4)
+    session = await restarted.get_session(app_name=APP, user_id=USER, session_id=SESSION)
+    assert [e.content.parts[0].text for e in session.events] == ["質問 2", "回答 2", "状態更新"]
+    assert session.state == {"topic": "天気"}
+    assert [s.id for s in (await restarted.list_sessions(app_name=APP)).sessions] == [SESSION]
+
+    await restarted.delete_session(app_name=APP, user_id=USER, session_id=SESSION)
+    assert await restarted.get_session(app_name=APP, user_id=USER, session_id=SESSION) is None
+    await restarted.close()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT event_data FROM events WHERE app_name = ? AND user_id = ? AND session_id = ? "
+        "ORDER BY seq DESC LIMIT 5", (APP, USER, SESSION)))
+    assert "idx_events_session" in plan
+    conn.close()
+
+
+async def test_saint_graph_history_survives_restart_with_sqlite(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+
+    def make_saint_graph():
+        shared = SharedResources.create("")
+        shared.session_service = BoundedSessionService(SqliteSessionStore(path))
+        return SaintGraph(MagicMock(), "", "session test", shared=shared)
+
+    first = make_saint_graph()
+    await first.restore_history([{"role": "user", "text": "こんにちは"}, {"role": "model", "text": "ようこそ！"}])
+    await first.shared.close()
+
+    second = make_saint_graph()
+    # 永続化されたセッションがあればチェックポイントの履歴で上書きしない
+    await second.restore_history([{"role": "user", "text": "別の履歴"}])
+    assert await second.export_history() == [
+        {"role": "user", "text": "こんにちは"},
+        {"role": "model", "text": "ようこそ！"},
+    ]
+    await second.shared.close()
@@ -0,0 +1,150 @@
+"""
+Unit tests for the SIGTERM shutdown coordinator and the body's deadline-bound shutdown.
+"""
+import asyncio
+import json
+import os
+import signal
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from body.streamer.service import StreamerBodyService
+from infra.storage_client import FileSystemStorageClient
+from saint_graph.broadcast_loop import BroadcastContext
+from saint_graph.checkpoint import BroadcastCheckpoint, CheckpointStore
+from saint_graph.news_service import NewsService
+from saint_graph.shutdown import ShutdownCoordinator
+
+
+@pytest.fixture
+def news_service(tmp_path):
+    storage = FileSystemStorageClient(base_path=str(tmp_path))
+    storage.write_text("news/news_script.md", "# News\n\n## Weather\nSunny.\n\n## Economy\nUp.")
+    service = NewsService("news/news_script.md", storage_client=storage)
+    service.load_news()
+    return service
+
+
+def _make_ctx(news_service):
+    saint_graph = MagicMock()
+    saint_graph.body.shutdown_broadcast = AsyncMock(return_value="stopped")
+    saint_graph.export_history = AsyncMock(return_value=[{"role": "model", "text": "Weather"}])
+    return BroadcastContext(saint_graph=saint_graph, news_service=news_service,
+                            checkpoints=CheckpointStore(news_service.storage))
+
+
+async def test_sigterm_sets_shutdown_and_finish_stops_within_deadline(news_service):
+    ctx = _make_ctx(news_service)
+    news_service.get_next_item()
+    ctx.checkpoints.save(BroadcastCheckpoint(phase="news", news_index=1, news_total=2))
+    await ctx.checkpoints.flush()
+    stale = json.loads(news_service.storage.read_text(ctx.checkpoints.key))
+    stale["saved_at"] = "2000-01-01T00:00:00Z"
+    news_service.storage.write_text(ctx.checkpoints.key, json.dumps(stale))
+    # 打ち切られたターンの途中でニュースが進んでいても、完了したターンの状態を保存する
+    news_service.get_next_item()
+    coordinator = ShutdownCoordinator(ctx, deadline=5.0)
+    coordinator.install()
+    try:
+        os.kill(os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(ctx.shutdown.wait(), timeout=1)
+    finally:
+        coordinator.uninstall()
+
+    assert coordinator.reason == "SIGTERM"
+    await coordinator.finish()
+
+    deadline = ctx.saint_graph.body.shutdown_broadcast.call_args.kwargs["deadline"]
+    assert 4.0 < deadline <= 5.0
+    # 再起動後はこのチェックポイントから再開できる（保存時刻も更新される）
+    checkpoint = await ctx.checkpoints.aload_resumable(max_age=60)
+    assert (checkpoint.phase, checkpoint.news_index) == ("news", 1)
+    assert checkpoint.history == [{"role": "model", "text": "Weather"}]
+
+
+async def test_finish_gives_up_when_body_exceeds_deadline(news_service):
+    ctx = _make_ctx(news_service)
+
+    async def hang(deadline):
+        await asyncio.sleep(10)
+
+    ctx.saint_graph.body.shutdown_broadcast = AsyncMock(side_effect=hang)
+    coordinator = ShutdownCoordinator(ctx, deadline=0.1)
+    coordinator.request_shutdown("test")
+
+    start = time.monotonic()
+    await coordinator.finish()
+
+    assert time.monotonic() - start < 1.5
+
+
+async def test_second_request_cancels_main_task(news_service):
+    ctx = _make_ctx(news_service)
+    coordinator = ShutdownCoordinator(ctx, deadline=5.0)
+
+    async def main():
+        coordinator.install()
+        try:
+            await asyncio.sleep(10)
+        finally:
+            coordinator.uninstall()
+
+    task = asyncio.create_task(main())
+    await asyncio.sleep(0)
+    coordinator.request_shutdown("SIGTERM")
+    coordinator.request_shutdown("SIGINT")
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+async def test_body_shutdown_discards_queue_and_plays_closing_line():
+    service = StreamerBodyService()
+    service._pending_broadcast_config = None
+    service._closing_line = "ここまでです"
+    service._closing_clip_task = asyncio.get_running_loop().create_future()
+    service._closing_clip_task.set_result(("closing.wav", 0.05))
+    played = []
+
+    async def play(file_path, duration, emotion):
+        played.append(file_path)
+
+    for text in ("一文目", "二文目", "三文目"):
+        await service.speak(text)
+
+    with patch("body.streamer.service.voice_adapter.generate_and_save", AsyncMock()) as synthesize, \
+         patch.object(service, "play_audio_with_sync_emotion", play), \
+         patch("body.streamer.service.obs_adapter.set_visible_source", AsyncMock()), \
+         patch.object(service, "stop_obs_recording", AsyncMock(return_value="stopped")) as stop, \
+         patch.dict(os.environ, {"BROADCAST_STOP_DELAY": "5", "TIMELINE_REPORT": "false"}):
+        await service.start_worker()
+        start = time.monotonic()
+        result = await service.shutdown_broadcast(deadline=2.5)
+        elapsed = time.monotonic() - start
+        await service.stop_worker()
+
+    assert result == "stopped"
+    assert played == ["closing.wav"]
+    synthesize.assert_not_called()
+    stop.assert_awaited_once()
+    # 停止 API の分を残して、BROADCAST_STOP_DELAY より短く切り上げる
+    assert elapsed < 1.0
+
+
+@pytest.mark.parametrize("start_recording", [
+    AsyncMock(return_value=False),
+    AsyncMock(side_effect=ConnectionError("OBS is down")),
+])
+async def test_failed_broadcast_start_is_not_live(start_recording):
+    service = StreamerBodyService()
+    await service.start_broadcast({})
+
+    with patch("body.streamer.service.obs_adapter.start_recording", start_recording), \
+         patch("body.streamer.service.asyncio.sleep", AsyncMock()), \
+         patch.dict(os.environ, {"STREAMING_MODE": "false"}):
+        await service._execute_actual_broadcast_start(service._pending_broadcast_config)
+
+    # 開始できなかった配信を、停止時に配信中として扱わない
+    assert not service.broadcast_live
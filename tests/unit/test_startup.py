@@ -0,0 +1,105 @@
+"""
+Unit tests for startup: explicit config loading, lazy imports and the startup profiler.
+"""
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from saint_graph import config as config_module
+from saint_graph.startup_profile import StartupProfiler
+
+SRC_DIR = str(Path(__file__).resolve().parents[2] / "src")
+
+
+@pytest.fixture
+def fresh_config(monkeypatch):
+    """キャッシュ済みの Config を破棄し、テスト後に元へ戻す"""
+    monkeypatch.setattr(config_module, "_config", None)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    yield
+
+
+def test_load_config_resolves_secrets_once(fresh_config):
+    with patch.object(config_module, "_load_google_api_key", return_value="test-key") as load_key:
+        first = config_module.load_config()
+        second = config_module.load_config()
+
+    assert first is second
+    assert first.google_api_key == "test-key"
+    load_key.assert_called_once()
+
+
+def test_load_config_reload(fresh_config, monkeypatch):
+    with patch.object(config_module, "_load_google_api_key", return_value="test-key"):
+        first = config_module.load_config()
+        monkeypatch.setenv("MAX_WAIT_CYCLES", "5")
+        second = config_module.load_config(reload=True)
+
+    assert first is not second
+    assert second.max_wait_cycles == 5
+
+
+def test_legacy_constants_resolve_lazily(fresh_config, monkeypatch):
+    monkeypatch.setenv("BODY_URL", "http://body:9000")
+    with patch.object(config_module, "_load_google_api_key", return_value="test-key"):
+        assert config_module.BODY_URL == "http://body:9000"
+    with pytest.raises(AttributeError):
+        config_module.NOT_A_SETTING
+
+
+def test_google_api_key_is_prefetched_with_startup_secrets(monkeypatch):
+    provider = MagicMock()
+    provider.prefetch.return_value = {"GOOGLE_API_KEY": "secret-key"}
+    monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
+
+    with patch("infra.secret_provider.create_secret_provider", return_value=provider):
+        assert config_module._load_google_api_key() == "secret-key"
+    provider.prefetch.assert_called_once_with(config_module.STARTUP_SECRETS)
+    provider.get_secret.assert_not_called()
+
+def test_import_does_not_resolve_config_or_load_adk():
+    """config / broadcast_loop の import だけではシークレット取得も ADK の読み込みも行わない"""
+    code = (
+        "import sys\n"
+        "import saint_graph.config as c, saint_graph.broadcast_loop, saint_graph.main\n"
+        "assert c._config is None\n"
+        "assert 'google.adk' not in sys.modules, 'google.adk imported eagerly'\n"
+        "assert 'infra.secret_provider' not in sys.modules\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={"PYTHONPATH": SRC_DIR, "PATH": ""},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+async def test_profiler_records_concurrent_phases():
+    profiler = StartupProfiler(enabled=True)
+
+    with profiler.phase("sync"):
+        pass
+    await asyncio.gather(
+        profiler.track("a", asyncio.sleep(0.02)),
+        profiler.track("b", asyncio.sleep(0.02)),
+    )
+
+    phases = {p.name: p for p in profiler.phases}
+    assert set(phases) == {"sync", "a", "b"}
+    assert phases["a"].duration >= 0.015
+    # 並行実行したフェーズは開始時刻が重なる
+    assert phases["b"].start < phases["a"].end
+    report = profiler.report()
+    assert "Startup profile" in report and "sync" in report
+
+
+async def test_disabled_profiler_records_nothing():
+    profiler = StartupProfiler()
+
+    assert await profiler.track("a", asyncio.sleep(0, result=42)) == 42
+    assert profiler.phases == []
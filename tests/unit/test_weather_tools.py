@@ -1,8 +1,20 @@
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock, AsyncMock
 import json
+from tools.weather import tools
 from tools.weather.tools import get_weather
 
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    """テストごとにキャッシュと共有クライアントを初期化する"""
+    monkeypatch.setenv("WEATHER_CACHE_DIR", str(tmp_path / "weather-cache"))
+    tools.reset_caches()
+    yield
+    tools.reset_caches()
+
+
 @pytest.mark.asyncio
 async def test_get_weather_success():
     # Mock Geocoding Response
@@ -84,3 +96,151 @@ async def test_get_weather_error():
         result = await get_weather("Tokyo")
         assert "失敗" in result  # 'Failed' in Japanese
         assert "Network Error" in result
+
+
+GEO_TOKYO = {"results": [{"latitude": 35.6895, "longitude": 139.6917, "name": "東京"}]}
+WEATHER_TOKYO = {
+    "current_weather": {"temperature": 15.0, "weathercode": 0},
+    "daily": {
+        "time": ["2026-01-10", "2026-01-11"],
+        "temperature_2m_max": [18.0, 17.0],
+        "temperature_2m_min": [10.0, 9.0],
+        "weathercode": [0, 1],
+    },
+}
+
+
+@pytest.fixture
+def fake_client():
+    """URL に応じてジオコード/予報を返す共有クライアントのモック"""
+    with patch('httpx.AsyncClient') as mock_client_cls:
+        mock_client = mock_client_cls.return_value
+
+        async def fake_get(url, **kwargs):
+            await asyncio.sleep(0.01)
+            res = MagicMock()
+            res.json.return_value = GEO_TOKYO if "search" in url else WEATHER_TOKYO
+            return res
+
+        mock_client.get = AsyncMock(side_effect=fake_get)
+        yield mock_client
+
+
+def _urls(mock_client):
+    return [c.args[0] for c in mock_client.get.call_args_list]
+
+
+async def test_repeated_calls_hit_cache(fake_client):
+    first = await get_weather("東京")
+    second = await get_weather("東京", "tomorrow")
+
+    assert "東京" in first and "2026-01-11" in second
+    assert len(_urls(fake_client)) == 2  # ジオコード1回 + 予報1回
+
+
+async def test_concurrent_requests_are_coalesced(fake_client):
+    results = await asyncio.gather(*(get_weather("東京") for _ in range(5)))
+
+    assert len(set(results)) == 1
+    urls = _urls(fake_client)
+    assert sum("search" in u for u in urls) == 1
+    assert sum("forecast" in u for u in urls) == 1
+
+
+async def test_geocode_cache_is_persisted(fake_client):
+    await get_weather("東京")
+    tools.reset_caches()
+
+    await get_weather("東京")
+
+    # 再起動後はジオコードをディスクから読み、予報のみ再取得する
+    urls = _urls(fake_client)
+    assert sum("search" in u for u in urls) == 1
+    assert sum("forecast" in u for u in urls) == 2
+
+
+async def test_forecast_expires_at_update_boundary(fake_client):
+    with patch("tools.weather.tools.time.time", return_value=tools.FORECAST_TTL * 100 + 10):
+        await get_weather("東京")
+    with patch("tools.weather.tools.time.time", return_value=tools.FORECAST_TTL * 101 - 1):
+        await get_weather("東京")
+    with patch("tools.weather.tools.time.time", return_value=tools.FORECAST_TTL * 101):
+        await get_weather("東京")
+
+    assert sum("forecast" in u for u in _urls(fake_client)) == 2
+
+
+async def test_failed_fetch_is_not_cached(fake_client):
+    original = fake_client.get.side_effect
+    fake_client.get.side_effect = Exception("Network Error")
+    assert "失敗" in await get_weather("東京")
+
+    fake_client.get.side_effect = original
+    assert "東京 の天気" in await get_weather("東京")
+
+
+async def test_get_weather_multi_batches_forecasts():
+    from tools.weather.tools import get_weather_multi
+
+    def geo(name, lat, lon):
+        return {"results": [{"latitude": lat, "longitude": lon, "name": name}]}
+
+    geo_by_name = {"%E6%9C%AD%E5%B9%8C": geo("札幌", 43.06, 141.35),
+                   "%E7%A6%8F%E5%B2%A1": geo("福岡", 33.59, 130.40),
+                   "Nowhere": {"results": []}}
+
+    with patch('httpx.AsyncClient') as mock_client_cls:
+        mock_client = mock_client_cls.return_value
+
+        async def fake_get(url, **kwargs):
+            res = MagicMock()
+            if "search" in url:
+                name = url.split("name=")[1].split("&")[0]
+                res.json.return_value = geo_by_name[name]
+            else:
+                assert "latitude=43.06,33.59" in url and "longitude=141.35,130.4" in url
+                cloudy = {**WEATHER_TOKYO, "current_weather": {"temperature": 20.0, "weathercode": 3}}
+                res.json.return_value = [WEATHER_TOKYO, cloudy]
+            return res
+
+        mock_client.get = AsyncMock(side_effect=fake_get)
+
+        result = await get_weather_multi(["札幌", "福岡", "札幌", "Nowhere"])
+
+        forecast_calls = [c for c in mock_client.get.call_args_list if "forecast" in c.args[0]]
+        assert len(forecast_calls) == 1
+        assert "| 札幌 | 晴天 | 15.0°C | 晴天 | 18.0°C | 10.0°C |" in result
+        assert "| 福岡 | くもり | 20.0°C |" in result
+        assert "見つからなかった地点: Nowhere" in result
+
+        # 2回目は予報キャッシュから返す
+        await get_weather_multi(["札幌", "福岡"], "tomorrow")
+        assert len([c for c in mock_client.get.call_args_list if "forecast" in c.args[0]]) == 1
+
+
+async def test_get_weather_multi_tomorrow_table(fake_client):
+    from tools.weather.tools import get_weather_multi
+
+    result = await get_weather_multi(["東京"], "tomorrow")
+
+    assert "| 地点 | 予報 | 最高 | 最低 |" in result
+    assert "| 東京 | 快晴 | 17.0°C | 9.0°C |" in result
+
+
+async def test_metrics_record_cache_and_upstream_calls(fake_client):
+    from tools.weather.metrics import CACHE_HIT_RATIO, CACHE_LOOKUPS, TOOL_ERRORS, UPSTREAM_REQUESTS
+
+    geo_hits = CACHE_LOOKUPS.value(cache="geocode", result="hit")
+    forecast_ok = UPSTREAM_REQUESTS.value(endpoint="forecast", outcome="ok")
+    errors = TOOL_ERRORS.value(tool="get_weather")
+
+    await get_weather("東京")
+    await get_weather("東京")
+
+    assert CACHE_LOOKUPS.value(cache="geocode", result="hit") == geo_hits + 1
+    assert UPSTREAM_REQUESTS.value(endpoint="forecast", outcome="ok") == forecast_ok + 1
+    assert 0.0 < CACHE_HIT_RATIO.value(cache="forecast") <= 1.0
+
+    fake_client.get.side_effect = Exception("Network Error")
+    await get_weather("大阪")
+    assert TOOL_ERRORS.value(tool="get_weather") == errors + 1
@@ -0,0 +1,97 @@
+"""
+Unit tests for the shared YouTube credential / API client cache.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from body.streamer.youtube_auth import YouTubeAuth
+
+
+def make_creds(expires_in: float) -> Credentials:
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=expires_in)
+    return Credentials(
+        token="ya29.mock",
+        refresh_token="1//mock",
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="mock.apps.googleusercontent.com",
+        client_secret="mock-secret",
+        scopes=YouTubeAuth.SCOPES,
+        expiry=expiry,
+    )
+
+
+@pytest.fixture(autouse=True)
+def reset_shared():
+    YouTubeAuth.reset_shared()
+    yield
+    YouTubeAuth.reset_shared()
+
+
+def test_credentials_loaded_once():
+    creds = make_creds(expires_in=3600)
+    with patch.object(YouTubeAuth, "get_credentials", return_value=creds) as load:
+        assert YouTubeAuth.get_shared_credentials() is creds
+        assert YouTubeAuth.get_shared_credentials() is creds
+    load.assert_called_once()
+
+
+def test_token_refreshed_ahead_of_expiry():
+    creds = make_creds(expires_in=60)
+    with patch.object(YouTubeAuth, "get_credentials", return_value=creds), \
+         patch.object(Credentials, "refresh") as refresh:
+        YouTubeAuth.get_shared_credentials()
+    refresh.assert_called_once()
+
+
+def test_token_not_refreshed_when_far_from_expiry():
+    creds = make_creds(expires_in=3600)
+    with patch.object(YouTubeAuth, "get_credentials", return_value=creds), \
+         patch.object(Credentials, "refresh") as refresh:
+        YouTubeAuth.get_shared_credentials()
+    refresh.assert_not_called()
+
+
+def test_service_built_once_with_static_discovery():
+    creds = make_creds(expires_in=3600)
+    with patch.object(YouTubeAuth, "get_credentials", return_value=creds), \
+         patch("body.streamer.youtube_auth.build", return_value=MagicMock()) as build:
+        first = YouTubeAuth.get_shared_service()
+        second = YouTubeAuth.get_shared_service()
+
+    assert first is second
+    build.assert_called_once()
+    assert build.call_args.kwargs["static_discovery"] is True
+
+
+def test_service_builds_offline_and_uses_per_thread_http():
+    """同梱のディスカバリ文書で構築でき、リクエストはスレッドごとの接続を使う"""
+    service = YouTubeAuth.get_service(make_creds(expires_in=3600))
+
+    request = service.liveBroadcasts().list(part="id", mine=True)
+    same_thread = service.videos().list(part="id", id="x")
+
+    assert request.http is same_thread.http
+    assert request.http.credentials.token == "ya29.mock"
+
+
+def test_set_shared_credentials_drops_cached_client():
+    with patch.object(YouTubeAuth, "get_credentials", return_value=make_creds(expires_in=3600)), \
+         patch("body.streamer.youtube_auth.build", side_effect=lambda *a, **k: MagicMock()):
+        first = YouTubeAuth.get_shared_service()
+        YouTubeAuth.set_shared_credentials(make_creds(expires_in=3600))
+        second = YouTubeAuth.get_shared_service()
+
+    assert first is not second
+
+
+def test_export_token_json_for_subprocess():
+    creds = make_creds(expires_in=3600)
+    with patch.object(YouTubeAuth, "get_credentials", return_value=creds):
+        token = json.loads(YouTubeAuth.export_token_json())
+
+    assert token["token"] == "ya29.mock"
+    assert token["refresh_token"] == "1//mock"
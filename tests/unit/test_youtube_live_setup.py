@@ -0,0 +1,170 @@
+"""
+Unit tests for the non-blocking YouTube Live setup pipeline.
+"""
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from body.streamer.service import StreamerBodyService
+from body.streamer.youtube_live_adapter import YoutubeLiveAdapter
+
+API_DELAY = 0.1
+
+
+def make_adapter(calls):
+    """API 呼び出しを記録し、それぞれ API_DELAY 秒ブロックするアダプター"""
+    adapter = YoutubeLiveAdapter.__new__(YoutubeLiveAdapter)
+    lock = threading.Lock()
+
+    def blocking(name, result):
+        def _call(*args, **kwargs):
+            with lock:
+                calls.append((name, "start", time.perf_counter()))
+            time.sleep(API_DELAY)
+            with lock:
+                calls.append((name, "end", time.perf_counter()))
+            return result
+        return _call
+
+    adapter._create_broadcast = blocking("broadcast", {"id": "b1"})
+    adapter._create_stream = blocking("stream", {"id": "s1", "cdn": {"ingestionInfo": {"streamName": "key"}}})
+    adapter._set_thumbnail = blocking("thumbnail", {})
+    adapter._bind_broadcast_to_stream = blocking("bind", {})
+    adapter.get_stream_status = lambda youtube, stream_id: {"streamStatus": "active"}
+    return adapter
+
+
+def times(calls, name):
+    return {phase: t for n, phase, t in calls if n == name}
+
+
+async def test_acreate_live_runs_independent_calls_concurrently():
+    calls = []
+    adapter = make_adapter(calls)
+
+    start = time.perf_counter()
+    result = await adapter.acreate_live(MagicMock(), "title", "desc", "2026-01-01T00:00:00Z",
+                                        thumbnail_path="thumb.png")
+    elapsed = time.perf_counter() - start
+
+    assert result["broadcast"]["id"] == "b1"
+    assert result["stream"]["id"] == "s1"
+    # 逐次なら 4 回分かかるところ、2 段階で終わる
+    assert elapsed < API_DELAY * 3
+    broadcast, stream = times(calls, "broadcast"), times(calls, "stream")
+    assert times(calls, "bind")["start"] >= max(broadcast["end"], stream["end"])
+    assert times(calls, "thumbnail")["start"] >= broadcast["end"]
+
+
+async def test_acreate_live_does_not_block_event_loop():
+    adapter = make_adapter([])
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(ticker())
+    await adapter.acreate_live(MagicMock(), "title", "desc", "2026-01-01T00:00:00Z")
+    task.cancel()
+
+    assert ticks >= 10
+
+
+async def test_start_broadcast_prepares_live_before_first_speech(monkeypatch):
+    monkeypatch.setenv("STREAMING_MODE", "true")
+    service = StreamerBodyService()
+    service._youtube_live_adapter = make_adapter([])
+
+    with patch("body.streamer.youtube_live_adapter.YouTubeAuth.get_shared_service", return_value=MagicMock()), \
+         patch("body.streamer.service.obs_adapter.start_streaming", AsyncMock(return_value=True)) as start_obs, \
+         patch("body.streamer.youtube_comment_adapter.YouTubeCommentAdapter") as comment_adapter:
+        await service.start_broadcast({"title": "t"})
+        assert service._live_setup_task is not None
+        await asyncio.sleep(API_DELAY * 3)
+        assert service._live_setup_task.done()
+
+        # 最初の発話時は準備済みの結果を使うので、API を待たずに OBS を開始できる
+        start = time.perf_counter()
+        result = await service._start_streaming({"title": "t"})
+        assert time.perf_counter() - start < API_DELAY
+
+    start_obs.assert_awaited_once_with("key")
+    comment_adapter.assert_called_once_with("b1", None)
+    assert "b1" in result
+    assert service._live_setup_task is None
+
+
+async def test_stop_before_first_speech_cancels_setup(monkeypatch):
+    monkeypatch.setenv("STREAMING_MODE", "true")
+    service = StreamerBodyService()
+    service._youtube_live_adapter = make_adapter([])
+
+    with patch("body.streamer.service.obs_adapter.stop_streaming", AsyncMock(return_value=True)):
+        await service.start_broadcast({"title": "t"})
+        task = service._live_setup_task
+        await service._stop_streaming()
+
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert service._live_setup_task is None
+
+
+async def test_start_streaming_resolves_youtube_client_off_the_loop(monkeypatch):
+    monkeypatch.setenv("STREAMING_MODE", "true")
+    service = StreamerBodyService()
+    service._youtube_live_adapter = make_adapter([])
+    loop_thread = threading.get_ident()
+    resolved_in = []
+
+    def get_shared_service():
+        resolved_in.append(threading.get_ident())
+        return MagicMock()
+
+    with patch("body.streamer.youtube_live_adapter.YouTubeAuth.get_shared_service", side_effect=get_shared_service), \
+         patch("body.streamer.service.obs_adapter.start_streaming", AsyncMock(return_value=True)), \
+         patch("body.streamer.youtube_comment_adapter.YouTubeCommentAdapter"):
+        await service._start_streaming({"title": "t"})
+
+    # 配信枠の準備と、ストリーム状態の待機の両方でクライアントを取得する
+    assert len(resolved_in) == 2
+    assert loop_thread not in resolved_in
+
+
+async def test_repeated_start_broadcast_reuses_setup_in_progress(monkeypatch):
+    monkeypatch.setenv("STREAMING_MODE", "true")
+    service = StreamerBodyService()
+    calls = []
+    service._youtube_live_adapter = make_adapter(calls)
+
+    with patch("body.streamer.youtube_live_adapter.YouTubeAuth.get_shared_service", return_value=MagicMock()):
+        await service.start_broadcast({"title": "t"})
+        task = service._live_setup_task
+        await asyncio.sleep(API_DELAY / 2)
+        # 作成途中の配信枠を取り消さず、同じ準備を使い続ける
+        await service.start_broadcast({"title": "t"})
+        assert service._live_setup_task is task
+        result = await task
+
+    assert result["broadcast"]["id"] == "b1"
+    assert [name for name, phase, _ in calls if phase == "start"].count("broadcast") == 1
+
+
+async def test_start_broadcast_retries_failed_setup(monkeypatch):
+    monkeypatch.setenv("STREAMING_MODE", "true")
+    service = StreamerBodyService()
+    adapter = make_adapter([])
+    service._youtube_live_adapter = adapter
+    failed = asyncio.get_running_loop().create_future()
+    failed.set_exception(RuntimeError("quota"))
+    service._live_setup_task = failed
+
+    with patch("body.streamer.youtube_live_adapter.YouTubeAuth.get_shared_service", return_value=MagicMock()):
+        await service.start_broadcast({"title": "t"})
+        assert service._live_setup_task is not failed
+        assert (await service._live_setup_task)["broadcast"]["id"] == "b1"